@@ -0,0 +1,117 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   Line framing for serial sensors
+#   ---------------------------------
+#   Ports are opened with timeout=0 as before. Instead of polling them one
+#   byte at a time, the reader waits in select() on the port's file
+#   descriptor until data arrives, reads everything waiting in one call
+#   into a bytearray and splits lines out of it with bytearray.find. A
+#   process waiting on a quiet sensor therefore sleeps in the kernel.
+#   Lines are returned without their terminator, decoded as latin-1 (the
+#   same characters the old chr(c) loops produced). A buffer growing past
+#   maxLength without a terminator is dropped and counted in overflows.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import time
+import select
+import weakref
+
+lineReaders = weakref.WeakKeyDictionary()
+
+
+class SerialLineReader:
+
+    def __init__(self, serialPort, terminator=b'\n', maxLength=4096, encoding='latin-1'):
+        if isinstance(terminator, str):
+            terminator = terminator.encode()
+        self.serialPort = serialPort
+        self.terminator = terminator
+        self.maxLength  = maxLength
+        self.encoding   = encoding
+        self.buffer     = bytearray()
+        self.searchFrom = 0
+        self.overflows  = 0
+
+    def fill(self, timeout):
+        # Waits up to timeout seconds (None for ever) and appends whatever
+        # the port holds. Returns the number of bytes read.
+        try:
+            fileNo = self.serialPort.fileno()
+        except (AttributeError, OSError, ValueError):
+            fileNo = None
+
+        if fileNo is not None:
+            ready, _, _ = select.select([fileNo], [], [], timeout)
+            if not ready:
+                return 0
+            data = self.serialPort.read(max(1, self.serialPort.in_waiting))
+        else:
+            # Ports without a descriptor block in the driver instead
+            self.serialPort.timeout = timeout
+            data = self.serialPort.read(1)
+            if data:
+                data += self.serialPort.read(self.serialPort.in_waiting)
+            self.serialPort.timeout = 0
+
+        self.buffer += data
+        return len(data)
+
+    def takeLine(self):
+        index = self.buffer.find(self.terminator, self.searchFrom)
+        if index < 0:
+            if len(self.buffer) > self.maxLength:
+                self.overflows += 1
+                print("[ERROR] No line terminator in " + str(len(self.buffer)) + " bytes from " \
+                        + str(getattr(self.serialPort, 'portstr', self.serialPort)) + ", dropped")
+                self.clear()
+            else:
+                # The terminator may have been cut between two reads
+                self.searchFrom = max(0, len(self.buffer) - len(self.terminator) + 1)
+            return None
+        line = bytes(self.buffer[:index])
+        del self.buffer[:index + len(self.terminator)]
+        self.searchFrom = 0
+        return line.decode(self.encoding, 'ignore')
+
+    def readLine(self, timeout=None):
+        # Next complete line, or None when timeout seconds pass first.
+        # timeout=None waits for ever and timeout=0 only takes what is
+        # already waiting.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            line = self.takeLine()
+            if line is not None:
+                return line
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self.fill(remaining) and remaining == 0:
+                return None
+
+    def readLines(self, timeout):
+        # Every line received within timeout seconds
+        lines    = []
+        deadline = time.monotonic() + timeout
+        while True:
+            line = self.readLine(max(0.0, deadline - time.monotonic()))
+            if line is None:
+                return lines
+            lines.append(line)
+
+    def lines(self):
+        while True:
+            yield self.readLine()
+
+    def clear(self):
+        del self.buffer[:]
+        self.searchFrom = 0
+
+
+def getReader(serialPort, terminator=b'\n', maxLength=4096):
+    # One reader per open port, so bytes after a line are kept for the next call
+    reader = lineReaders.get(serialPort)
+    if reader is None:
+        reader = lineReaders[serialPort] = SerialLineReader(serialPort, terminator, maxLength)
+    return reader
@@ -3,6 +3,7 @@ import serial
 import datetime
 from mintsJetson import mintsSensorReader as mSR
 from mintsJetson import mintsDefinitions as mD
+from mintsJetson import mintsSerialLines as mSL
 import sys
 
 
@@ -25,24 +26,18 @@ def main(portNum):
         print("Connected to: " + ser.portstr)
         print(" ")
 
-        #this will store the line
-        line = []
+        # Frames from the Nano end with '~' rather than a new line
+        reader = mSL.SerialLineReader(ser,terminator=b'~')
 
         while True:
             try:
-                for c in ser.read():
-                    line.append(chr(c))
-                    if chr(c) == '~':
-                        dataString     = (''.join(line))
-                        dataStringPost = dataString.replace('~', '')
-                        print("================")
-                        print(dataStringPost)
-                        mSR.dataSplit(dataStringPost,datetime.datetime.now())
-                        line = []
-                        break
+                dataStringPost = reader.readLine()
+                print("================")
+                print(dataStringPost)
+                mSR.dataSplit(dataStringPost,datetime.datetime.now())
             except:
                 print("Incomplete String Read")
-                line = []
+                reader.clear()
         ser.close()
 
 
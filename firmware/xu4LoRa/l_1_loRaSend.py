@@ -51,6 +51,7 @@ pa101d  = PAI101D_(bus,debug)
 loRaE5MiniPorts     = mD.loRaE5MiniPorts
 ips7100Ports        = mD.ips7100Ports
 rainPorts           = mD.rainPorts 
+loRaPackedInterval  = mD.loRaPackedInterval
 
 appKey              = mD.appKey
 macAddress          = mD.macAddress
@@ -165,35 +166,22 @@ if __name__ == "__main__":
       print("Trying to connect")
       time.sleep(5)
     
+    # Every sensor is read once per cycle and the records go out packed
+    # in as few uplinks as the data rate allows
+    mPL.startPacking(serE5Mini)
     while True:
+        cycleStart = time.monotonic()
         try:    
             mPL.readSensorData(ips7100Online,serIPS7100,"IPS7100",serE5Mini)
             mintsBCConcatSend08(serE5Mini)
             mPL.readSensorDataI2c(bme280Online,bme280,"BME280V2",serE5Mini)
-            
-            mPL.readSensorData(ips7100Online,serIPS7100,"IPS7100",serE5Mini)
-            mintsBCConcatSend08(serE5Mini)
             mPL.readSensorDataI2c(scd30Online,scd30,"SCD30",serE5Mini)
-            
-            mPL.readSensorData(ips7100Online,serIPS7100,"IPS7100",serE5Mini)
-            mintsBCConcatSend08(serE5Mini)
             mPL.readSensorDataGPSI2C(pa101dOnline,pa101d,"GPGGAPL",serE5Mini)
-
-            mPL.readSensorData(ips7100Online,serIPS7100,"IPS7100",serE5Mini)
-            mintsBCConcatSend08(serE5Mini)
             mPL.readSensorDataI2c(as7265xOnline,as7265x,"AS7265X",serE5Mini)
-    
-            mPL.readSensorData(ips7100Online,serIPS7100,"IPS7100",serE5Mini)
-            mintsBCConcatSend08(serE5Mini)
             mPL.readSensorDataRG15(rainOnline,serRain,"RG15",serE5Mini)
-
-            mPL.readSensorData(ips7100Online,serIPS7100,"IPS7100",serE5Mini)
-            mintsBCConcatSend08(serE5Mini)
             mPL.readSensorDataI2c(mbls001Onlune,mbls001,"MBLS001",serE5Mini)
-
-            mPL.readSensorData(ips7100Online,serIPS7100,"IPS7100",serE5Mini)
-            mintsBCConcatSend08(serE5Mini)
             mPL.readSensorDataGPSI2C(pa101dOnline,pa101d,"GPRMCPL",serE5Mini)
+            mPL.sendPacked(serE5Mini)
 
         except Exception as e:
             time.sleep(.5)
@@ -202,6 +190,8 @@ if __name__ == "__main__":
             print("Data Packet Not Sent")
             time.sleep(.5)
 
+        time.sleep(max(0,loRaPackedInterval - (time.monotonic() - cycleStart)))
+
                   
         
         
@@ -6,6 +6,7 @@ import logging
 import smbus2
 import struct
 import time
+from mintsI2c import i2c_sensirion as sensirion
 
 # to_s16 = lambda x: (x + 2**15) % 2**16 - 2**15
 # to_u16 = lambda x: x % 2**16
@@ -25,7 +26,6 @@ SET_ALTITUDE_COMPENSATION         =0x5102
 READ_SERIALNBR                    =0xD033
 SET_TEMP_OFFSET                   =0x5403
 SOFT_RESET                        =0xD304
-POLYNOMIAL                        =0x31
 
 
 class SCD30:
@@ -169,9 +169,7 @@ class SCD30:
                           self.job_pretty_hex(data))
             return None
 
-        co2_ppm      = self.job_interpret_as_float((data[0] << 16) | data[1])
-        temp_celsius = self.job_interpret_as_float((data[2] << 16) | data[3])
-        rh_percent   = self.job_interpret_as_float((data[4] << 16) | data[5])
+        co2_ppm, temp_celsius, rh_percent = sensirion.wordsToFloats(data)
 
         return (co2_ppm, temp_celsius, rh_percent)
 
@@ -328,13 +326,10 @@ class SCD30:
         # CRC Check byte (cyclic_redundancy_check)] * number of arguments 
         """
 
-        raw_message = list(command.to_bytes(2, "big"))
-        
         # Nothing happens if there are no arguments
         for argument in arguments:
             self.job_check_word(argument)
-            raw_message.extend(argument.to_bytes(2, "big"))
-            raw_message.append(self.job_crc8(argument))
+        raw_message = list(command.to_bytes(2, "big") + sensirion.encodeWords(arguments))
 		
         if(self.debug):
         	print("Sending raw I2C data block: "+ str(self.job_pretty_hex(raw_message)))
@@ -368,7 +363,7 @@ class SCD30:
         # raw_response = self._i2c.read_i2c_block_data(
         #    self._i2c_addr, command, 3 * num_response_words)
 
-        raw_response = list(read_txn)
+        raw_response = bytes(read_txn)
 		
         if(self.debug):
         	print("Received raw I2C response: " + str(self.job_pretty_hex(raw_response)))
@@ -382,22 +377,18 @@ class SCD30:
         # (big-endian), each with a CRC-8 checksum:
         # [MSB0, LSB0, CRC0, MSB1, LSB1, CRC1, ...]
 
-        response = []
-
-        for i in range(num_response_words):
-            # Looking at each word seperately 
-            # word_with_crc contains [MSB, LSB, CRC] for the i-th response word
-            word_with_crc = raw_response[3 * i: 3 * i + 3]
-            word = int.from_bytes(word_with_crc[:2], "big")
-            response_crc = word_with_crc[2]
-            computed_crc = self.job_crc8(word)
-            if (response_crc != computed_crc):
-                print(
-                    "CRC verification for word " + str(self.job_pretty_hex(word)) +
-                    "failed: received " + str(self.job_pretty_hex(response_crc)) +
-                    "computed " +str(self.job_pretty_hex(computed_crc)))
-                return None
-            response.append(word)
+        # All CRCs are checked in one pass, see i2c_sensirion
+        bad_words = sensirion.badWords(raw_response)
+        if bad_words:
+            i = bad_words[0]
+            word = int.from_bytes(raw_response[3 * i: 3 * i + 2], "big")
+            print(
+                "CRC verification for word " + str(self.job_pretty_hex(word)) +
+                "failed: received " + str(self.job_pretty_hex(raw_response[3 * i + 2])) +
+                "computed " +str(self.job_pretty_hex(sensirion.wordCrc(word))))
+            return None
+
+        response = list(sensirion.decodeWords(raw_response))
 		
         if(self.debug):
         	print("CRC-verified response: " + str(self.job_pretty_hex(response)))
@@ -452,24 +443,10 @@ class SCD30:
         Polynomial: x^8 + x^5 + x^4 + 1 (0x31, MSB)
         Initialization: 0xFF
 
-        Algorithm adapted from:
-        https://en.wikipedia.org/wiki/Computation_of_cyclic_redundancy_checks
-
+        Looked up in the table of i2c_sensirion.
         """
         self.job_check_word(word)
-        polynomial = POLYNOMIAL
-        rem = 0xFF
-        word_bytes = word.to_bytes(2, "big")
-        for byte in word_bytes:
-            rem ^= byte
-            for _ in range(8):
-                if rem & 0x80:
-                    rem = (rem << 1) ^ polynomial
-                else:
-                    rem = rem << 1
-                rem &= 0xFF
-
-        return rem
+        return sensirion.wordCrc(word)
 
     def job_interpret_as_float(self,integer: int):
         return struct.unpack('!f', struct.pack('!I', integer))[0]
\ No newline at end of file
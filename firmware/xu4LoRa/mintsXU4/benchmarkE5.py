@@ -0,0 +1,191 @@
+# ***************************************************************************
+#  mintsXU4 - E5 mini driver check and benchmark
+#   ---------------------------------
+#   Runs the start up of l_1_loRaSend (settings, join) and a number of
+#   uplinks against a simulated E5 mini, once with the fixed wait
+#   sendCommand (kept below as the reference) and once with mintsE5.
+#   The simulated modem answers through a pipe, so the serial line
+#   reader and its select() run as on the node. Its latencies follow the
+#   modem: settings in ~20 ms, AT+MSGHEX done after the receive windows
+#   (~2.2 s), AT+JOIN after the join accept (~6 s), and every fifth
+#   uplink is first refused with "No band in 300ms". All times, the
+#   driver's e5SettleTime included, are multiplied by the scale argument
+#   to keep the run short and printed in modem seconds. Also checks the
+#   response classification.
+#
+#   Run from firmware/xu4LoRa:
+#       python3 -m mintsXU4.benchmarkE5 [uplinks] [scale]
+#  ***************************************************************************
+
+import os
+import sys
+import time
+import fcntl
+import struct
+import termios
+import threading
+
+from mintsXU4 import mintsE5 as mE5
+from mintsXU4 import mintsSerialLines as mSL
+
+settingsCommands = [('AT+RESET', 2), ('AT+FDEFAULT', 1), ('AT+VER', 1), ('AT+FDEFAULT', 1),
+                    ('AT+ID', 1), ('AT+KEY=APPKEY, "00000000000000000000000000000000"', 1),
+                    ('AT+MODE=LWOTAA', 1), ('AT+DR=US915', 1), ('AT+DR=dr2', 1),
+                    ('AT+CH=NUM, 56-63', 1), ('AT+POWER=20', 1)]
+
+
+class SimulatedE5:
+
+    def __init__(self, scale):
+        self.scale          = scale
+        self.readFd, self.writeFd = os.pipe()
+        self.joined         = False
+        self.busyUntil      = 0
+        self.messages       = 0
+        self.refused        = set()
+        self.portstr        = "simulatedE5"
+
+    def fileno(self):
+        return self.readFd
+
+    @property
+    def in_waiting(self):
+        return struct.unpack('i', fcntl.ioctl(self.readFd, termios.FIONREAD, b'\0\0\0\0'))[0]
+
+    def read(self, size=1):
+        return os.read(self.readFd, size)
+
+    def later(self, delay, lines):
+        timer = threading.Timer(delay*self.scale, lambda: os.write(self.writeFd,
+                    "".join(line + "\r\n" for line in lines).encode()))
+        timer.daemon = True
+        timer.start()
+
+    def write(self, data):
+        command = data.decode().strip()
+        name    = mE5.commandName(command)
+        value   = command.split('=', 1)[1] if '=' in command else ""
+        now     = time.monotonic()
+        if name == "JOIN":
+            self.later(0.02, ["+JOIN: Start", "+JOIN: NORMAL"])
+            self.later(6.0, ["+JOIN: Network joined", "+JOIN: NetID 000013 DevAddr 26:0C:00:01", "+JOIN: Done"])
+            self.joined = True
+        elif name == "MSGHEX":
+            if not self.joined:
+                self.later(0.02, ["+MSGHEX: Please join network first"])
+            elif now < self.busyUntil:
+                self.later(0.02, ["+MSGHEX: LoRaWAN modem is busy"])
+            elif self.messages % 5 == 4 and self.messages not in self.refused:
+                self.refused.add(self.messages)
+                self.later(0.02, ["+MSGHEX: No band in 300ms"])
+            else:
+                self.messages  += 1
+                self.busyUntil  = now + 2.2*self.scale
+                self.later(0.02, ["+MSGHEX: Start"])
+                self.later(2.2,  ["+MSGHEX: FPENDING", "+MSGHEX: RXWIN2, RSSI -106, SNR 4.0", "+MSGHEX: Done"])
+        elif name == "ID":
+            self.later(0.02, ["+ID: DevAddr, 26:0C:00:01", "+ID: DevEui, 2C:F7:F1:20:00:00:00:01",
+                              "+ID: AppEui, 80:00:00:00:00:00:00:06"])
+        elif name == "DR" and not value:
+            self.later(0.02, ["+DR: US915 DR2 SF8 BW125K"])
+        else:
+            self.later(0.02, ["+" + name + ": " + (value or "OK")])
+        return len(data)
+
+
+def legacySendCommand(serIn, commandStrIn, timeOutIn, scale):
+    # Same waits as the old mintsPoLo.sendCommand
+    time.sleep(.5*scale)
+    serIn.write(str.encode(commandStrIn + '\n\r'))
+    return [line.replace("\r", "") for line in mSL.getReader(serIn).readLines(timeOutIn*scale)]
+
+
+def runLegacy(numOfUplinks, scale):
+    modem   = SimulatedE5(scale)
+    timings = {}
+    startTime = time.monotonic()
+    for commandStr, timeOut in settingsCommands:
+        legacySendCommand(modem, commandStr, timeOut, scale)
+    timings['settings'] = time.monotonic() - startTime
+
+    startTime = time.monotonic()
+    joined    = any(line == '+JOIN: Network joined' for line in legacySendCommand(modem, 'AT+JOIN', 10, scale))
+    timings['join'] = time.monotonic() - startTime
+
+    startTime = time.monotonic()
+    sent = 0
+    for index in range(numOfUplinks):
+        legacySendCommand(modem, 'AT+PORT=' + str(15 + index % 3), 2, scale)
+        lines = legacySendCommand(modem, 'AT+MSGHEX=' + "ab"*20, 5, scale)
+        sent += '+MSGHEX: Done' in lines
+    timings['uplinks'] = time.monotonic() - startTime
+    timings['blocked'] = timings['uplinks']/numOfUplinks
+    return joined, sent, timings
+
+
+def runDriver(numOfUplinks, scale):
+    modem   = SimulatedE5(scale)
+    e5      = mE5.E5Mini(modem)
+    mE5.e5SettleTime *= scale
+    timings = {}
+    startTime = time.monotonic()
+    for commandStr, _ in settingsCommands:
+        response = e5.command(commandStr).result()
+        assert response.ok, response
+    timings['settings'] = time.monotonic() - startTime
+    assert len(e5.command('AT+ID').result().lines) == 3
+
+    startTime = time.monotonic()
+    joined    = e5.join(10).result()
+    timings['join'] = time.monotonic() - startTime
+
+    startTime = time.monotonic()
+    futures   = [e5.uplink(15 + index % 3, "ab"*20) for index in range(numOfUplinks)]
+    timings['blocked'] = (time.monotonic() - startTime)/numOfUplinks
+    responses = [future.result() for future in futures]
+    timings['uplinks'] = time.monotonic() - startTime
+    e5.close()
+    return joined, sum(response.ok for response in responses), timings, e5.stats
+
+
+def checkClassification():
+    cases = [
+        ("AT+MSGHEX=00", ["+MSGHEX: Start", "+MSGHEX: Done"], 'ok'),
+        ("AT+CMSGHEX=00", ["+CMSGHEX: Start", "+CMSGHEX: Wait ACK", "+CMSGHEX: ACK Received", "+CMSGHEX: Done"], 'ok'),
+        ("AT+CMSGHEX=00", ["+CMSGHEX: Start", "+CMSGHEX: Wait ACK", "+CMSGHEX: Done"], 'noAck'),
+        ("AT+MSGHEX=00", ["+MSGHEX: LoRaWAN modem is busy"], 'busy'),
+        ("AT+MSGHEX=00", ["+MSGHEX: No band in 13469ms"], 'dutyCycle'),
+        ("AT+MSGHEX=00", ["+MSGHEX: Please join network first"], 'notJoined'),
+        ("AT+MSGHEX=00", ["+MSGHEX: Length error 130"], 'length'),
+        ("AT+PORT=300", ["+PORT: ERROR(-1)"], 'error'),
+        ("AT+JOIN", ["+JOIN: Start", "+JOIN: NORMAL", "+JOIN: Join failed", "+JOIN: Done"], 'notJoined'),
+        ("AT+JOIN", ["+JOIN: Joined already"], 'ok'),
+    ]
+    for command, lines, status in cases:
+        response = mE5.E5Response(command, lines, True)
+        assert response.status == status, (command, lines, response.status)
+    assert mE5.E5Response("AT+MSGHEX=00", ["+MSGHEX: No band in 13469ms"], True).waitTime == 13.469
+    assert mE5.E5Response("AT+MSGHEX=00", ["+MSGHEX: Start"], False).status == 'timeout'
+    print("Classification: {0} responses checked".format(len(cases) + 2))
+
+
+def main(arguments):
+    numOfUplinks = int(arguments[0]) if arguments else 10
+    scale        = float(arguments[1]) if len(arguments) > 1 else 0.1
+    checkClassification()
+
+    joinedOld, sentOld, timingsOld = runLegacy(numOfUplinks, scale)
+    joinedNew, sentNew, timingsNew, stats = runDriver(numOfUplinks, scale)
+    assert joinedOld and joinedNew
+    assert sentNew == numOfUplinks, stats
+
+    print("{0:<28} {1:>12} {2:>12}".format("Modem seconds", "sendCommand", "mintsE5"))
+    for key, label in [('settings', "11 settings commands"), ('join', "Join"),
+                       ('uplinks', "{0} uplinks, all done".format(numOfUplinks)),
+                       ('blocked', "Sensor loop wait per uplink")]:
+        print("{0:<28} {1:>12.3f} {2:>12.3f}".format(label, timingsOld[key]/scale, timingsNew[key]/scale))
+    print("Uplinks done: {0} and {1} of {2}, driver statuses {3}".format(sentOld, sentNew, numOfUplinks, stats))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
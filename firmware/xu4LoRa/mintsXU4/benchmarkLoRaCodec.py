@@ -0,0 +1,922 @@
+# ***************************************************************************
+#  mintsXU4 - LoRa payload codec check and benchmark
+#   ---------------------------------
+#   For every sensor registered in portIDs.yml (and every layout in
+#   loRaSensors.yaml) random sensor readings, as the readers pass them
+#   (serial fields as strings, NMEA sentences for the GPS), are encoded
+#   by encodeDecode and by the sensing functions of mintsLoRaSensing as
+#   they were before the codec (kept verbatim below as the reference,
+#   legacyEncodeDecode). The payloads have to be equal byte for byte, and
+#   decoding that payload both ways has to give the same fields and
+#   values, as it has for random payloads of the same length. The
+#   dateTime fields are left out: they come from now(), and the old
+#   MBCLR001 decoder read the lag as lag*256. For readings neither
+#   side encodes (e.g. GPS sentences whose time stamps pynmea2 gives with
+#   a zone) only decoding is checked. Encode and decode
+#   times of both are printed.
+#
+#   Run from firmware/xu4LoRa:
+#       python3 -m mintsXU4.benchmarkLoRaCodec
+#  ***************************************************************************
+
+import io
+import sys
+import time
+import math
+import struct
+import random
+import datetime
+import contextlib
+import pynmea2
+import numpy as np
+from datetime import timedelta
+from collections import OrderedDict
+
+from mintsXU4 import mintsDefinitions as mD
+from mintsXU4 import mintsLoRaSensing as mLS
+
+
+def nmeaSentence(body):
+    checksum = 0
+    for character in body:
+        checksum ^= ord(character)
+    return "${0}*{1:02X}".format(body, checksum)
+
+
+def nmeaCoordinate(value, degreeDigits):
+    degrees = int(abs(value))
+    return "{0:0{1}d}{2:07.4f}".format(degrees, degreeDigits, (abs(value) - degrees)*60)
+
+
+def ggaSentence(rng):
+    latitude, longitude = rng.uniform(-89, 89), rng.uniform(-179, 179)
+    return nmeaSentence("GPGGA,{0:02d}{1:02d}{2:02d}.00,{3},{4},{5},{6},{7},{8:02d},{9:.1f},{10:.1f},M,{11:.1f},M,,".format(
+                rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59),
+                nmeaCoordinate(latitude, 2), "N" if latitude >= 0 else "S",
+                nmeaCoordinate(longitude, 3), "E" if longitude >= 0 else "W",
+                rng.randint(1, 2), rng.randint(3, 12), rng.uniform(0.5, 5),
+                rng.uniform(-50, 900), rng.uniform(-40, 40)))
+
+
+def rmcSentence(rng):
+    latitude, longitude = rng.uniform(-89, 89), rng.uniform(-179, 179)
+    return nmeaSentence("GPRMC,{0:02d}{1:02d}{2:02d}.00,A,{3},{4},{5},{6},{7:.2f},{8:.2f},{9:02d}{10:02d}{11:02d},,,A".format(
+                rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59),
+                nmeaCoordinate(latitude, 2), "N" if latitude >= 0 else "S",
+                nmeaCoordinate(longitude, 3), "E" if longitude >= 0 else "W",
+                rng.uniform(0, 60), rng.uniform(0, 360),
+                rng.randint(1, 28), rng.randint(1, 12), rng.randint(20, 30)))
+
+
+def reading(kind, rng):
+    # A single value of a sensor reading: l label, U/F numbers as the serial
+    # readers split them, u8/u16/u32/f as the I2C readers pass them
+    if kind == 'l':
+        return rng.choice(["PC0.1", "PM2.5", "T", "RH", "x"])
+    if kind == 'U':
+        return str(rng.randint(0, 2**31))
+    if kind == 'F':
+        return "{0:.3f}".format(rng.uniform(-1e4, 1e4))
+    if kind == 'f':
+        return rng.uniform(-1e4, 1e4)
+    return rng.randint(0, {'u8': 255, 'u16': 65535, 'u32': 2**32 - 1}[kind])
+
+
+inputKinds = {
+    "IPS7100"    : ['l', 'U']*7 + ['l', 'F']*7 + ['l'],
+    "IPS7100CNR" : ['l', 'U']*7 + ['l', 'F']*7 + ['F']*16,
+    "BME688CNR"  : ['F']*29 + ['F', 'l']*7 + ['l'],
+    "BME280V2"   : ['f']*5,
+    "SCD30"      : ['f']*3,
+    "AS7265X"    : ['f']*18,
+    "MBLS001"    : ['u16'] + ['f']*9,
+    "PM"         : ['u8'],
+    "PMPoLo"     : ['u8'],
+    "MBCLR001"   : ['u8', 'u16', 'f'],
+    "MBCLR002"   : ['u8'] + ['u16', 'u16', 'f']*8,
+    }
+
+inputMakers = {
+    "RG15"    : lambda rng: ["Acc {0:.2f} mm".format(rng.uniform(0, 50)),
+                             "EventAcc {0:.2f} mm".format(rng.uniform(0, 50)),
+                             "TotalAcc {0:.2f} mm".format(rng.uniform(0, 500)),
+                             "RInt {0:.2f} mmph".format(rng.uniform(0, 20))],
+    "MacAD"   : lambda rng: ["{0:012x}".format(rng.getrandbits(48))],
+    "GPGGAPL" : ggaSentence,
+    "GPRMCPL" : rmcSentence,
+    }
+
+
+def sensorInput(sensorID, rng):
+    if sensorID in inputMakers:
+        return inputMakers[sensorID](rng)
+    return [reading(kind, rng) for kind in inputKinds[sensorID]]
+
+
+def quiet(function, *arguments):
+    # The sensing functions print on every call
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*arguments)
+
+
+def sameReadings(sensorDictionary, reference):
+    # Same fields and values, dateTime fields left out and NaN equal to NaN
+    readings  = [(key, value) for key, value in sensorDictionary.items() if not key.startswith("dateTime")]
+    reference = [(key, value) for key, value in reference.items() if not key.startswith("dateTime")]
+    return [key for key, _ in readings] == [key for key, _ in reference] and \
+           all(value == other or (value != value and other != other) \
+                for (_, value), (_, other) in zip(readings, reference))
+
+
+def checkDecode(sensorID, payload):
+    legacy = quiet(legacyEncodeDecode, sensorID, payload, False)
+    values = quiet(mLS.encodeDecode, sensorID, payload, False)
+    if legacy is None:
+        return "reference could not decode {0}".format(payload)
+    if values is None or not sameReadings(values, legacy):
+        return "decoded {0}, reference {1}".format(values, legacy)
+    return None
+
+
+def checkSensor(sensorID, rng, numOfCases=200):
+    # (error or None, whether both sides refused a reading). Payloads are
+    # checked as encoded, and as random bytes of the same length. Once a
+    # reading is refused, which both sides take seconds of sleeps over,
+    # only decoding is checked.
+    if sensorID not in inputKinds and sensorID not in inputMakers:
+        return "no reference sensing function", False
+    refused = False
+    size    = mLS.loRaSensors[sensorID].size
+    for _ in range(numOfCases):
+        if not refused:
+            dataIn  = sensorInput(sensorID, rng)
+            legacy  = quiet(legacyEncodeDecode, sensorID, dataIn, True)
+            payload = quiet(mLS.encodeDecode, sensorID, dataIn, True)
+            if payload != legacy:
+                return "payload {0} differs from {1} for {2}".format(payload, legacy, dataIn), refused
+            if legacy is None:
+                refused = True
+            else:
+                size  = len(legacy)//2
+                error = checkDecode(sensorID, payload)
+                if error is not None:
+                    return error, refused
+        error = checkDecode(sensorID, bytes(rng.getrandbits(8) for _ in range(size)).hex())
+        if error is not None:
+            return error, refused
+    return None, refused
+
+
+def timeIt(function, cases, repeats=20):
+    with contextlib.redirect_stdout(io.StringIO()):
+        startTime = time.perf_counter()
+        for _ in range(repeats):
+            for case in cases:
+                function(*case)
+    return (time.perf_counter() - startTime)/(repeats*len(cases))
+
+
+def main():
+    rng        = random.Random(42)
+    portIDs    = [port['sensor'] for port in mD.fPortIDs]
+    sensorIDs  = sorted(set(portIDs) | set(mLS.loRaSensors))
+    failed     = 0
+    untimed    = []
+
+    print("{0:<12} {1:>5} {2:>6}  {3}".format("Sensor", "Port", "Bytes", "Same as the old sensing"))
+    for sensorID in sensorIDs:
+        port = "yes" if sensorID in portIDs else "-"
+        if sensorID not in mLS.loRaSensors:
+            print("{0:<12} {1:>5} {2:>6}  FAILED: no layout in loRaSensors.yaml".format(sensorID, port, "-"))
+            failed += 1
+            continue
+        error, refused = checkSensor(sensorID, rng)
+        print("{0:<12} {1:>5} {2:>6}  {3}".format(sensorID, port, mLS.loRaSensors[sensorID].size,\
+                "FAILED: " + error if error is not None else \
+                "ok, decode only: neither side encodes the readings" if refused else "ok"))
+        if refused or error is not None:
+            untimed.append(sensorID)
+        failed += error is not None
+
+    print()
+    print("{0:<12} {1:>12} {2:>12} {3:>12} {4:>12}".format(\
+            "Sensor", "enc old us", "enc new us", "dec old us", "dec new us"))
+    for sensorID in sorted(mLS.loRaSensors):
+        if sensorID not in inputKinds and sensorID not in inputMakers or sensorID in untimed:
+            continue
+        encodeCases = [(sensorID, sensorInput(sensorID, rng), True) for _ in range(100)]
+        decodeCases = [(sensorID, quiet(legacyEncodeDecode, *case), False) for case in encodeCases]
+        print("{0:<12} {1:>12.2f} {2:>12.2f} {3:>12.2f} {4:>12.2f}".format(sensorID,
+            1e6*timeIt(legacyEncodeDecode, encodeCases),
+            1e6*timeIt(mLS.encodeDecode, encodeCases),
+            1e6*timeIt(legacyEncodeDecode, decodeCases),
+            1e6*timeIt(mLS.encodeDecode, decodeCases)))
+
+    if failed:
+        print("{0} sensor(s) failed".format(failed))
+        sys.exit(1)
+
+
+# Sensing functions of mintsLoRaSensing before the codec, unchanged but
+# for the name of encodeDecode
+def legacyEncodeDecode(sensorID,sensorData,transmitReceive):
+    # print("Encode Decode")
+    if sensorID == "IPS7100":
+        return sensingIPS7100(sensorData,transmitReceive);
+    if sensorID == "IPS7100CNR":
+        return sensingIPS7100CNR(sensorData,transmitReceive);
+    if sensorID == "BME688CNR":
+        return sensingBME688CNR(sensorData,transmitReceive); 
+    if sensorID == "BME280V2":
+        return sensingBME280V2(sensorData,transmitReceive); 
+    if sensorID == "SCD30":
+        return sensingSCD30(sensorData,transmitReceive);           
+    if sensorID == "AS7265X":
+        return sensingAS7265X(sensorData,transmitReceive);   
+    if sensorID == "PM":
+        return sensingPM(sensorData,transmitReceive);   
+    if sensorID == "PMPoLo":
+        return sensingPM(sensorData,transmitReceive); 
+    if sensorID == "MacAD":
+        return sensingMacAD(sensorData,transmitReceive);      
+    if sensorID == "GPGGAPL":
+        return sensingGPGGAPL(sensorData,transmitReceive);         
+    if sensorID == "GPRMCPL":
+        return sensingGPRMCPL(sensorData,transmitReceive);  
+    if sensorID == "MBCLR001":
+        return sensingMBCLR001(sensorData,transmitReceive);  
+    if sensorID == "MBCLR002":
+        return sensingMBCLR002(sensorData,transmitReceive);  
+    if sensorID == "RG15":
+        return sensingRG15(sensorData,transmitReceive);  
+    if sensorID == "MBLS001":
+        return sensingMBLS001(sensorData,transmitReceive);  
+
+    return;   
+
+
+def sensingRG15(dataIn,transmitReceive):
+    try:
+        if (transmitReceive): 
+            print("RG15 Read")	
+            if (len(dataIn)==4):
+                strOut  = \
+                    np.float32(dataIn[0].replace(' ', "").replace('mm', "").replace('Acc', "")).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[1].replace(' ', "").replace('mm', "").replace('EventAcc', "")).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[2].replace(' ', "").replace('mm', "").replace('TotalAcc', "")).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[3].replace(' ', "").replace('mmph', "").replace('RInt', "")).tobytes().hex().zfill(8)      
+                return strOut;  
+            else:
+                print("Invalid data string read from the RG15")
+                return None;
+        else:
+            dateTime = datetime.datetime.now()
+            sensorDictionary =  OrderedDict([
+                    ("dateTime"           ,str(dateTime)),
+                    ("accumulation"       ,struct.unpack('<f',bytes.fromhex(dataIn[0:8]))[0]),
+                    ("eventAccumulation"  ,struct.unpack('<f',bytes.fromhex(dataIn[8:16]))[0]),
+                    ("totalAccumulation"  ,struct.unpack('<f',bytes.fromhex(dataIn[16:24]))[0]),
+                    ("rainPerInterval"    ,struct.unpack('<f',bytes.fromhex(dataIn[24:32]))[0]),
+            ])
+            return sensorDictionary;
+
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for RG15")
+        time.sleep(.5)
+        return None
+        
+    # For transmitting data, transmitRecieve is True
+def sensingMBCLR002(dataIn,transmitReceive):
+    try:
+        if (transmitReceive): 
+            print("MBCLR002 Read")	
+            strOut  = \
+                np.ubyte(dataIn[0]).tobytes().hex().zfill(2)+ \
+                np.uint16(dataIn[1]).tobytes().hex().zfill(4)+ \
+                np.uint16(dataIn[2]).tobytes().hex().zfill(4)+ \
+                np.float32(dataIn[3]).tobytes().hex().zfill(8)+ \
+                np.uint16(dataIn[4]).tobytes().hex().zfill(4)+ \
+                np.uint16(dataIn[5]).tobytes().hex().zfill(4)+ \
+                np.float32(dataIn[6]).tobytes().hex().zfill(8)+ \
+                np.uint16(dataIn[7]).tobytes().hex().zfill(4)+ \
+                np.uint16(dataIn[8]).tobytes().hex().zfill(4)+ \
+                np.float32(dataIn[9]).tobytes().hex().zfill(8)+ \
+                np.uint16(dataIn[10]).tobytes().hex().zfill(4)+ \
+                np.uint16(dataIn[11]).tobytes().hex().zfill(4)+ \
+                np.float32(dataIn[12]).tobytes().hex().zfill(8)+ \
+                np.uint16(dataIn[13]).tobytes().hex().zfill(4)+ \
+                np.uint16(dataIn[14]).tobytes().hex().zfill(4)+ \
+                np.float32(dataIn[15]).tobytes().hex().zfill(8)+ \
+                np.uint16(dataIn[16]).tobytes().hex().zfill(4)+ \
+                np.uint16(dataIn[17]).tobytes().hex().zfill(4)+ \
+                np.float32(dataIn[18]).tobytes().hex().zfill(8)+ \
+                np.uint16(dataIn[19]).tobytes().hex().zfill(4)+ \
+                np.uint16(dataIn[20]).tobytes().hex().zfill(4)+ \
+                np.float32(dataIn[21]).tobytes().hex().zfill(8)+ \
+                np.uint16(dataIn[22]).tobytes().hex().zfill(4)+ \
+                np.uint16(dataIn[23]).tobytes().hex().zfill(4)+ \
+                np.float32(dataIn[24]).tobytes().hex().zfill(8)
+            return strOut;
+        else:
+            dateTime = datetime.datetime.now() 
+            lag0 = struct.unpack('<H',bytes.fromhex(dataIn[2:6]))[0]
+            lag1 = struct.unpack('<H',bytes.fromhex(dataIn[18:22]))[0]
+            lag2 = struct.unpack('<H',bytes.fromhex(dataIn[34:38]))[0]
+            lag3 = struct.unpack('<H',bytes.fromhex(dataIn[50:54]))[0]    
+            lag4 = struct.unpack('<H',bytes.fromhex(dataIn[66:70]))[0]    
+            lag5 = struct.unpack('<H',bytes.fromhex(dataIn[82:86]))[0]    
+            lag6 = struct.unpack('<H',bytes.fromhex(dataIn[98:102]))[0]    
+            lag7 = struct.unpack('<H',bytes.fromhex(dataIn[114:118]))[0]            
+            
+            dateTime0 = dateTime - timedelta(seconds = lag0)
+            dateTime1 = dateTime - timedelta(seconds = lag1)
+            dateTime2 = dateTime - timedelta(seconds = lag2)
+            dateTime3 = dateTime - timedelta(seconds = lag3)
+            dateTime4 = dateTime - timedelta(seconds = lag4)
+            dateTime5 = dateTime - timedelta(seconds = lag5)
+            dateTime6 = dateTime - timedelta(seconds = lag6)
+            dateTime7 = dateTime - timedelta(seconds = lag7)
+            
+            sensorDictionary =  OrderedDict([
+                    ("dateTime"      ,str(dateTime)),
+                    ("numOfCalls"    ,struct.unpack('<B',bytes.fromhex(dataIn[0:2]))[0]),
+                    ("dateTime0"     ,str(dateTime0)),
+                    ("lag0"          ,struct.unpack('<H',bytes.fromhex(dataIn[2:6]))[0]),
+                    ("label0"        ,struct.unpack('<H',bytes.fromhex(dataIn[6:10]))[0]),
+                    ("confidence0"   ,struct.unpack('<f',bytes.fromhex(dataIn[10:18]))[0]),
+                    ("dateTime1"     ,str(dateTime1)),
+                    ("lag1"          ,struct.unpack('<H',bytes.fromhex(dataIn[18:22]))[0]),
+                    ("label1"        ,struct.unpack('<H',bytes.fromhex(dataIn[22:26]))[0]),
+                    ("confidence1"   ,struct.unpack('<f',bytes.fromhex(dataIn[26:34]))[0]),
+                    ("dateTime2"     ,str(dateTime2)),
+                    ("lag2"          ,struct.unpack('<H',bytes.fromhex(dataIn[34:38]))[0]),
+                    ("label2"        ,struct.unpack('<H',bytes.fromhex(dataIn[38:42]))[0]),
+                    ("confidence2"   ,struct.unpack('<f',bytes.fromhex(dataIn[42:50]))[0]),
+                    ("dateTime3"     ,str(dateTime3)),
+                    ("lag3"          ,struct.unpack('<H',bytes.fromhex(dataIn[50:54]))[0]),
+                    ("label3"        ,struct.unpack('<H',bytes.fromhex(dataIn[54:58]))[0]),
+                    ("confidence3"   ,struct.unpack('<f',bytes.fromhex(dataIn[58:66]))[0]),
+                    ("dateTime4"     ,str(dateTime4)),
+                    ("lag4"          ,struct.unpack('<H',bytes.fromhex(dataIn[66:70]))[0]),
+                    ("label4"        ,struct.unpack('<H',bytes.fromhex(dataIn[70:74]))[0]),
+                    ("confidence4"   ,struct.unpack('<f',bytes.fromhex(dataIn[74:82]))[0]),
+                    ("dateTime5"     ,str(dateTime5)),
+                    ("lag5"          ,struct.unpack('<H',bytes.fromhex(dataIn[82:86]))[0]),
+                    ("label5"        ,struct.unpack('<H',bytes.fromhex(dataIn[86:90]))[0]),
+                    ("confidence5"   ,struct.unpack('<f',bytes.fromhex(dataIn[90:98]))[0]),
+                    ("dateTime6"     ,str(dateTime6)),
+                    ("lag6"          ,struct.unpack('<H',bytes.fromhex(dataIn[98:102]))[0]),
+                    ("label6"        ,struct.unpack('<H',bytes.fromhex(dataIn[102:106]))[0]),
+                    ("confidence6"   ,struct.unpack('<f',bytes.fromhex(dataIn[106:114]))[0]),
+                    ("dateTime7"     ,str(dateTime7)),
+                    ("lag7"          ,struct.unpack('<H',bytes.fromhex(dataIn[114:118]))[0]),
+                    ("label7"        ,struct.unpack('<H',bytes.fromhex(dataIn[118:122]))[0]),
+                    ("confidence7"   ,struct.unpack('<f',bytes.fromhex(dataIn[122:130]))[0]),
+                ])
+            return sensorDictionary;
+    
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for IPS7100")
+        time.sleep(.5)
+        return None     
+    
+def sensingMBCLR001(dataIn,transmitReceive):
+    try:
+        if (transmitReceive): 
+            print("MBCLR001 Read")	
+            strOut  = \
+                np.ubyte(dataIn[0]).tobytes().hex().zfill(4)+ \
+                np.uint16(dataIn[1]).tobytes().hex().zfill(4)+ \
+                np.float32(dataIn[2]).tobytes().hex().zfill(8)
+            return strOut;  
+        else:
+            dateTimePre = datetime.datetime.now() 
+            lag = struct.unpack('<H',bytes.fromhex(dataIn[0:4]))[0]
+            dateTime = dateTimePre - timedelta(seconds = lag)
+            sensorDictionary =  OrderedDict([
+                    ("dateTime"     ,str(dateTime)),
+                    ("label"        ,struct.unpack('<H',bytes.fromhex(dataIn[4:8]))[0]),
+                    ("confidence"   ,struct.unpack('<f',bytes.fromhex(dataIn[8:16]))[0]),
+            ])
+            return sensorDictionary;
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for MBCLR001")
+        time.sleep(.5)
+        return None
+
+
+def sensingPM(dataIn,transmitReceive):
+    try:
+        print("Reading Power Mode")	
+        if (transmitReceive): 
+            strOut  = \
+                np.ubyte(dataIn[0]).tobytes().hex().zfill(2)
+            return strOut;  
+        else:
+            dateTime = datetime.datetime.now()
+            sensorDictionary =  OrderedDict([
+                    ("dateTime"      ,str(dateTime)),
+                    ("powerMode",struct.unpack('<B',bytes.fromhex(dataIn[0:8]))[0])
+            ])
+            return sensorDictionary;
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for PM")
+        time.sleep(.5)
+        return None
+
+
+def sensingPMPoLo(dataIn,transmitReceive):
+    try:    
+        print("Reading Power Mode")	
+        if (transmitReceive): 
+            strOut  = \
+                np.ubyte(dataIn[0]).tobytes().hex().zfill(2)
+            return strOut;  
+        else:
+            dateTime = datetime.datetime.now()
+            sensorDictionary =  OrderedDict([
+                    ("dateTime"      ,str(dateTime)),
+                    ("powerMode",struct.unpack('<B',bytes.fromhex(dataIn[0:2]))[0])
+            ])
+            return sensorDictionary;
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for PMPoLo")
+        time.sleep(.5)
+        return None
+    
+def sensingMacAD(dataIn,transmitReceive):
+    try:
+        print("Reading Mac Address")	
+        if (transmitReceive): 
+            strOut  = \
+                dataIn[0].zfill(12)
+            return strOut;  
+        else:
+            dateTime = datetime.datetime.now()
+            sensorDictionary =  OrderedDict([
+                    ("dateTime"      ,str(dateTime)),
+                    ("macAddress" ,dataIn),
+            ])
+            return sensorDictionary;
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for Mac Address")
+        time.sleep(.5)
+        return None
+            
+def getLatitudeCords(latitudeStr,latitudeDirection):
+    latitude = float(latitudeStr)
+    latitudeCord      =  math.floor(latitude/100) +(latitude - 100*(math.floor(latitude/100)))/60
+    if(latitudeDirection=="S"):
+        latitudeCord = -1*latitudeCord
+    return latitudeCord
+
+def getLongitudeCords(longitudeStr,longitudeDirection):
+    longitude = float(longitudeStr)
+    longitudeCord      =  math.floor(longitude/100) +(longitude - 100*(math.floor(longitude/100)))/60
+    if(longitudeDirection=="W"):
+        longitudeCord = -1*longitudeCord
+    return longitudeCord      
+
+
+def sensingGPGGAPL(dataIn,transmitReceive):
+    try:
+        if (transmitReceive): 
+            dataIn = pynmea2.parse(dataIn)
+            if (dataIn.gps_qual>0):
+                timeStamp = str(dataIn.timestamp).split(":")
+                print("GPGGAPL Read")	
+                strOut  = \
+                    np.ubyte(timeStamp[0]).tobytes().hex().zfill(2)+ \
+                    np.ubyte(timeStamp[1]).tobytes().hex().zfill(2)+ \
+                    np.ubyte(timeStamp[2]).tobytes().hex().zfill(2)+ \
+                    np.double(getLatitudeCords(dataIn.lat,dataIn.lat_dir)).tobytes().hex().zfill(16)+ \
+                    np.double(getLongitudeCords(dataIn.lon,dataIn.lon_dir)).tobytes().hex().zfill(16) + \
+                    np.ubyte(dataIn.gps_qual).tobytes().hex().zfill(2)+ \
+                    np.ubyte(dataIn.num_sats).tobytes().hex().zfill(2)+ \
+                    np.float32(dataIn.horizontal_dil).tobytes().hex().zfill(8) +\
+                    np.float32(dataIn.altitude).tobytes().hex().zfill(8) +\
+                    np.float32(dataIn.geo_sep).tobytes().hex().zfill(8) ;
+                return strOut;  
+            else:
+                print("GPGGAPL Data Not Read: No GPS Signal")	
+                return None
+
+        else:
+            dateTime = datetime.datetime.now()
+            sensorDictionary =  OrderedDict([
+                    ("dateTime"            ,str(dateTime)),
+                    ("hour"                ,struct.unpack('<B',bytes.fromhex(dataIn[0:2]))[0]),
+                    ("minute"              ,struct.unpack('<B',bytes.fromhex(dataIn[2:4]))[0]),
+                    ("second"              ,struct.unpack('<B',bytes.fromhex(dataIn[4:6]))[0]),
+                    ("latitudeCoordinate"  ,struct.unpack('<d',bytes.fromhex(dataIn[6:22]))[0]),
+                    ("longitudeCoordinate" ,struct.unpack('<d',bytes.fromhex(dataIn[22:38]))[0]),
+                    ("gpsQuality"          ,struct.unpack('<B',bytes.fromhex(dataIn[38:40]))[0]),
+                    ("numberOfSatellites"  ,struct.unpack('<B',bytes.fromhex(dataIn[40:42]))[0]),
+                    ("HorizontalDilution"  ,struct.unpack('<f',bytes.fromhex(dataIn[42:50]))[0]),
+                    ("altitude"            ,struct.unpack('<f',bytes.fromhex(dataIn[50:58]))[0]),
+                    ("undulation"          ,struct.unpack('<f',bytes.fromhex(dataIn[58:66]))[0]),
+            ])
+            return sensorDictionary;
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for GPGGAPL")
+        time.sleep(.5)
+        return None
+
+def sensingGPRMCPL(dataIn,transmitReceive):
+    try:
+        if (transmitReceive): 
+            dataIn = pynmea2.parse(dataIn)
+            if (dataIn.status=='A'):
+                timeStamp = str(dataIn.timestamp).split(":")
+                dateStamp = str(dataIn.datestamp).split("-")
+                print("GPRMCPL Read")	
+                strOut  = \
+                    np.uint16(dateStamp[0]).tobytes().hex().zfill(4)+ \
+                    np.ubyte(dateStamp[1]).tobytes().hex().zfill(2)+ \
+                    np.ubyte(dateStamp[2]).tobytes().hex().zfill(2)+ \
+                    np.ubyte(timeStamp[0]).tobytes().hex().zfill(2)+ \
+                    np.ubyte(timeStamp[1]).tobytes().hex().zfill(2)+ \
+                    np.ubyte(timeStamp[2]).tobytes().hex().zfill(2)+ \
+                    np.double(getLatitudeCords(dataIn.lat,dataIn.lat_dir)).tobytes().hex().zfill(16)+ \
+                    np.double(getLongitudeCords(dataIn.lon,dataIn.lon_dir)).tobytes().hex().zfill(16) + \
+                    np.float32(dataIn.spd_over_grnd).tobytes().hex().zfill(8) ;
+                return strOut;  
+            else:
+                print("GPRMCPL Data Not Read: No GPS Signal")	
+                return None
+        else:
+            dateTime = datetime.datetime.now()
+            sensorDictionary =  OrderedDict([
+                    ("dateTime"            ,str(dateTime)),
+                    ("year"                ,struct.unpack('<H',bytes.fromhex(dataIn[0:4]))[0]),
+                    ("month"               ,struct.unpack('<B',bytes.fromhex(dataIn[4:6]))[0]),
+                    ("day"                 ,struct.unpack('<B',bytes.fromhex(dataIn[6:8]))[0]),               
+                    ("hour"                ,struct.unpack('<B',bytes.fromhex(dataIn[8:10]))[0]),
+                    ("minute"              ,struct.unpack('<B',bytes.fromhex(dataIn[10:12]))[0]),
+                    ("second"              ,struct.unpack('<B',bytes.fromhex(dataIn[12:14]))[0]),
+                    ("latitudeCoordinate"  ,struct.unpack('<d',bytes.fromhex(dataIn[14:30]))[0]),
+                    ("longitudeCoordinate" ,struct.unpack('<d',bytes.fromhex(dataIn[30:46]))[0]),
+                    ("speedOverGround"     ,struct.unpack('<f',bytes.fromhex(dataIn[46:54]))[0]),
+            ])
+            return sensorDictionary;
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for GPRMCPL")
+        time.sleep(.5)
+        return None
+
+def sensingAS7265X(dataIn,transmitReceive):
+    try:
+        if (transmitReceive): 
+            print("AS7265X Read")	
+            if(len(dataIn)==18):
+                strOut  = \
+                    np.float32(dataIn[0]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[1]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[2]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[3]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[4]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[5]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[6]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[7]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[8]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[9]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[10]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[11]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[12]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[13]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[14]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[15]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[16]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[17]).tobytes().hex().zfill(8) ;
+                return strOut;  
+            else:
+                print("Invalid data string read by the Canaaree")
+                return None;
+        else:
+            dateTime = datetime.datetime.now()
+            sensorDictionary =  OrderedDict([
+                    ("dateTime"      ,str(dateTime)),
+                    ("channelA410nm" ,struct.unpack('<f',bytes.fromhex(dataIn[0:8]))[0]),
+                    ("channelB435nm" ,struct.unpack('<f',bytes.fromhex(dataIn[8:16]))[0]),
+                    ("channelC460nm" ,struct.unpack('<f',bytes.fromhex(dataIn[16:24]))[0]),
+                    ("channelD485nm" ,struct.unpack('<f',bytes.fromhex(dataIn[24:32]))[0]),                
+                    ("channelE510nm" ,struct.unpack('<f',bytes.fromhex(dataIn[32:40]))[0]),
+                    ("channelF535nm" ,struct.unpack('<f',bytes.fromhex(dataIn[40:48]))[0]),
+                    ("channelG560nm" ,struct.unpack('<f',bytes.fromhex(dataIn[48:56]))[0]),
+                    ("channelH585nm" ,struct.unpack('<f',bytes.fromhex(dataIn[56:64]))[0]),                
+                    ("channelR610nm" ,struct.unpack('<f',bytes.fromhex(dataIn[64:72]))[0]),
+                    ("channelI645nm" ,struct.unpack('<f',bytes.fromhex(dataIn[72:80]))[0]),
+                    ("channelS680nm" ,struct.unpack('<f',bytes.fromhex(dataIn[80:88]))[0]),
+                    ("channelJ705nm" ,struct.unpack('<f',bytes.fromhex(dataIn[88:96]))[0]),                
+                    ("channelT730nm" ,struct.unpack('<f',bytes.fromhex(dataIn[96:104]))[0]),
+                    ("channelU760nm" ,struct.unpack('<f',bytes.fromhex(dataIn[104:112]))[0]),
+                    ("channelV810nm" ,struct.unpack('<f',bytes.fromhex(dataIn[112:120]))[0]),
+                    ("channelW860nm" ,struct.unpack('<f',bytes.fromhex(dataIn[120:128]))[0]),                
+                    ("channelK900nm" ,struct.unpack('<f',bytes.fromhex(dataIn[128:136]))[0]),
+                    ("channelL940nm" ,struct.unpack('<f',bytes.fromhex(dataIn[136:144]))[0]),
+            ])
+            return sensorDictionary;
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for AS7265X")
+        time.sleep(.5)
+        return None
+
+
+
+def sensingMBLS001(dataIn,transmitReceive):
+    try:
+        if (transmitReceive): 
+            print("MBLS001 Read")	
+
+            if (len(dataIn)==10):
+                strOut  = \
+                     np.uint16(dataIn[0]).tobytes().hex().zfill(4) + \
+                    np.float32(dataIn[1]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[2]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[3]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[4]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[5]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[6]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[7]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[8]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[9]).tobytes().hex().zfill(8) 
+                return strOut;  
+            else:
+                print("Invalid data string read from the MBLS001")
+
+                return None;
+
+        else:
+            dateTime = datetime.datetime.now()
+            sensorDictionary =  OrderedDict([
+                    ("dateTime"            ,str(dateTime)),
+                    ("batteryLevelRaw"     ,struct.unpack('<H',bytes.fromhex(dataIn[0:4]))[0]),
+                    ("cellVoltage"         ,struct.unpack('<f',bytes.fromhex(dataIn[4:12]))[0]),
+                    ("solarVoltage"        ,struct.unpack('<f',bytes.fromhex(dataIn[12:20]))[0]),
+                    ("solarCurrent"        ,struct.unpack('<f',bytes.fromhex(dataIn[20:28]))[0]),
+                    ("solarPower"          ,struct.unpack('<f',bytes.fromhex(dataIn[28:36]))[0]),
+                    ("solarShuntVoltage"   ,struct.unpack('<f',bytes.fromhex(dataIn[36:44]))[0]), 
+                    ("batteryVoltage"      ,struct.unpack('<f',bytes.fromhex(dataIn[44:52]))[0]),
+                    ("batteryCurrent"      ,struct.unpack('<f',bytes.fromhex(dataIn[52:60]))[0]),
+                    ("batteryPower"        ,struct.unpack('<f',bytes.fromhex(dataIn[60:68]))[0]),
+                    ("batteryShuntVoltage" ,struct.unpack('<f',bytes.fromhex(dataIn[68:76]))[0])
+            ])
+            return sensorDictionary;
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for MBLS001")
+        time.sleep(.5)
+        return None
+
+def sensingBME280V2(dataIn,transmitReceive):
+    try:
+        if (transmitReceive): 
+            print("BME280V2 Read")	
+            if (len(dataIn)==5):
+                strOut  = \
+                    np.float32(dataIn[0]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[1]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[2]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[3]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[4]).tobytes().hex().zfill(8)
+                return strOut;  
+            else:
+                print("Invalid data string read from the BME280")
+
+                return None;
+
+        else:
+            dateTime = datetime.datetime.now()
+            sensorDictionary =  OrderedDict([
+                    ("dateTime"     ,str(dateTime)),
+                    ("temperature"  ,struct.unpack('<f',bytes.fromhex(dataIn[0:8]))[0]),
+                    ("pressure"     ,struct.unpack('<f',bytes.fromhex(dataIn[8:16]))[0]),
+                    ("humidity"     ,struct.unpack('<f',bytes.fromhex(dataIn[16:24]))[0]),
+                    ("dewPoint"     ,struct.unpack('<f',bytes.fromhex(dataIn[24:32]))[0]),
+                    ("altitude"     ,struct.unpack('<f',bytes.fromhex(dataIn[32:40]))[0]),        
+            ])
+            return sensorDictionary;
+
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for SCD30")
+        time.sleep(.5)
+        return None
+
+
+
+def sensingSCD30(dataIn,transmitReceive):
+    try:
+        if (transmitReceive): 
+            print("SCD30 Read")	
+            if (len(dataIn)==3):
+                strOut  = \
+                    np.float32(dataIn[0]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[1]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[2]).tobytes().hex().zfill(8)
+                return strOut;  
+            else:
+                print("Invalid data string read from the SCD30")
+                return None;
+
+        else:
+            dateTime = datetime.datetime.now()
+            sensorDictionary =  OrderedDict([
+                    ("dateTime"     ,str(dateTime)),
+                    ("co2"          ,struct.unpack('<f',bytes.fromhex(dataIn[0:8]))[0]),
+                    ("temperature"  ,struct.unpack('<f',bytes.fromhex(dataIn[8:16]))[0]),
+                    ("humidity"     ,struct.unpack('<f',bytes.fromhex(dataIn[16:24]))[0]),
+            ])
+            return sensorDictionary;
+
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for SCD30")
+        time.sleep(.5)
+        return None
+
+def sensingBME688CNR(dataIn,transmitReceive):
+    try:
+        if (transmitReceive): 
+            print("BME688CNR Read")	
+            if (len(dataIn)== 44): 
+                strOut  = \
+                    np.float32(dataIn[29]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[31]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[33]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[35]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[37]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[39]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[41]).tobytes().hex().zfill(8)
+                return strOut;  
+            else:
+                print("Invalid data string read from the Canaaree")
+                return None;
+        else:
+            dateTime = datetime.datetime.now()
+            sensorDictionary =  OrderedDict([
+                    ("dateTime"    , str(dateTime)), 
+                    ("temperature" ,struct.unpack('<f',bytes.fromhex(dataIn[0:8]))[0]),
+                    ("humidity"    ,struct.unpack('<f',bytes.fromhex(dataIn[8:16]))[0]),
+                    ("pressure"    ,struct.unpack('<f',bytes.fromhex(dataIn[16:24]))[0]),
+                    ("vocAqi"      ,struct.unpack('<f',bytes.fromhex(dataIn[24:32]))[0]),
+                    ("bvocEq"      ,struct.unpack('<f',bytes.fromhex(dataIn[32:40]))[0]),
+                    ("gasEst"      ,struct.unpack('<f',bytes.fromhex(dataIn[40:48]))[0]), 
+                    ("co2Eq"       ,struct.unpack('<f',bytes.fromhex(dataIn[48:56]))[0]),
+            ])
+            return sensorDictionary;
+
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for BME688CNR")
+        time.sleep(.5)
+        return None
+        
+def sensingIPS7100(dataIn,transmitReceive):
+
+    try:
+        if (transmitReceive):  
+            print("IPS7100 Read")	
+            if (len(dataIn)== 29): 
+                strOut  = \
+                    np.uint32(dataIn[1]).tobytes().hex().zfill(8)+ \
+                    np.uint32(dataIn[3]).tobytes().hex().zfill(8) + \
+                    np.uint32(dataIn[5]).tobytes().hex().zfill(8)+ \
+                    np.uint32(dataIn[7]).tobytes().hex().zfill(8) + \
+                    np.uint32(dataIn[9]).tobytes().hex().zfill(8)+ \
+                    np.uint32(dataIn[11]).tobytes().hex().zfill(8) + \
+                    np.uint32(dataIn[13]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[15]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[17]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[19]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[21]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[23]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[25]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[27]).tobytes().hex().zfill(8)
+                return strOut;  
+            else:
+                print("Invalid data string read from the IPS7100")
+                return None
+
+        else:
+            dateTime = datetime.datetime.now()
+            sensorDictionary =  OrderedDict([
+                    ("dateTime" , str(dateTime)), 
+                    ("pc0_1"  ,struct.unpack('<L',bytes.fromhex(dataIn[0:8]))[0]),
+                    ("pc0_3"  ,struct.unpack('<L',bytes.fromhex(dataIn[8:16]))[0]),
+                    ("pc0_5"  ,struct.unpack('<L',bytes.fromhex(dataIn[16:24]))[0]),
+                    ("pc1_0"  ,struct.unpack('<L',bytes.fromhex(dataIn[24:32]))[0]),
+                    ("pc2_5"  ,struct.unpack('<L',bytes.fromhex(dataIn[32:40]))[0]),
+                    ("pc5_0"  ,struct.unpack('<L',bytes.fromhex(dataIn[40:48]))[0]), 
+                    ("pc10_0" ,struct.unpack('<L',bytes.fromhex(dataIn[48:56]))[0]),
+                    ("pm0_1"  ,struct.unpack('<f',bytes.fromhex(dataIn[56:64]))[0]), 
+                    ("pm0_3"  ,struct.unpack('<f',bytes.fromhex(dataIn[64:72]))[0]),
+                    ("pm0_5"  ,struct.unpack('<f',bytes.fromhex(dataIn[72:80]))[0]),
+                    ("pm1_0"  ,struct.unpack('<f',bytes.fromhex(dataIn[80:88]))[0]),
+                    ("pm2_5"  ,struct.unpack('<f',bytes.fromhex(dataIn[88:96]))[0]),
+                    ("pm5_0"  ,struct.unpack('<f',bytes.fromhex(dataIn[96:104]))[0]), 
+                    ("pm10_0" ,struct.unpack('<f',bytes.fromhex(dataIn[104:112]))[0])
+            ])
+            return sensorDictionary;
+
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for IPS7100")
+        time.sleep(.5)
+        return None
+
+        
+def sensingIPS7100CNR(dataIn,transmitReceive):
+    try:
+        if (transmitReceive):  
+            print("IPS7100CNR Read")	
+            if (len(dataIn)== 44): 
+                strOut  = \
+                    np.uint32(dataIn[1]).tobytes().hex().zfill(8)+ \
+                    np.uint32(dataIn[3]).tobytes().hex().zfill(8) + \
+                    np.uint32(dataIn[5]).tobytes().hex().zfill(8)+ \
+                    np.uint32(dataIn[7]).tobytes().hex().zfill(8) + \
+                    np.uint32(dataIn[9]).tobytes().hex().zfill(8)+ \
+                    np.uint32(dataIn[11]).tobytes().hex().zfill(8) + \
+                    np.uint32(dataIn[13]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[15]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[17]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[19]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[21]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[23]).tobytes().hex().zfill(8)+ \
+                    np.float32(dataIn[25]).tobytes().hex().zfill(8) + \
+                    np.float32(dataIn[27]).tobytes().hex().zfill(8)
+                return strOut;  
+            else:
+                print("Invalid data string read from the IPS7100CNR")
+                return None
+
+        else:
+            dateTime = datetime.datetime.now()
+            sensorDictionary =  OrderedDict([
+                    ("dateTime" , str(dateTime)), 
+                    ("pc0_1"  ,struct.unpack('<L',bytes.fromhex(dataIn[0:8]))[0]),
+                    ("pc0_3"  ,struct.unpack('<L',bytes.fromhex(dataIn[8:16]))[0]),
+                    ("pc0_5"  ,struct.unpack('<L',bytes.fromhex(dataIn[16:24]))[0]),
+                    ("pc1_0"  ,struct.unpack('<L',bytes.fromhex(dataIn[24:32]))[0]),
+                    ("pc2_5"  ,struct.unpack('<L',bytes.fromhex(dataIn[32:40]))[0]),
+                    ("pc5_0"  ,struct.unpack('<L',bytes.fromhex(dataIn[40:48]))[0]), 
+                    ("pc10_0" ,struct.unpack('<L',bytes.fromhex(dataIn[48:56]))[0]),
+                    ("pm0_1"  ,struct.unpack('<f',bytes.fromhex(dataIn[56:64]))[0]), 
+                    ("pm0_3"  ,struct.unpack('<f',bytes.fromhex(dataIn[64:72]))[0]),
+                    ("pm0_5"  ,struct.unpack('<f',bytes.fromhex(dataIn[72:80]))[0]),
+                    ("pm1_0"  ,struct.unpack('<f',bytes.fromhex(dataIn[80:88]))[0]),
+                    ("pm2_5"  ,struct.unpack('<f',bytes.fromhex(dataIn[88:96]))[0]),
+                    ("pm5_0"  ,struct.unpack('<f',bytes.fromhex(dataIn[96:104]))[0]), 
+                    ("pm10_0" ,struct.unpack('<f',bytes.fromhex(dataIn[104:112]))[0])
+            ])
+            return sensorDictionary;
+
+    except Exception as e:
+        time.sleep(.5)
+        print ("Error and type: %s - %s." % (e,type(e)))
+        time.sleep(.5)
+        print("Data Packet Not Sent for IPS7100CNR")
+        time.sleep(.5)
+        return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# ***************************************************************************
+#  mintsXU4 - Packed LoRa uplink check and benchmark
+#   ---------------------------------
+#   Takes one send cycle of l_1_loRaSend (a record of every sensor with a
+#   port in portIDs.yml and a layout in loRaSensors.yaml), packs it with
+#   mintsLoRaFrames at every US915 data rate and decodes the frames again
+#   with mintsLoRaSensing.decodeMultiplexed, comparing every value. Then
+#   compares one uplink per sensor (as before) with the packed frames:
+#   uplinks, AT commands, bytes per uplink and time on air, for random
+#   cycles. Time on air is the Semtech formula with 13 bytes of LoRaWAN
+#   overhead per frame, 8 preamble symbols, explicit header and CR 4/5.
+#
+#   Run from firmware/xu4LoRa:
+#       python3 -m mintsXU4.benchmarkLoRaFrames [cycles]
+#  ***************************************************************************
+
+import io
+import sys
+import math
+import random
+import contextlib
+
+from mintsXU4 import mintsDefinitions as mD
+from mintsXU4 import mintsLoRaSensing as mLS
+from mintsXU4 import mintsLoRaFrames as mLF
+from mintsXU4 import mintsLoRaIndex as mLI
+from mintsXU4.benchmarkLoRaCodec import randomValues
+
+# Spreading factor and bandwidth (kHz) of the US915 uplink data rates
+usDataRates   = {0: (10, 125), 1: (9, 125), 2: (8, 125), 3: (7, 125), 4: (8, 500)}
+frameOverhead = 13  # MHDR, FHDR without FOpts, FPort and MIC
+
+
+def timeOnAir(payloadBytes, spreadingFactor, bandwidth):
+    # Seconds on air of a frame carrying payloadBytes of application payload
+    symbolTime   = (2**spreadingFactor)/(bandwidth*1000.0)
+    lowRate      = 1 if symbolTime > 0.016 else 0
+    bits         = 8*(payloadBytes + frameOverhead) - 4*spreadingFactor + 28 + 16
+    symbols      = 8 + max(math.ceil(bits/(4.0*(spreadingFactor - 2*lowRate)))*5, 0)
+    return (8 + 4.25 + symbols)*symbolTime
+
+
+def cycleRecords(rng):
+    # (tag, payload) of every sensor l_1_loRaSend can pack
+    records = []
+    for port in mD.fPortIDs:
+        codec = mLS.loRaSensors.get(port['sensor'])
+        if codec is None or port['portID'] > 255:
+            continue
+        records.append((port['portID'], codec.pack(randomValues(codec, rng))))
+    return records
+
+
+def withoutTimes(sensorDictionary):
+    # Time stamps are taken at decoding, so they are left out of comparisons
+    return [(key, value) for key, value in sensorDictionary.items() if not key.startswith("dateTime")]
+
+
+def checkRoundTrip(records, maxPayload):
+    # Every frame must fit and decode to what the sensors' own uplinks decode to
+    packer = mLF.FramePacker(maxPayload)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for tag, payload in records:
+            packer.add(tag, payload)
+        frames = packer.frames()
+        for frame in frames:
+            assert sum(len(record) for record in frame) <= maxPayload
+            sensorIDs = [mLI.getPort(record[0])['sensor'] for record in frame]
+            single    = [(sensorID, mLS.encodeDecode(sensorID, record[1:].hex(), False)) \
+                            for sensorID, record in zip(sensorIDs, frame)]
+            packed = mLS.decodeMultiplexed(b"".join(frame).hex())
+            assert [(sensorID, withoutTimes(sensorDictionary)) for sensorID, sensorDictionary in packed] == \
+                   [(sensorID, withoutTimes(sensorDictionary)) for sensorID, sensorDictionary in single]
+    assert sum(len(frame) for frame in frames) + packer.stats['dropped'] == len(records)
+    return frames, packer.stats['dropped']
+
+
+def main(arguments):
+    numOfCycles = int(arguments[0]) if arguments else 1000
+    rng         = random.Random(42)
+
+    print("{0:<4} {1:>7} {2:>8} {3:>8} {4:>8} {5:>10} {6:>10} {7:>10}".format(
+            "DR", "Max B", "Records", "Dropped", "Uplinks", "B/uplink", "Air old s", "Air new s"))
+    for dataRate, (spreadingFactor, bandwidth) in usDataRates.items():
+        maxPayload = mLF.maxPayload("US915", dataRate)
+        uplinksOld = uplinksNew = bytesNew = dropped = 0
+        airOld = airNew = 0.0
+        for _ in range(numOfCycles):
+            records = cycleRecords(rng)
+            frames, droppedCycle = checkRoundTrip(records, maxPayload)
+            dropped    += droppedCycle
+            fitting     = [payload for _, payload in records if 1 + len(payload) <= maxPayload]
+            uplinksOld += len(fitting)
+            airOld     += sum(timeOnAir(len(payload), spreadingFactor, bandwidth) for payload in fitting)
+            uplinksNew += len(frames)
+            for frame in frames:
+                size      = sum(len(record) for record in frame)
+                bytesNew += size
+                airNew   += timeOnAir(size, spreadingFactor, bandwidth)
+        print("{0:<4} {1:>7} {2:>8} {3:>8} {4:>8.2f} {5:>10.1f} {6:>10.3f} {7:>10.3f}".format(
+                dataRate, maxPayload, len(records), dropped//numOfCycles, uplinksNew/numOfCycles,
+                bytesNew/max(uplinksNew, 1), airOld/numOfCycles, airNew/numOfCycles))
+        print("     one uplink per sensor: {0:.2f} uplinks and {1:.2f} AT commands per cycle, packed: {2:.2f} and {3:.2f}"\
+                .format(uplinksOld/numOfCycles, 2*uplinksOld/numOfCycles,
+                        uplinksNew/numOfCycles, uplinksNew/numOfCycles + 1))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
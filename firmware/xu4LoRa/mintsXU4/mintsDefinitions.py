@@ -55,20 +55,38 @@ macAddress               = findMacAddress()
 mintsDefinitions         = yaml.load(open('mintsXU4/credentials/mintsDefinitions.yaml'),Loader=yaml.FullLoader)
 credentials              = yaml.load(open('mintsXU4/credentials/credentials.yaml'),Loader=yaml.FullLoader)
 loRaCredentials          = yaml.load(open('mintsXU4/credentials/loRacredentials.yaml'),Loader=yaml.FullLoader)
-fPortIDs                 = yaml.load(open('mintsXU4/credentials/portIDs.yml'),Loader=yaml.FullLoader)['portIDs']
-nodeIDs                  = yaml.load(open('mintsXU4/credentials/nodeIDs.yaml'),Loader=yaml.FullLoader)
+portIDsFile              = 'mintsXU4/credentials/portIDs.yml'
+nodeIDsFile              = 'mintsXU4/credentials/nodeIDs.yaml'
+fPortIDs                 = yaml.load(open(portIDsFile),Loader=yaml.FullLoader)['portIDs']
+nodeIDs                  = yaml.load(open(nodeIDsFile),Loader=yaml.FullLoader)
+loRaSensorsFile          = 'mintsXU4/loRaSensors.yaml'
+indexReloadInterval      = 5 # Seconds between checks for edited port/node YAML files
 
 keys                     = yaml.load(open('mintsXU4/credentials/keys.yaml'),Loader=yaml.FullLoader)
 
 dataFolder                = mintsDefinitions['dataFolder']
 dataFolderTmp             = mintsDefinitions['dataFolderTmp']
 dataFolderJson            = mintsDefinitions['dataFolderJson']
+# Decoded LoRa exports, kept apart from the files r_1_loRaRecieve writes
+dataFolderBackfill        = mintsDefinitions.get('dataFolderBackfill', dataFolder.rstrip('/') + 'Backfill')
 
 mqttPortLoRa              = loRaCredentials['port']
 mqttBrokerLoRa            = loRaCredentials['broker']
 
 mqttOn                    = True
 
+loRaRegion                = "US915"
+loRaDataRate              = 2   # Set at join, the packer follows the modem's data rate after that
+loRaPackedPort            = 200 # fPort of multi sensor frames, must not be a portID in portIDs.yml
+loRaPackedInterval        = 30  # Seconds between the starts of two packed send cycles
+
+e5CommandTimeout          = 2    # Seconds, E5 mini settings commands answer within milliseconds
+e5MessageTimeout          = 15   # Seconds for AT+MSGHEX to reach Done, receive windows included
+e5JoinTimeout             = 20
+e5SettleTime              = 0.05 # Seconds to wait for more lines of a short command (AT+ID prints three)
+e5QueueSize               = 16   # Uplinks waiting for the modem before the oldest is dropped
+e5Retries                 = 3    # Resends of an uplink the modem refused as busy or duty cycle limited
+
 nodeIDs                  = nodeIDs['nodeIDs']
 
 keys                     = yaml.load(open('mintsXU4/credentials/keys.yaml'),Loader=yaml.FullLoader)
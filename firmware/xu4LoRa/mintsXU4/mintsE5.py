@@ -0,0 +1,277 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   Event driven driver for the LoRa E5 mini AT modem
+#   ---------------------------------
+#   A reader thread takes every line the modem prints (through the
+#   mintsSerialLines reader of the port) and hands the ones starting with
+#   the name of the command in flight, e.g. +MSGHEX:, to that command.
+#   A command finishes on its terminal line instead of after a fixed
+#   wait:
+#       AT+MSGHEX / AT+CMSGHEX / AT+JOIN : "Done" or an error line
+#       everything else                  : first line, plus any further
+#                                          lines within e5SettleTime
+#   Commands run one at a time on a single worker thread and come back
+#   as futures of an E5Response, whose status classifies the outcome:
+#       ok, noAck (confirmed uplink without an ACK), busy, dutyCycle
+#       ("No band in <n>ms", waitTime holds the seconds), notJoined,
+#       length (payload too long for the data rate), error (ERROR(n)),
+#       timeout, dropped (uplink queue full).
+#   uplink() only queues the message and returns its future, so the
+#   sensor loop never waits for the radio. Busy and duty cycle refusals
+#   are retried after the modem's wait and a lost join is joined again.
+#   A timed out uplink is not sent again, as the modem may have sent it,
+#   but comes back as timeout. With more than e5QueueSize uplinks waiting
+#   the oldest is dropped.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import re
+import time
+import weakref
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+from mintsXU4 import mintsDefinitions as mD
+from mintsXU4 import mintsSerialLines as mSL
+
+e5CommandTimeout = mD.e5CommandTimeout
+e5MessageTimeout = mD.e5MessageTimeout
+e5JoinTimeout    = mD.e5JoinTimeout
+e5SettleTime     = mD.e5SettleTime
+e5QueueSize      = mD.e5QueueSize
+e5Retries        = mD.e5Retries
+
+modems           = weakref.WeakKeyDictionary()
+
+longCommands     = ("MSGHEX", "CMSGHEX", "MSG", "CMSG", "JOIN")
+noBandPattern    = re.compile(r"No band in (\d+)\s*ms")
+
+
+def commandName(commandStr):
+    # AT+MSGHEX=0a0b -> MSGHEX
+    return commandStr.split('=', 1)[0].strip()[3:].upper()
+
+
+def lineStatus(line):
+    # Status a line reports on its own, None for lines which are no error
+    if "ERROR(" in line:
+        return 'error'
+    if "busy" in line:
+        return 'busy'
+    if noBandPattern.search(line) is not None:
+        return 'dutyCycle'
+    if "Please join" in line or "Join failed" in line:
+        return 'notJoined'
+    if "Length error" in line:
+        return 'length'
+    return None
+
+
+def isTerminal(line):
+    # Last line of a long command
+    return line.endswith("Done") or "Joined already" in line or lineStatus(line) is not None
+
+
+class E5Response:
+
+    def __init__(self, command, lines, finished, status=None):
+        self.command  = command
+        self.lines    = lines
+        self.waitTime = 0.0
+        self.status   = status or self.classify(finished)
+
+    def classify(self, finished):
+        for line in self.lines:
+            status = lineStatus(line)
+            if status == 'dutyCycle':
+                self.waitTime = int(noBandPattern.search(line).group(1))/1000.0
+            if status is not None:
+                return status
+        if not finished:
+            return 'timeout'
+        if any("Wait ACK" in line for line in self.lines) and \
+                not any("ACK Received" in line for line in self.lines):
+            return 'noAck'
+        if commandName(self.command) == "JOIN" and \
+                not any("Network joined" in line or "Joined already" in line for line in self.lines):
+            return 'notJoined'
+        return 'ok'
+
+    @property
+    def ok(self):
+        return self.status == 'ok'
+
+    def __repr__(self):
+        return "E5Response({0}, {1}, {2})".format(self.command, self.status, self.lines)
+
+
+class E5Mini:
+
+    def __init__(self, serialPort):
+        self.serialPort  = serialPort
+        self.reader      = mSL.getReader(serialPort)
+        self.lock        = threading.Condition()
+        self.pending     = None
+        self.jobs        = deque()
+        self.uplinks     = 0
+        self.currentPort = None
+        self.running     = True
+        self.stats       = {}
+
+        self.readerThread = threading.Thread(target=self.readLines, name="e5Reader", daemon=True)
+        self.workerThread = threading.Thread(target=self.runJobs, name="e5Worker", daemon=True)
+        self.readerThread.start()
+        self.workerThread.start()
+
+    # Reader thread
+    def readLines(self):
+        while self.running:
+            try:
+                line = self.reader.readLine(0.5)
+            except Exception as e:
+                print("[ERROR] E5 mini read failed: " + str(e))
+                time.sleep(1)
+                continue
+            if line is None:
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            print(line)
+            with self.lock:
+                pending = self.pending
+                if pending is not None and line.startswith("+" + pending['name'] + ":"):
+                    pending['lines'].append(line)
+                    pending['lastLine'] = time.monotonic()
+                    if pending['name'] in longCommands:
+                        pending['finished'] = isTerminal(line)
+                    self.lock.notify_all()
+
+    # Worker thread
+    def runJobs(self):
+        while True:
+            with self.lock:
+                while self.running and not self.jobs:
+                    self.lock.wait()
+                if not self.running:
+                    return
+                job, future, isUplink = self.jobs.popleft()
+                if isUplink:
+                    self.uplinks -= 1
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(job())
+            except Exception as e:
+                future.set_exception(e)
+
+    def submit(self, job, isUplink=False):
+        future = Future()
+        with self.lock:
+            if isUplink:
+                if self.uplinks >= e5QueueSize:
+                    # Oldest waiting uplink gives way
+                    for index, (_, oldFuture, oldUplink) in enumerate(self.jobs):
+                        if oldUplink:
+                            del self.jobs[index]
+                            self.uplinks -= 1
+                            self.count('dropped')
+                            oldFuture.set_result(E5Response("AT+MSGHEX", [], False, 'dropped'))
+                            break
+                self.uplinks += 1
+            self.jobs.append((job, future, isUplink))
+            self.lock.notify_all()
+        return future
+
+    def execute(self, commandStr, timeout=None):
+        # Runs one command on the calling thread; only the worker calls this
+        name    = commandName(commandStr)
+        timeout = timeout if timeout is not None else \
+                    e5JoinTimeout if name == "JOIN" else \
+                    e5MessageTimeout if name in longCommands else e5CommandTimeout
+        pending = {'command': commandStr, 'name': name, 'lines': [], 'finished': False, 'lastLine': None}
+        with self.lock:
+            self.pending = pending
+        self.serialPort.write(str.encode(commandStr + '\n\r'))
+
+        deadline = time.monotonic() + timeout
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                if name not in longCommands and pending['lastLine'] is not None and \
+                        now - pending['lastLine'] >= e5SettleTime:
+                    pending['finished'] = True
+                if pending['finished'] or now >= deadline:
+                    break
+                waitFor = deadline - now
+                if name not in longCommands and pending['lastLine'] is not None:
+                    waitFor = min(waitFor, pending['lastLine'] + e5SettleTime - now)
+                self.lock.wait(max(waitFor, 0.001))
+            self.pending = None
+        response = E5Response(commandStr, pending['lines'], pending['finished'])
+        self.count(response.status)
+        return response
+
+    def count(self, status):
+        self.stats[status] = self.stats.get(status, 0) + 1
+
+    def transmit(self, portID, hexString, confirmed=False):
+        response = None
+        for attempt in range(e5Retries + 1):
+            if self.currentPort != portID:
+                portResponse = self.execute('AT+PORT=' + str(portID))
+                if not portResponse.ok:
+                    response = portResponse
+                    continue
+                self.currentPort = portID
+            response = self.execute(('AT+CMSGHEX=' if confirmed else 'AT+MSGHEX=') + hexString)
+            if response.status == 'busy':
+                time.sleep(1)
+            elif response.status == 'dutyCycle':
+                time.sleep(response.waitTime)
+            elif response.status == 'notJoined':
+                self.joinNetwork(1)
+            else:
+                return response
+        return response
+
+    def joinNetwork(self, numberOfTries):
+        for currentTry in range(numberOfTries):
+            print("Joining Network Trial: " + str(currentTry))
+            response = self.execute('AT+JOIN')
+            if response.ok:
+                return True
+            if response.status in ('busy', 'dutyCycle'):
+                time.sleep(max(response.waitTime, 1))
+        return False
+
+    # Public, callable from any thread
+    def command(self, commandStr, timeout=None):
+        return self.submit(lambda: self.execute(commandStr, timeout))
+
+    def join(self, numberOfTries):
+        return self.submit(lambda: self.joinNetwork(numberOfTries))
+
+    def uplink(self, portID, hexString, confirmed=False):
+        return self.submit(lambda: self.transmit(portID, hexString, confirmed), isUplink=True)
+
+    def reset(self):
+        # After AT+FDEFAULT the modem is back on its default port
+        return self.submit(lambda: setattr(self, 'currentPort', None))
+
+    def close(self):
+        with self.lock:
+            self.running = False
+            self.lock.notify_all()
+
+
+def getModem(serialPort):
+    # One driver per open port, as only it may read from the port
+    modem = modems.get(serialPort)
+    if modem is None:
+        modem = modems[serialPort] = E5Mini(serialPort)
+    return modem
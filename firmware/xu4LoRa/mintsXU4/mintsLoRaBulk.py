@@ -0,0 +1,263 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   Bulk decoder for ChirpStack uplink exports
+#   ---------------------------------
+#   Reads a JSONL/NDJSON event export one line at a time and queues the
+#   payload bytes per fPort. Once a port has chunkFrames frames (or all
+#   ports together hold that many) the queued payloads are joined and
+#   decoded in one np.frombuffer call with a structured dtype built from
+#   the sensor layout in loRaSensors.yaml. The decoded columns are then
+#   written to one CSV per node, sensor and day. A day file is started
+#   afresh by the first chunk of a run that reaches it and appended to by
+#   the rest, so decoding an export again replaces its files instead of
+#   doubling their rows. Memory is bounded by the chunk size and the run
+#   time grows linearly with the export.
+#   Frames on packedPort (see mintsLoRaFrames) are split at their tags
+#   and each record is queued as if it came on its sensor's own fPort.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import os
+import re
+import gzip
+import json
+import datetime
+import base64
+import struct
+import numpy as np
+import pandas as pd
+
+from mintsXU4 import mintsLoRaCodec as mLC
+
+dtypeCodes = {'B': 'u1', 'b': 'i1', 'H': 'u2', 'h': 'i2', 'I': 'u4', 'i': 'i4',
+              'L': 'u4', 'l': 'i4', 'Q': 'u8', 'q': 'i8', 'e': 'f2', 'f': 'f4',
+              'd': 'f8', '?': '?'}
+
+# RFC3339 with any number of fraction digits and an optional zone
+timePattern = re.compile(r"^(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2})(?:\.(\d+))?(Z|[+-]\d{2}:?\d{2})?$")
+
+
+def layoutDtype(codec):
+    # Structured dtype with the same byte layout as the codec's struct
+    names, formats, offsets = [], [], []
+    fields = iter(codec.fields)
+    offset = 0
+    for count, code in mLC.layoutCodes(codec.layout.format):
+        if code == 'x':
+            offset += count
+        elif code == 's':
+            names.append(next(fields))
+            formats.append(('u1', (count,)))
+            offsets.append(offset)
+            offset += count
+        else:
+            size = struct.calcsize('<' + code)
+            for _ in range(count):
+                names.append(next(fields))
+                formats.append('<' + dtypeCodes[code])
+                offsets.append(offset)
+                offset += size
+    return np.dtype({'names': names, 'formats': formats, 'offsets': offsets,
+                     'itemsize': codec.size})
+
+
+def openExport(exportFile):
+    if exportFile.endswith(".gz"):
+        return gzip.open(exportFile, 'rt')
+    return open(exportFile, 'r')
+
+
+def parseTime(timeStamp):
+    # UTC datetime64[us] of an uplink time stamp, ValueError if it does not parse.
+    # fromisoformat takes neither Z nor nanoseconds before Python 3.11.
+    match = timePattern.match(timeStamp.strip())
+    if match is None:
+        raise ValueError("Bad time stamp " + timeStamp)
+    base, fraction, zone = match.groups()
+    zone     = "+00:00" if zone in (None, "Z") else zone[:3] + ":" + zone[-2:]
+    dateTime = datetime.datetime.fromisoformat(base + "." + (fraction or "")[:6].ljust(6, "0") + zone)
+    return np.datetime64(dateTime.astimezone(datetime.timezone.utc).replace(tzinfo=None), 'us')
+
+
+def uplinkFrame(record):
+    # (nodeID, UTC time stamp, fPort, payload bytes) of a ChirpStack v3
+    # or v4 uplink event, optionally wrapped as {"topic": .., "payload": ..}
+    nodeID = None
+    if 'payload' in record and 'topic' in record:
+        nodeID = record['topic'].split('/')[5]
+        record = record['payload']
+        if isinstance(record, str):
+            record = json.loads(record)
+
+    if 'fPort' not in record or 'data' not in record:
+        return None
+
+    if nodeID is None:
+        if 'deviceInfo' in record:
+            nodeID = record['deviceInfo']['devEui']
+        else:
+            nodeID = record['devEUI']
+            if len(nodeID) != 16:
+                nodeID = base64.b64decode(nodeID).hex()
+
+    timeStamp = record.get('publishedAt') or record.get('time') or record['rxInfo'][0]['time']
+    return nodeID.lower(), parseTime(timeStamp), record['fPort'], base64.b64decode(record['data'])
+
+
+def shiftSeconds(timeStamps, seconds):
+    return timeStamps - seconds.astype('timedelta64[s]').astype('timedelta64[us]')
+
+
+def dateTimeStrings(timeStamps):
+    return np.char.replace(np.datetime_as_string(timeStamps, unit='us'), 'T', ' ')
+
+
+def postMacAD(sensorData, timeStamps):
+    sensorData['macAddress'] = [bytes(row).hex() for row in sensorData['macAddress']]
+    return sensorData
+
+
+def postMBCLR001(sensorData, timeStamps):
+    # The call was heard lag seconds before the uplink
+    sensorData['dateTime'] = dateTimeStrings(shiftSeconds(timeStamps, sensorData['lag'].to_numpy()))
+    return sensorData.drop(columns=['lag'])
+
+
+def postMBCLR002(sensorData, timeStamps):
+    for call in range(8):
+        lag = sensorData['lag' + str(call)]
+        sensorData.insert(sensorData.columns.get_loc('lag' + str(call)), 'dateTime' + str(call),\
+                          dateTimeStrings(shiftSeconds(timeStamps, lag.to_numpy())))
+    return sensorData
+
+
+# Same extra columns as the live decoders in mintsLoRaSensing
+postProcessors = {
+    "MacAD"    : postMacAD,
+    "MBCLR001" : postMBCLR001,
+    "MBCLR002" : postMBCLR002,
+    }
+
+
+class BulkDecoder:
+
+    def __init__(self, codecs, fPortIDs, outputFolder, chunkFrames, packedPort=None):
+        self.codecs       = codecs
+        self.sensorByPort = {port['portID']: port['sensor'] for port in fPortIDs}
+        self.dtypes       = {}
+        self.outputFolder = outputFolder
+        self.chunkFrames  = chunkFrames
+        self.packedPort   = packedPort
+        self.pending      = {}
+        self.numPending   = 0
+        self.stats        = {'lines': 0, 'frames': 0, 'decoded': 0, 'badLines': 0,
+                             'unknownPort': 0, 'shortPayload': 0, 'packedFrames': 0}
+        self.decoded      = {}
+        self.written      = set()   # Day files this run has started
+
+    def addLine(self, line):
+        self.stats['lines'] += 1
+        line = line.strip()
+        if not line:
+            return
+        try:
+            frame = uplinkFrame(json.loads(line))
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+            self.stats['badLines'] += 1
+            return
+        if frame is not None:
+            self.addFrame(*frame)
+
+    def addPacked(self, nodeID, timeStamp, payload):
+        self.stats['packedFrames'] += 1
+        offset = 0
+        while offset < len(payload):
+            fPort    = payload[offset]
+            sensorID = self.sensorByPort.get(fPort)
+            if sensorID is None or sensorID not in self.codecs:
+                # Rest of the frame cannot be split without the record size
+                self.stats['unknownPort'] += 1
+                return
+            end = offset + 1 + self.codecs[sensorID].size
+            self.addFrame(nodeID, timeStamp, fPort, payload[offset+1:end])
+            offset = end
+
+    def addFrame(self, nodeID, timeStamp, fPort, payload):
+        if fPort == self.packedPort:
+            self.addPacked(nodeID, timeStamp, payload)
+            return
+        self.stats['frames'] += 1
+        sensorID = self.sensorByPort.get(fPort)
+        if sensorID is None or sensorID not in self.codecs:
+            self.stats['unknownPort'] += 1
+            return
+        if len(payload) < self.codecs[sensorID].size:
+            self.stats['shortPayload'] += 1
+            return
+
+        queued = self.pending.setdefault(fPort, ([], [], []))
+        queued[0].append(nodeID)
+        queued[1].append(timeStamp)
+        queued[2].append(payload[:self.codecs[sensorID].size])
+        self.numPending += 1
+
+        if len(queued[0]) >= self.chunkFrames:
+            self.flushPort(fPort)
+        elif self.numPending >= self.chunkFrames:
+            self.flushAll()
+
+    def flushAll(self):
+        for fPort in list(self.pending):
+            self.flushPort(fPort)
+
+    def flushPort(self, fPort):
+        nodeIDs, timeStamps, payloads = self.pending.pop(fPort)
+        self.numPending -= len(nodeIDs)
+        sensorID = self.sensorByPort[fPort]
+        codec    = self.codecs[sensorID]
+
+        dtype = self.dtypes.get(sensorID)
+        if dtype is None:
+            dtype = self.dtypes[sensorID] = layoutDtype(codec)
+
+        records    = np.frombuffer(b"".join(payloads), dtype=dtype)
+        timeStamps = np.array(timeStamps, dtype='datetime64[us]')
+
+        sensorData = pd.DataFrame({name: (list(records[name]) if records[name].ndim > 1 \
+                                            else records[name]) for name in dtype.names})
+        sensorData.insert(0, 'nodeID', nodeIDs)
+        sensorData.insert(0, 'dateTime', dateTimeStrings(timeStamps))
+        if sensorID in postProcessors:
+            sensorData = postProcessors[sensorID](sensorData, timeStamps)
+
+        # Day of the dateTime written, which MBCLR001 moved back by its lag
+        days = sensorData['dateTime'].str[0:10]
+        for (nodeID, day), group in sensorData.groupby([sensorData['nodeID'], days], sort=False):
+            self.writeDay(nodeID, sensorID, day, group)
+
+        self.stats['decoded'] += len(nodeIDs)
+        self.decoded[sensorID] = self.decoded.get(sensorID, 0) + len(nodeIDs)
+
+    def writePath(self, nodeID, sensorID, day):
+        # Same layout as the raw files on the nodes
+        year, month, dayOfMonth = day.split('-')
+        return os.path.join(self.outputFolder, nodeID, year, month, dayOfMonth,\
+                    "MINTS_" + nodeID + "_" + sensorID + "_" + year + "_" + month + "_" + dayOfMonth + ".csv")
+
+    def writeDay(self, nodeID, sensorID, day, sensorData):
+        writePath = self.writePath(nodeID, sensorID, day)
+        directoryIn = os.path.dirname(writePath)
+        if not os.path.exists(directoryIn):
+            os.makedirs(directoryIn)
+        fresh = writePath not in self.written
+        self.written.add(writePath)
+        sensorData.drop(columns=['nodeID']).to_csv(writePath, mode='w' if fresh else 'a', header=fresh, index=False)
+
+    def decodeExport(self, exportFile):
+        with openExport(exportFile) as fp:
+            for line in fp:
+                self.addLine(line)
+        self.flushAll()
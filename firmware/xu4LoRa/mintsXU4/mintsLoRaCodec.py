@@ -0,0 +1,111 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   Struct based codec for LoRa uplink payloads
+#   ---------------------------------
+#   Each sensor layout in loRaSensors.yaml is compiled once into a
+#   struct.Struct. Encoding is a single pack of the selected sensor values
+#   and decoding a single unpack_from of the payload bytes, with the field
+#   names attached afterwards.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import struct
+import yaml
+from collections import OrderedDict
+
+
+def toInt(value):
+    return int(float(value))
+
+
+def layoutCodes(layoutFormat):
+    # Yields (repeat count, struct code) for every item of a format. For
+    # 's' the count is the string length and the item is a single value.
+    count = ""
+    for character in layoutFormat.lstrip("<>=!@"):
+        if character.isdigit():
+            count += character
+            continue
+        yield int(count or 1), character
+        count = ""
+
+
+def layoutCasts(layoutFormat):
+    # Python type each value of a layout is packed from
+    casts = []
+    for count, code in layoutCodes(layoutFormat):
+        if code == 'x':
+            continue
+        if code in 'fde':
+            casts += [float]*count
+        elif code == 's':
+            casts.append(bytes.fromhex)
+        else:
+            casts += [toInt]*count
+    return casts
+
+
+class LoRaCodec:
+
+    def __init__(self, sensorID, layout, fields, inputLength=None, inputIndices=None):
+        self.sensorID     = sensorID
+        self.layout       = struct.Struct(layout)
+        self.fields       = tuple(fields)
+        self.size         = self.layout.size
+        self.casts        = layoutCasts(layout)
+        self.inputLength  = inputLength
+        self.inputIndices = inputIndices
+        self.sensing      = None
+
+        if len(self.casts) != len(self.fields):
+            raise ValueError("{0}: layout {1} holds {2} values for {3} fields"\
+                                .format(sensorID, layout, len(self.casts), len(self.fields)))
+
+    def select(self, dataIn):
+        # Values read from the sensor which go into the payload, or None
+        # when the reading does not have the expected number of values
+        if self.inputLength is not None and len(dataIn) != self.inputLength:
+            return None
+        if self.inputIndices is not None:
+            return [dataIn[index] for index in self.inputIndices]
+        return dataIn
+
+    def pack(self, values):
+        return self.layout.pack(*[cast(value) for cast, value in zip(self.casts, values)])
+
+    def unpack(self, payload, offset=0):
+        return self.layout.unpack_from(payload, offset)
+
+    def encode(self, dataIn):
+        values = self.select(dataIn)
+        if values is None:
+            return None
+        return self.pack(values).hex()
+
+    def decode(self, payload):
+        # payload is either the raw bytes or the base 16 string
+        if isinstance(payload, str):
+            payload = bytes.fromhex(payload)
+        return OrderedDict(zip(self.fields, self.layout.unpack_from(payload)))
+
+    def describe(self):
+        return OrderedDict([
+            ('layout'       , self.layout.format),
+            ('size'         , self.size),
+            ('fields'       , list(self.fields)),
+            ('inputLength'  , self.inputLength),
+            ('inputIndices' , self.inputIndices)])
+
+
+def loadCodecs(sensorsFile):
+    with open(sensorsFile, 'r') as fp:
+        sensors = yaml.safe_load(fp)['sensors']
+    codecs = {}
+    for sensorID, descriptor in sensors.items():
+        sensorID = str(sensorID)
+        codecs[sensorID] = LoRaCodec(sensorID, descriptor['layout'], descriptor['fields'],\
+                                        descriptor.get('inputLength'), descriptor.get('inputIndices'))
+    return codecs
@@ -0,0 +1,116 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   Packing of several sensor records into one LoRa uplink
+#   ---------------------------------
+#   Instead of one AT+MSGHEX per sensor on the sensor's own fPort, records
+#   are queued here and sent together on loRaPackedPort. A record is the
+#   sensor's portID from portIDs.yml as a one byte tag followed by its
+#   payload from loRaSensors.yaml. Payloads have a fixed size per sensor,
+#   so no length byte is needed and the receiver walks the frame tag by
+#   tag (mintsLoRaSensing.decodeMultiplexed).
+#   Frames are filled first fit decreasing up to the largest application
+#   payload of the current data rate, maxPayloads below, which is the
+#   LoRaWAN regional parameters' N without FOpts. Records larger than
+#   that are dropped and counted. Bytes per uplink and uplinks per hour
+#   are kept from the first frame packed. Results may come back from the
+#   modem's thread, so the queue and counters are behind a lock.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import time
+import threading
+
+# Largest application payload in bytes, indexed by data rate
+maxPayloads = {
+    "US915": (11, 53, 125, 242, 242),
+    "AU915": (51, 51, 51, 115, 242, 242, 242),
+    "EU868": (51, 51, 51, 115, 222, 222, 222, 222),
+    }
+
+
+def maxPayload(region, dataRate):
+    payloads = maxPayloads[region]
+    return payloads[min(max(int(dataRate), 0), len(payloads) - 1)]
+
+
+def packRecords(records, maxPayloadIn):
+    # First fit decreasing: lists of records, each fitting in maxPayloadIn
+    frames, sizes = [], []
+    for record in sorted(records, key=len, reverse=True):
+        for index, size in enumerate(sizes):
+            if size + len(record) <= maxPayloadIn:
+                frames[index].append(record)
+                sizes[index] += len(record)
+                break
+        else:
+            frames.append([record])
+            sizes.append(len(record))
+    return frames
+
+
+class FramePacker:
+
+    def __init__(self, maxPayloadIn):
+        self.maxPayload = maxPayloadIn
+        self.pending    = []
+        self.startTime  = None
+        self.lock       = threading.Lock()
+        self.stats      = {'records': 0, 'uplinks': 0, 'bytes': 0, 'dropped': 0, 'failed': 0}
+
+    def add(self, tag, payload):
+        record = bytes([tag]) + bytes(payload)
+        with self.lock:
+            if len(record) > self.maxPayload:
+                self.stats['dropped'] += 1
+                print("[ERROR] Record of {0} bytes for port {1} does not fit in {2} bytes, dropped"\
+                        .format(len(record), tag, self.maxPayload))
+                return False
+            self.pending.append(record)
+        return True
+
+    def frames(self):
+        # Takes the queued records, as lists of records per uplink
+        with self.lock:
+            queued, self.pending = self.pending, []
+            pending = []
+            for record in queued:
+                if len(record) <= self.maxPayload:
+                    pending.append(record)
+                else:
+                    # Queued before the data rate dropped
+                    self.stats['dropped'] += 1
+            if self.startTime is None and pending:
+                self.startTime = time.monotonic()
+            return packRecords(pending, self.maxPayload)
+
+    def requeue(self, records):
+        # Records of a frame the modem refused, e.g. after the data rate dropped
+        for record in records:
+            self.add(record[0], record[1:])
+
+    def sent(self, records):
+        with self.lock:
+            self.stats['records'] += len(records)
+            self.stats['uplinks'] += 1
+            self.stats['bytes']   += sum(len(record) for record in records)
+
+    def failed(self, records):
+        with self.lock:
+            self.stats['failed'] += 1
+
+    def bytesPerUplink(self):
+        return self.stats['bytes']/self.stats['uplinks'] if self.stats['uplinks'] else 0.0
+
+    def uplinksPerHour(self):
+        if self.startTime is None:
+            return 0.0
+        return 3600*self.stats['uplinks']/max(time.monotonic() - self.startTime, 1)
+
+    def report(self):
+        return "Uplinks: {0}, records: {1}, {2:.1f} of {3} bytes per uplink, {4:.1f} uplinks per hour, "\
+               "{5} records dropped, {6} uplinks failed"\
+                .format(self.stats['uplinks'], self.stats['records'], self.bytesPerUplink(),
+                        self.maxPayload, self.uplinksPerHour(), self.stats['dropped'], self.stats['failed'])
@@ -0,0 +1,118 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   Dictionary indexes over portIDs.yml and nodeIDs.yaml
+#   ---------------------------------
+#   Ports are indexed by fPort and by sensor ID, nodes by node ID, so each
+#   uplink or transmit costs one dictionary lookup. The YAML files are
+#   checked for changes at most every indexReloadInterval seconds and the
+#   indexes rebuilt when their modification time moves; a file which
+#   fails to load leaves the previous index in place. Lookups which
+#   miss return None and are counted in unknownCounts instead of falling
+#   back to another entry.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import os
+import time
+import yaml
+
+from mintsXU4 import mintsDefinitions as mD
+
+portIDsFile         = mD.portIDsFile
+nodeIDsFile         = mD.nodeIDsFile
+indexReloadInterval = mD.indexReloadInterval
+
+portsByID       = {}
+portsBySensor   = {}
+nodesByID       = {}
+fileTimes       = {}
+lastCheck       = 0
+unknownCounts   = {'port': {}, 'sensor': {}, 'node': {}}
+
+
+def fileTime(fileIn):
+    try:
+        return os.stat(fileIn).st_mtime_ns
+    except OSError:
+        return None
+
+
+def loadIndexes():
+    global portsByID, portsBySensor, nodesByID
+    portTime, nodeTime = fileTime(portIDsFile), fileTime(nodeIDsFile)
+
+    if portTime != fileTimes.get(portIDsFile):
+        # A file that fails to load is retried once it changes again
+        fileTimes[portIDsFile] = portTime
+        try:
+            with open(portIDsFile, 'r') as fp:
+                ports = yaml.safe_load(fp)['portIDs']
+            byID, bySensor = {}, {}
+            for port in ports:
+                byID[port['portID']] = port
+                # First entry wins, as with the old scan
+                bySensor.setdefault(port['sensor'], port)
+            portsByID, portsBySensor = byID, bySensor
+            print("Loaded " + str(len(byID)) + " ports from " + portIDsFile)
+        except Exception as e:
+            print("[ERROR] Could not load " + portIDsFile + ": " + str(e))
+
+    if nodeTime != fileTimes.get(nodeIDsFile):
+        fileTimes[nodeIDsFile] = nodeTime
+        try:
+            with open(nodeIDsFile, 'r') as fp:
+                nodes = yaml.safe_load(fp)['nodeIDs']
+            nodesByID = {node['nodeID']: node for node in nodes}
+            print("Loaded " + str(len(nodesByID)) + " nodes from " + nodeIDsFile)
+        except Exception as e:
+            print("[ERROR] Could not load " + nodeIDsFile + ": " + str(e))
+
+
+def checkReload():
+    global lastCheck
+    now = time.monotonic()
+    if now - lastCheck >= indexReloadInterval:
+        lastCheck = now
+        loadIndexes()
+
+
+def countUnknown(kind, key):
+    counts = unknownCounts[kind]
+    counts[key] = counts.get(key, 0) + 1
+    if counts[key] == 1 or counts[key] % 100 == 0:
+        print("[ERROR] Unknown " + kind + " " + str(key) + " (seen " + str(counts[key]) + " times)")
+
+
+def getPort(portID):
+    checkReload()
+    port = portsByID.get(portID)
+    if port is None:
+        countUnknown('port', portID)
+    return port
+
+
+def getSensorPort(sensorID):
+    checkReload()
+    port = portsBySensor.get(sensorID)
+    if port is None:
+        countUnknown('sensor', sensorID)
+    return port
+
+
+def getNode(nodeID):
+    checkReload()
+    node = nodesByID.get(nodeID)
+    if node is None:
+        countUnknown('node', nodeID)
+    return node
+
+
+def getUnknownCounts():
+    return {kind: dict(counts) for kind, counts in unknownCounts.items()}
+
+
+loadIndexes()
+lastCheck = time.monotonic()
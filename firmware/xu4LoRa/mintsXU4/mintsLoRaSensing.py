@@ -6,6 +6,8 @@ import csv
 #import deepdish as dd
 # from mintsXU4 import mintsLatest as mL
 from mintsXU4 import mintsDefinitions as mD
+from mintsXU4 import mintsLoRaCodec as mLC
+from mintsXU4 import mintsLoRaIndex as mLI
 # from mintsXU4 import mintsSensorReader as mSR
 from getmac import get_mac_address
 import time
@@ -15,24 +17,24 @@ from collections import OrderedDict
 import math
 import base64
 import json
-import struct
-import numpy as np
 from datetime import timedelta
 
 macAddress     = mD.macAddress
 dataFolder     = mD.dataFolder
-fPortIDs        = mD.fPortIDs
+loRaSensorsFile = mD.loRaSensorsFile
+loRaPackedPort  = mD.loRaPackedPort
 
 mqttOn         = mD.mqttOn
 decoder        = json.JSONDecoder(object_pairs_hook=OrderedDict)
 
-def loRaSummaryReceive(message,fPortIDs):
+def loRaSummaryReceive(message):
     nodeID = message.topic.split('/')[5]
     sensorPackage       =  decoder.decode(message.payload.decode("utf-8","ignore"))
     rxInfo              =  sensorPackage['rxInfo'][0]
     txInfo              =  sensorPackage['txInfo']
     loRaModulationInfo  =  txInfo['loRaModulationInfo']
-    sensorID            = fPortIDs[getPortIndex(sensorPackage['fPort'],fPortIDs)]['sensor']
+    port                = mLI.getPort(sensorPackage['fPort']) if sensorPackage['fPort'] != loRaPackedPort else None
+    sensorID            = port['sensor'] if port is not None else None
     dateTime            = datetime.datetime.fromisoformat(sensorPackage['publishedAt'][0:26])
     base16Data          = base64.b64decode(sensorPackage['data'].encode()).hex()
     gatewayID           = base64.b64decode(rxInfo['gatewayID']).hex()
@@ -61,277 +63,130 @@ def loRaSummaryReceive(message,fPortIDs):
     return dateTime,gatewayID,nodeID,sensorID,framePort,base16Data;
 
 
-def getPortIndex(portIDIn,fPortIDs):
-    indexOut = 0
-    for portID in fPortIDs:
-        if (portIDIn == portID['portID']):
-            return indexOut; 
-        indexOut = indexOut +1
-    return -1;
-
-
 def encodeDecode(sensorID,sensorData,transmitReceive):
-    # print("Encode Decode")
-    if sensorID == "IPS7100":
-        return sensingIPS7100(sensorData,transmitReceive);
-    if sensorID == "IPS7100CNR":
-        return sensingIPS7100CNR(sensorData,transmitReceive);
-    if sensorID == "BME688CNR":
-        return sensingBME688CNR(sensorData,transmitReceive); 
-    if sensorID == "BME280V2":
-        return sensingBME280V2(sensorData,transmitReceive); 
-    if sensorID == "SCD30":
-        return sensingSCD30(sensorData,transmitReceive);           
-    if sensorID == "AS7265X":
-        return sensingAS7265X(sensorData,transmitReceive);   
-    if sensorID == "PM":
-        return sensingPM(sensorData,transmitReceive);   
-    if sensorID == "PMPoLo":
-        return sensingPM(sensorData,transmitReceive); 
-    if sensorID == "MacAD":
-        return sensingMacAD(sensorData,transmitReceive);      
-    if sensorID == "GPGGAPL":
-        return sensingGPGGAPL(sensorData,transmitReceive);         
-    if sensorID == "GPRMCPL":
-        return sensingGPRMCPL(sensorData,transmitReceive);  
-    if sensorID == "MBCLR001":
-        return sensingMBCLR001(sensorData,transmitReceive);  
-    if sensorID == "MBCLR002":
-        return sensingMBCLR002(sensorData,transmitReceive);  
-    if sensorID == "RG15":
-        return sensingRG15(sensorData,transmitReceive);  
-    if sensorID == "MBLS001":
-        return sensingMBLS001(sensorData,transmitReceive);  
-
-    return;   
-
-
-def sensingRG15(dataIn,transmitReceive):
-    try:
-        if (transmitReceive): 
-            print("RG15 Read")	
-            if (len(dataIn)==4):
-                strOut  = \
-                    np.float32(dataIn[0].replace(' ', "").replace('mm', "").replace('Acc', "")).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[1].replace(' ', "").replace('mm', "").replace('EventAcc', "")).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[2].replace(' ', "").replace('mm', "").replace('TotalAcc', "")).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[3].replace(' ', "").replace('mmph', "").replace('RInt', "")).tobytes().hex().zfill(8)      
-                return strOut;  
-            else:
-                print("Invalid data string read from the RG15")
-                return None;
-        else:
-            dateTime = datetime.datetime.now()
-            sensorDictionary =  OrderedDict([
-                    ("dateTime"           ,str(dateTime)),
-                    ("accumulation"       ,struct.unpack('<f',bytes.fromhex(dataIn[0:8]))[0]),
-                    ("eventAccumulation"  ,struct.unpack('<f',bytes.fromhex(dataIn[8:16]))[0]),
-                    ("totalAccumulation"  ,struct.unpack('<f',bytes.fromhex(dataIn[16:24]))[0]),
-                    ("rainPerInterval"    ,struct.unpack('<f',bytes.fromhex(dataIn[24:32]))[0]),
-            ])
-            return sensorDictionary;
-
-    except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for RG15")
-        time.sleep(.5)
-        return None
-        
-    # For transmitting data, transmitRecieve is True
-def sensingMBCLR002(dataIn,transmitReceive):
+    codec = loRaSensors.get(sensorID)
+    if codec is None:
+        print("Unknown LoRa sensor: " + str(sensorID))
+        return None;
+    if codec.sensing is not None:
+        return codec.sensing(codec,sensorData,transmitReceive);
+    return sensingLayout(codec,sensorData,transmitReceive);
+
+
+def decodeMultiplexed(base16Data):
+    # (sensorID, sensorDictionary) for every record of a packed frame, see
+    # mintsLoRaFrames. A tag without a known layout ends the frame, as the
+    # length of its record is unknown.
+    payload = bytes.fromhex(base16Data)
+    records = []
+    offset  = 0
+    while offset < len(payload):
+        port     = mLI.getPort(payload[offset])
+        sensorID = port['sensor'] if port is not None else None
+        codec    = loRaSensors.get(sensorID)
+        if codec is None or offset + 1 + codec.size > len(payload):
+            print("[ERROR] Packed frame cut at byte " + str(offset) + ", tag " + str(payload[offset]) \
+                    + ", sensor " + str(sensorID))
+            break
+        sensorDictionary = encodeDecode(sensorID,payload[offset+1:offset+1+codec.size],False)
+        if sensorDictionary is not None:
+            records.append((sensorID,sensorDictionary))
+        offset += 1 + codec.size
+    return records;
+
+
+def sensingError(sensorID,e):
+    time.sleep(.5)
+    print ("Error and type: %s - %s." % (e,type(e)))
+    time.sleep(.5)
+    print("Data Packet Not Sent for " + sensorID)
+    time.sleep(.5)
+    return None
+
+
+def sensingLayout(codec,dataIn,transmitReceive):
+    # Sensors whose payload is just the selected readings in layout order
     try:
-        if (transmitReceive): 
-            print("MBCLR002 Read")	
-            strOut  = \
-                np.ubyte(dataIn[0]).tobytes().hex().zfill(2)+ \
-                np.uint16(dataIn[1]).tobytes().hex().zfill(4)+ \
-                np.uint16(dataIn[2]).tobytes().hex().zfill(4)+ \
-                np.float32(dataIn[3]).tobytes().hex().zfill(8)+ \
-                np.uint16(dataIn[4]).tobytes().hex().zfill(4)+ \
-                np.uint16(dataIn[5]).tobytes().hex().zfill(4)+ \
-                np.float32(dataIn[6]).tobytes().hex().zfill(8)+ \
-                np.uint16(dataIn[7]).tobytes().hex().zfill(4)+ \
-                np.uint16(dataIn[8]).tobytes().hex().zfill(4)+ \
-                np.float32(dataIn[9]).tobytes().hex().zfill(8)+ \
-                np.uint16(dataIn[10]).tobytes().hex().zfill(4)+ \
-                np.uint16(dataIn[11]).tobytes().hex().zfill(4)+ \
-                np.float32(dataIn[12]).tobytes().hex().zfill(8)+ \
-                np.uint16(dataIn[13]).tobytes().hex().zfill(4)+ \
-                np.uint16(dataIn[14]).tobytes().hex().zfill(4)+ \
-                np.float32(dataIn[15]).tobytes().hex().zfill(8)+ \
-                np.uint16(dataIn[16]).tobytes().hex().zfill(4)+ \
-                np.uint16(dataIn[17]).tobytes().hex().zfill(4)+ \
-                np.float32(dataIn[18]).tobytes().hex().zfill(8)+ \
-                np.uint16(dataIn[19]).tobytes().hex().zfill(4)+ \
-                np.uint16(dataIn[20]).tobytes().hex().zfill(4)+ \
-                np.float32(dataIn[21]).tobytes().hex().zfill(8)+ \
-                np.uint16(dataIn[22]).tobytes().hex().zfill(4)+ \
-                np.uint16(dataIn[23]).tobytes().hex().zfill(4)+ \
-                np.float32(dataIn[24]).tobytes().hex().zfill(8)
+        if (transmitReceive):
+            print(codec.sensorID + " Read")
+            strOut = codec.encode(dataIn)
+            if strOut is None:
+                print("Invalid data string read from the " + codec.sensorID)
             return strOut;
         else:
-            dateTime = datetime.datetime.now() 
-            lag0 = struct.unpack('<H',bytes.fromhex(dataIn[2:6]))[0]
-            lag1 = struct.unpack('<H',bytes.fromhex(dataIn[18:22]))[0]
-            lag2 = struct.unpack('<H',bytes.fromhex(dataIn[34:38]))[0]
-            lag3 = struct.unpack('<H',bytes.fromhex(dataIn[50:54]))[0]    
-            lag4 = struct.unpack('<H',bytes.fromhex(dataIn[66:70]))[0]    
-            lag5 = struct.unpack('<H',bytes.fromhex(dataIn[82:86]))[0]    
-            lag6 = struct.unpack('<H',bytes.fromhex(dataIn[98:102]))[0]    
-            lag7 = struct.unpack('<H',bytes.fromhex(dataIn[114:118]))[0]            
-            
-            dateTime0 = dateTime - timedelta(seconds = lag0)
-            dateTime1 = dateTime - timedelta(seconds = lag1)
-            dateTime2 = dateTime - timedelta(seconds = lag2)
-            dateTime3 = dateTime - timedelta(seconds = lag3)
-            dateTime4 = dateTime - timedelta(seconds = lag4)
-            dateTime5 = dateTime - timedelta(seconds = lag5)
-            dateTime6 = dateTime - timedelta(seconds = lag6)
-            dateTime7 = dateTime - timedelta(seconds = lag7)
-            
-            sensorDictionary =  OrderedDict([
-                    ("dateTime"      ,str(dateTime)),
-                    ("numOfCalls"    ,struct.unpack('<B',bytes.fromhex(dataIn[0:2]))[0]),
-                    ("dateTime0"     ,str(dateTime0)),
-                    ("lag0"          ,struct.unpack('<H',bytes.fromhex(dataIn[2:6]))[0]),
-                    ("label0"        ,struct.unpack('<H',bytes.fromhex(dataIn[6:10]))[0]),
-                    ("confidence0"   ,struct.unpack('<f',bytes.fromhex(dataIn[10:18]))[0]),
-                    ("dateTime1"     ,str(dateTime1)),
-                    ("lag1"          ,struct.unpack('<H',bytes.fromhex(dataIn[18:22]))[0]),
-                    ("label1"        ,struct.unpack('<H',bytes.fromhex(dataIn[22:26]))[0]),
-                    ("confidence1"   ,struct.unpack('<f',bytes.fromhex(dataIn[26:34]))[0]),
-                    ("dateTime2"     ,str(dateTime2)),
-                    ("lag2"          ,struct.unpack('<H',bytes.fromhex(dataIn[34:38]))[0]),
-                    ("label2"        ,struct.unpack('<H',bytes.fromhex(dataIn[38:42]))[0]),
-                    ("confidence2"   ,struct.unpack('<f',bytes.fromhex(dataIn[42:50]))[0]),
-                    ("dateTime3"     ,str(dateTime3)),
-                    ("lag3"          ,struct.unpack('<H',bytes.fromhex(dataIn[50:54]))[0]),
-                    ("label3"        ,struct.unpack('<H',bytes.fromhex(dataIn[54:58]))[0]),
-                    ("confidence3"   ,struct.unpack('<f',bytes.fromhex(dataIn[58:66]))[0]),
-                    ("dateTime4"     ,str(dateTime4)),
-                    ("lag4"          ,struct.unpack('<H',bytes.fromhex(dataIn[66:70]))[0]),
-                    ("label4"        ,struct.unpack('<H',bytes.fromhex(dataIn[70:74]))[0]),
-                    ("confidence4"   ,struct.unpack('<f',bytes.fromhex(dataIn[74:82]))[0]),
-                    ("dateTime5"     ,str(dateTime5)),
-                    ("lag5"          ,struct.unpack('<H',bytes.fromhex(dataIn[82:86]))[0]),
-                    ("label5"        ,struct.unpack('<H',bytes.fromhex(dataIn[86:90]))[0]),
-                    ("confidence5"   ,struct.unpack('<f',bytes.fromhex(dataIn[90:98]))[0]),
-                    ("dateTime6"     ,str(dateTime6)),
-                    ("lag6"          ,struct.unpack('<H',bytes.fromhex(dataIn[98:102]))[0]),
-                    ("label6"        ,struct.unpack('<H',bytes.fromhex(dataIn[102:106]))[0]),
-                    ("confidence6"   ,struct.unpack('<f',bytes.fromhex(dataIn[106:114]))[0]),
-                    ("dateTime7"     ,str(dateTime7)),
-                    ("lag7"          ,struct.unpack('<H',bytes.fromhex(dataIn[114:118]))[0]),
-                    ("label7"        ,struct.unpack('<H',bytes.fromhex(dataIn[118:122]))[0]),
-                    ("confidence7"   ,struct.unpack('<f',bytes.fromhex(dataIn[122:130]))[0]),
-                ])
+            dateTime = datetime.datetime.now()
+            sensorDictionary = OrderedDict([("dateTime", str(dateTime))])
+            sensorDictionary.update(codec.decode(dataIn))
             return sensorDictionary;
-    
     except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for IPS7100")
-        time.sleep(.5)
-        return None     
-    
-def sensingMBCLR001(dataIn,transmitReceive):
+        return sensingError(codec.sensorID,e)
+
+
+def sensingRG15(codec,dataIn,transmitReceive):
+    if (transmitReceive and len(dataIn)==4):
+        dataIn = [dataIn[0].replace(' ', "").replace('mm', "").replace('Acc', ""),
+                  dataIn[1].replace(' ', "").replace('mm', "").replace('EventAcc', ""),
+                  dataIn[2].replace(' ', "").replace('mm', "").replace('TotalAcc', ""),
+                  dataIn[3].replace(' ', "").replace('mmph', "").replace('RInt', "")]
+    return sensingLayout(codec,dataIn,transmitReceive);
+
+
+def sensingMBCLR001(codec,dataIn,transmitReceive):
+    # The lag goes out as a zero byte followed by the lag byte, which the
+    # layout covers with a pad byte
     try:
-        if (transmitReceive): 
-            print("MBCLR001 Read")	
-            strOut  = \
-                np.ubyte(dataIn[0]).tobytes().hex().zfill(4)+ \
-                np.uint16(dataIn[1]).tobytes().hex().zfill(4)+ \
-                np.float32(dataIn[2]).tobytes().hex().zfill(8)
-            return strOut;  
+        if (transmitReceive):
+            print("MBCLR001 Read")
+            return codec.encode(dataIn);
         else:
-            dateTimePre = datetime.datetime.now() 
-            lag = struct.unpack('<H',bytes.fromhex(dataIn[0:4]))[0]
-            dateTime = dateTimePre - timedelta(seconds = lag)
-            sensorDictionary =  OrderedDict([
+            sensorDictionary = codec.decode(dataIn)
+            dateTime = datetime.datetime.now() - timedelta(seconds = sensorDictionary['lag'])
+            return OrderedDict([
                     ("dateTime"     ,str(dateTime)),
-                    ("label"        ,struct.unpack('<H',bytes.fromhex(dataIn[4:8]))[0]),
-                    ("confidence"   ,struct.unpack('<f',bytes.fromhex(dataIn[8:16]))[0]),
-            ])
-            return sensorDictionary;
+                    ("label"        ,sensorDictionary['label']),
+                    ("confidence"   ,sensorDictionary['confidence']),
+            ]);
     except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for MBCLR001")
-        time.sleep(.5)
-        return None
+        return sensingError("MBCLR001",e)
 
 
-def sensingPM(dataIn,transmitReceive):
+def sensingMBCLR002(codec,dataIn,transmitReceive):
     try:
-        print("Reading Power Mode")	
-        if (transmitReceive): 
-            strOut  = \
-                np.ubyte(dataIn[0]).tobytes().hex().zfill(2)
-            return strOut;  
+        if (transmitReceive):
+            print("MBCLR002 Read")
+            return codec.encode(dataIn);
         else:
             dateTime = datetime.datetime.now()
-            sensorDictionary =  OrderedDict([
-                    ("dateTime"      ,str(dateTime)),
-                    ("powerMode",struct.unpack('<B',bytes.fromhex(dataIn[0:8]))[0])
-            ])
+            decoded  = codec.decode(dataIn)
+            sensorDictionary = OrderedDict([
+                    ("dateTime"   ,str(dateTime)),
+                    ("numOfCalls" ,decoded['numOfCalls'])])
+            for call in range(8):
+                lag = decoded['lag' + str(call)]
+                sensorDictionary['dateTime'   + str(call)] = str(dateTime - timedelta(seconds = lag))
+                sensorDictionary['lag'        + str(call)] = lag
+                sensorDictionary['label'      + str(call)] = decoded['label' + str(call)]
+                sensorDictionary['confidence' + str(call)] = decoded['confidence' + str(call)]
             return sensorDictionary;
     except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for PM")
-        time.sleep(.5)
-        return None
-
-
-def sensingPMPoLo(dataIn,transmitReceive):
-    try:    
-        print("Reading Power Mode")	
-        if (transmitReceive): 
-            strOut  = \
-                np.ubyte(dataIn[0]).tobytes().hex().zfill(2)
-            return strOut;  
-        else:
-            dateTime = datetime.datetime.now()
-            sensorDictionary =  OrderedDict([
-                    ("dateTime"      ,str(dateTime)),
-                    ("powerMode",struct.unpack('<B',bytes.fromhex(dataIn[0:2]))[0])
-            ])
-            return sensorDictionary;
-    except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for PMPoLo")
-        time.sleep(.5)
-        return None
-    
-def sensingMacAD(dataIn,transmitReceive):
+        return sensingError("MBCLR002",e)
+
+
+def sensingMacAD(codec,dataIn,transmitReceive):
     try:
-        print("Reading Mac Address")	
-        if (transmitReceive): 
-            strOut  = \
-                dataIn[0].zfill(12)
-            return strOut;  
+        print("Reading Mac Address")
+        if (transmitReceive):
+            return codec.encode([dataIn[0].zfill(12)]);
         else:
             dateTime = datetime.datetime.now()
-            sensorDictionary =  OrderedDict([
-                    ("dateTime"      ,str(dateTime)),
-                    ("macAddress" ,dataIn),
-            ])
-            return sensorDictionary;
+            return OrderedDict([
+                    ("dateTime"   ,str(dateTime)),
+                    ("macAddress" ,codec.decode(dataIn)['macAddress'].hex()),
+            ]);
     except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for Mac Address")
-        time.sleep(.5)
-        return None
-            
+        return sensingError("Mac Address",e)
+
+
 def getLatitudeCords(latitudeStr,latitudeDirection):
     latitude = float(latitudeStr)
     latitudeCord      =  math.floor(latitude/100) +(latitude - 100*(math.floor(latitude/100)))/60
@@ -347,427 +202,47 @@ def getLongitudeCords(longitudeStr,longitudeDirection):
     return longitudeCord      
 
 
-def sensingGPGGAPL(dataIn,transmitReceive):
-    try:
-        if (transmitReceive): 
+def sensingGPGGAPL(codec,dataIn,transmitReceive):
+    if (transmitReceive):
+        try:
             dataIn = pynmea2.parse(dataIn)
             if (dataIn.gps_qual>0):
                 timeStamp = str(dataIn.timestamp).split(":")
-                print("GPGGAPL Read")	
-                strOut  = \
-                    np.ubyte(timeStamp[0]).tobytes().hex().zfill(2)+ \
-                    np.ubyte(timeStamp[1]).tobytes().hex().zfill(2)+ \
-                    np.ubyte(timeStamp[2]).tobytes().hex().zfill(2)+ \
-                    np.double(getLatitudeCords(dataIn.lat,dataIn.lat_dir)).tobytes().hex().zfill(16)+ \
-                    np.double(getLongitudeCords(dataIn.lon,dataIn.lon_dir)).tobytes().hex().zfill(16) + \
-                    np.ubyte(dataIn.gps_qual).tobytes().hex().zfill(2)+ \
-                    np.ubyte(dataIn.num_sats).tobytes().hex().zfill(2)+ \
-                    np.float32(dataIn.horizontal_dil).tobytes().hex().zfill(8) +\
-                    np.float32(dataIn.altitude).tobytes().hex().zfill(8) +\
-                    np.float32(dataIn.geo_sep).tobytes().hex().zfill(8) ;
-                return strOut;  
+                print("GPGGAPL Read")
+                return codec.pack([
+                    timeStamp[0], timeStamp[1], timeStamp[2],
+                    getLatitudeCords(dataIn.lat,dataIn.lat_dir),
+                    getLongitudeCords(dataIn.lon,dataIn.lon_dir),
+                    dataIn.gps_qual, dataIn.num_sats,
+                    dataIn.horizontal_dil, dataIn.altitude, dataIn.geo_sep]).hex();
             else:
-                print("GPGGAPL Data Not Read: No GPS Signal")	
+                print("GPGGAPL Data Not Read: No GPS Signal")
                 return None
+        except Exception as e:
+            return sensingError("GPGGAPL",e)
+    return sensingLayout(codec,dataIn,transmitReceive);
 
-        else:
-            dateTime = datetime.datetime.now()
-            sensorDictionary =  OrderedDict([
-                    ("dateTime"            ,str(dateTime)),
-                    ("hour"                ,struct.unpack('<B',bytes.fromhex(dataIn[0:2]))[0]),
-                    ("minute"              ,struct.unpack('<B',bytes.fromhex(dataIn[2:4]))[0]),
-                    ("second"              ,struct.unpack('<B',bytes.fromhex(dataIn[4:6]))[0]),
-                    ("latitudeCoordinate"  ,struct.unpack('<d',bytes.fromhex(dataIn[6:22]))[0]),
-                    ("longitudeCoordinate" ,struct.unpack('<d',bytes.fromhex(dataIn[22:38]))[0]),
-                    ("gpsQuality"          ,struct.unpack('<B',bytes.fromhex(dataIn[38:40]))[0]),
-                    ("numberOfSatellites"  ,struct.unpack('<B',bytes.fromhex(dataIn[40:42]))[0]),
-                    ("HorizontalDilution"  ,struct.unpack('<f',bytes.fromhex(dataIn[42:50]))[0]),
-                    ("altitude"            ,struct.unpack('<f',bytes.fromhex(dataIn[50:58]))[0]),
-                    ("undulation"          ,struct.unpack('<f',bytes.fromhex(dataIn[58:66]))[0]),
-            ])
-            return sensorDictionary;
-    except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for GPGGAPL")
-        time.sleep(.5)
-        return None
-
-def sensingGPRMCPL(dataIn,transmitReceive):
-    try:
-        if (transmitReceive): 
+
+def sensingGPRMCPL(codec,dataIn,transmitReceive):
+    if (transmitReceive):
+        try:
             dataIn = pynmea2.parse(dataIn)
             if (dataIn.status=='A'):
                 timeStamp = str(dataIn.timestamp).split(":")
                 dateStamp = str(dataIn.datestamp).split("-")
-                print("GPRMCPL Read")	
-                strOut  = \
-                    np.uint16(dateStamp[0]).tobytes().hex().zfill(4)+ \
-                    np.ubyte(dateStamp[1]).tobytes().hex().zfill(2)+ \
-                    np.ubyte(dateStamp[2]).tobytes().hex().zfill(2)+ \
-                    np.ubyte(timeStamp[0]).tobytes().hex().zfill(2)+ \
-                    np.ubyte(timeStamp[1]).tobytes().hex().zfill(2)+ \
-                    np.ubyte(timeStamp[2]).tobytes().hex().zfill(2)+ \
-                    np.double(getLatitudeCords(dataIn.lat,dataIn.lat_dir)).tobytes().hex().zfill(16)+ \
-                    np.double(getLongitudeCords(dataIn.lon,dataIn.lon_dir)).tobytes().hex().zfill(16) + \
-                    np.float32(dataIn.spd_over_grnd).tobytes().hex().zfill(8) ;
-                return strOut;  
-            else:
-                print("GPRMCPL Data Not Read: No GPS Signal")	
-                return None
-        else:
-            dateTime = datetime.datetime.now()
-            sensorDictionary =  OrderedDict([
-                    ("dateTime"            ,str(dateTime)),
-                    ("year"                ,struct.unpack('<H',bytes.fromhex(dataIn[0:4]))[0]),
-                    ("month"               ,struct.unpack('<B',bytes.fromhex(dataIn[4:6]))[0]),
-                    ("day"                 ,struct.unpack('<B',bytes.fromhex(dataIn[6:8]))[0]),               
-                    ("hour"                ,struct.unpack('<B',bytes.fromhex(dataIn[8:10]))[0]),
-                    ("minute"              ,struct.unpack('<B',bytes.fromhex(dataIn[10:12]))[0]),
-                    ("second"              ,struct.unpack('<B',bytes.fromhex(dataIn[12:14]))[0]),
-                    ("latitudeCoordinate"  ,struct.unpack('<d',bytes.fromhex(dataIn[14:30]))[0]),
-                    ("longitudeCoordinate" ,struct.unpack('<d',bytes.fromhex(dataIn[30:46]))[0]),
-                    ("speedOverGround"     ,struct.unpack('<f',bytes.fromhex(dataIn[46:54]))[0]),
-            ])
-            return sensorDictionary;
-    except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for GPRMCPL")
-        time.sleep(.5)
-        return None
-
-def sensingAS7265X(dataIn,transmitReceive):
-    try:
-        if (transmitReceive): 
-            print("AS7265X Read")	
-            if(len(dataIn)==18):
-                strOut  = \
-                    np.float32(dataIn[0]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[1]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[2]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[3]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[4]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[5]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[6]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[7]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[8]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[9]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[10]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[11]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[12]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[13]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[14]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[15]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[16]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[17]).tobytes().hex().zfill(8) ;
-                return strOut;  
-            else:
-                print("Invalid data string read by the Canaaree")
-                return None;
-        else:
-            dateTime = datetime.datetime.now()
-            sensorDictionary =  OrderedDict([
-                    ("dateTime"      ,str(dateTime)),
-                    ("channelA410nm" ,struct.unpack('<f',bytes.fromhex(dataIn[0:8]))[0]),
-                    ("channelB435nm" ,struct.unpack('<f',bytes.fromhex(dataIn[8:16]))[0]),
-                    ("channelC460nm" ,struct.unpack('<f',bytes.fromhex(dataIn[16:24]))[0]),
-                    ("channelD485nm" ,struct.unpack('<f',bytes.fromhex(dataIn[24:32]))[0]),                
-                    ("channelE510nm" ,struct.unpack('<f',bytes.fromhex(dataIn[32:40]))[0]),
-                    ("channelF535nm" ,struct.unpack('<f',bytes.fromhex(dataIn[40:48]))[0]),
-                    ("channelG560nm" ,struct.unpack('<f',bytes.fromhex(dataIn[48:56]))[0]),
-                    ("channelH585nm" ,struct.unpack('<f',bytes.fromhex(dataIn[56:64]))[0]),                
-                    ("channelR610nm" ,struct.unpack('<f',bytes.fromhex(dataIn[64:72]))[0]),
-                    ("channelI645nm" ,struct.unpack('<f',bytes.fromhex(dataIn[72:80]))[0]),
-                    ("channelS680nm" ,struct.unpack('<f',bytes.fromhex(dataIn[80:88]))[0]),
-                    ("channelJ705nm" ,struct.unpack('<f',bytes.fromhex(dataIn[88:96]))[0]),                
-                    ("channelT730nm" ,struct.unpack('<f',bytes.fromhex(dataIn[96:104]))[0]),
-                    ("channelU760nm" ,struct.unpack('<f',bytes.fromhex(dataIn[104:112]))[0]),
-                    ("channelV810nm" ,struct.unpack('<f',bytes.fromhex(dataIn[112:120]))[0]),
-                    ("channelW860nm" ,struct.unpack('<f',bytes.fromhex(dataIn[120:128]))[0]),                
-                    ("channelK900nm" ,struct.unpack('<f',bytes.fromhex(dataIn[128:136]))[0]),
-                    ("channelL940nm" ,struct.unpack('<f',bytes.fromhex(dataIn[136:144]))[0]),
-            ])
-            return sensorDictionary;
-    except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for AS7265X")
-        time.sleep(.5)
-        return None
-
-
-
-def sensingMBLS001(dataIn,transmitReceive):
-    try:
-        if (transmitReceive): 
-            print("MBLS001 Read")	
-
-            if (len(dataIn)==10):
-                strOut  = \
-                     np.uint16(dataIn[0]).tobytes().hex().zfill(4) + \
-                    np.float32(dataIn[1]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[2]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[3]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[4]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[5]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[6]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[7]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[8]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[9]).tobytes().hex().zfill(8) 
-                return strOut;  
-            else:
-                print("Invalid data string read from the MBLS001")
-
-                return None;
-
-        else:
-            dateTime = datetime.datetime.now()
-            sensorDictionary =  OrderedDict([
-                    ("dateTime"            ,str(dateTime)),
-                    ("batteryLevelRaw"     ,struct.unpack('<H',bytes.fromhex(dataIn[0:4]))[0]),
-                    ("cellVoltage"         ,struct.unpack('<f',bytes.fromhex(dataIn[4:12]))[0]),
-                    ("solarVoltage"        ,struct.unpack('<f',bytes.fromhex(dataIn[12:20]))[0]),
-                    ("solarCurrent"        ,struct.unpack('<f',bytes.fromhex(dataIn[20:28]))[0]),
-                    ("solarPower"          ,struct.unpack('<f',bytes.fromhex(dataIn[28:36]))[0]),
-                    ("solarShuntVoltage"   ,struct.unpack('<f',bytes.fromhex(dataIn[36:44]))[0]), 
-                    ("batteryVoltage"      ,struct.unpack('<f',bytes.fromhex(dataIn[44:52]))[0]),
-                    ("batteryCurrent"      ,struct.unpack('<f',bytes.fromhex(dataIn[52:60]))[0]),
-                    ("batteryPower"        ,struct.unpack('<f',bytes.fromhex(dataIn[60:68]))[0]),
-                    ("batteryShuntVoltage" ,struct.unpack('<f',bytes.fromhex(dataIn[68:76]))[0])
-            ])
-            return sensorDictionary;
-    except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for MBLS001")
-        time.sleep(.5)
-        return None
-
-def sensingBME280V2(dataIn,transmitReceive):
-    try:
-        if (transmitReceive): 
-            print("BME280V2 Read")	
-            if (len(dataIn)==5):
-                strOut  = \
-                    np.float32(dataIn[0]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[1]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[2]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[3]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[4]).tobytes().hex().zfill(8)
-                return strOut;  
+                print("GPRMCPL Read")
+                return codec.pack([
+                    dateStamp[0], dateStamp[1], dateStamp[2],
+                    timeStamp[0], timeStamp[1], timeStamp[2],
+                    getLatitudeCords(dataIn.lat,dataIn.lat_dir),
+                    getLongitudeCords(dataIn.lon,dataIn.lon_dir),
+                    dataIn.spd_over_grnd]).hex();
             else:
-                print("Invalid data string read from the BME280")
-
-                return None;
-
-        else:
-            dateTime = datetime.datetime.now()
-            sensorDictionary =  OrderedDict([
-                    ("dateTime"     ,str(dateTime)),
-                    ("temperature"  ,struct.unpack('<f',bytes.fromhex(dataIn[0:8]))[0]),
-                    ("pressure"     ,struct.unpack('<f',bytes.fromhex(dataIn[8:16]))[0]),
-                    ("humidity"     ,struct.unpack('<f',bytes.fromhex(dataIn[16:24]))[0]),
-                    ("dewPoint"     ,struct.unpack('<f',bytes.fromhex(dataIn[24:32]))[0]),
-                    ("altitude"     ,struct.unpack('<f',bytes.fromhex(dataIn[32:40]))[0]),        
-            ])
-            return sensorDictionary;
-
-    except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for SCD30")
-        time.sleep(.5)
-        return None
-
-
-
-def sensingSCD30(dataIn,transmitReceive):
-    try:
-        if (transmitReceive): 
-            print("SCD30 Read")	
-            if (len(dataIn)==3):
-                strOut  = \
-                    np.float32(dataIn[0]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[1]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[2]).tobytes().hex().zfill(8)
-                return strOut;  
-            else:
-                print("Invalid data string read from the SCD30")
-                return None;
-
-        else:
-            dateTime = datetime.datetime.now()
-            sensorDictionary =  OrderedDict([
-                    ("dateTime"     ,str(dateTime)),
-                    ("co2"          ,struct.unpack('<f',bytes.fromhex(dataIn[0:8]))[0]),
-                    ("temperature"  ,struct.unpack('<f',bytes.fromhex(dataIn[8:16]))[0]),
-                    ("humidity"     ,struct.unpack('<f',bytes.fromhex(dataIn[16:24]))[0]),
-            ])
-            return sensorDictionary;
-
-    except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for SCD30")
-        time.sleep(.5)
-        return None
-
-def sensingBME688CNR(dataIn,transmitReceive):
-    try:
-        if (transmitReceive): 
-            print("BME688CNR Read")	
-            if (len(dataIn)== 44): 
-                strOut  = \
-                    np.float32(dataIn[29]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[31]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[33]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[35]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[37]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[39]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[41]).tobytes().hex().zfill(8)
-                return strOut;  
-            else:
-                print("Invalid data string read from the Canaaree")
-                return None;
-        else:
-            dateTime = datetime.datetime.now()
-            sensorDictionary =  OrderedDict([
-                    ("dateTime"    , str(dateTime)), 
-                    ("temperature" ,struct.unpack('<f',bytes.fromhex(dataIn[0:8]))[0]),
-                    ("humidity"    ,struct.unpack('<f',bytes.fromhex(dataIn[8:16]))[0]),
-                    ("pressure"    ,struct.unpack('<f',bytes.fromhex(dataIn[16:24]))[0]),
-                    ("vocAqi"      ,struct.unpack('<f',bytes.fromhex(dataIn[24:32]))[0]),
-                    ("bvocEq"      ,struct.unpack('<f',bytes.fromhex(dataIn[32:40]))[0]),
-                    ("gasEst"      ,struct.unpack('<f',bytes.fromhex(dataIn[40:48]))[0]), 
-                    ("co2Eq"       ,struct.unpack('<f',bytes.fromhex(dataIn[48:56]))[0]),
-            ])
-            return sensorDictionary;
-
-    except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for BME688CNR")
-        time.sleep(.5)
-        return None
-        
-def sensingIPS7100(dataIn,transmitReceive):
-
-    try:
-        if (transmitReceive):  
-            print("IPS7100 Read")	
-            if (len(dataIn)== 29): 
-                strOut  = \
-                    np.uint32(dataIn[1]).tobytes().hex().zfill(8)+ \
-                    np.uint32(dataIn[3]).tobytes().hex().zfill(8) + \
-                    np.uint32(dataIn[5]).tobytes().hex().zfill(8)+ \
-                    np.uint32(dataIn[7]).tobytes().hex().zfill(8) + \
-                    np.uint32(dataIn[9]).tobytes().hex().zfill(8)+ \
-                    np.uint32(dataIn[11]).tobytes().hex().zfill(8) + \
-                    np.uint32(dataIn[13]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[15]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[17]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[19]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[21]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[23]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[25]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[27]).tobytes().hex().zfill(8)
-                return strOut;  
-            else:
-                print("Invalid data string read from the IPS7100")
-                return None
-
-        else:
-            dateTime = datetime.datetime.now()
-            sensorDictionary =  OrderedDict([
-                    ("dateTime" , str(dateTime)), 
-                    ("pc0_1"  ,struct.unpack('<L',bytes.fromhex(dataIn[0:8]))[0]),
-                    ("pc0_3"  ,struct.unpack('<L',bytes.fromhex(dataIn[8:16]))[0]),
-                    ("pc0_5"  ,struct.unpack('<L',bytes.fromhex(dataIn[16:24]))[0]),
-                    ("pc1_0"  ,struct.unpack('<L',bytes.fromhex(dataIn[24:32]))[0]),
-                    ("pc2_5"  ,struct.unpack('<L',bytes.fromhex(dataIn[32:40]))[0]),
-                    ("pc5_0"  ,struct.unpack('<L',bytes.fromhex(dataIn[40:48]))[0]), 
-                    ("pc10_0" ,struct.unpack('<L',bytes.fromhex(dataIn[48:56]))[0]),
-                    ("pm0_1"  ,struct.unpack('<f',bytes.fromhex(dataIn[56:64]))[0]), 
-                    ("pm0_3"  ,struct.unpack('<f',bytes.fromhex(dataIn[64:72]))[0]),
-                    ("pm0_5"  ,struct.unpack('<f',bytes.fromhex(dataIn[72:80]))[0]),
-                    ("pm1_0"  ,struct.unpack('<f',bytes.fromhex(dataIn[80:88]))[0]),
-                    ("pm2_5"  ,struct.unpack('<f',bytes.fromhex(dataIn[88:96]))[0]),
-                    ("pm5_0"  ,struct.unpack('<f',bytes.fromhex(dataIn[96:104]))[0]), 
-                    ("pm10_0" ,struct.unpack('<f',bytes.fromhex(dataIn[104:112]))[0])
-            ])
-            return sensorDictionary;
-
-    except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for IPS7100")
-        time.sleep(.5)
-        return None
-
-        
-def sensingIPS7100CNR(dataIn,transmitReceive):
-    try:
-        if (transmitReceive):  
-            print("IPS7100CNR Read")	
-            if (len(dataIn)== 44): 
-                strOut  = \
-                    np.uint32(dataIn[1]).tobytes().hex().zfill(8)+ \
-                    np.uint32(dataIn[3]).tobytes().hex().zfill(8) + \
-                    np.uint32(dataIn[5]).tobytes().hex().zfill(8)+ \
-                    np.uint32(dataIn[7]).tobytes().hex().zfill(8) + \
-                    np.uint32(dataIn[9]).tobytes().hex().zfill(8)+ \
-                    np.uint32(dataIn[11]).tobytes().hex().zfill(8) + \
-                    np.uint32(dataIn[13]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[15]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[17]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[19]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[21]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[23]).tobytes().hex().zfill(8)+ \
-                    np.float32(dataIn[25]).tobytes().hex().zfill(8) + \
-                    np.float32(dataIn[27]).tobytes().hex().zfill(8)
-                return strOut;  
-            else:
-                print("Invalid data string read from the IPS7100CNR")
+                print("GPRMCPL Data Not Read: No GPS Signal")
                 return None
-
-        else:
-            dateTime = datetime.datetime.now()
-            sensorDictionary =  OrderedDict([
-                    ("dateTime" , str(dateTime)), 
-                    ("pc0_1"  ,struct.unpack('<L',bytes.fromhex(dataIn[0:8]))[0]),
-                    ("pc0_3"  ,struct.unpack('<L',bytes.fromhex(dataIn[8:16]))[0]),
-                    ("pc0_5"  ,struct.unpack('<L',bytes.fromhex(dataIn[16:24]))[0]),
-                    ("pc1_0"  ,struct.unpack('<L',bytes.fromhex(dataIn[24:32]))[0]),
-                    ("pc2_5"  ,struct.unpack('<L',bytes.fromhex(dataIn[32:40]))[0]),
-                    ("pc5_0"  ,struct.unpack('<L',bytes.fromhex(dataIn[40:48]))[0]), 
-                    ("pc10_0" ,struct.unpack('<L',bytes.fromhex(dataIn[48:56]))[0]),
-                    ("pm0_1"  ,struct.unpack('<f',bytes.fromhex(dataIn[56:64]))[0]), 
-                    ("pm0_3"  ,struct.unpack('<f',bytes.fromhex(dataIn[64:72]))[0]),
-                    ("pm0_5"  ,struct.unpack('<f',bytes.fromhex(dataIn[72:80]))[0]),
-                    ("pm1_0"  ,struct.unpack('<f',bytes.fromhex(dataIn[80:88]))[0]),
-                    ("pm2_5"  ,struct.unpack('<f',bytes.fromhex(dataIn[88:96]))[0]),
-                    ("pm5_0"  ,struct.unpack('<f',bytes.fromhex(dataIn[96:104]))[0]), 
-                    ("pm10_0" ,struct.unpack('<f',bytes.fromhex(dataIn[104:112]))[0])
-            ])
-            return sensorDictionary;
-
-    except Exception as e:
-        time.sleep(.5)
-        print ("Error and type: %s - %s." % (e,type(e)))
-        time.sleep(.5)
-        print("Data Packet Not Sent for IPS7100CNR")
-        time.sleep(.5)
-        return None
-
+        except Exception as e:
+            return sensingError("GPRMCPL",e)
+    return sensingLayout(codec,dataIn,transmitReceive);
 
 
 def directoryCheck(outputPath):
@@ -777,3 +252,25 @@ def directoryCheck(outputPath):
         print("Creating a Directory @: " +directoryIn)
         os.makedirs(directoryIn)
     return exists
+
+
+# Sensors which need more than packing their readings in layout order.
+# Everything else in loRaSensors.yaml goes through sensingLayout.
+sensingFunctions = {
+    "MacAD"      : sensingMacAD,
+    "GPGGAPL"    : sensingGPGGAPL,
+    "GPRMCPL"    : sensingGPRMCPL,
+    "MBCLR001"   : sensingMBCLR001,
+    "MBCLR002"   : sensingMBCLR002,
+    "RG15"       : sensingRG15,
+    }
+
+loRaSensors = mLC.loadCodecs(loRaSensorsFile)
+for sensorID, sensing in sensingFunctions.items():
+    if sensorID in loRaSensors:
+        loRaSensors[sensorID].sensing = sensing
+
+
+def describeLoRaSensors():
+    return OrderedDict((sensorID, loRaSensors[sensorID].describe()) \
+                            for sensorID in sorted(loRaSensors))
@@ -5,12 +5,17 @@ import base64
 from cgitb import strong
 from datetime import datetime
 from this import d
+import re
 import time
 from xmlrpc.client import DateTime 
 import serial.tools.list_ports
 
 from mintsXU4 import mintsDefinitions as mD
 from mintsXU4 import mintsLoRaSensing as mLS
+from mintsXU4 import mintsLoRaIndex as mLI
+from mintsXU4 import mintsSerialLines as mSL
+from mintsXU4 import mintsLoRaFrames as mLF
+from mintsXU4 import mintsE5 as mE5
 
 from collections import OrderedDict
 import struct
@@ -21,15 +26,19 @@ loRaE5MiniPorts     = mD.loRaE5MiniPorts
 # gpsPorts            = mD.gpsPorts
 appKey              = mD.appKey
 macAddress          = mD.macAddress
-fPortIDs            = mD.fPortIDs
 receiveTransmit     = True
+loRaRegion          = mD.loRaRegion
+loRaDataRate        = mD.loRaDataRate
+loRaPackedPort      = mD.loRaPackedPort
+
+# With a packer, sendCommandHex queues records for sendPacked
+packer              = None
+checkDataRate       = False     # AT+DR asked for after a length error
 
 
 def deriveSensorStats(sensorID):
-    for port in fPortIDs:
-        if(port['sensor'] == sensorID):
-            return port;
-    return port;
+    # None for sensors without a port in portIDs.yml
+    return mLI.getSensorPort(sensorID)
 
 def getPort(portsIn,indexIn,baudRateIn):
     availabilty  = len(portsIn)>0
@@ -101,7 +110,6 @@ def loRaE5ReJoin(availE5Mini,serE5Mini):
         quit()
            
     joined = joinNetwork(10,serE5Mini,10)  
-    time.sleep(5)
     return joined;
   
   
@@ -112,18 +120,20 @@ def loRaE5MiniJoin(availE5Mini,serE5Mini):
         quit()
          
     joined = False 
+    modem  = mE5.getModem(serE5Mini)
     # Read E5 Mini Credentials
-    sendCommand(serE5Mini,'AT+RESET',2)
-    sendCommand(serE5Mini,'AT+FDEFAULT',1)
-    sendCommand(serE5Mini,'AT+VER',1)
-    sendCommand(serE5Mini,'AT+FDEFAULT',1)
-    sendCommand(serE5Mini,'AT+ID',1)
-    sendCommand(serE5Mini,'AT+KEY=APPKEY, "'+appKey+'"',1)
-    sendCommand(serE5Mini,'AT+MODE=LWOTAA',1)
-    sendCommand(serE5Mini,'AT+DR=US915',1)
-    sendCommand(serE5Mini,'AT+DR=dr2',1)
-    sendCommand(serE5Mini,'AT+CH=NUM, 56-63',1)
-    sendCommand(serE5Mini,'AT+POWER=20',1)
+    modem.command('AT+RESET').result()
+    modem.command('AT+FDEFAULT').result()
+    modem.command('AT+VER').result()
+    modem.command('AT+FDEFAULT').result()
+    modem.reset()
+    modem.command('AT+ID').result()
+    modem.command('AT+KEY=APPKEY, "'+appKey+'"').result()
+    modem.command('AT+MODE=LWOTAA').result()
+    modem.command('AT+DR='+loRaRegion).result()
+    modem.command('AT+DR=dr'+str(loRaDataRate)).result()
+    modem.command('AT+CH=NUM, 56-63').result()
+    modem.command('AT+POWER=20').result()
 
     # Check Join
     joined = joinNetwork(10,serE5Mini,10)
@@ -167,134 +177,73 @@ def openSerial(portIn,baudRate):
 
 def sendCommand2(serIn,commandStrIn,timeOutIn):
     serIn.write(str.encode(commandStrIn+ '\n\r'))
-    line = []
-    lines = []
-    startTime = time.time()
-    while (time.time()-startTime)<timeOutIn:
-        for c in serIn.read():
-            line.append(chr(c))
-            if chr(c) == '\n':
-                dataString = (''.join(line)).replace("\n","").replace("\r","")
-                lines.append(dataString)
-                # print(dataString)
-                line = []
-                break
+    lines = [line.replace("\r","") for line in mSL.getReader(serIn).readLines(timeOutIn)]
     return serIn,lines;
 
 
 def sendCommand(serIn,commandStrIn,timeOutIn):
     time.sleep(.5)
     serIn.write(str.encode(commandStrIn+ '\n\r'))
-    line = []
     lines = []
-    startTime = time.time()
-    while (time.time()-startTime)<timeOutIn:
-        for c in serIn.read():
-            line.append(chr(c))
-            if chr(c) == '\n':
-                dataString = (''.join(line)).replace("\n","").replace("\r","")
-                lines.append(dataString)
-                print(dataString)
-                line = []
-                break
+    for line in mSL.getReader(serIn).readLines(timeOutIn):
+        dataString = line.replace("\r","")
+        lines.append(dataString)
+        print(dataString)
     return lines;
 
-def readSerialLineStrAsIs(serIn,timeOutSensor,strExpected):
-    line = []
-    startTime = time.time()
+def readFullLines(serIn,timeOutSensor):
+    # Lines received within timeOutSensor seconds, skipping the first one
+    # which may have started before the read
+    reader    = mSL.getReader(serIn)
+    deadline  = time.time() + timeOutSensor
     startFound = False
-    while (time.time()-startTime)<timeOutSensor:   
-        # try:
-            for c in serIn.read():
-                line.append(chr(c))
-                # print((''.join(line)))
-
-                if chr(c) == '\n':
-                    if startFound == True:
-                        dataString     = (''.join(line))
-                        dataStringPost = dataString.replace('\r\n', '')
-                        
-                        if dataStringPost.find(strExpected) >0:
-                            return dataStringPost;
-                        else:
-                            line = []
-                    else:    
-                        startFound = True
-                        line = []
+    while True:
+        line = reader.readLine(max(0,deadline - time.time()))
+        if line is None:
+            return
+        if startFound == True:
+            yield line.rstrip('\r')
+        else:
+            startFound = True
+
+def readSerialLineStrAsIs(serIn,timeOutSensor,strExpected):
+    for dataStringPost in readFullLines(serIn,timeOutSensor):
+        if dataStringPost.find(strExpected) >0:
+            return dataStringPost;
 
 def readSerialLineStr(serIn,timeOutSensor,strExpected):
-    line = []
-    startTime = time.time()
-    startFound = False
-    while (time.time()-startTime)<timeOutSensor:   
-        # try:
-            for c in serIn.read():
-                line.append(chr(c))
-                # print((''.join(line)))
-
-                if chr(c) == '\n':
-                    if startFound == True:
-                        dataString     = (''.join(line))
-                        dataStringPost = dataString.replace('\r\n', '')
-                        dataStringData =  dataStringPost.split(',')
-                        
-                        if dataStringPost.find(strExpected) >0:
-                            return dataStringData;
-                        else:
-                            line = []
-                    else:    
-                        startFound = True
-                        line = []
-
-        # except:
-        #     print("Incomplete String Read")
-        #     line = []
+    for dataStringPost in readFullLines(serIn,timeOutSensor):
+        if dataStringPost.find(strExpected) >0:
+            return dataStringPost.split(',');
 
 def swapBytes(inputIn):
     return bytes([c for t in zip(inputIn[1::2], inputIn[::2]) for c in t])
 
 def joinNetwork(numberOfTries,ser,timeOutIn):
-    for currentTry in range(numberOfTries):
-        print("Joining Network Trial: " + str(currentTry))
-        lines = sendCommand(ser,'AT+JOIN',timeOutIn)
-        
-        for line in lines:
-            if line == '+JOIN: Network joined':
-                return True;
-
-    return False;
+    # Each trial ends on the modem's +JOIN: Done, timeOutIn is kept for callers
+    return mE5.getModem(ser).join(numberOfTries).result();
 
 def readSerialLine(serIn,timeOutSensor,sizeExpected):
-    line = []
-    startTime = time.time()
-    startFound = False
-    while (time.time()-startTime)<timeOutSensor:   
-        # try:
-            for c in serIn.read():
-                line.append(chr(c))
-                if chr(c) == '\n':
-                    if startFound == True:
-                        dataString     = (''.join(line))
-                        dataStringPost = dataString.replace('\r\n', '')
-                        dataStringData = dataStringPost.split(',')
-                        if sizeExpected == len(dataStringData):
-                            print("Returning Data")
-                            return dataStringData;
-                        else:
-                            line = []
-                    else:    
-                        startFound = True
-                        line = []
+    for dataStringPost in readFullLines(serIn,timeOutSensor):
+        dataStringData = dataStringPost.split(',')
+        if sizeExpected == len(dataStringData):
+            print("Returning Data")
+            return dataStringData;
     return;
 
 def sendCommandHex(serPortE5,sensorID,sensorData,port):
+    if port is None:
+        print("No LoRa port registered for sensor " + sensorID)
+        return;
     try:
         hexString = mLS.encodeDecode(sensorID,sensorData,receiveTransmit)
         print("HEX STRING: ")
         print(hexString)
-        if hexString is not None:
-            sendCommand(serPortE5,'AT+PORT='+ str(port['portID']),2) 
-            sendCommand(serPortE5,'AT+MSGHEX='+str(hexString ),5)    
+        if hexString is not None and packer is not None:
+            packer.add(port['portID'],bytes.fromhex(hexString))
+        elif hexString is not None:
+            mE5.getModem(serPortE5).uplink(port['portID'],str(hexString)).add_done_callback(\
+                lambda future: print(sensorID + " uplink: " + future.result().status))
         else: 
             print("No data received for sensor " + sensorID)
     except Exception as e:
@@ -306,6 +255,69 @@ def sendCommandHex(serPortE5,sensorID,sensorData,port):
         return;
 
 
+def dataRateOf(response):
+    # Data rate an AT+DR response reports, or None
+    for line in response.lines:
+        if line.startswith("+DR:"):
+            dataRates = re.findall(r"DR(\d+)",line[4:])
+            if dataRates:
+                return int(dataRates[-1]);
+    return None;
+
+
+def readDataRate(serPortE5):
+    # Data rate the modem uses now (ADR may have changed it), or None
+    return dataRateOf(mE5.getModem(serPortE5).command('AT+DR').result());
+
+
+def startPacking(serPortE5):
+    global packer
+    dataRate = readDataRate(serPortE5)
+    if dataRate is None:
+        dataRate = loRaDataRate
+    packer = mLF.FramePacker(mLF.maxPayload(loRaRegion,dataRate))
+    print("Packing records into frames of " + str(packer.maxPayload) + " bytes (DR" + str(dataRate) + ")")
+    return packer;
+
+
+def dataRateRead(response):
+    # Runs on the modem's worker thread once AT+DR finished
+    global checkDataRate
+    checkDataRate = False
+    dataRate = dataRateOf(response)
+    if dataRate is not None:
+        packer.maxPayload = mLF.maxPayload(loRaRegion,dataRate)
+        print("Packing records into frames of " + str(packer.maxPayload) + " bytes (DR" + str(dataRate) + ")")
+
+
+def packedSent(modem,response,records):
+    # Runs on the modem's worker thread once an uplink finished. After a
+    # length error the data rate is asked for without waiting on it, the
+    # frame sizes change when the answer comes.
+    global checkDataRate
+    if response.status in ('ok','noAck'):
+        packer.sent(records)
+    elif response.status == 'length':
+        print("[ERROR] Frame too long for the data rate, records queued again")
+        packer.requeue(records)
+        if not checkDataRate:
+            checkDataRate = True
+            modem.command('AT+DR').add_done_callback(lambda future: dataRateRead(future.result()))
+    else:
+        print("[ERROR] Packed uplink not sent: " + response.status)
+        packer.failed(records)
+
+
+def sendPacked(serPortE5):
+    # Queues everything added since the last call in as few uplinks as fit,
+    # without waiting for the radio
+    modem = mE5.getModem(serPortE5)
+    for records in packer.frames():
+        modem.uplink(loRaPackedPort,b"".join(records).hex()).add_done_callback(\
+            lambda future, records=records: packedSent(modem,future.result(),records))
+    print(packer.report())
+
+
 def readSensorDataBirdSong(sensorData,sensorID,serPortE5):
     try:
         print("====================================")
@@ -331,6 +343,9 @@ def readSensorDataGPSI2C(online,i2cSensor,sensorID,serPortE5):
         if online:
             print(sensorID + " Online") 
             port = deriveSensorStats(sensorID)
+            if port is None:
+                print("No LoRa port registered for sensor " + sensorID)
+                return;
             if port['portID']==106:
                 sensorData = i2cSensor.readSentence("GGA")
                 sendCommandHex(serPortE5,sensorID,sensorData,port)  
@@ -361,6 +376,9 @@ def readSensorDataGPS(online,serPort,sensorID,serPortE5):
         if online:
             print(sensorID + " Online") 
             port = deriveSensorStats(sensorID)
+            if port is None:
+                print("No LoRa port registered for sensor " + sensorID)
+                return;
             if port['portID']==106:
                 sensorData = readSerialLineStrAsIs(serPort,2,"GGA")
                 print(sensorData)
@@ -391,6 +409,9 @@ def readSensorData(online,serPort,sensorID,serPortE5):
         if online:
             print(sensorID + " Online") 
             port = deriveSensorStats(sensorID)
+            if port is None:
+                print("No LoRa port registered for sensor " + sensorID)
+                return;
             if port['portID']<255:
                 sensorData = readSerialLine(serPort,2,port['numOfParametors'])
                 if (sensorData is not None): 
@@ -420,6 +441,9 @@ def readSensorDataRG15(online,serPort,sensorID,serPortE5):
         if online:
             print(sensorID + " Online") 
             port = deriveSensorStats(sensorID)
+            if port is None:
+                print("No LoRa port registered for sensor " + sensorID)
+                return;
             if port['portID']<255:
                 sensorDataWhole = sendCommand(serPort,'R',1)
                 sensorData      = sensorDataWhole[0].split(',')
@@ -451,6 +475,9 @@ def readSensorDataI2c(online,i2cObject,sensorID,serPortE5):
         if online:
             print(sensorID + " Online")  
             port = deriveSensorStats(sensorID)
+            if port is None:
+                print("No LoRa port registered for sensor " + sensorID)
+                return;
             if port['portID']<255:
                 print("Reading I2C Data")
                 sensorData  =  i2cObject.read()
@@ -13,6 +13,7 @@ import time
 # from poLoNodes.firmware.xu4LoRa.mintsXU4 import mintsLoRaSensing as mSR
 from mintsXU4 import mintsDefinitions as mD
 from mintsXU4 import mintsLoRaSensing as mLS
+from mintsXU4 import mintsLoRaIndex as mLI
 # from xu4LoRa.mintsXU4 import mintsLoRaReader as mLR
 # from xu4LoRa.mintsXU4 import mintsLiveNodes as mLN
 
@@ -21,11 +22,9 @@ import datetime
 mqttPortLoRa        = mD.mqttPortLoRa
 mqttBrokerLoRa      = mD.mqttBrokerLoRa
 loRaCredentials     = mD.loRaCredentials  
-nodeIDs             = mD.nodeIDs
 
 
 tlsCert             = mD.tlsCert
-fPortIDs              = mD.fPortIDs 
 
 connected        = False  # Stores the connection status
 broker       = mqttBrokerLoRa  
@@ -42,24 +41,13 @@ print()
     
 
 
-def getNodeIndex(nodeIDIn):
-    indexOut = 0
-    for node in nodeIDs:
-        nodeID = node['nodeID']
-        if (nodeID == nodeIDIn):
-            return indexOut; 
-        indexOut = indexOut +1
-    return -1;
-
 def on_connect(client, userdata, flags, rc):
     print("Connected with result code "+str(rc))
     topic = "utd/lora/app/2/device/+/event/up"
     client.subscribe(topic)
     print("Subscrbing to Topic: "+ topic)
     print()
-    for node in nodeIDs:
- 
-        nodeID = node['nodeID']
+    for nodeID in mLI.nodesByID:
         print("Appending Node: " + nodeID)
         print()
         # nodeObjects.append(mLN.node(nodeID))
@@ -67,12 +55,18 @@ def on_connect(client, userdata, flags, rc):
 def on_message(client, userdata, msg):
     try:
         dateTime,gatewayID,nodeID,sensorID,framePort,base16Data = \
-            mLS.loRaSummaryReceive(msg,fPortIDs)
-        nodeIndex = getNodeIndex(nodeID)
-        if nodeIndex >= 0 :  
-            print()
-            print(" - - - MINTS DATA RECEIVED - - - ")
-            sensorDictionary = mLS.encodeDecode(sensorID,base16Data,False)
+            mLS.loRaSummaryReceive(msg)
+        if mLI.getNode(nodeID) is None:
+            return
+        if framePort == mD.loRaPackedPort:
+            records = mLS.decodeMultiplexed(base16Data)
+        elif sensorID is not None:
+            records = [(sensorID,mLS.encodeDecode(sensorID,base16Data,False))]
+        else:
+            return
+        print()
+        print(" - - - MINTS DATA RECEIVED - - - ")
+        for sensorID, sensorDictionary in records:
             if sensorDictionary is not None:
                 dateTime = datetime.datetime.strptime(sensorDictionary["dateTime"], '%Y-%m-%d %H:%M:%S.%f')
                 print("Node ID         : " + nodeID)
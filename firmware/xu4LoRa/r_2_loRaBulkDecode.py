@@ -0,0 +1,55 @@
+#
+# Backfills decoded sensor files from a ChirpStack uplink export
+# Usage : python3 r_2_loRaBulkDecode.py export.jsonl[.gz] [export2 ...] [-o outputFolder]
+# Writes to dataFolderBackfill unless -o is given. Day files left by an
+# earlier run are replaced, so decode all exports covering a day together.
+import sys
+import time
+
+from mintsXU4 import mintsDefinitions as mD
+from mintsXU4 import mintsLoRaCodec as mLC
+from mintsXU4 import mintsLoRaBulk as mLB
+
+fPortIDs           = mD.fPortIDs
+dataFolderBackfill = mD.dataFolderBackfill
+loRaSensorsFile    = mD.loRaSensorsFile
+loRaPackedPort     = mD.loRaPackedPort
+chunkFrames        = 50000
+
+
+def main(arguments):
+    outputFolder = dataFolderBackfill
+    if "-o" in arguments:
+        index        = arguments.index("-o")
+        outputFolder = arguments[index+1]
+        arguments    = arguments[:index] + arguments[index+2:]
+
+    if not arguments:
+        print("Usage: python3 r_2_loRaBulkDecode.py export.jsonl[.gz] [...] [-o outputFolder]")
+        return
+
+    decoder   = mLB.BulkDecoder(mLC.loadCodecs(loRaSensorsFile), fPortIDs, outputFolder, chunkFrames,\
+                                    loRaPackedPort)
+    startTime = time.time()
+    for exportFile in arguments:
+        print("Decoding: " + exportFile)
+        decoder.decodeExport(exportFile)
+
+    print("Lines          : " + str(decoder.stats['lines']))
+    print("Uplinks        : " + str(decoder.stats['frames']))
+    print("Packed uplinks : " + str(decoder.stats['packedFrames']))
+    print("Decoded        : " + str(decoder.stats['decoded']))
+    print("Bad lines      : " + str(decoder.stats['badLines']))
+    print("Unknown ports  : " + str(decoder.stats['unknownPort']))
+    print("Short payloads : " + str(decoder.stats['shortPayload']))
+    for sensorID in sorted(decoder.decoded):
+        print("\t{0:<12} {1}".format(sensorID, decoder.decoded[sensorID]))
+    print("Time taken     : {0:.1f} s".format(time.time() - startTime))
+    print("Written to     : " + outputFolder)
+
+
+if __name__ == "__main__":
+    print("=============")
+    print("    MINTS    ")
+    print("=============")
+    main(sys.argv[1:])
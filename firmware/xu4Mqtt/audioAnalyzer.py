@@ -14,6 +14,7 @@ import pandas as pd
 from glob import glob
 
 import time
+import queue
 
 time.sleep(1) 
 
@@ -23,6 +24,7 @@ from mintsXU4 import mintsDefinitions as mD
 from multiprocessing import Pool, freeze_support
 from audioMints import config as cfg
 from audioMints import functions as fn
+from audioMints.worker import AnalyzerWorker
 
 sampleRate         = 44100  # Sample rate
 period             = 120    # Duration of recording
@@ -31,6 +33,8 @@ audioFileNamePre   = "mintsAudio"
 
 minConfidence      = .3
 numOfThreads       = 4
+batchSize          = 4      # Windows per inference, see audioMints.benchmarkInference
+itemTimeout        = 600    # Seconds without a result before a file is queued again
 
 dataFolder        = mD.dataFolder
 tmpFolderName     = mD.dataFolderTmp
@@ -40,38 +44,53 @@ tmpFolderName     = mD.dataFolderTmp
 currentIndex = 0 
 
 def main(cfg):
-    labels = pd.read_csv("audioMints/labels/labels.csv") 
+    labels = pd.read_csv("audioMints/labels/labels.csv").set_index("Scientific name")["Labels"]
+    cfg    = fn.loadConfig(cfg,fn.parseArguments(tmpFolderName,minConfidence,numOfThreads))
+    cfg.TFLITE_THREADS = 1
+    cfg.BATCH_SIZE     = batchSize
+    worker = AnalyzerWorker(cfg,numOfThreads,itemTimeout)
 
     while True:
         try:
             audioFolders = glob(tmpFolderName+ "/*/", recursive = True)
-            time.sleep(1)
             for folderIn in audioFolders:
-                print("-----------------------------")
-                print("Looking up folder: " +folderIn)
-                freeze_support()
-                cfg = fn.configSetUp(cfg,folderIn,minConfidence,numOfThreads)
-                soundClassData = pd.read_csv(folderIn + '/'+ audioFileNamePre+  '.BirdNET.results.csv')
-                soundClassData["Labels"] = soundClassData["Scientific name"].map(labels.set_index("Scientific name")["Labels"])
-                baseDateTime = folderIn.split('/')
-                dateTimeBase  = datetime.datetime.strptime(\
-                                baseDateTime[-2], '%Y_%m_%d_%H_%M_%S_%f')
-
-                print("Deleting the folder: " +folderIn)
-                if os.path.exists(folderIn):
-                    shutil.rmtree(folderIn)
-
-                for index, row in soundClassData.iterrows():
-                    dateTime = dateTimeBase + datetime.timedelta(seconds = row['Start (s)'])
-                    sensorDictionary = OrderedDict([
-                        ("dateTime"     ,str(dateTime)),
-                        ("label"        ,row['Labels']),
-                        ("confidence"   ,row['Confidence'])
-                         ])
-                    mSR.sensorFinisher(dateTime,"MBC001",sensorDictionary)
-
-                print("=============")
-                print()
+                fileIn = folderIn + audioFileNamePre + ".wav"
+                if os.path.isfile(fileIn) and worker.submit(fileIn):
+                    print("Queued: " + fileIn)
+
+            try:
+                result = worker.results.get(timeout = 1)
+            except queue.Empty:
+                continue
+
+            print("-----------------------------")
+            folderIn = os.path.dirname(result['path']) + '/'
+            print("Looking up folder: " +folderIn)
+            if result['detections'] is None:
+                print("Audio File Error")
+                continue
+            baseDateTime = folderIn.split('/')
+            dateTimeBase  = datetime.datetime.strptime(\
+                            baseDateTime[-2], '%Y_%m_%d_%H_%M_%S_%f')
+
+            print("Deleting the folder: " +folderIn)
+            if os.path.exists(folderIn):
+                shutil.rmtree(folderIn)
+
+            for start, scientificName, commonName, confidence in result['detections']:
+                dateTime = dateTimeBase + datetime.timedelta(seconds = start)
+                sensorDictionary = OrderedDict([
+                    ("dateTime"     ,str(dateTime)),
+                    ("label"        ,labels.get(scientificName)),
+                    ("confidence"   ,round(confidence,4))
+                     ])
+                mSR.sensorFinisher(dateTime,"MBC001",sensorDictionary)
+
+            print("Analyzed in {0:.2f} s, {1:.2f} s after being queued".format(\
+                            result['analysisTime'],result['latency']))
+            print(worker.report())
+            print("=============")
+            print()
                    
        
         except Exception as e:
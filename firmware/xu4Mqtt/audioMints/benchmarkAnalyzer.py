@@ -0,0 +1,126 @@
+# ***************************************************************************
+#  audioMints - Analyzer worker check and benchmark
+#   ---------------------------------
+#   Writes recordings as audioRecorder.py does (a folder per recording
+#   holding mintsAudio.wav, 44.1 kHz noise with a few tones) and analyses
+#   them twice:
+#       configSetUp : the old audioAnalyzer.py loop, configSetUp and the
+#                     result CSV per folder, one folder after the other
+#       worker      : one AnalyzerWorker, files submitted one after the
+#                     other and then all at once
+#   Checks that both give the same detections and prints the set up
+#   time, the time per file and files per hour. Needs the BirdNET model
+#   and tflite, so it is run on the node.
+#
+#   Run from firmware/xu4Mqtt:
+#       python3 -m audioMints.benchmarkAnalyzer [files] [seconds] [processes]
+#  ***************************************************************************
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from scipy.io import wavfile
+
+from audioMints import config as cfg
+from audioMints import functions as fn
+from audioMints.worker import AnalyzerWorker
+
+recordRate    = 44100
+minConfidence = .3
+
+
+def makeRecordings(numOfFiles, seconds):
+    rng     = np.random.RandomState(42)
+    folder  = tempfile.mkdtemp()
+    files   = []
+    times   = np.arange(int(seconds*recordRate))/recordRate
+    for index in range(numOfFiles):
+        fileName  = os.path.join(folder, "2024_01_01_00_0{0}_00_000000".format(index), "mintsAudio.wav")
+        recording = 0.05*rng.randn(len(times))
+        for toneHz in rng.uniform(1000, 8000, 3):
+            recording += 0.2*np.sin(2*np.pi*toneHz*times)*(np.sin(2*np.pi*times/7) > 0)
+        os.makedirs(os.path.dirname(fileName))
+        wavfile.write(fileName, recordRate, recording.astype(np.float32).reshape(-1, 1))
+        files.append(fileName)
+    return folder, files
+
+
+def runConfigSetUp(files, processes):
+    detections, timings = {}, []
+    for fileName in files:
+        startTime = time.monotonic()
+        folderIn  = os.path.dirname(fileName) + '/'
+        fn.configSetUp(cfg, folderIn, minConfidence, processes)
+        results   = pd.read_csv(folderIn + 'mintsAudio.BirdNET.results.csv')
+        timings.append(time.monotonic() - startTime)
+        detections[fileName] = [(row['Start (s)'], row['Scientific name'], row['Confidence']) \
+                                    for _, row in results.iterrows()]
+    return detections, timings
+
+
+def runWorker(files, processes, together):
+    startTime = time.monotonic()
+    loaded    = fn.loadConfig(cfg, fn.parseArguments(os.path.dirname(files[0]), minConfidence, processes))
+    loaded.TFLITE_THREADS = 1
+    worker    = AnalyzerWorker(loaded, processes)
+    # The first submission waits for the pool's start up
+    worker.submit(files[0])
+    first     = worker.results.get()
+    setUp     = time.monotonic() - startTime - first['analysisTime']
+
+    results   = [first]
+    startTime = time.monotonic()
+    if together:
+        for fileName in files[1:]:
+            worker.submit(fileName)
+        results += [worker.results.get() for _ in files[1:]]
+    else:
+        for fileName in files[1:]:
+            worker.submit(fileName)
+            results.append(worker.results.get())
+    elapsed   = time.monotonic() - startTime
+    worker.close()
+
+    detections = {result['path']: [(start, scientificName, round(confidence, 4)) \
+                                    for start, scientificName, _, confidence in result['detections']] \
+                    for result in results}
+    return detections, setUp, elapsed/max(len(files) - 1, 1), np.mean([result['latency'] for result in results[1:]])
+
+
+def main(arguments):
+    numOfFiles = int(arguments[0]) if arguments else 4
+    seconds    = float(arguments[1]) if len(arguments) > 1 else 120
+    processes  = int(arguments[2]) if len(arguments) > 2 else 4
+    # configSetUp parses the command line and finds the model next to the
+    # script, so both are made to look like audioAnalyzer.py
+    sys.argv   = [os.path.join(os.getcwd(), "audioAnalyzer.py")]
+
+    folder, files = makeRecordings(numOfFiles, seconds)
+    try:
+        old, timings = runConfigSetUp(files, processes)
+        one, setUp, perFile, _ = runWorker(files, processes, False)
+        many, _, perFileMany, latency = runWorker(files, processes, True)
+    finally:
+        shutil.rmtree(folder)
+    for fileName in files:
+        assert [(float(start), name, float(confidence)) for start, name, confidence in old[fileName]] == \
+               one[fileName] == many[fileName], fileName
+
+    print("{0} files of {1:.0f} s, {2} processes, {3} detections each way".format(
+            numOfFiles, seconds, processes, sum(len(detections) for detections in old.values())))
+    print("{0:<34} {1:>10} {2:>10} {3:>10}".format("", "Set up s", "s/file", "files/h"))
+    print("{0:<34} {1:>10} {2:>10.2f} {3:>10.1f}".format("configSetUp per folder", "-",
+            np.mean(timings), 3600/np.mean(timings)))
+    print("{0:<34} {1:>10.2f} {2:>10.2f} {3:>10.1f}".format("worker, one after the other",
+            setUp, perFile, 3600/perFile))
+    print("{0:<34} {1:>10} {2:>10.2f} {3:>10.1f}".format("worker, all at once", "-",
+            perFileMany, 3600/perFileMany))
+    print("Latency from submission, all at once: {0:.2f} s".format(latency))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
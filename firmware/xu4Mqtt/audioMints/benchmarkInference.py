@@ -0,0 +1,109 @@
+# ***************************************************************************
+#  audioMints - Batched inference check and benchmark
+#   ---------------------------------
+#   Runs windows of noise through BirdNET with the old model.predict
+#   (input resized and tensors allocated again for every batch, kept below
+#   as the reference) and with the fixed shape engines of model.py, for
+#   every batch size and number of TFLite threads asked for, on every
+#   group of cores of the same maximum clock. On the XU4 these are the
+#   LITTLE (A7, cpu 0-3) and big (A15, cpu 4-7) cores; the process is
+#   pinned to one group at a time. Checks that the engines score every
+#   window, padded batches included, as the reference does, and prints
+#   windows per second with the fastest batch size and threads per group,
+#   which then go into BATCH_SIZE / batchSize.
+#
+#   Run from firmware/xu4Mqtt:
+#       python3 -m audioMints.benchmarkInference [windows] [batch sizes] [threads]
+#   e.g.    python3 -m audioMints.benchmarkInference 48 1,2,4,8 1,2,4
+#  ***************************************************************************
+
+import os
+import sys
+import time
+import glob
+import numpy as np
+
+from audioMints import config as cfg
+from audioMints import model
+
+
+def coreGroups():
+    # {max clock in kHz: [cpus]}, all cpus together where clocks are unknown
+    groups = {}
+    for cpu in sorted(os.sched_getaffinity(0)):
+        files = glob.glob("/sys/devices/system/cpu/cpu{0}/cpufreq/cpuinfo_max_freq".format(cpu))
+        clock = int(open(files[0]).read()) if files else 0
+        groups.setdefault(clock, []).append(cpu)
+    return groups
+
+
+def legacyPredict(interpreter, sample):
+    # Same steps as the old model.predict
+    input_details = interpreter.get_input_details()
+    interpreter.resize_tensor_input(input_details[0]['index'], [len(sample), *sample[0].shape])
+    interpreter.allocate_tensors()
+    interpreter.set_tensor(input_details[0]['index'], np.array(sample, dtype='float32'))
+    interpreter.invoke()
+    return interpreter.get_tensor(interpreter.get_output_details()[0]['index'])
+
+
+def timeBatches(predictor, windows, batchSize):
+    startTime = time.monotonic()
+    for first in range(0, len(windows), batchSize):
+        predictor(windows[first:first + batchSize])
+    return len(windows)/(time.monotonic() - startTime)
+
+
+def run(windows, batchSizes, threads):
+    cfg.TFLITE_THREADS = threads
+    cfg.BATCH_SIZE     = max(batchSizes)
+    model.ENGINES      = []
+    model.loadEngines()
+    # Every size the engines may be asked for, so a padded batch is checked too
+    engines            = {size: model.BatchEngine(size) for size in batchSizes}
+    interpreter        = model.tflite.Interpreter(model_path=cfg.MODEL_PATH, num_threads=threads)
+
+    reference = np.concatenate([legacyPredict(interpreter, windows[index:index + 1]) for index in range(3)])
+    for size, engine in engines.items():
+        scores = np.concatenate([engine.run(windows[first:min(first + size, 3)]).copy() \
+                                    for first in range(0, 3, size)])
+        assert np.allclose(scores, reference, atol=1e-4), size
+    assert np.allclose(model.predict(windows[:3]), reference, atol=1e-4)
+
+    results = {}
+    for size, engine in engines.items():
+        timeBatches(engine.run, windows[:size], size)
+        results[(size, 'legacy')] = timeBatches(lambda sample: legacyPredict(interpreter, sample), windows, size)
+        results[(size, 'engine')] = timeBatches(engine.run, windows, size)
+    return results
+
+
+def main(arguments):
+    numOfWindows = int(arguments[0]) if arguments else 48
+    batchSizes   = [int(size) for size in arguments[1].split(',')] if len(arguments) > 1 else [1, 2, 4, 8]
+    threadCounts = [int(count) for count in arguments[2].split(',')] if len(arguments) > 2 else [1, 2, 4]
+
+    rng     = np.random.RandomState(42)
+    windows = (0.05*rng.randn(numOfWindows, int(cfg.SIG_LENGTH*cfg.SAMPLE_RATE))).astype(np.float32)
+
+    allCores = os.sched_getaffinity(0)
+    for clock, cores in sorted(coreGroups().items()):
+        os.sched_setaffinity(0, cores)
+        print("Cores {0} ({1:.0f} MHz)".format(cores, clock/1000))
+        print("{0:>8} {1:>8} {2:>14} {3:>14}".format("Threads", "Batch", "Old windows/s", "New windows/s"))
+        best = None
+        for threads in threadCounts:
+            if threads > len(cores):
+                continue
+            results = run(windows, batchSizes, threads)
+            for size in batchSizes:
+                print("{0:>8} {1:>8} {2:>14.2f} {3:>14.2f}".format(threads, size,
+                        results[(size, 'legacy')], results[(size, 'engine')]))
+                if best is None or results[(size, 'engine')] > best[0]:
+                    best = (results[(size, 'engine')], size, threads)
+        print("Fastest: batch size {0} with {1} threads, {2:.2f} windows/s".format(best[1], best[2], best[0]))
+    os.sched_setaffinity(0, allCores)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
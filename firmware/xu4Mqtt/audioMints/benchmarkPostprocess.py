@@ -0,0 +1,81 @@
+# ***************************************************************************
+#  audioMints - Detection post processing check and benchmark
+#   ---------------------------------
+#   Scores a 120 s recording's worth of windows (random sigmoid scores
+#   over the BirdNET labels, a few labels per window made confident) and
+#   finds the detections as analyzeFile and saveResultFile did (a dict
+#   and a full sort per window, then the species list scan and
+#   LABELS.index per label, kept below as the reference) and with
+#   postprocess.detections, with the species list of the location filter
+#   and without one. Checks that both find the same detections in the
+#   same order, and that k=5 gives the first five of every window.
+#
+#   Run from firmware/xu4Mqtt:
+#       python3 -m audioMints.benchmarkPostprocess [windows] [repeats]
+#  ***************************************************************************
+
+import sys
+import time
+import operator
+import numpy as np
+
+from audioMints import config as cfg
+from audioMints import functions as fn
+from audioMints import postprocess
+
+
+def legacyDetections(scores):
+    # Same steps as the old analyzeFile and saveResultFile
+    found = []
+    for window, pred in enumerate(scores):
+        p_labels = dict(zip(cfg.LABELS, pred))
+        p_sorted = sorted(p_labels.items(), key=operator.itemgetter(1), reverse=True)
+        for c in p_sorted:
+            if c[1] > cfg.MIN_CONFIDENCE and c[0] in cfg.CODES and (c[0] in cfg.SPECIES_LIST or len(cfg.SPECIES_LIST) == 0):
+                found.append((window, cfg.LABELS.index(c[0]), float(c[1])))
+    return found
+
+
+def makeScores(numOfWindows, rng):
+    scores = 1/(1 + np.exp(-(rng.randn(numOfWindows, len(cfg.LABELS))*2 - 6)))
+    for window in range(numOfWindows):
+        scores[window, rng.randint(0, len(cfg.LABELS), 8)] = rng.uniform(0.2, 0.99, 8)
+    return scores.astype(np.float32)
+
+
+def timeIt(function, scores, repeats):
+    startTime = time.monotonic()
+    for _ in range(repeats):
+        found = function(scores)
+    return (time.monotonic() - startTime)/repeats, found
+
+
+def main(arguments):
+    numOfWindows = int(arguments[0]) if arguments else 40
+    repeats      = int(arguments[1]) if len(arguments) > 1 else 5
+    rng          = np.random.RandomState(42)
+
+    cfg.CODES          = fn.loadCodes()
+    cfg.LABELS         = fn.loadLabels(cfg.LABELS_FILE)
+    cfg.MIN_CONFIDENCE = 0.3
+    scores             = makeScores(numOfWindows, rng)
+    speciesList        = [cfg.LABELS[index] for index in rng.choice(len(cfg.LABELS), 150, replace=False)]
+
+    print("{0} windows x {1} labels".format(numOfWindows, len(cfg.LABELS)))
+    print("{0:<22} {1:>11} {2:>12} {3:>12} {4:>8}".format("Species list", "Detections", "Old ms", "New ms", "Speed up"))
+    for name, species in [("location filter (150)", speciesList), ("none", [])]:
+        cfg.SPECIES_LIST = species
+        oldTime, old = timeIt(legacyDetections, scores, repeats)
+        newTime, new = timeIt(postprocess.detections, scores, repeats)
+        assert old == [(int(window), int(label), float(confidence)) for window, label, confidence in new]
+
+        top = postprocess.detections(scores, k=5)
+        assert [tuple(detection) for detection in top] == \
+               [detection for detection in old if sum(1 for other in old[:old.index(detection)] \
+                                                       if other[0] == detection[0]) < 5]
+        print("{0:<22} {1:>11} {2:>12.2f} {3:>12.3f} {4:>8.0f}".format(
+                name, len(new), 1000*oldTime, 1000*newTime, oldTime/newTime))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,124 @@
+# ***************************************************************************
+#  audioMints - Streaming capture check and benchmark
+#   ---------------------------------
+#   Feeds AudioStream.callback from a thread with 1024 sample blocks of a
+#   44.1 kHz test tone (the rate audioRecorder.py records at, so windows
+#   are resampled), speed times faster than real time, and reads the
+#   windows as audioStream.py does. Checks that windows follow each other
+#   by SIG_LENGTH - SIG_OVERLAP, have the model's length and keep the
+#   tone's frequency, and that a reader slower than the microphone skips
+#   audio instead of falling behind. Prints the delay from the last
+#   sample of a window to the window being handed out, against the WAV
+#   round trip of audioRecorder.py / audioAnalyzer.py: a 120 s recording
+#   written to disk, read back and resampled, before its first window.
+#
+#   Run from firmware/xu4Mqtt:
+#       python3 -m audioMints.benchmarkStream [seconds] [speed]
+#  ***************************************************************************
+
+import os
+import sys
+import time
+import tempfile
+import threading
+import numpy as np
+from scipy.io import wavfile
+from scipy.signal import resample_poly
+
+from audioMints import config as cfg
+from audioMints.stream import AudioStream
+
+recordRate = 44100
+blockSize  = 1024
+toneHz     = 3000.0
+
+
+def tone(first, count, rate):
+    return (0.5*np.sin(2*np.pi*toneHz*(first + np.arange(count))/rate)).astype(np.float32)
+
+
+def feed(stream, seconds, speed, written):
+    # Plays the part of the PortAudio thread
+    total = int(seconds*recordRate)
+    first = 0
+    while first < total:
+        block = tone(first, blockSize, recordRate).reshape(-1, 1)
+        stream.callback(block, blockSize, None, None)
+        first += blockSize
+        written.append((first, time.monotonic()))
+        time.sleep(blockSize/recordRate/speed)
+
+
+def peakHz(window, rate):
+    spectrum = np.abs(np.fft.rfft(window*np.hanning(len(window))))
+    return np.argmax(spectrum)*rate/len(window)
+
+
+def runStream(seconds, speed, readerDelay=0.0, bufferSeconds=30):
+    stream = AudioStream(bufferSeconds=bufferSeconds)
+    stream.streamRate = recordRate
+    written = []
+    feeder  = threading.Thread(target=feed, args=(stream, seconds, speed, written), daemon=True)
+    feeder.start()
+
+    size     = int(cfg.SIG_LENGTH*recordRate)
+    step     = int((cfg.SIG_LENGTH - cfg.SIG_OVERLAP)*recordRate)
+    starts, delays = [], []
+    try:
+        for dateTime, window in stream.windows(timeout=1):
+            handedOut = time.monotonic()
+            first     = round((dateTime - stream.startTime).total_seconds()*recordRate)
+            last      = first + size
+            available = next(moment for count, moment in written if count >= last)
+            delays.append(handedOut - available)
+            assert len(window) == int(cfg.SIG_LENGTH*cfg.SAMPLE_RATE) and window.dtype == np.float32
+            assert abs(peakHz(window, cfg.SAMPLE_RATE) - toneHz) < 1.0
+            starts.append(first)
+            time.sleep(readerDelay/speed)
+    except TimeoutError:
+        pass
+    feeder.join()
+    return starts, step, delays, stream.ring
+
+
+def wavRoundTrip(seconds):
+    # What happens to a recording before its first window reaches BirdNET
+    recording = tone(0, int(seconds*recordRate), recordRate).reshape(-1, 1)
+    fileName  = os.path.join(tempfile.mkdtemp(), "mintsAudio.wav")
+    startTime = time.monotonic()
+    wavfile.write(fileName, recordRate, recording)
+    rate, samples = wavfile.read(fileName)
+    resample_poly(samples.reshape(-1), 160, 147)
+    elapsed = time.monotonic() - startTime
+    size    = os.path.getsize(fileName)
+    os.remove(fileName)
+    os.rmdir(os.path.dirname(fileName))
+    return elapsed, size
+
+
+def main(arguments):
+    seconds = float(arguments[0]) if arguments else 60
+    speed   = float(arguments[1]) if len(arguments) > 1 else 20
+
+    starts, step, delays, ring = runStream(seconds, speed)
+    assert len(starts) == int((seconds*recordRate - int(cfg.SIG_LENGTH*recordRate))//step) + 1
+    assert all(later - earlier == step for earlier, later in zip(starts, starts[1:]))
+    assert ring.overruns == 0
+    print("Stream: {0} windows of {1:.0f} s, every {2:.2f} s, none skipped".format(
+            len(starts), cfg.SIG_LENGTH, step/recordRate))
+    print("Last sample to window handed out: mean {0:.3f} s, max {1:.3f} s".format(
+            np.mean(delays), np.max(delays)))
+
+    # A reader needing twice a window's time falls behind by a window per window
+    slowStarts, _, _, slowRing = runStream(seconds, speed, 2*cfg.SIG_LENGTH, bufferSeconds=10)
+    assert slowRing.overruns > 0 and len(slowStarts) < len(starts)
+    print("Slow reader: {0} windows, {1} overruns, {2:.1f} s skipped".format(
+            len(slowStarts), slowRing.overruns, slowRing.skipped/recordRate))
+
+    elapsed, size = wavRoundTrip(120)
+    print("WAV round trip: {0:.1f} MB written per 120 s recording, {1:.3f} s to write, read and resample,"
+          " first window after 120 s of recording".format(size/1e6, elapsed))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -53,6 +53,9 @@ LOCATION_FILTER_THRESHOLD = 0.03
 CODES_FILE = 'audioMints/eBird_taxonomy_codes_2021E.json'
 SPECIES_LIST_FILE = 'example/species_list.txt' 
 
+# Species lists of the location filter, by location, week and threshold
+SPECIES_CACHE_PATH = 'audioMints/cache'
+
 # File input path and output path for selection tables
 INPUT_PATH = 'NC/'
 OUTPUT_PATH = 'NC/'
@@ -110,6 +113,7 @@ def getConfig():
         'LOCATION_FILTER_THRESHOLD': LOCATION_FILTER_THRESHOLD,
         'CODES_FILE': CODES_FILE,
         'SPECIES_LIST_FILE': SPECIES_LIST_FILE,
+        'SPECIES_CACHE_PATH': SPECIES_CACHE_PATH,
         'INPUT_PATH': INPUT_PATH,
         'OUTPUT_PATH': OUTPUT_PATH,
         'CPU_THREADS': CPU_THREADS,
@@ -142,6 +146,7 @@ def setConfig(c):
     global LOCATION_FILTER_THRESHOLD
     global CODES_FILE
     global SPECIES_LIST_FILE
+    global SPECIES_CACHE_PATH
     global INPUT_PATH
     global OUTPUT_PATH
     global CPU_THREADS
@@ -171,6 +176,7 @@ def setConfig(c):
     LOCATION_FILTER_THRESHOLD = c['LOCATION_FILTER_THRESHOLD']
     CODES_FILE = c['CODES_FILE']
     SPECIES_LIST_FILE = c['SPECIES_LIST_FILE']
+    SPECIES_CACHE_PATH = c['SPECIES_CACHE_PATH']
     INPUT_PATH = c['INPUT_PATH']
     OUTPUT_PATH = c['OUTPUT_PATH']
     CPU_THREADS = c['CPU_THREADS']
@@ -1,7 +1,6 @@
 import os
 
 import json
-import operator
 
 import datetime
 import traceback
@@ -26,6 +25,8 @@ from audioMints import config as cfg
 
 from audioMints import audio
 from audioMints import model
+from audioMints import postprocess
+from audioMints import speciesCache
 
 
 def getAudioFileName(folderIn):
@@ -104,14 +105,14 @@ def loadSpeciesList(fpath):
 
 def predictSpeciesList():
 
-    l_filter = model.explore(cfg.LATITUDE, cfg.LONGITUDE, cfg.WEEK)
+    # Meta model only for a location, week and threshold not in the cache
     cfg.SPECIES_LIST_FILE = None
-    cfg.SPECIES_LIST = []
-    for s in l_filter:
-        if s[0] >= cfg.LOCATION_FILTER_THRESHOLD:
-            cfg.SPECIES_LIST.append(s[1])
+    cfg.SPECIES_LIST = speciesCache.speciesList(cfg.LATITUDE, cfg.LONGITUDE, cfg.WEEK, cfg.LOCATION_FILTER_THRESHOLD)
 
-def saveResultFile(r, path, afile_path):
+def saveResultFile(r, timestamps, path, afile_path):
+
+    # r holds the detections of postprocess.detections, timestamps the
+    # 'start-end' of every window
 
     # Make folder if it doesn't exist
     if len(os.path.dirname(path)) > 0 and not os.path.exists(os.path.dirname(path)):
@@ -128,45 +129,31 @@ def saveResultFile(r, path, afile_path):
 
         # Write header
         out_string += header
-        
-        # Extract valid predictions for every timestamp
-        for timestamp in getSortedTimestamps(r):
-            rstring = ''
-            start, end = timestamp.split('-')
-            for c in r[timestamp]:
-                if c[1] > cfg.MIN_CONFIDENCE and c[0] in cfg.CODES and (c[0] in cfg.SPECIES_LIST or len(cfg.SPECIES_LIST) == 0):
-                    selection_id += 1
-                    label = cfg.TRANSLATED_LABELS[cfg.LABELS.index(c[0])]
-                    rstring += '{}\tSpectrogram 1\t1\t{}\t{}\t{}\t{}\t{}\t{}\t{:.4f}\n'.format(
-                        selection_id, 
-                        start, 
-                        end, 
-                        150, 
-                        12000, 
-                        cfg.CODES[c[0]], 
-                        label.split('_')[1], 
-                        c[1])
-
-            # Write result string to file
-            if len(rstring) > 0:
-                out_string += rstring
+
+        # Valid predictions, by timestamp
+        for window, index, confidence in r:
+            start, end = timestamps[window].split('-')
+            selection_id += 1
+            label = cfg.TRANSLATED_LABELS[index]
+            out_string += '{}\tSpectrogram 1\t1\t{}\t{}\t{}\t{}\t{}\t{}\t{:.4f}\n'.format(
+                selection_id, 
+                start, 
+                end, 
+                150, 
+                12000, 
+                cfg.CODES[cfg.LABELS[index]], 
+                label.split('_')[1], 
+                confidence)
 
     elif cfg.RESULT_TYPE == 'audacity':
 
         # Audacity timeline labels
-        for timestamp in getSortedTimestamps(r):
-            rstring = ''
-            for c in r[timestamp]:
-                if c[1] > cfg.MIN_CONFIDENCE and c[0] in cfg.CODES and (c[0] in cfg.SPECIES_LIST or len(cfg.SPECIES_LIST) == 0):
-                    label = cfg.TRANSLATED_LABELS[cfg.LABELS.index(c[0])]
-                    rstring += '{}\t{}\t{:.4f}\n'.format(
-                        timestamp.replace('-', '\t'), 
-                        label.replace('_', ', '), 
-                        c[1])
-
-            # Write result string to file
-            if len(rstring) > 0:
-                out_string += rstring
+        for window, index, confidence in r:
+            label = cfg.TRANSLATED_LABELS[index]
+            out_string += '{}\t{}\t{:.4f}\n'.format(
+                timestamps[window].replace('-', '\t'), 
+                label.replace('_', ', '), 
+                confidence)
 
     elif cfg.RESULT_TYPE == 'r':
 
@@ -174,31 +161,25 @@ def saveResultFile(r, path, afile_path):
         header = 'filepath,start,end,scientific_name,common_name,confidence,lat,lon,week,overlap,sensitivity,min_conf,species_list,model'
         out_string += header
 
-        for timestamp in getSortedTimestamps(r):
-            rstring = ''
-            start, end = timestamp.split('-')
-            for c in r[timestamp]:
-                if c[1] > cfg.MIN_CONFIDENCE and c[0] in cfg.CODES and (c[0] in cfg.SPECIES_LIST or len(cfg.SPECIES_LIST) == 0):                    
-                    label = cfg.TRANSLATED_LABELS[cfg.LABELS.index(c[0])]
-                    rstring += '\n{},{},{},{},{},{:.4f},{:.4f},{:.4f},{},{},{},{},{},{}'.format(
-                        afile_path,
-                        start,
-                        end,
-                        label.split('_')[0],
-                        label.split('_')[1],
-                        c[1],
-                        cfg.LATITUDE,
-                        cfg.LONGITUDE,
-                        cfg.WEEK,
-                        cfg.SIG_OVERLAP,
-                        (1.0 - cfg.SIGMOID_SENSITIVITY) + 1.0,
-                        cfg.MIN_CONFIDENCE,
-                        cfg.SPECIES_LIST_FILE,
-                        os.path.basename(cfg.MODEL_PATH)
-                    )
-            # Write result string to file
-            if len(rstring) > 0:
-                out_string += rstring
+        for window, index, confidence in r:
+            start, end = timestamps[window].split('-')
+            label = cfg.TRANSLATED_LABELS[index]
+            out_string += '\n{},{},{},{},{},{:.4f},{:.4f},{:.4f},{},{},{},{},{},{}'.format(
+                afile_path,
+                start,
+                end,
+                label.split('_')[0],
+                label.split('_')[1],
+                confidence,
+                cfg.LATITUDE,
+                cfg.LONGITUDE,
+                cfg.WEEK,
+                cfg.SIG_OVERLAP,
+                (1.0 - cfg.SIGMOID_SENSITIVITY) + 1.0,
+                cfg.MIN_CONFIDENCE,
+                cfg.SPECIES_LIST_FILE,
+                os.path.basename(cfg.MODEL_PATH)
+            )
 
     else:
 
@@ -208,22 +189,15 @@ def saveResultFile(r, path, afile_path):
         # Write header
         out_string += header
 
-        for timestamp in getSortedTimestamps(r):
-            rstring = ''
-            for c in r[timestamp]:                
-                start, end = timestamp.split('-')
-                if c[1] > cfg.MIN_CONFIDENCE and c[0] in cfg.CODES and (c[0] in cfg.SPECIES_LIST or len(cfg.SPECIES_LIST) == 0):
-                    label = cfg.TRANSLATED_LABELS[cfg.LABELS.index(c[0])]
-                    rstring += '{},{},{},{},{:.4f}\n'.format(
-                        start,
-                        end,
-                        label.split('_')[0],
-                        label.split('_')[1],
-                        c[1])
-
-            # Write result string to file
-            if len(rstring) > 0:
-                out_string += rstring
+        for window, index, confidence in r:
+            start, end = timestamps[window].split('-')
+            label = cfg.TRANSLATED_LABELS[index]
+            out_string += '{},{},{},{},{:.4f}\n'.format(
+                start,
+                end,
+                label.split('_')[0],
+                label.split('_')[1],
+                confidence)
 
     # Save as file
     with open(path, 'w') as rfile:
@@ -246,16 +220,57 @@ def getRawAudioFromFile(fpath):
 
 def predict(samples):
 
-    # Prepare sample and pass through model
-    data = np.array(samples, dtype='float32')
-    prediction = model.predict(data)
+    # Pass samples through model, which copies them into its input
+    prediction = model.predict(samples)
 
-    # Logits or sigmoid activations?
+    # Logits or sigmoid activations? Either way a copy, as the engine's
+    # scores are overwritten by its next batch
     if cfg.APPLY_SIGMOID:
-        prediction = model.flat_sigmoid(np.array(prediction), sensitivity=-cfg.SIGMOID_SENSITIVITY)
+        prediction = model.flat_sigmoid(prediction, sensitivity=-cfg.SIGMOID_SENSITIVITY)
+    else:
+        prediction = np.array(prediction)
 
     return prediction
 
+def chunkScores(chunks):
+
+    # Scores of all chunks as one (chunks x labels) matrix
+    scores = None
+    for first in range(0, len(chunks), cfg.BATCH_SIZE):
+        p = predict(chunks[first:first + cfg.BATCH_SIZE])
+        if scores is None:
+            scores = np.empty((len(chunks), p.shape[1]), dtype=p.dtype)
+        scores[first:first + len(p)] = p
+
+    return scores
+
+def windowDetections(prediction):
+
+    # (scientific name, common name, confidence) of one window's scores,
+    # filtered as in saveResultFile, most confident first
+    detections = []
+    for _, index, confidence in postprocess.detections(prediction):
+        label = cfg.TRANSLATED_LABELS[index].split('_')
+        detections.append((label[0], label[1], float(confidence)))
+
+    return detections
+
+def fileDetections(fpath):
+
+    # (start (s), scientific name, common name, confidence) of every window
+    # of an audio file, without writing a result file; None if it cannot
+    # be opened
+    chunks = getRawAudioFromFile(fpath)
+    if len(chunks) == 0:
+        return None
+
+    detections = []
+    for window, index, confidence in postprocess.detections(chunkScores(chunks)):
+        label = cfg.TRANSLATED_LABELS[index].split('_')
+        detections.append((float(window*(cfg.SIG_LENGTH - cfg.SIG_OVERLAP)), label[0], label[1], float(confidence)))
+
+    return detections
+
 def analyzeFile(item):
 
     # Get file path and restore cfg
@@ -279,50 +294,21 @@ def analyzeFile(item):
         # writeErrorLog(msg) 
         return False
 
-    # Process each chunk
+    # Process all chunks, BATCH_SIZE at a time
     try:
         start, end = 0, cfg.SIG_LENGTH
-        results = {}
-        samples = []
         timestamps = []
         for c in range(len(chunks)):
 
-            # Add to batch
-            samples.append(chunks[c])
-            timestamps.append([start, end])
+            # Get timestamp
+            timestamps.append(str(start) + '-' + str(end))
 
             # Advance start and end
             start += cfg.SIG_LENGTH - cfg.SIG_OVERLAP
             end = start + cfg.SIG_LENGTH
 
-            # Check if batch is full or last chunk        
-            if len(samples) < cfg.BATCH_SIZE and c < len(chunks) - 1:
-                continue
-
-            # Predict
-            p = predict(samples)
-
-            # Add to results
-            for i in range(len(samples)):
-
-                # Get timestamp
-                s_start, s_end = timestamps[i]
-
-                # Get prediction
-                pred = p[i]
-
-                # Assign scores to labels
-                p_labels = dict(zip(cfg.LABELS, pred))
-
-                # Sort by score
-                p_sorted =  sorted(p_labels.items(), key=operator.itemgetter(1), reverse=True)
-
-                # Store top 5 results and advance indicies
-                results[str(s_start) + '-' + str(s_end)] = p_sorted
-
-            # Clear batch
-            samples = []
-            timestamps = []  
+        # Predict and keep valid scores, by timestamp and score
+        results = postprocess.detections(chunkScores(chunks))
     except:
         # Print traceback
         print(traceback.format_exc(), flush=True)
@@ -350,9 +336,9 @@ def analyzeFile(item):
                 rtype = '.BirdNET.results.txt'
             else:
                 rtype = '.BirdNET.results.csv'
-            saveResultFile(results, os.path.join(cfg.OUTPUT_PATH, rpath.rsplit('.', 1)[0] + rtype), fpath)
+            saveResultFile(results, timestamps, os.path.join(cfg.OUTPUT_PATH, rpath.rsplit('.', 1)[0] + rtype), fpath)
         else:
-            saveResultFile(results, cfg.OUTPUT_PATH, fpath)        
+            saveResultFile(results, timestamps, cfg.OUTPUT_PATH, fpath)        
     except:
 
         # Print traceback
@@ -379,7 +365,7 @@ def makeAudioFile(sampleRateIn,audioLength,channelNum,fileName,fileSaveLocation)
     write(os.path.join(fileSaveLocation,fileName), sampleRateIn, recording)  # Save as WAV file
     return recording;
 
-def configSetUp(cfgIn,outPutPath,confidenceIn,cpuThreads):
+def parseArguments(outPutPath,confidenceIn,cpuThreads):
 
     # Parse arguments
     parser = argparse.ArgumentParser(description='Analyze audio files with BirdNET')
@@ -387,7 +373,7 @@ def configSetUp(cfgIn,outPutPath,confidenceIn,cpuThreads):
     parser.add_argument('--o', default=outPutPath, help='Path to output file or folder. If this is a file, --i needs to be a file too.')
     parser.add_argument('--lat', type=float, default=32.779167, help='Recording location latitude. Set -1 to ignore.')
     parser.add_argument('--lon', type=float, default=-96.808891, help='Recording location longitude. Set -1 to ignore.')
-    parser.add_argument('--week', type=int, default=-1, help='Week of the year when the recording was made. Values in [1, 48] (4 weeks per month). Set -1 for year-round species list.')
+    parser.add_argument('--week', type=int, default=-1, help='Week of the year when the recording was made. Values in [1, 48] (4 weeks per month). Set -1 for year-round species list, 0 to follow the date.')
     parser.add_argument('--slist', default='', help='Path to species list file or folder. If folder is provided, species list needs to be named \"species_list.txt\". If lat and lon are provided, this list will be ignored.')
     parser.add_argument('--sensitivity', type=float, default=1.0, help='Detection sensitivity; Higher values result in higher sensitivity. Values in [0.5, 1.5]. Defaults to 1.0.')
     parser.add_argument('--min_conf', type=float, default=confidenceIn, help='Minimum confidence threshold. Values in [0.01, 0.99]. Defaults to 0.1.')
@@ -398,8 +384,12 @@ def configSetUp(cfgIn,outPutPath,confidenceIn,cpuThreads):
     parser.add_argument('--locale', default='en', help='Locale for translated species common names. Values in [\'af\', \'de\', \'it\', ...] Defaults to \'en\'.')
     parser.add_argument('--sf_thresh', type=float, default=0.03, help='Minimum species occurrence frequency threshold for location filter. Values in [0.01, 0.99]. Defaults to 0.03.')
 
-    args = parser.parse_args()
+    return parser.parse_args()
+
+def loadConfig(cfgIn,args):
 
+    # Model, labels, species list and thresholds, shared by the file
+    # analysis and the streaming analyzer
     # Set paths relative to script path (requested in #3)
     cfgIn.MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), cfgIn.MODEL_PATH)
     cfgIn.LABELS_FILE = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), cfgIn.LABELS_FILE)
@@ -407,6 +397,7 @@ def configSetUp(cfgIn,outPutPath,confidenceIn,cpuThreads):
     cfgIn.MDATA_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), cfgIn.MDATA_MODEL_PATH)
     cfgIn.CODES_FILE = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), cfgIn.CODES_FILE)
     cfgIn.ERROR_LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), cfgIn.ERROR_LOG_FILE)
+    cfgIn.SPECIES_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), cfgIn.SPECIES_CACHE_PATH)
 
     # Load eBird codes, labels
     cfgIn.CODES = loadCodes()
@@ -439,16 +430,6 @@ def configSetUp(cfgIn,outPutPath,confidenceIn,cpuThreads):
     else:        
         print('Species list contains {} species'.format(len(cfgIn.SPECIES_LIST)))
 
-    # Set input and output path    
-    cfgIn.INPUT_PATH = args.i
-    cfgIn.OUTPUT_PATH = args.o
-
-    # Parse input files
-    if os.path.isdir(cfgIn.INPUT_PATH):
-        cfgIn.FILE_LIST = parseInputFiles(cfgIn.INPUT_PATH)  
-    else:
-        cfgIn.FILE_LIST = [cfgIn.INPUT_PATH]
-
     # Set confidence threshold
     cfgIn.MIN_CONFIDENCE = max(0.01, min(0.99, float(args.min_conf)))
 
@@ -463,6 +444,26 @@ def configSetUp(cfgIn,outPutPath,confidenceIn,cpuThreads):
     if not cfgIn.RESULT_TYPE in ['table', 'audacity', 'r', 'csv']:
         cfgIn.RESULT_TYPE = 'table'
 
+    # Set batch size
+    cfgIn.BATCH_SIZE = max(1, int(args.batchsize))
+
+    return cfgIn
+
+def configSetUp(cfgIn,outPutPath,confidenceIn,cpuThreads):
+
+    args  = parseArguments(outPutPath,confidenceIn,cpuThreads)
+    cfgIn = loadConfig(cfgIn,args)
+
+    # Set input and output path    
+    cfgIn.INPUT_PATH = args.i
+    cfgIn.OUTPUT_PATH = args.o
+
+    # Parse input files
+    if os.path.isdir(cfgIn.INPUT_PATH):
+        cfgIn.FILE_LIST = parseInputFiles(cfgIn.INPUT_PATH)  
+    else:
+        cfgIn.FILE_LIST = [cfgIn.INPUT_PATH]
+
     # Set number of threads
     if os.path.isdir(cfgIn.INPUT_PATH):
         cfgIn.CPU_THREADS = max(1, int(args.threads))
@@ -471,9 +472,6 @@ def configSetUp(cfgIn,outPutPath,confidenceIn,cpuThreads):
         cfgIn.CPU_THREADS = 1
         cfgIn.TFLITE_THREADS = max(1, int(args.threads))
 
-    # Set batch size
-    cfgIn.BATCH_SIZE = max(1, int(args.batchsize))
-
     # Add config items to each file list entry.
     # We have to do this for Windows which does not
     # support fork() and thus each process has to
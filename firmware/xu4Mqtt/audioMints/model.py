@@ -25,6 +25,9 @@ INTERPRETER = None
 M_INTERPRETER = None
 PBMODEL = None
 
+# Interpreters allocated once per fixed batch size, see loadEngines
+ENGINES = []
+
 def loadModel(class_output=True):
 
     global PBMODEL
@@ -59,6 +62,51 @@ def loadModel(class_output=True):
         # which we will ignore until TF lets us block them
         PBMODEL = keras.models.load_model(cfg.MODEL_PATH, compile=False)
 
+class BatchEngine:
+
+    # One interpreter with its tensors allocated for batchSize windows.
+    # Windows are copied straight into the input tensor, a short batch is
+    # padded with zeros, and the scores are copied into an array allocated
+    # here, so nothing is reallocated per batch. The returned scores are
+    # overwritten by the next run.
+
+    def __init__(self, batchSize):
+        self.batchSize = batchSize
+        self.interpreter = tflite.Interpreter(model_path=cfg.MODEL_PATH, num_threads=cfg.TFLITE_THREADS)
+        input_details = self.interpreter.get_input_details()
+        self.inputIndex = input_details[0]['index']
+        self.interpreter.resize_tensor_input(self.inputIndex, [batchSize, *input_details[0]['shape'][1:]])
+        self.interpreter.allocate_tensors()
+        output_details = self.interpreter.get_output_details()
+        self.outputIndex = output_details[0]['index']
+        self.output = np.empty(output_details[0]['shape'], dtype='float32')
+
+    def run(self, samples):
+
+        # Views of the tensors must be gone before invoke()
+        inputs = self.interpreter.tensor(self.inputIndex)()
+        for i in range(len(samples)):
+            inputs[i] = samples[i]
+        inputs[len(samples):] = 0
+        del inputs
+
+        self.interpreter.invoke()
+        np.copyto(self.output, self.interpreter.tensor(self.outputIndex)())
+
+        return self.output[:len(samples)]
+
+def loadEngines():
+
+    global ENGINES
+
+    # Protobuf models are not batched here
+    if not cfg.MODEL_PATH.endswith('.tflite'):
+        loadModel()
+        return
+
+    # Single windows (streaming, last chunk of a file) and full batches
+    ENGINES = [BatchEngine(size) for size in sorted(set([1, max(1, int(cfg.BATCH_SIZE))]))]
+
 def loadMetaModel():
 
     global M_INTERPRETER
@@ -115,29 +163,25 @@ def flat_sigmoid(x, sensitivity=-1):
 
 def predict(sample):
 
-    global INTERPRETER
-
-    # Does interpreter or keras model exist?
-    if INTERPRETER == None and PBMODEL == None:
-        loadModel()
+    # Does an engine or keras model exist?
+    if not ENGINES and PBMODEL == None:
+        loadEngines()
 
     if PBMODEL == None:
 
-        # Reshape input tensor
-        INTERPRETER.resize_tensor_input(INPUT_LAYER_INDEX, [len(sample), *sample[0].shape])
-        INTERPRETER.allocate_tensors()
+        # Smallest engine taking the whole batch, or the largest one in turns
+        for engine in ENGINES:
+            if engine.batchSize >= len(sample):
+                return engine.run(sample)
 
-        # Make a prediction (Audio only for now)
-        INTERPRETER.set_tensor(INPUT_LAYER_INDEX, np.array(sample, dtype='float32'))
-        INTERPRETER.invoke()
-        prediction = INTERPRETER.get_tensor(OUTPUT_LAYER_INDEX)
-
-        return prediction
+        engine = ENGINES[-1]
+        return np.concatenate([engine.run(sample[first:first + engine.batchSize]).copy() \
+                                for first in range(0, len(sample), engine.batchSize)])
 
     else:
 
         # Make a prediction (Audio only for now)
-        prediction = PBMODEL.predict(sample)
+        prediction = PBMODEL.predict(np.array(sample, dtype='float32'))
 
         return prediction
 
@@ -0,0 +1,62 @@
+# ***************************************************************************
+#  audioMints
+#   ---------------------------------
+#   Vectorized detections from BirdNET scores
+#   ---------------------------------
+#   Works on the (windows x labels) score matrix of a file or of a single
+#   window at once. Which labels may be reported (an eBird code exists and
+#   the label is on the species list, or there is no list) is a boolean
+#   mask over cfg.LABELS, built once per loaded config. Scores of masked
+#   labels above MIN_CONFIDENCE come back as a structured array of
+#   detectionType: window index, label index and confidence, ordered by
+#   window and then by confidence, equal scores in label order as the
+#   sorted() of saveResultFile did. With k, only the k best labels of
+#   every window are looked at, picked with argpartition.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import numpy as np
+
+from audioMints import config as cfg
+
+detectionType = np.dtype([('window', np.int32), ('label', np.int32), ('confidence', np.float64)])
+
+maskKey = None
+mask    = None
+
+
+def speciesMask():
+    # Rebuilt when loadConfig / setConfig bring new label or species lists
+    global maskKey, mask
+    key = (id(cfg.LABELS), id(cfg.CODES), id(cfg.SPECIES_LIST), len(cfg.LABELS), len(cfg.SPECIES_LIST))
+    if key != maskKey:
+        species = set(cfg.SPECIES_LIST)
+        mask    = np.array([code in cfg.CODES and (code in species or len(species) == 0) \
+                                for code in cfg.LABELS], dtype=bool)
+        maskKey = key
+    return mask
+
+
+def detections(scores, k=None, minConfidence=None):
+    scores        = np.atleast_2d(scores)
+    minConfidence = cfg.MIN_CONFIDENCE if minConfidence is None else minConfidence
+    keep          = speciesMask() & (scores > minConfidence)
+
+    if k is not None and k < scores.shape[1]:
+        top      = np.argpartition(np.where(keep, -scores, np.inf), k - 1, axis=1)[:, :k]
+        topKeep  = np.take_along_axis(keep, top, axis=1)
+        windows  = np.nonzero(topKeep)[0]
+        labels   = top[topKeep]
+    else:
+        windows, labels = np.nonzero(keep)
+
+    confidence = scores[windows, labels]
+    order      = np.lexsort((labels, -confidence, windows))
+
+    found = np.empty(len(order), dtype=detectionType)
+    found['window']     = windows[order]
+    found['label']      = labels[order]
+    found['confidence'] = confidence[order]
+    return found
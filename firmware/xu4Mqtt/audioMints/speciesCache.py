@@ -0,0 +1,106 @@
+# ***************************************************************************
+#  audioMints
+#   ---------------------------------
+#   Cached species list of the BirdNET location filter
+#   ---------------------------------
+#   The meta model's species list only depends on the location, the week
+#   and the threshold, and the node does not move. Lists are kept by
+#   (latitude, longitude rounded to 0.01 degrees, week, threshold) as a
+#   bitset over cfg.LABELS, packed 8 labels a byte, in memory and in
+#   SPECIES_CACHE_PATH, so audioStream.py, audioAnalyzer.py and any
+#   configSetUp run share one file per key and the meta model only runs
+#   for a key no one has seen. A file made with other labels is made
+#   again. WEEK 0 follows the date (BirdNET weeks, 4 a month):
+#   refresh() swaps in the new week's list once the week rolls over.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import os
+import zlib
+import datetime
+import numpy as np
+
+from audioMints import config as cfg
+from audioMints import model
+
+speciesMasks = {}
+listWeek     = None
+
+
+def currentWeek(dateTime=None):
+    # Week of the year in [1, 48], as the meta model counts them
+    dateTime = dateTime or datetime.datetime.now()
+    return (dateTime.month - 1)*4 + min((dateTime.day - 1)//7, 3) + 1
+
+
+def speciesKey(latitude, longitude, week, threshold):
+    week = currentWeek() if week == 0 else int(week)
+    return (round(float(latitude), 2), round(float(longitude), 2), week, round(float(threshold), 3))
+
+
+def cacheFile(key):
+    return os.path.join(cfg.SPECIES_CACHE_PATH, "species_{0:.2f}_{1:.2f}_{2}_{3:.3f}.npz".format(*key))
+
+
+def labelsHash():
+    return zlib.crc32("\n".join(cfg.LABELS).encode())
+
+
+def readMask(key):
+    fileName = cacheFile(key)
+    if not os.path.isfile(fileName):
+        return None
+    try:
+        with np.load(fileName) as stored:
+            if int(stored['labels']) != labelsHash() or int(stored['count']) != len(cfg.LABELS):
+                return None
+            return np.unpackbits(stored['bits'], count=len(cfg.LABELS)).astype(bool)
+    except Exception as e:
+        print("[ERROR] Species cache " + fileName + " unreadable: " + str(e))
+        return None
+
+
+def writeMask(key, mask):
+    # Written aside and renamed, as other processes may be reading
+    fileName = cacheFile(key)
+    os.makedirs(os.path.dirname(fileName), exist_ok=True)
+    tmpName  = fileName + ".{0}.tmp".format(os.getpid())
+    with open(tmpName, 'wb') as cacheOut:
+        np.savez(cacheOut, bits=np.packbits(mask), count=len(cfg.LABELS), labels=labelsHash())
+    os.replace(tmpName, fileName)
+
+
+def predictMask(key):
+    latitude, longitude, week, threshold = key
+    scores = model.predictFilter(latitude, longitude, week)
+    return np.asarray(scores) >= threshold
+
+
+def speciesMask(latitude, longitude, week, threshold):
+    key  = speciesKey(latitude, longitude, week, threshold)
+    mask = speciesMasks.get((key, labelsHash()))
+    if mask is None:
+        mask = readMask(key)
+        if mask is None:
+            mask = predictMask(key)
+            writeMask(key, mask)
+        speciesMasks[(key, labelsHash())] = mask
+    return mask
+
+
+def speciesList(latitude, longitude, week, threshold):
+    global listWeek
+    listWeek = speciesKey(latitude, longitude, week, threshold)[2]
+    return [cfg.LABELS[index] for index in np.flatnonzero(speciesMask(latitude, longitude, week, threshold))]
+
+
+def refresh():
+    # For long lived processes, pool processes included: True if the
+    # species list was (re)loaded for the current week
+    if cfg.WEEK != 0 or (cfg.LATITUDE == -1 and cfg.LONGITUDE == -1) or listWeek == currentWeek():
+        return False
+    cfg.SPECIES_LIST = speciesList(cfg.LATITUDE, cfg.LONGITUDE, cfg.WEEK, cfg.LOCATION_FILTER_THRESHOLD)
+    print('Week {} species list contains {} species'.format(listWeek, len(cfg.SPECIES_LIST)))
+    return True
@@ -0,0 +1,164 @@
+# ***************************************************************************
+#  audioMints
+#   ---------------------------------
+#   Streaming microphone capture for BirdNET
+#   ---------------------------------
+#   A sounddevice input stream calls back with blocks of samples, which
+#   are copied into a ring buffer holding bufferSeconds of audio. The
+#   callback is the only writer and the analyzer the only reader; each
+#   side only moves its own sample counters, so the copy takes no lock.
+#   The writer announces the end of a write before copying and publishes
+#   it after, and the reader keeps a copy only if no write announced
+#   before or during it reached its slots.
+#   An Event only wakes the reader. windows() hands out SIG_LENGTH second
+#   windows (stepping by SIG_LENGTH - SIG_OVERLAP) at the model rate, with
+#   the time of their first sample. The stream is opened at the model
+#   rate (48 kHz) and only when the device refuses that at its own rate,
+#   in which case every window is resampled with resample_poly. If the
+#   reader falls more than bufferSeconds behind, the oldest audio and one
+#   callback block more are skipped and counted in overruns.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import math
+import datetime
+import threading
+import numpy as np
+import sounddevice as sd
+
+from audioMints import config as cfg
+
+
+class RingBuffer:
+
+    def __init__(self, capacity):
+        self.data      = np.zeros(capacity, dtype=np.float32)
+        self.capacity  = capacity
+        self.writing   = 0   # Samples written once the write in progress ends
+        self.written   = 0   # Samples ever written, moved by the writer only
+        self.readCount = 0   # Samples ever read, moved by the reader only
+        self.blockSize = 0   # Largest write seen
+        self.overruns  = 0
+        self.skipped   = 0
+        self.dataReady = threading.Event()
+
+    def write(self, samples):
+        end     = self.written + len(samples)
+        samples = samples[-self.capacity:]
+        self.blockSize = max(self.blockSize, len(samples))
+        # Announced before the copy, so the reader knows which slots change
+        self.writing = end
+        start = (end - len(samples)) % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        self.data[:len(samples) - first] = samples[first:]
+        # Published after the copy, so the reader never sees unwritten samples
+        self.written = end
+        self.dataReady.set()
+
+    def read(self, count, timeout=None):
+        # (index of the first sample, next count samples), or None after
+        # timeout seconds without enough samples
+        while True:
+            while self.written - self.readCount < count:
+                self.dataReady.clear()
+                if self.written - self.readCount >= count:
+                    break
+                if not self.dataReady.wait(timeout):
+                    return None
+
+            first = self.readCount
+            if self.writing - first > self.capacity:
+                # Lapped: go on one block past the oldest sample, which the
+                # next write takes
+                skipped         = self.writing - self.capacity + self.blockSize - first
+                self.readCount += skipped
+                self.skipped   += skipped
+                self.overruns  += 1
+                continue
+            start   = first % self.capacity
+            samples = np.concatenate((self.data[start:start + count],
+                                      self.data[:max(0, start + count - self.capacity)]))
+            # The writer may have started on these slots during the copy
+            if self.writing - first <= self.capacity:
+                self.readCount = first + count
+                return first, samples
+
+
+class AudioStream:
+
+    def __init__(self, channels=1, device=None, bufferSeconds=30, modelRate=None):
+        self.channels   = channels
+        self.device     = device
+        self.modelRate  = modelRate or cfg.SAMPLE_RATE
+        self.streamRate = self.modelRate
+        self.ring       = RingBuffer(int(bufferSeconds*self.modelRate))
+        self.stream     = None
+        self.startTime  = None
+        self.statusFlags = 0
+
+    def callback(self, indata, frames, timeInfo, status):
+        # Runs on the PortAudio thread; indata is reused once this returns
+        if status:
+            self.statusFlags += 1
+        if self.startTime is None:
+            self.startTime = datetime.datetime.now() - datetime.timedelta(seconds=frames/self.streamRate)
+        self.ring.write(indata[:, 0] if indata.ndim > 1 else indata)
+
+    def start(self):
+        try:
+            self.stream = sd.InputStream(samplerate=self.modelRate, channels=self.channels, device=self.device,
+                                         dtype='float32', callback=self.callback)
+        except sd.PortAudioError:
+            self.streamRate = int(sd.query_devices(self.device, 'input')['default_samplerate'])
+            print("Device does not record at {0} Hz, resampling from {1} Hz".format(self.modelRate, self.streamRate))
+            self.stream = sd.InputStream(samplerate=self.streamRate, channels=self.channels, device=self.device,
+                                         dtype='float32', callback=self.callback)
+        self.stream.start()
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+    def toModelRate(self, samples, length):
+        if self.streamRate == self.modelRate:
+            return samples
+        from scipy.signal import resample_poly
+        divisor   = math.gcd(self.modelRate, self.streamRate)
+        resampled = resample_poly(samples, self.modelRate//divisor, self.streamRate//divisor).astype(np.float32)
+        if len(resampled) < length:
+            resampled = np.pad(resampled, (0, length - len(resampled)))
+        return resampled[:length]
+
+    def readSamples(self, count, timeout):
+        read = self.ring.read(count, timeout)
+        if read is None:
+            raise TimeoutError("No audio for {0} seconds".format(timeout))
+        return read
+
+    def windows(self, seconds=None, overlap=None, timeout=10):
+        # Yields (dateTime of the first sample, window) for ever; raises
+        # TimeoutError when the microphone stops delivering
+        seconds = cfg.SIG_LENGTH if seconds is None else seconds
+        overlap = cfg.SIG_OVERLAP if overlap is None else overlap
+        length  = int(seconds*self.modelRate)
+        size    = int(seconds*self.streamRate)
+        step    = min(size, max(1, int((seconds - overlap)*self.streamRate)))
+
+        first, window = self.readSamples(size, timeout)
+        while True:
+            yield self.startTime + datetime.timedelta(seconds=first/self.streamRate), \
+                    self.toModelRate(window, length)
+            index, samples = self.readSamples(step, timeout)
+            if index == first + size:
+                window = np.concatenate((window[step:], samples))
+                first += step
+            else:
+                # Audio was skipped after an overrun, so a fresh window
+                if step < size:
+                    samples = np.concatenate((samples, self.readSamples(size - step, timeout)[1]))
+                first, window = index, samples
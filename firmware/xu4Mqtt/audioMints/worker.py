@@ -0,0 +1,126 @@
+# ***************************************************************************
+#  audioMints
+#   ---------------------------------
+#   Long lived BirdNET analyzer
+#   ---------------------------------
+#   configSetUp parses the arguments, loads the codes and labels, runs the
+#   location filter and starts a Pool whose processes each load the model,
+#   all again for every recording. AnalyzerWorker is set up once from a
+#   loaded config (functions.loadConfig): its pool processes get the
+#   config, species list included, load the model and run it once on
+#   silence at start up, then stay up. Files are submitted to the pool's
+#   task queue and their detections (functions.fileDetections) come back
+#   on the results queue together with the time spent analysing and the
+#   latency from submission. A file is only queued once at a time; a
+#   file which cannot be read comes back with detections None and may be
+#   submitted again. The pool replaces a process which dies, but not its
+#   task, so a file without a result after itemTimeout seconds may be
+#   submitted again too, and a late result of the first try is dropped.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import time
+import queue
+import threading
+import traceback
+import numpy as np
+from multiprocessing import Pool
+
+from audioMints import config as cfg
+from audioMints import functions as fn
+from audioMints import model
+from audioMints import speciesCache
+
+
+def initWorker(config):
+    # Runs once in every pool process
+    cfg.setConfig(config)
+    model.loadEngines()
+    fn.predict([np.zeros(int(cfg.SIG_LENGTH*cfg.SAMPLE_RATE), dtype=np.float32)])
+
+
+def analyzeItem(fpath):
+    startTime = time.monotonic()
+    try:
+        speciesCache.refresh()
+        detections = fn.fileDetections(fpath)
+    except Exception:
+        print(traceback.format_exc(), flush=True)
+        detections = None
+    return fpath, detections, time.monotonic() - startTime
+
+
+class AnalyzerWorker:
+
+    def __init__(self, cfgIn, processes=1, itemTimeout=600):
+        self.results     = queue.Queue()
+        self.pending     = {}
+        self.lock        = threading.Lock()
+        self.itemTimeout = itemTimeout
+        self.startTime   = time.monotonic()
+        self.stats       = {'items': 0, 'failed': 0, 'lost': 0, 'analysisTime': 0.0, 'latency': 0.0}
+        self.pool        = Pool(max(1, processes), initializer=initWorker, initargs=(cfgIn.getConfig(),))
+
+    def submit(self, fpath):
+        with self.lock:
+            submitTime = self.pending.get(fpath)
+            if submitTime is not None:
+                if time.monotonic() - submitTime < self.itemTimeout:
+                    return False
+                # Most likely its pool process died
+                print("[ERROR] No result for " + fpath + " after {0:.0f} s, queued again"\
+                        .format(time.monotonic() - submitTime))
+                self.stats['lost'] += 1
+            submitTime = self.pending[fpath] = time.monotonic()
+        self.pool.apply_async(analyzeItem, (fpath,),
+                              callback=lambda result: self.finished(result, submitTime),
+                              error_callback=lambda error: self.crashed(fpath, error, submitTime))
+        return True
+
+    def finished(self, result, submitTime):
+        # Called on the pool's result thread
+        fpath, detections, analysisTime = result
+        with self.lock:
+            if self.pending.get(fpath) != submitTime:
+                return
+            latency = time.monotonic() - self.pending.pop(fpath)
+            self.stats['items']        += 1
+            self.stats['failed']       += detections is None
+            self.stats['analysisTime'] += analysisTime
+            self.stats['latency']      += latency
+        self.results.put({'path': fpath, 'detections': detections,
+                          'analysisTime': analysisTime, 'latency': latency})
+
+    def crashed(self, fpath, error, submitTime):
+        print("[ERROR] Analyzer worker failed on " + fpath + ": " + str(error))
+        with self.lock:
+            if self.pending.get(fpath) == submitTime:
+                del self.pending[fpath]
+
+    def queued(self):
+        with self.lock:
+            return len(self.pending)
+
+    def report(self):
+        items = max(self.stats['items'], 1)
+        return "Analyzed: {0} files, {1} failed, {2} lost, {3:.2f} s analysis and {4:.2f} s latency per file, "\
+               "{5:.1f} files per hour"\
+                .format(self.stats['items'], self.stats['failed'], self.stats['lost'],
+                        self.stats['analysisTime']/items, self.stats['latency']/items,
+                        3600*self.stats['items']/max(time.monotonic() - self.startTime, 1))
+
+    def close(self):
+        # Waits for the files queued, but not for a task lost with its
+        # process, which would keep Pool.join waiting for ever
+        self.pool.close()
+        while True:
+            with self.lock:
+                waiting = [submitTime for submitTime in self.pending.values() \
+                                if time.monotonic() - submitTime < self.itemTimeout]
+            if not waiting:
+                break
+            time.sleep(0.1)
+        self.pool.terminate()
+        self.pool.join()
@@ -0,0 +1,66 @@
+# Streaming replacement of audioRecorder.py and audioAnalyzer.py: the
+# microphone is read into memory by audioMints.stream and every
+# SIG_LENGTH second window goes straight to BirdNET, with no WAV written
+# to dataFolderTmp in between.
+
+from collections import OrderedDict
+import datetime
+import pandas as pd
+
+import time
+
+from mintsXU4 import mintsSensorReader as mSR
+from mintsXU4 import mintsDefinitions as mD
+
+from audioMints import config as cfg
+from audioMints import functions as fn
+from audioMints import speciesCache
+from audioMints.stream import AudioStream
+
+channelSelected    = 1
+bufferSeconds      = 30     # Audio kept in memory while BirdNET catches up
+minConfidence      = .3
+numOfThreads       = 4
+
+dataFolder         = mD.dataFolder
+
+
+def main(cfg):
+    labels = pd.read_csv("audioMints/labels/labels.csv").set_index("Scientific name")["Labels"]
+    cfg    = fn.loadConfig(cfg,fn.parseArguments(dataFolder,minConfidence,numOfThreads))
+    cfg.TFLITE_THREADS = numOfThreads
+
+    while True:
+        stream = AudioStream(channelSelected,bufferSeconds=bufferSeconds)
+        try:
+            stream.start()
+            print("Streaming from the microphone at " + str(stream.streamRate) + " Hz")
+            for dateTime, window in stream.windows():
+                speciesCache.refresh()
+                prediction = fn.predict([window])[0]
+                for scientificName, commonName, confidence in fn.windowDetections(prediction):
+                    sensorDictionary = OrderedDict([
+                        ("dateTime"     ,str(dateTime)),
+                        ("label"        ,labels.get(scientificName)),
+                        ("confidence"   ,round(confidence,4))
+                         ])
+                    mSR.sensorFinisher(dateTime,"MBC001",sensorDictionary)
+                if stream.ring.overruns:
+                    print("[ERROR] BirdNET fell behind, " + str(stream.ring.skipped) + " samples skipped")
+                    stream.ring.overruns = 0
+
+        except Exception as e:
+            time.sleep(.5)
+            print ("Error and type: %s - %s." % (e,type(e)))
+            time.sleep(.5)
+            print("Microphone Not Connected: Check connection")
+            time.sleep(.5)
+        finally:
+            stream.stop()
+
+if __name__ == "__main__":
+    print("=============")
+    print("    MINTS    ")
+    print("=============")
+    print("Connecting to the microphone on Channel: {0}".format(channelSelected))
+    main(cfg)
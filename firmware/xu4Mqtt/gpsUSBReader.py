@@ -3,6 +3,7 @@ import serial
 import datetime
 from mintsXU4 import mintsSensorReader as mSR
 from mintsXU4 import mintsDefinitions as mD
+from mintsXU4 import mintsSerialLines as mSL
 import time
 import serial
 import pynmea2
@@ -34,37 +35,28 @@ def main():
     delta  = 2
     print("connected to: " + ser.portstr)
 
-    #this will store the line
-    line = []
+    reader = mSL.SerialLineReader(ser)
 
-
-    
     while True:
        try:
-           for c in ser.read():
-               line.append(chr(c))
-        
-               if chr(c) == '\n':
-                   dataString     = (''.join(line))
-                   print(dataString)
-                   dateTime  = datetime.datetime.now()
-                   if (dataString.startswith("$GPGGA") and mSR.getDeltaTime(lastGPGGA,delta)):
-                       mSR.GPSGPGGA2Write(dataString,dateTime)
-                       lastGPGGA = time.time()
-                   if (dataString.startswith("$GPRMC") and mSR.getDeltaTime(lastGPRMC,delta)):
-                       mSR.GPSGPRMC2Write(dataString,dateTime)
-                       lastGPRMC = time.time()
-                   if (dataString.startswith("$GNGGA") and mSR.getDeltaTime(lastGPGGA,delta)):
-                       mSR.GPSGPGGA2Write(dataString,dateTime)
-                       lastGPGGA = time.time()
-                   if (dataString.startswith("$GNRMC") and mSR.getDeltaTime(lastGPRMC,delta)):
-                       mSR.GPSGPRMC2Write(dataString,dateTime)
-                       lastGPRMC = time.time()                    
-                   line = []
-                   break
+           for dataString in reader.lines():
+               print(dataString)
+               dateTime  = datetime.datetime.now()
+               if (dataString.startswith("$GPGGA") and mSR.getDeltaTime(lastGPGGA,delta)):
+                   mSR.GPSGPGGA2Write(dataString,dateTime)
+                   lastGPGGA = time.time()
+               if (dataString.startswith("$GPRMC") and mSR.getDeltaTime(lastGPRMC,delta)):
+                   mSR.GPSGPRMC2Write(dataString,dateTime)
+                   lastGPRMC = time.time()
+               if (dataString.startswith("$GNGGA") and mSR.getDeltaTime(lastGPGGA,delta)):
+                   mSR.GPSGPGGA2Write(dataString,dateTime)
+                   lastGPGGA = time.time()
+               if (dataString.startswith("$GNRMC") and mSR.getDeltaTime(lastGPRMC,delta)):
+                   mSR.GPSGPRMC2Write(dataString,dateTime)
+                   lastGPRMC = time.time()                    
        except:
            print("Incomplete String Read")
-           line = []
+           reader.clear()
 
     ser.close()
 
@@ -19,6 +19,8 @@ from collections import OrderedDict
 from glob import glob
 from mintsXU4 import mintsDefinitions as mD
 from mintsXU4 import mintsSensorReader as mSR
+from mintsXU4 import mintsSerialLines as mSL
+from mintsXU4 import mintsI2cScheduler as mIS
 import traceback
 # from mintsXU4 import mintsPoLo as mPL
 from collections import OrderedDict
@@ -69,8 +71,6 @@ lastGPGGA = time.time()
 lastGNRMC = time.time()
 lastGNGGA = time.time()
 delta  = 10
-#this will store the line
-line = []
 
 
 
@@ -103,33 +103,38 @@ if __name__ == "__main__":
     
     try:
         usbGPSAvailability,serialConnection  = is_serial_port_open(gpsPort[0])
+        gpsReader = mSL.SerialLineReader(serialConnection)
     except:
         usbGPSAvailability = False
         ser = []
     
     # I2C Devices 
     as7265xOnline  =  as7265x.initiate()
-    as7265xReadTime  = time.time()
-
     bme280Online   =  bme280.initiate(30)
-    bme280ReadTime  = time.time()
-
     scd30Online    =  scd30.initiate(30)
-    scd30ReadTime  = time.time()
-    
     pa101dOnline   =  pa101d.initiate()
-    pa101dGGAReadTime  = time.time()
-    pa101dRMCReadTime  = time.time()    
 
+    scheduler = mIS.I2cScheduler()
+    if as7265xOnline:
+        scheduler.add("AS7265X",as7265x,delta)
+    if pa101dOnline:
+        scheduler.add("PA101D",pa101d,delta,("GGA",))
+    if bme280Online:
+        scheduler.add("BME280",bme280,delta)
+    if pa101dOnline:
+        scheduler.add("PA101D",pa101d,delta,("RMC",))
+    if scd30Online:
+        scheduler.add("SCD30",scd30,delta)
 
     while True:
         try:
+            # Wait for GPS lines until the next I2C sensor is due
+            i2cWait = scheduler.runPending()
             if usbGPSAvailability:
                 try:       
-                    for c in serialConnection.read():
-                        line.append(chr(c))
-                        if chr(c) == '\n':
-                            dataString     = (''.join(line)).split('\r')[0]
+                    dataString = gpsReader.readLine(i2cWait)
+                    if dataString is not None:
+                            dataString     = dataString.split('\r')[0]
                             # print(dataString)
                             dateTime  = datetime.datetime.now()
                             if (dataString.startswith("$GPGGA") and mSR.getDeltaTime(lastGPGGA,delta)):
@@ -144,41 +149,17 @@ if __name__ == "__main__":
                             if (dataString.startswith("$GNRMC") and mSR.getDeltaTime(lastGNRMC,delta)):
                                 mSR.GPSGPRMC2Write(dataString.split('\r')[0],dateTime)
                                 lastGNRMC = time.time()                    
-                            line = []
-                            break
                 except Exception as e:
                     time.sleep(.5)
-                    line = []
+                    gpsReader.clear()
                     print ("USB GPS Error and type: %s - %s." % (e,type(e)))
                     print("Errornous String")
                     print(dataString)
                     print("+=+=+=+=+=+=+=+=")
                     time.sleep(.5)
-        
+            else:
+                time.sleep(i2cWait)
                               
-            if as7265xOnline and mSR.getDeltaTimeAM(as7265xReadTime,delta):
-                as7265xReadTime  = time.time()
-                as7265x.readMqtt();
-            
-            if pa101dOnline and mSR.getDeltaTimeAM(pa101dGGAReadTime,delta):
-                pa101dGGAReadTime  = time.time()
-                print("---GGA---")
-                pa101d.readMqtt("GGA");                  
-         
-            if bme280Online and mSR.getDeltaTimeAM(bme280ReadTime,delta):
-                bme280ReadTime  = time.time()                
-                bme280.readMqtt();
-            
-            if pa101dOnline and mSR.getDeltaTimeAM(pa101dRMCReadTime,delta):
-                pa101dRMCReadTime  = time.time()
-                print("---RMC---")
-                pa101d.readMqtt("RMC");               
-            
-            if scd30Online and mSR.getDeltaTimeAM(scd30ReadTime,delta):
-                scd30.readMqtt();
-                scd30ReadTime  = time.time()
-
-       
 
         except Exception as e:
             time.sleep(.5)
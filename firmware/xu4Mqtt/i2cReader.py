@@ -19,6 +19,7 @@ from collections import OrderedDict
 from glob import glob
 from mintsXU4 import mintsDefinitions as mD
 from mintsXU4 import mintsSensorReader as mSR
+from mintsXU4 import mintsI2cScheduler as mIS
 
 # from mintsXU4 import mintsPoLo as mPL
 from collections import OrderedDict
@@ -59,50 +60,22 @@ if __name__ == "__main__":
     
     # I2C Devices 
     as7265xOnline  =  as7265x.initiate()
-    as7265xReadTime  = time.time()
-
     bme280Online   =  bme280.initiate(30)
-    bme280ReadTime  = time.time()
-
     scd30Online    =  scd30.initiate(30)
-    scd30ReadTime  = time.time()
-    
     pa101dOnline   =  pa101d.initiate()
-    pa101dGGAReadTime  = time.time()
-    pa101dRMCReadTime  = time.time()    
 
     delta = 10
 
-    while True:
-        try:    
-            if as7265xOnline and mSR.getDeltaTimeAM(as7265xReadTime,delta):
-                as7265xReadTime  = time.time()
-                as7265x.readMqtt();
-            if bme280Online and mSR.getDeltaTimeAM(bme280ReadTime,delta):
-                bme280ReadTime  = time.time()                
-                bme280.readMqtt();
-            if pa101dOnline and mSR.getDeltaTimeAM(pa101dGGAReadTime,delta):
-                pa101dReadTime  = time.time()
-                pa101d.readMqtt("GGA");                        
-            if scd30Online and mSR.getDeltaTimeAM(scd30ReadTime,delta):
-                scd30.readMqtt();
-                scd30ReadTime  = time.time()
-            if pa101dOnline and mSR.getDeltaTimeAM(pa101dRMCReadTime,delta):
-                pa101dReadTime  = time.time()
-                pa101d.readMqtt("RMC");            
-
-        except Exception as e:
-            time.sleep(.5)
-            print ("Error and type: %s - %s." % (e,type(e)))
-            time.sleep(.5)
-        
-                  
-        
-        
-        
-
-        
-        
-        
-        
-        
\ No newline at end of file
+    scheduler = mIS.I2cScheduler()
+    if as7265xOnline:
+        scheduler.add("AS7265X",as7265x,delta)
+    if bme280Online:
+        scheduler.add("BME280",bme280,delta)
+    if pa101dOnline:
+        scheduler.add("PA101D",pa101d,delta,("GGA",))
+    if scd30Online:
+        scheduler.add("SCD30",scd30,delta)
+    if pa101dOnline:
+        scheduler.add("PA101D",pa101d,delta,("RMC",))
+
+    scheduler.run()
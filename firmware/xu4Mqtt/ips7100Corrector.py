@@ -0,0 +1,46 @@
+#
+# Offline humidity correction of a full day of IPS7100 data
+# Usage : python3 ips7100Corrector.py [YYYY-MM-DD] [overwrite]
+# Defaults to yesterday. An existing IPS7100MC file is only replaced
+# when overwrite is given.
+import os
+import sys
+import datetime
+from mintsXU4 import mintsSensorReader as mSR
+from mintsXU4 import mintsDefinitions as mD
+from mintsPMCorrections import corrections as mC
+
+pmSensor      = mD.pmSensor
+climateSensor = mD.climateSensor
+
+
+def main():
+    if len(sys.argv) > 1:
+        dateTime = datetime.datetime.strptime(sys.argv[1], "%Y-%m-%d")
+    else:
+        dateTime = datetime.datetime.now() - datetime.timedelta(days=1)
+    overwrite = len(sys.argv) > 2 and sys.argv[2] == "overwrite"
+
+    pmCSV      = mSR.getWritePath(pmSensor,dateTime)
+    climateCSV = mSR.getWritePath(climateSensor,dateTime)
+    outputCSV  = mSR.getWritePath("IPS7100MC",dateTime)
+
+    for inputCSV in (pmCSV, climateCSV):
+        if not os.path.isfile(inputCSV):
+            print("[ERROR] Missing input: " + inputCSV)
+            return
+
+    if os.path.isfile(outputCSV) and not overwrite:
+        print("[ERROR] Output exists, pass overwrite to replace: " + outputCSV)
+        return
+
+    print("Correcting: " + pmCSV)
+    mC.correctDailyCSV(pmCSV,climateCSV,outputCSV,climateSensor)
+    print("Written: " + outputCSV)
+
+
+if __name__ == "__main__":
+    print("=============")
+    print("    MINTS    ")
+    print("=============")
+    main()
@@ -3,6 +3,7 @@ import serial
 import datetime
 from mintsXU4 import mintsSensorReader as mSR
 from mintsXU4 import mintsDefinitions as mD
+from mintsXU4 import mintsSerialLines as mSL
 import sys
 
 dataFolder  = mD.dataFolder
@@ -22,23 +23,16 @@ def main():
     print("Connected to: " + ser.portstr)
     print(" ")
 
-        #this will store the line
-    line = []
+    reader = mSL.SerialLineReader(ser)
 
     while True:
         try:
-            for c in ser.read():
-                line.append(chr(c))
-                if chr(c) == '\n':
-                    dataString     = (''.join(line))
-                    dataStringPost = dataString.replace('\n', '')
-                    print("================")
-                    mSR.IPS7100Write(dataStringPost,datetime.datetime.now())
-                    line = []
-                    break
+            dataStringPost = reader.readLine()
+            print("================")
+            mSR.IPS7100Write(dataStringPost,datetime.datetime.now())
         except Exception as e:
             print(e)
-            line = []
+            reader.clear()
     ser.close()
 
 
@@ -19,4 +19,8 @@ kill $(pgrep -f 'python3 audioDeleter.py')
 sleep 1
 kill $(pgrep -f 'python3 audioRecorder.py')
 sleep 1
-kill $(pgrep -f 'audioAnalyzer.py')
\ No newline at end of file
+kill $(pgrep -f 'audioAnalyzer.py')
+sleep 1
+kill $(pgrep -f 'python3 audioStream.py')
+sleep 1
+kill $(pgrep -f 'python3 sensorHub.py')
\ No newline at end of file
@@ -0,0 +1,140 @@
+# ***************************************************************************
+#  mintsI2c - AS7265X spectrum read benchmark
+#   ---------------------------------
+#   Counts I2C transactions and wall time per spectrum for the per channel
+#   reads (getCalibratedA ... getCalibratedL, each selecting its device)
+#   against readSpectrum (one block burst per device, selection reused),
+#   and asserts that both give the same 18 values.
+#
+#   Run from firmware/xu4Mqtt:
+#       python3 -m mintsI2c.benchmarkAS7265X [spectra] [--bus 1]
+#   Without --bus the virtual register interface is simulated: every
+#   transaction takes transactionTime seconds and a virtual register
+#   answers responseTime seconds after its address is written.
+#  ***************************************************************************
+
+import sys
+import time
+import struct
+import random
+import numpy as np
+
+from mintsI2c import i2c_as7265x as AS
+
+transactionTime = 0.0003  # 3 bytes at 100 kHz
+responseTime    = 0.0002
+
+perChannelReads = ["getCalibratedA", "getCalibratedB", "getCalibratedC", "getCalibratedD",
+                   "getCalibratedE", "getCalibratedF", "getCalibratedG", "getCalibratedH",
+                   "getCalibratedR", "getCalibratedI", "getCalibratedS", "getCalibratedJ",
+                   "getCalibratedT", "getCalibratedU", "getCalibratedV", "getCalibratedW",
+                   "getCalibratedK", "getCalibratedL"]
+
+
+class SimulatedAS7265X:
+    # smbus2 style bus with the master/slave virtual register handshake
+
+    def __init__(self):
+        rng = random.Random(42)
+        self.registers = {device: bytearray(0x60) for device in (AS.NIR, AS.VISIBLE, AS.UV)}
+        for device, registers in self.registers.items():
+            for channel in range(6):
+                value = struct.pack('>f', rng.uniform(0, 5000))
+                registers[AS.R_G_A_CAL + 4*channel:AS.R_G_A_CAL + 4*channel + 4] = value
+        self.selected     = AS.NIR
+        self.pendingWrite = None
+        self.readValue    = None
+        self.readyAt      = 0.0
+        self.clock        = time.perf_counter()
+
+    def transaction(self):
+        self.clock = max(self.clock, time.perf_counter()) + transactionTime
+        while time.perf_counter() < self.clock:
+            pass
+
+    def read_byte_data(self, address, register):
+        self.transaction()
+        if register == AS.STATUS_REG:
+            rxValid = self.readValue is not None and self.clock >= self.readyAt
+            return AS.RX_VALID if rxValid else 0
+        if register == AS.READ_REG:
+            value, self.readValue = self.readValue, None
+            return value or 0
+        return 0
+
+    def write_byte_data(self, address, register, value):
+        self.transaction()
+        if register != AS.WRITE_REG:
+            return
+        if self.pendingWrite is not None:
+            if self.pendingWrite == AS.DEV_SELECT_CONTROL:
+                self.selected = value & 0x03
+            else:
+                self.registers[self.selected][self.pendingWrite] = value
+            self.pendingWrite = None
+        elif value & 0x80:
+            self.pendingWrite = value & 0x7F
+        else:
+            self.readValue = self.registers[self.selected][value]
+            self.readyAt   = self.clock + responseTime
+
+
+class CountingBus:
+
+    def __init__(self, bus):
+        self.bus          = bus
+        self.transactions = 0
+
+    def read_byte_data(self, address, register):
+        self.transactions += 1
+        return self.bus.read_byte_data(address, register)
+
+    def write_byte_data(self, address, register, value):
+        self.transactions += 1
+        return self.bus.write_byte_data(address, register, value)
+
+
+def perChannelSpectrum(sensor):
+    return [getattr(sensor, read)() for read in perChannelReads]
+
+
+def timeIt(bus, function, spectra):
+    sensor     = AS.AS7265X(bus, False)
+    outputs    = []
+    startCount = bus.transactions
+    startTime  = time.perf_counter()
+    for _ in range(spectra):
+        outputs.append(function(sensor))
+    duration   = time.perf_counter() - startTime
+    return outputs, (bus.transactions - startCount)/spectra, duration/spectra
+
+
+def main(arguments):
+    if "--bus" in arguments:
+        import smbus2
+        index     = arguments.index("--bus")
+        bus       = CountingBus(smbus2.SMBus(int(arguments[index+1])))
+        arguments = arguments[:index] + arguments[index+2:]
+        print("Sensor on I2C bus, values are read without triggering a measurement")
+    else:
+        bus = CountingBus(SimulatedAS7265X())
+        print("Simulated sensor, {0:g} ms per transaction, {1:g} ms response".format(
+                1000*transactionTime, 1000*responseTime))
+    spectra = int(arguments[0]) if arguments else 20
+
+    outputsOld, transactionsOld, durationOld = timeIt(bus, perChannelSpectrum, spectra)
+    outputsNew, transactionsNew, durationNew = timeIt(bus, lambda sensor: sensor.readSpectrum(), spectra)
+
+    for old, new in zip(outputsOld, outputsNew):
+        assert new.dtype == np.float32 and new.shape == (18,)
+        assert np.array_equal(np.array(old, dtype=np.float32), new), (old, new)
+
+    print("Spectra: {0}".format(spectra))
+    print("{0:<14} {1:>14} {2:>14}".format("", "Transactions", "ms / spectrum"))
+    print("{0:<14} {1:>14.1f} {2:>14.2f}".format("Per channel", transactionsOld, 1000*durationOld))
+    print("{0:<14} {1:>14.1f} {2:>14.2f}".format("Block burst", transactionsNew, 1000*durationNew))
+    print("Speed up: {0:.1f}x, same values".format(durationOld/durationNew))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,122 @@
+# ***************************************************************************
+#  mintsI2c - Sensirion CRC and word decoding benchmark
+#   ---------------------------------
+#   Checks the table CRC of i2c_sensirion against the bitwise CRC for
+#   every one of the 65536 words and for every single bit error in a
+#   word, checks the one pass response decoder against the per word loop
+#   the SCD30 driver used (kept below as the reference), then times both
+#   on SCD30 read_measurement responses.
+#
+#   Run from firmware/xu4Mqtt:
+#       python3 -m mintsI2c.benchmarkSensirion [responses]
+#  ***************************************************************************
+
+import sys
+import time
+import struct
+import random
+
+from mintsI2c import i2c_sensirion as sensirion
+
+
+def crc8Reference(word):
+    rem = 0xFF
+    for byte in word.to_bytes(2, "big"):
+        rem ^= byte
+        for _ in range(8):
+            if rem & 0x80:
+                rem = (rem << 1) ^ 0x31
+            else:
+                rem = rem << 1
+            rem &= 0xFF
+    return rem
+
+
+def decodeReference(raw_response, num_response_words):
+    response = []
+    for i in range(num_response_words):
+        word_with_crc = raw_response[3 * i: 3 * i + 3]
+        word = int.from_bytes(word_with_crc[:2], "big")
+        if word_with_crc[2] != crc8Reference(word):
+            return None
+        response.append(word)
+    return response
+
+
+def decodeTable(raw_response, num_response_words):
+    if sensirion.badWords(raw_response):
+        return None
+    return list(sensirion.decodeWords(raw_response))
+
+
+def checkCrc():
+    references = [crc8Reference(word) for word in range(0x10000)]
+    assert sensirion.wordCrc(0xBEEF) == 0x92  # interface description example
+    assert all(sensirion.wordCrc(word) == references[word] for word in range(0x10000))
+    assert all(sensirion.crc8(word.to_bytes(2, "big")) == references[word] for word in range(0x10000))
+    assert all(sensirion.crc8Bitwise(word.to_bytes(2, "big")) == references[word] for word in range(0x10000))
+
+    # All words in one response, through the column decoder
+    raw = sensirion.encodeWords(list(range(0x10000)))
+    assert list(raw[2::3]) == references
+    assert sensirion.badWords(raw) == []
+    assert sensirion.decodeWords(raw) == tuple(range(0x10000))
+
+    # A CRC-8 with this polynomial catches every single bit error in a word
+    for bit in range(24):
+        corrupt = bytearray(raw)
+        corrupt[bit//8::3] = bytes(byte ^ (0x80 >> bit % 8) for byte in raw[bit//8::3])
+        assert sensirion.badWords(corrupt) == list(range(0x10000)), bit
+    print("CRC: 65536 words and 24 single bit errors per word checked")
+
+
+def measurementResponses(numOfResponses):
+    rng = random.Random(42)
+    responses = []
+    for _ in range(numOfResponses):
+        values = (rng.uniform(400, 5000), rng.uniform(-10, 50), rng.uniform(0, 100))
+        responses.append(sensirion.encodeWords(struct.unpack(">6H", struct.pack(">3f", *values))))
+    # Every tenth response with one flipped byte
+    for index in range(0, numOfResponses, 10):
+        corrupt = bytearray(responses[index])
+        corrupt[rng.randrange(18)] ^= 1 << rng.randrange(8)
+        responses[index] = bytes(corrupt)
+    return responses
+
+
+def timeIt(function, responses):
+    startTime = time.perf_counter()
+    outputs   = [function(response, 6) for response in responses]
+    return outputs, time.perf_counter() - startTime
+
+
+def main(arguments):
+    checkCrc()
+
+    responses = measurementResponses(int(arguments[0]) if arguments else 100000)
+    outputsReference, durationReference = timeIt(decodeReference, responses)
+    outputsTable,     durationTable     = timeIt(decodeTable, responses)
+    assert outputsReference == outputsTable
+    print("Responses: {0}, rejected: {1}".format(len(responses), outputsTable.count(None)))
+
+    rng   = random.Random(1)
+    words = [rng.randrange(0x10000) for _ in range(len(responses))]
+    startTime = time.perf_counter()
+    referenceCrcs = [crc8Reference(word) for word in words]
+    durationCrcReference = time.perf_counter() - startTime
+    startTime = time.perf_counter()
+    tableCrcs = [sensirion.wordCrc(word) for word in words]
+    durationCrcTable = time.perf_counter() - startTime
+    assert referenceCrcs == tableCrcs
+
+    print("{0:<26} {1:>12} {2:>12}".format("", "Bitwise us", "Table us"))
+    print("{0:<26} {1:>12.2f} {2:>12.2f}".format("CRC per word",
+            1e6*durationCrcReference/len(words), 1e6*durationCrcTable/len(words)))
+    print("{0:<26} {1:>12.2f} {2:>12.2f}".format("read_measurement decode",
+            1e6*durationReference/len(responses), 1e6*durationTable/len(responses)))
+    print("Speed up: CRC {0:.1f}x, decode {1:.1f}x, same results".format(
+            durationCrcReference/durationCrcTable, durationReference/durationTable))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -4,6 +4,7 @@ import logging
 import smbus2
 import struct
 import time
+import numpy as np
 from collections import OrderedDict
 import datetime
 from mintsXU4 import mintsSensorReader as mSR
@@ -56,6 +57,19 @@ POLLING_DELAY = 0.01
 NIR = 0x00
 VISIBLE = 0x01
 UV = 0x02
+
+#Burst reads
+BURST_POLL_LIMIT = 1000
+CAL_BLOCK_SIZE = 24
+#Offset of each device's 6 calibrated floats in a spectrum block
+BLOCK_OFFSETS = {UV: 0, VISIBLE: 6, NIR: 12}
+#Block order UV A-F, VISIBLE G-L, NIR R-W to spectral order 410 nm to 940 nm
+SPECTRAL_ORDER = np.array([0, 1, 2, 3, 4, 5, 6, 7, 12, 8, 13, 9, 14, 15, 16, 17, 10, 11])
+SPECTRAL_KEYS = ["channelA410nm", "channelA435nm", "channelA460nm", "channelA485nm",
+                 "channelA510nm", "channelA535nm", "channelA560nm", "channelA585nm",
+                 "channelA610nm", "channelA645nm", "channelA680nm", "channelA705nm",
+                 "channelA730nm", "channelA760nm", "channelA810nm", "channelA860nm",
+                 "channelA900nm", "channelA940nm"]
    
 LED_WHITE = 0x00
 LED_IR = 0x01
@@ -102,6 +116,8 @@ class AS7265X():
         self.i2c_addr = AS7265X_I2C_ADDR
         self.i2c      = i2c_dev
         self.debug    = debugIn
+        self.integrationCycles = 49
+        self.selectedDevice = None
 
 
     def initiate(self):
@@ -130,55 +146,30 @@ class AS7265X():
       
     def read(self):
         self.takeMeasurements()
-        data = []
-        data.append(self.getCalibratedA())
-        data.append(self.getCalibratedB())
-        data.append(self.getCalibratedC())
-        data.append(self.getCalibratedD())
-        data.append(self.getCalibratedE())
-        data.append(self.getCalibratedF())
-        data.append(self.getCalibratedG())
-        data.append(self.getCalibratedH())
-        data.append(self.getCalibratedR())        
-        data.append(self.getCalibratedI())
-        data.append(self.getCalibratedS())
-        data.append(self.getCalibratedJ())
-        data.append(self.getCalibratedT())
-        data.append(self.getCalibratedU())
-        data.append(self.getCalibratedV())
-        data.append(self.getCalibratedW())
-        data.append(self.getCalibratedK())
-        data.append(self.getCalibratedL())
+        data = self.readSpectrum().tolist()
         # print(data)
-        time.sleep(1)        
         return data;
 
-    def readMqtt(self):
+    def conversionTime(self):
+        # The 6 channel one shot integrates twice, 2.8 ms per cycle
+        return 2*(self.integrationCycles + 1)*0.0028
+
+    def trigger(self):
+        self.setMeasurementMode(MEASUREMENT_MODE_6CHAN_ONE_SHOT)
+
+    def ready(self):
+        return self.dataAvailable()
+
+    def collect(self):
         dateTime  = datetime.datetime.now()
-        sensorDictionary =  OrderedDict([
-        ("dateTime"     , str(dateTime)), # always the same
-        ("channelA410nm",self.getCalibratedA()),
-        ("channelA435nm",self.getCalibratedB()),
-        ("channelA460nm",self.getCalibratedC()),
-        ("channelA485nm",self.getCalibratedD()),
-        ("channelA510nm",self.getCalibratedE()),
-        ("channelA535nm",self.getCalibratedF()),
-        ("channelA560nm",self.getCalibratedG()),
-        ("channelA585nm",self.getCalibratedH()),
-        ("channelA610nm",self.getCalibratedR()),
-        ("channelA645nm",self.getCalibratedI()),
-        ("channelA680nm",self.getCalibratedS()),
-        ("channelA705nm",self.getCalibratedJ()),
-        ("channelA730nm",self.getCalibratedT()),
-        ("channelA760nm",self.getCalibratedU()),
-        ("channelA810nm",self.getCalibratedV()),
-        ("channelA860nm",self.getCalibratedW()),
-        ("channelA900nm",self.getCalibratedK()),
-        ("channelA940nm",self.getCalibratedL()),
-            ])        
+        sensorDictionary =  OrderedDict([("dateTime", str(dateTime))])
+        sensorDictionary.update(zip(SPECTRAL_KEYS, self.readSpectrum().tolist()))
         # print(sensorDictionary)
-        mSR.sensorFinisher(dateTime,"AS7265X",sensorDictionary)
-        time.sleep(1)        
+        return dateTime,"AS7265X",sensorDictionary;
+
+    def readMqtt(self):
+        self.takeMeasurements()
+        mSR.sensorFinisher(*self.collect())
         return;
 
 
@@ -188,6 +179,7 @@ class AS7265X():
             return False
 
         value = self.virtualReadRegister(DEV_SELECT_CONTROL)
+        self.selectedDevice = value & 0b00000011
 
         if (value & 0b00110000) == 0:
             return False
@@ -395,6 +387,23 @@ class AS7265X():
 
         return self.convertBytesToFloat(calBytes)
 
+    def readCalibratedBlock(self, device):
+        # The 6 calibrated channels of one device as 24 big-endian bytes,
+        # selecting the device only if it is not selected already
+        if self.selectedDevice != device:
+            self.fastSelectDevice(device)
+        return self.burstRead(R_G_A_CAL, CAL_BLOCK_SIZE)
+
+    def readSpectrum(self):
+        # All 18 calibrated channels as a float32 vector in spectral order.
+        # Starts with the device left selected by the previous call.
+        blocks  = bytearray(3*CAL_BLOCK_SIZE)
+        devices = sorted(BLOCK_OFFSETS, key=lambda device: device != self.selectedDevice)
+        for device in devices:
+            offset = 4*BLOCK_OFFSETS[device]
+            blocks[offset:offset + CAL_BLOCK_SIZE] = self.readCalibratedBlock(device)
+        return np.frombuffer(bytes(blocks), dtype='>f4').astype(np.float32)[SPECTRAL_ORDER]
+
     #Given 4 bytes returns the floating point value
     def convertBytesToFloat(self, value):
         b = struct.pack('=L', value)
@@ -418,6 +427,7 @@ class AS7265X():
         self.virtualWriteRegister(CONFIG, value)
 
     def setIntegrationCycles(self, cycleValue):
+        self.integrationCycles = cycleValue
         self.virtualWriteRegister(INTEGRATION_TIME, cycleValue)
 
     def enableInterrupt(self):
@@ -458,6 +468,14 @@ class AS7265X():
 
     def selectDevice(self, device):
         self.virtualWriteRegister(DEV_SELECT_CONTROL, device)
+        self.selectedDevice = device
+
+    def fastSelectDevice(self, device):
+        self.waitWriteReady()
+        self.writeRegister(WRITE_REG, DEV_SELECT_CONTROL | 0x80)
+        self.waitWriteReady()
+        self.writeRegister(WRITE_REG, device)
+        self.selectedDevice = device
 
     def enableIndicator(self):
         value = self.virtualReadRegister(LED_CONFIG)
@@ -496,6 +514,7 @@ class AS7265X():
         value = self.virtualReadRegister(CONFIG)
         value |= 0x80
         self.virtualWriteRegister(CONFIG, value)
+        self.selectedDevice = None
 
     def virtualReadRegister(self, virtualAddr):
         status = self.readRegister(STATUS_REG)
@@ -536,6 +555,33 @@ class AS7265X():
 
         self.writeRegister(WRITE_REG, dataToWrite)
 
+    # Burst access: the status register is polled back to back instead of
+    # every POLLING_DELAY, as each poll is a bus transaction itself. The TX
+    # check is only needed before the first address, for the next ones the
+    # byte received proves the slave took the previous address.
+    def waitWriteReady(self):
+        for _ in range(BURST_POLL_LIMIT):
+            if (self.readRegister(STATUS_REG) & TX_VALID) == 0:
+                return
+        raise OSError("AS7265X write register stays full")
+
+    def burstRead(self, firstAddr, count):
+        status = self.readRegister(STATUS_REG)
+        if (status & RX_VALID) != 0:
+            self.readRegister(READ_REG)
+        self.waitWriteReady()
+
+        data = bytearray(count)
+        for index in range(count):
+            self.writeRegister(WRITE_REG, firstAddr + index)
+            for _ in range(BURST_POLL_LIMIT):
+                if (self.readRegister(STATUS_REG) & RX_VALID) != 0:
+                    break
+            else:
+                raise OSError("AS7265X no data for virtual register " + hex(firstAddr + index))
+            data[index] = self.readRegister(READ_REG)
+        return data
+
     def readRegister(self, addr):
         return self.i2c.read_byte_data(self.i2c_addr, addr)
 
@@ -45,62 +45,49 @@ class BME280:
             time.sleep(1)
             return True       
       
-    def read(self):
+    def measure(self):
+        # [temperature, pressure, humidity, dewPoint, altitude] or None.
+        # The forced mode conversion happens inside bme280.sample.
         measurement = bme280.sample(self.i2c, self.i2c_addr, self.calibration_params)
-        if measurement is not None:
-            temperature = measurement.temperature
-            pressure    = measurement.pressure
-            humidity    = measurement.humidity
-            
-            # print("Temperature: {:.2f}'C, Pressure: {:.2f}'C, Relative Humidity: {:.2f}%".format(measurement.temperature,measurement.pressure,measurement.humidity))
-            A = (100*pressure) / 101325;
-            B = 1 / 5.25588
-            C = pow(A, B)
-            C = 1.0 - C
-            altitude = C / 0.0000225577
-            dewPoint = 243.04 * (math.log(humidity/100.0) + ((17.625 * temperature)/(243.04 + temperature)))/(17.625 - math.log(humidity/100.0) - ((17.625 * temperature)/(243.04 + temperature)));
-            time.sleep(1)
-            # Units temperature C, Pressure milliBar, Humidity %, Altitude m
-            return [temperature,pressure,humidity,dewPoint,altitude];
-        
-        else:
-            time.sleep(1)
+        if measurement is None:
             print("BME280 Measurments not read")
-            return [];
+            return None
+        temperature = measurement.temperature
+        pressure    = measurement.pressure
+        humidity    = measurement.humidity
+        
+        # print("Temperature: {:.2f}'C, Pressure: {:.2f}'C, Relative Humidity: {:.2f}%".format(measurement.temperature,measurement.pressure,measurement.humidity))
+        A = (100*pressure) / 101325;
+        B = 1 / 5.25588
+        C = pow(A, B)
+        C = 1.0 - C
+        altitude = C / 0.0000225577
+        dewPoint = 243.04 * (math.log(humidity/100.0) + ((17.625 * temperature)/(243.04 + temperature)))/(17.625 - math.log(humidity/100.0) - ((17.625 * temperature)/(243.04 + temperature)));
+        # Units temperature C, Pressure milliBar, Humidity %, Altitude m
+        return [temperature,pressure,humidity,dewPoint,altitude];
 
+    def read(self):
+        values = self.measure()
+        return values if values is not None else [];
 
-    def readMqtt(self):
-        dateTime  = datetime.datetime.now()
-        measurement = bme280.sample(self.i2c, self.i2c_addr, self.calibration_params)
-        if measurement is not None:
-            temperature = measurement.temperature
-            pressure    = measurement.pressure
-            humidity    = measurement.humidity
-            
-            # print("Temperature: {:.2f}'C, Pressure: {:.2f}'C, Relative Humidity: {:.2f}%".format(measurement.temperature,measurement.pressure,measurement.humidity))
-            A = (100*pressure) / 101325;
-            B = 1 / 5.25588
-            C = pow(A, B)
-            C = 1.0 - C
-            altitude = C / 0.0000225577
-            dewPoint = 243.04 * (math.log(humidity/100.0) + ((17.625 * temperature)/(243.04 + temperature)))/(17.625 - math.log(humidity/100.0) - ((17.625 * temperature)/(243.04 + temperature)));
-            time.sleep(1)
-            # Units temperature C, Pressure milliBar, Humidity %, Altitude m
+    def collect(self):
+        dateTime = datetime.datetime.now()
+        values   = self.measure()
+        if values is None:
+            return None
+        temperature,pressure,humidity,dewPoint,altitude = values
+        sensorDictionary =  OrderedDict([
+        ("dateTime"     , str(dateTime)), # always the same
+        ("temperature"  ,temperature),
+        ("pressure"     ,pressure),
+        ("humidity"     ,humidity),
+        ("dewPoint"     ,dewPoint),
+        ("altitude"     ,altitude),
+            ])        
+        return dateTime,"BME280V2",sensorDictionary;
 
-            sensorDictionary =  OrderedDict([
-            ("dateTime"     , str(dateTime)), # always the same
-            ("temperature"  ,temperature),
-            ("pressure"     ,pressure),
-            ("humidity"     ,humidity),
-            ("dewPoint"     ,dewPoint),
-            ("altitude"     ,altitude),
-                ])        
-            # print(sensorDictionary)
-            mSR.sensorFinisher(dateTime,"BME280V2",sensorDictionary)
-            time.sleep(1)   
-            return;
-        
-        else:
-            time.sleep(1)
-            print("BME280 Measurments not read")
-            return;
\ No newline at end of file
+    def readMqtt(self):
+        sample = self.collect()
+        if sample is not None:
+            mSR.sensorFinisher(*sample)
+        return;
@@ -21,6 +21,8 @@ class PAI101D_:
         
         self.gps = PA1010D(debug= debugIn)
         self.gps._i2c = i2c_dev
+        self.lineBuffer = []
+        self.sentences  = {}   # Latest complete sentence per type, e.g. "GGA"
 
     def initiate(self):
         try:
@@ -73,75 +75,85 @@ class PAI101D_:
             longitudeCord = -1*longitudeCord
         return longitudeCord
 
-    def readMqtt(self,strExpected, timeOut=2):
-        # print("Setting PA101D to normal")
-        # self.gps.send_command("$PMTK225,0*2B")
-        timeOut += time.time()
-        print("Reading MQTT")
-        print("Initial Data String Read")
-        dataString = self.gps.read_sentence()
-        print(dataString)
-        print("Initial Data String Printed")
-        
-        while time.time() < timeOut:
-            try:
-                # print("Data String Reading")
-                dataString = self.gps.read_sentence()
-                # print(dataString)
-                # print("-------------------")
-                if dataString.find(strExpected) >0:
-                    dateTime  = datetime.datetime.now()
-                    dataStringPost = dataString.replace('\n', '')
-                    sensorData = pynmea2.parse(dataStringPost)
-                    if strExpected == "GGA":
-                        if(sensorData.gps_qual>0):
-                            sensorName = "GPSGPGGA2"
-                            sensorDictionary = OrderedDict([
-                                    ("dateTime"          ,str(dateTime)),
-                                    ("timestamp"         ,str(sensorData.timestamp)),
-                                    ("latitudeCoordinate" ,self.getLatitudeCords(sensorData.lat,sensorData.lat_dir)),
-                                    ("longitudeCoordinate",self.getLongitudeCords(sensorData.lon,sensorData.lon_dir)),
-                                    ("latitude"          ,sensorData.lat),
-                                    ("latitudeDirection" ,sensorData.lat_dir),
-                                    ("longitude"         ,sensorData.lon),
-                                    ("longitudeDirection",sensorData.lon_dir),
-                                    ("gpsQuality"        ,sensorData.gps_qual),
-                                    ("numberOfSatellites",sensorData.num_sats),
-                                    ("HorizontalDilution",sensorData.horizontal_dil),
-                                    ("altitude"          ,sensorData.altitude),
-                                    ("altitudeUnits"     ,sensorData.altitude_units),
-                                    ("undulation"        ,sensorData.geo_sep),
-                                    ("undulationUnits"   ,sensorData.geo_sep_units),
-                                    ("age"               ,sensorData.age_gps_data),
-                                    ("stationID"         ,sensorData.ref_station_id)
-                                ])
-
-                            #Getting Write Path
-                            mSR.sensorFinisher(dateTime,sensorName,sensorDictionary)
-                            return
-                    if strExpected == "RMC":
-                        if(sensorData.status=='A'):
-                            sensorName = "GPSGPRMC2"
-                            sensorDictionary = OrderedDict([
-                                    ("dateTime"             ,str(dateTime)),
-                                    ("timestamp"            ,str(sensorData.timestamp)),
-                                    ("status"               ,sensorData.status),
-                                    ("latitudeCoordinate"   ,self.getLatitudeCords(sensorData.lat,sensorData.lat_dir)),
-                                    ("longitudeCoordinate"  ,self.getLongitudeCords(sensorData.lon,sensorData.lon_dir)),
-                                    ("latitude"             ,sensorData.lat),
-                                    ("latitudeDirection"    ,sensorData.lat_dir),
-                                    ("longitude"            ,sensorData.lon),
-                                    ("longitudeDirection"   ,sensorData.lon_dir),
-                                    ("speedOverGround"      ,sensorData.spd_over_grnd),
-                                    ("trueCourse"           ,sensorData.true_course),
-                                    ("dateStamp"            ,str(sensorData.datestamp)),
-                                    ("magVariation"         ,sensorData.mag_variation),
-                                    ("magVariationDirection",sensorData.mag_var_dir)
-                                    ])
-                            #Getting Write Path
-                            mSR.sensorFinisher(dateTime,sensorName,sensorDictionary)
-                            return
+    def readMqtt(self,strExpected):
+        if not self.ready(strExpected):
+            return;
+        sample = self.collect(strExpected)
+        if sample is not None:
+            mSR.sensorFinisher(*sample)
+        return;
 
-            except TimeoutError:
+    def pump(self,maxBytes=512):
+        # Reads what the receiver has buffered, at most maxBytes, without
+        # waiting. The PA1010D returns a line feed when it has nothing to send.
+        for _ in range(maxBytes):
+            char = self.gps._i2c.read_byte_data(self.gps._i2c_addr, 0x00)
+            if not self.lineBuffer and char != ord("$"):
+                if char == ord("\n"):
+                    return
                 continue
-        return;
\ No newline at end of file
+            if char == ord("\n") and self.lineBuffer[-1] != ord("\r"):
+                # Ran dry inside a sentence, the rest is read next time
+                return
+            self.lineBuffer.append(char)
+            if self.lineBuffer[-2:] == [ord("\r"), ord("\n")]:
+                sentence = bytearray(self.lineBuffer).decode("ascii", "ignore").strip().replace("\n", "")
+                self.lineBuffer = []
+                self.sentences[sentence[3:6]] = sentence
+
+    def ready(self,strExpected):
+        self.pump()
+        return strExpected in self.sentences
+
+    def collect(self,strExpected):
+        # Parses the latest buffered GGA or RMC sentence
+        dataString = self.sentences.pop(strExpected, None)
+        if dataString is None:
+            return;
+        dateTime  = datetime.datetime.now()
+        sensorData = pynmea2.parse(dataString)
+        if strExpected == "GGA":
+            if(sensorData.gps_qual>0):
+                sensorName = "GPSGPGGA2"
+                sensorDictionary = OrderedDict([
+                        ("dateTime"          ,str(dateTime)),
+                        ("timestamp"         ,str(sensorData.timestamp)),
+                        ("latitudeCoordinate" ,self.getLatitudeCords(sensorData.lat,sensorData.lat_dir)),
+                        ("longitudeCoordinate",self.getLongitudeCords(sensorData.lon,sensorData.lon_dir)),
+                        ("latitude"          ,sensorData.lat),
+                        ("latitudeDirection" ,sensorData.lat_dir),
+                        ("longitude"         ,sensorData.lon),
+                        ("longitudeDirection",sensorData.lon_dir),
+                        ("gpsQuality"        ,sensorData.gps_qual),
+                        ("numberOfSatellites",sensorData.num_sats),
+                        ("HorizontalDilution",sensorData.horizontal_dil),
+                        ("altitude"          ,sensorData.altitude),
+                        ("altitudeUnits"     ,sensorData.altitude_units),
+                        ("undulation"        ,sensorData.geo_sep),
+                        ("undulationUnits"   ,sensorData.geo_sep_units),
+                        ("age"               ,sensorData.age_gps_data),
+                        ("stationID"         ,sensorData.ref_station_id)
+                    ])
+
+                return dateTime,sensorName,sensorDictionary;
+        if strExpected == "RMC":
+            if(sensorData.status=='A'):
+                sensorName = "GPSGPRMC2"
+                sensorDictionary = OrderedDict([
+                        ("dateTime"             ,str(dateTime)),
+                        ("timestamp"            ,str(sensorData.timestamp)),
+                        ("status"               ,sensorData.status),
+                        ("latitudeCoordinate"   ,self.getLatitudeCords(sensorData.lat,sensorData.lat_dir)),
+                        ("longitudeCoordinate"  ,self.getLongitudeCords(sensorData.lon,sensorData.lon_dir)),
+                        ("latitude"             ,sensorData.lat),
+                        ("latitudeDirection"    ,sensorData.lat_dir),
+                        ("longitude"            ,sensorData.lon),
+                        ("longitudeDirection"   ,sensorData.lon_dir),
+                        ("speedOverGround"      ,sensorData.spd_over_grnd),
+                        ("trueCourse"           ,sensorData.true_course),
+                        ("dateStamp"            ,str(sensorData.datestamp)),
+                        ("magVariation"         ,sensorData.mag_variation),
+                        ("magVariationDirection",sensorData.mag_var_dir)
+                        ])
+                return dateTime,sensorName,sensorDictionary;
+        return;
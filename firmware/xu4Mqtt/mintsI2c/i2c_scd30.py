@@ -6,6 +6,7 @@ import logging
 import smbus2
 import struct
 import time
+from mintsI2c import i2c_sensirion as sensirion
 from mintsXU4 import mintsSensorReader as mSR
 from mintsXU4 import mintsDefinitions as mD
 from collections import OrderedDict
@@ -28,7 +29,6 @@ SET_ALTITUDE_COMPENSATION         =0x5102
 READ_SERIALNBR                    =0xD033
 SET_TEMP_OFFSET                   =0x5403
 SOFT_RESET                        =0xD304
-POLYNOMIAL                        =0x31
 
 
 class SCD30:
@@ -63,51 +63,48 @@ class SCD30:
             return True ;
     
     def read(self):
-        if self.get_data_ready():
+        if self.ready():
             measurement = self.read_measurement()
             if measurement is not None:
                 co2, temp, rh = measurement
                 # print("CO2: {:.2f}ppm, temp: {:.2f}'C, rh: {:.2f}%".format(co2,temp,rh))
-                time.sleep(1)
                 return [co2,temp,rh];
             else:
-                time.sleep(1)
                 print("SCD30 Measurments not read")    
                 return;
 
         else:
-            time.sleep(1)
             print("SCD30 Not Ready")
             return;
-    
-    def readMqtt(self):
-        if self.get_data_ready():
-            dateTime  = datetime.datetime.now()
-            measurement = self.read_measurement()
-            if measurement is not None:
-                co2, temp, rh = measurement
-                # print("CO2: {:.2f}ppm, temp: {:.2f}'C, rh: {:.2f}%".format(co2,temp,rh))
-                sensorDictionary =  OrderedDict([
-                    ("dateTime"     , str(dateTime)), # always the same
-                    ("co2"          ,co2),
-                    ("temperature"  ,temp),
-                    ("humidity"     ,rh),
-                    ])        
-                # print(sensorDictionary)
-                mSR.sensorFinisher(dateTime,"SCD30V2",sensorDictionary)
-                time.sleep(1)   
-                return;
 
+    def ready(self):
+        # Measurements run continuously, every 5 s as set in initiate
+        return bool(self.get_data_ready())
 
-            else:
-                time.sleep(1)
-                print("SCD30 Measurments not read")    
-                return;
-
-        else:
-            time.sleep(1)
+    def collect(self):
+        dateTime  = datetime.datetime.now()
+        measurement = self.read_measurement()
+        if measurement is None:
+            print("SCD30 Measurments not read")    
+            return None
+        co2, temp, rh = measurement
+        # print("CO2: {:.2f}ppm, temp: {:.2f}'C, rh: {:.2f}%".format(co2,temp,rh))
+        sensorDictionary =  OrderedDict([
+            ("dateTime"     , str(dateTime)), # always the same
+            ("co2"          ,co2),
+            ("temperature"  ,temp),
+            ("humidity"     ,rh),
+            ])        
+        return dateTime,"SCD30V2",sensorDictionary;
+    
+    def readMqtt(self):
+        if not self.ready():
             print("SCD30 Not Ready")
             return;
+        sample = self.collect()
+        if sample is not None:
+            mSR.sensorFinisher(*sample)
+        return;
 
     def get_firmware_version(self):
         """Reads the firmware version from the sensor.
@@ -198,9 +195,7 @@ class SCD30:
                           self.job_pretty_hex(data))
             return None
 
-        co2_ppm      = self.job_interpret_as_float((data[0] << 16) | data[1])
-        temp_celsius = self.job_interpret_as_float((data[2] << 16) | data[3])
-        rh_percent   = self.job_interpret_as_float((data[4] << 16) | data[5])
+        co2_ppm, temp_celsius, rh_percent = sensirion.wordsToFloats(data)
 
         return (co2_ppm, temp_celsius, rh_percent)
 
@@ -331,13 +326,10 @@ class SCD30:
         # CRC Check byte (cyclic_redundancy_check)] * number of arguments 
         """
 
-        raw_message = list(command.to_bytes(2, "big"))
-        
         # Nothing happens if there are no arguments
         for argument in arguments:
             self.job_check_word(argument)
-            raw_message.extend(argument.to_bytes(2, "big"))
-            raw_message.append(self.job_crc8(argument))
+        raw_message = list(command.to_bytes(2, "big") + sensirion.encodeWords(arguments))
 		
         if(self.debug):
         	print("Sending raw I2C data block: "+ str(self.job_pretty_hex(raw_message)))
@@ -371,7 +363,7 @@ class SCD30:
         # raw_response = self._i2c.read_i2c_block_data(
         #    self._i2c_addr, command, 3 * num_response_words)
 
-        raw_response = list(read_txn)
+        raw_response = bytes(read_txn)
 		
         if(self.debug):
         	print("Received raw I2C response: " + str(self.job_pretty_hex(raw_response)))
@@ -385,22 +377,18 @@ class SCD30:
         # (big-endian), each with a CRC-8 checksum:
         # [MSB0, LSB0, CRC0, MSB1, LSB1, CRC1, ...]
 
-        response = []
-
-        for i in range(num_response_words):
-            # Looking at each word seperately 
-            # word_with_crc contains [MSB, LSB, CRC] for the i-th response word
-            word_with_crc = raw_response[3 * i: 3 * i + 3]
-            word = int.from_bytes(word_with_crc[:2], "big")
-            response_crc = word_with_crc[2]
-            computed_crc = self.job_crc8(word)
-            if (response_crc != computed_crc):
-                print(
-                    "CRC verification for word " + str(self.job_pretty_hex(word)) +
-                    "failed: received " + str(self.job_pretty_hex(response_crc)) +
-                    "computed " +str(self.job_pretty_hex(computed_crc)))
-                return None
-            response.append(word)
+        # All CRCs are checked in one pass, see i2c_sensirion
+        bad_words = sensirion.badWords(raw_response)
+        if bad_words:
+            i = bad_words[0]
+            word = int.from_bytes(raw_response[3 * i: 3 * i + 2], "big")
+            print(
+                "CRC verification for word " + str(self.job_pretty_hex(word)) +
+                "failed: received " + str(self.job_pretty_hex(raw_response[3 * i + 2])) +
+                "computed " +str(self.job_pretty_hex(sensirion.wordCrc(word))))
+            return None
+
+        response = list(sensirion.decodeWords(raw_response))
 		
         if(self.debug):
         	print("CRC-verified response: " + str(self.job_pretty_hex(response)))
@@ -455,24 +443,10 @@ class SCD30:
         Polynomial: x^8 + x^5 + x^4 + 1 (0x31, MSB)
         Initialization: 0xFF
 
-        Algorithm adapted from:
-        https://en.wikipedia.org/wiki/Computation_of_cyclic_redundancy_checks
-
+        Looked up in the table of i2c_sensirion.
         """
         self.job_check_word(word)
-        polynomial = POLYNOMIAL
-        rem = 0xFF
-        word_bytes = word.to_bytes(2, "big")
-        for byte in word_bytes:
-            rem ^= byte
-            for _ in range(8):
-                if rem & 0x80:
-                    rem = (rem << 1) ^ polynomial
-                else:
-                    rem = rem << 1
-                rem &= 0xFF
-
-        return rem
+        return sensirion.wordCrc(word)
 
     def job_interpret_as_float(self,integer: int):
         return struct.unpack('!f', struct.pack('!I', integer))[0]
\ No newline at end of file
@@ -0,0 +1,95 @@
+# ***************************************************************************
+#  mintsI2c
+#   ---------------------------------
+#   Sensirion word protocol
+#   ---------------------------------
+#   Sensirion sensors (SCD30, SPS30, SEN5x, SGP) exchange 16 bit big-endian
+#   words, each followed by a CRC-8 byte (polynomial 0x31, init 0xFF):
+#       [MSB0, LSB0, CRC0, MSB1, LSB1, CRC1, ...]
+#   The CRC is looked up in a 256 entry table instead of shifted bit by bit.
+#   A response is checked as a whole: the MSB and LSB columns are sliced
+#   out, run through the table with bytes.translate and combined with one
+#   big integer xor, so no Python loop runs per word.
+#  ***************************************************************************
+
+import struct
+
+CRC_POLYNOMIAL = 0x31
+CRC_INIT       = 0xFF
+
+
+def crc8Bitwise(data, init=CRC_INIT):
+    # Reference implementation, as in the interface descriptions
+    rem = init
+    for byte in data:
+        rem ^= byte
+        for _ in range(8):
+            if rem & 0x80:
+                rem = (rem << 1) ^ CRC_POLYNOMIAL
+            else:
+                rem = rem << 1
+            rem &= 0xFF
+    return rem
+
+
+# CRC of a single byte starting from 0, and of a word's first byte from CRC_INIT
+CRC_TABLE = bytes(crc8Bitwise([byte], 0) for byte in range(256))
+CRC_MSB   = bytes(CRC_TABLE[CRC_INIT ^ byte] for byte in range(256))
+
+
+def crc8(data):
+    rem = CRC_INIT
+    for byte in data:
+        rem = CRC_TABLE[rem ^ byte]
+    return rem
+
+
+def wordCrc(word):
+    return CRC_TABLE[CRC_MSB[word >> 8] ^ (word & 0xFF)]
+
+
+def columnCrcs(msb, lsb):
+    # CRC of every word given its MSB and LSB byte columns
+    mixed = int.from_bytes(msb.translate(CRC_MSB), "big") ^ int.from_bytes(lsb, "big")
+    return mixed.to_bytes(len(lsb), "big").translate(CRC_TABLE)
+
+
+def encodeWords(words):
+    # Words with their CRC bytes, as sent after a command
+    data        = bytearray(3*len(words))
+    data[0::3]  = bytes(word >> 8 for word in words)
+    data[1::3]  = bytes(word & 0xFF for word in words)
+    data[2::3]  = columnCrcs(bytes(data[0::3]), bytes(data[1::3]))
+    return bytes(data)
+
+
+def badWords(raw):
+    # Indices of the words whose CRC does not match, empty when all are valid.
+    # Bytes past the last whole word are ignored.
+    raw      = bytes(raw)
+    count    = len(raw)//3
+    received = raw[2:3*count:3]
+    computed = columnCrcs(raw[0:3*count:3], raw[1:3*count:3])
+    if received == computed:
+        return []
+    return [index for index in range(count) if received[index] != computed[index]]
+
+
+def wordBytes(raw):
+    # The data bytes of every whole word with the CRC bytes left out
+    count       = len(raw)//3
+    data        = bytearray(2*count)
+    data[0::2]  = raw[0:3*count:3]
+    data[1::2]  = raw[1:3*count:3]
+    return bytes(data)
+
+
+def decodeWords(raw):
+    data = wordBytes(raw)
+    return struct.unpack(">%dH" % (len(data)//2), data)
+
+
+def wordsToFloats(words):
+    # Big-endian floats spread over word pairs, e.g. SCD30 measurements
+    count = len(words)//2
+    return struct.unpack(">%df" % count, struct.pack(">%dH" % (2*count), *words[:2*count]))
@@ -19,12 +19,17 @@
 
 
 import pandas as pd 
+import numpy as np
 from mintsXU4 import mintsSensorReader as mSR
 from mintsXU4 import mintsDefinitions as mD
+from mintsXU4 import mintsLatestStore as mLS
 from collections import OrderedDict
 import datetime
 import joblib
-import json
+import time
+import atexit
+import threading
+import warnings
 
 # For humidity correction
 # In order to apply corrections, the sensor finisher code needs to be updated
@@ -39,10 +44,23 @@ import json
 
 climateSensor     = mD.climateSensor
 pmSensor          = mD.pmSensor
-dataFolderTmp     = mD.dataFolderTmp
 macAddress        = mD.macAddress
 modelFile         = mD.modelFile
 loaded_humidModel = joblib.load(modelFile)
+climateFields     = ['temperature', 'pressure', 'humidity', 'dewPoint']
+mlBatchSize       = mD.mlBatchSize
+mlBatchSeconds    = mD.mlBatchSeconds
+
+# Column order the model was fitted with, falling back to the order used
+# when it was trained from a DataFrame
+mlFeatureNames    = list(getattr(loaded_humidModel, 'feature_names_in_',\
+                        ['cor_pm2_5', 'temperature', 'pressure', 'humidity', 'dewPoint', 'temp_dew']))
+
+# IPS7100MC records waiting for the next batched predict
+mlBatch           = []
+mlBatchStart      = None
+mlLock            = threading.RLock()
+mlChanged         = threading.Condition(mlLock)
     
 def doPrediction(sensorID,sensorDictionary,dateTime):
 
@@ -63,8 +81,7 @@ def doPrediction(sensorID,sensorDictionary,dateTime):
         # At this point load up the climate sensor 
         print("PM data read")
         dateTime        = dateTime
-        climateData     = loadJSONLatestClimate(climateSensor)
-        dateTimeClimate = datetime.datetime.strptime(climateData['dateTime'], "%Y-%m-%d %H:%M:%S.%f")
+        climateData     = mLS.latest(climateSensor,climateFields)
 
  
 
@@ -98,6 +115,7 @@ def doPrediction(sensorID,sensorDictionary,dateTime):
 
 
         ml_pm2_5    = pm2_5
+        mlFeatures  = None
         
         temperature,humidity,pressure,dewPoint= -100,-100,-100,-100
 
@@ -111,7 +129,7 @@ def doPrediction(sensorID,sensorDictionary,dateTime):
             if is_valid_temperature(temperature) and is_valid_humidity(humidity):
                 print("Climate Data is valid")
                 climateValidity = 1
-                if (dateTime-dateTimeClimate).total_seconds() < 300: 
+                if mLS.age(climateData) < 300: 
                     print("Cimate date time is valid")
                     climateDateTimeValidity = 1
                     T_D = temperature - dewPoint
@@ -128,6 +146,7 @@ def doPrediction(sensorID,sensorDictionary,dateTime):
             dewPointValidity == 1):
 
             print("Obtaining Corrected Particle Counts")
+            print('Condition is satisfied')
             cor_pc0_1, cor_pc0_3, cor_pc0_5, \
                     cor_pc1_0, cor_pc2_5, cor_pc5_0,\
                         cor_pc10_0,\
@@ -145,8 +164,10 @@ def doPrediction(sensorID,sensorDictionary,dateTime):
                                                         cor_pc1_0, cor_pc2_5, cor_pc5_0, \
                                                             cor_pc10_0)
 
-            ml_pm2_5 ,mlValidity = \
-                                mlCorrectedPM(temperature,humidity,pressure,dewPoint,\
+            # The ML value is filled in when the batch is predicted, until
+            # then the record carries the same fallback as a failed predict
+            ml_pm2_5   = cor_pm2_5
+            mlFeatures = mlFeatureRow(temperature,humidity,pressure,dewPoint,\
                                             cor_pm2_5)
         
         # At this point you generate the final ordered dictionary to  be published
@@ -180,8 +201,7 @@ def doPrediction(sensorID,sensorDictionary,dateTime):
                     ("dewPointValidity"         ,dewPointValidity),
                     ("mlValidity"               ,mlValidity)
                     ])
-        print(sensorDictionary)
-        mSR.sensorFinisher(dateTime,"IPS7100MC",sensorDictionary)
+        queueMLCorrection(dateTime,sensorDictionary,mlFeatures)
 
 
 
@@ -211,17 +231,102 @@ def humidityCorrectedPM(cor_pc0_1, cor_pc0_3, cor_pc0_5,\
 
 
 
-def mlCorrectedPM(temperature,humidity,pressure,dewPoint,cor_pm2_5):
+def mlFeatureRow(temperature,humidity,pressure,dewPoint,cor_pm2_5):
     try:
-        foggy = float(temperature) - float(dewPoint)
-        data = {'cor_pm2_5': [float(cor_pm2_5)], 'temperature': [float(temperature)], 'pressure': [pressure], 'humidity':[humidity], 'dewPoint':[dewPoint], 'temp_dew':[foggy]}
-        df = pd.DataFrame(data)
-        predicted_train_valid2 = makePrediction(loaded_humidModel, df)
-        return predicted_train_valid2["Predictions"][0], 1;
+        features = {'cor_pm2_5'  : float(cor_pm2_5),
+                    'temperature': float(temperature),
+                    'pressure'   : float(pressure),
+                    'humidity'   : float(humidity),
+                    'dewPoint'   : float(dewPoint),
+                    'temp_dew'   : float(temperature) - float(dewPoint)}
+        return [features[name] for name in mlFeatureNames]
     except Exception as e:
         print("An error  occured")
         print(e)
-        return cor_pm2_5, 0;
+        return None;
+
+
+def mlPredictBatch(featureRows):
+    # One predict call over an (n, features) array. Returns None on failure.
+    try:
+        featureArray = np.asarray(featureRows, dtype=np.float64).reshape(-1, len(mlFeatureNames))
+        with warnings.catch_warnings():
+            # Models fitted on a DataFrame warn about the missing column names
+            warnings.simplefilter("ignore", UserWarning)
+            return np.asarray(loaded_humidModel.predict(featureArray), dtype=np.float64).ravel()
+    except Exception as e:
+        print("An error  occured")
+        print(e)
+        return None;
+
+
+def queueMLCorrection(dateTime,sensorDictionary,mlFeatures):
+    # Records are kept in arrival order, including the ones which need no
+    # prediction, so the IPS7100MC file stays in time order
+    global mlBatchStart
+    with mlLock:
+        if mlBatchSize <= 1:
+            mlBatch.append((dateTime,sensorDictionary,mlFeatures))
+            flushMLBatch()
+            return
+
+        if not mlBatch:
+            mlBatchStart = time.monotonic()
+            mlChanged.notify()
+        mlBatch.append((dateTime,sensorDictionary,mlFeatures))
+
+        if len(mlBatch) >= mlBatchSize:
+            flushMLBatch()
+
+
+def flushMLBatch():
+    # The lock is held until the batch is finished, so a batch flushed by
+    # the timer is written before any later sample
+    global mlBatchStart
+    with mlLock:
+        batch = list(mlBatch)
+        del mlBatch[:]
+        mlBatchStart = None
+
+        featureRows = [mlFeatures for _, _, mlFeatures in batch if mlFeatures is not None]
+        if featureRows:
+            print("Predicting " + str(len(featureRows)) + " ML corrections")
+            predicted = mlPredictBatch(featureRows)
+            if predicted is not None:
+                predictedIndex = 0
+                for _, sensorDictionary, mlFeatures in batch:
+                    if mlFeatures is not None:
+                        sensorDictionary['pm2_5ML']    = float(predicted[predictedIndex])
+                        sensorDictionary['mlValidity'] = 1
+                        predictedIndex += 1
+
+        for dateTime, sensorDictionary, _ in batch:
+            print(sensorDictionary)
+            mSR.sensorFinisher(dateTime,"IPS7100MC",sensorDictionary)
+
+
+def mlFlushLoop():
+    # Flushes a batch once its oldest sample is mlBatchSeconds old, so a
+    # batch does not wait for the next IPS7100 sample
+    with mlLock:
+        while True:
+            if mlBatchStart is None:
+                mlChanged.wait()
+                continue
+            waitFor = mlBatchStart + mlBatchSeconds - time.monotonic()
+            if waitFor > 0:
+                mlChanged.wait(waitFor)
+            else:
+                try:
+                    flushMLBatch()
+                except Exception as e:
+                    print("[ERROR] ML batch flush failed")
+                    print(e)
+
+if mlBatchSize > 1:
+    threading.Thread(target=mlFlushLoop, name="mlBatchFlusher", daemon=True).start()
+
+atexit.register(flushMLBatch)
 
 
 
@@ -255,182 +360,199 @@ def keepClimateData(dateTime,sensorName,sensorDictionary):
                 ])
         
     if climateData:
-        writeJSONLatestClimate(climateData,sensorName)
-
-def writeJSONLatestClimate(sensorDictionary,sensorName):
-    directoryIn  = dataFolderTmp+"/"+macAddress+"/"+sensorName+".json"
-    print(directoryIn)
-    mSR.directoryCheck(directoryIn)
-    try:
-        with open(directoryIn,'w') as fp:
-            json.dump(sensorDictionary, fp)
-
-    except:
-        print("Json Data Not Written")
-
-def loadJSONLatestClimate(sensorName):
-    directoryIn  = dataFolderTmp+"/"+macAddress+"/"+sensorName+".json"
-    try:
-        with open(directoryIn, 'r') as fp:
-            loaded_data = json.load(fp)
-            print("Json Data Loaded Successfully")
-            # Now 'loaded_data' contains the Python dictionary loaded from the JSON file
-            print(loaded_data)
-            return loaded_data
-    except FileNotFoundError:
-        print("File Not Found")
-
-    except json.JSONDecodeError:
-        print("Error decoding JSON data")
-
-    return;
-
-def makePrediction(modelName, est_df):
-    predictions_train = pd.DataFrame(modelName.predict(est_df),columns=["Predictions"])
-    return predictions_train   
+        mLS.update(sensorName,dateTime,climateData,climateFields)
 
 def humidityCorrectedPC(pc0_1, pc0_3, pc0_5, pc1_0, pc2_5, pc5_0, pc10_0, humidity, temperature, dewPoint):
-
-    pc0_1 = float(pc0_1)
-    pc0_3 = float(pc0_3)
-    pc0_5 = float(pc0_5)
-    pc1_0 = float(pc1_0)
-    pc2_5 = float(pc2_5)
-    pc5_0 = float(pc5_0)
-    pc10_0 = float(pc10_0)
+    # Bin redistribution on plain floats. Index 1 is the virtual 80 nm
+    # point and index 8 the 10 um upper edge, as in the original 9 row
+    # table. The arithmetic is kept in the same order as the pandas
+    # version so the outputs are identical.
 
     hum = float(humidity)
     tem = float(temperature)
     dew = float(dewPoint)
 
-    print('Condition is satisfied')
-    data = {'count': [pc0_1, None, pc0_3, pc0_5, pc1_0, pc2_5, pc5_0, pc10_0, None],
-            'D_range': [50, 20, 200, 200, 500, 1500, 2500, 5000, None],
-            'D_point': [50, 80, 100, 300, 500, 1000, 2500, 5000, 10000]}
-    df1 = pd.DataFrame(data)
-    df1['N/D'] = df1['count']/df1['D_range']
-
-    df1['height_ini'] = 0
-    df1.loc[7, 'height_ini'] = (2*df1.loc[7, 'count'])/5000
-    df1.loc[6, 'height_ini'] = (2*df1.loc[6, 'count'])/2500 - df1.loc[7, 'height_ini']
-    df1.loc[5, 'height_ini'] = (2*df1.loc[5, 'count'])/1500 - df1.loc[6, 'height_ini']
-    df1.loc[4, 'height_ini'] = (2*df1.loc[4, 'count'])/500 - df1.loc[5, 'height_ini']
-    df1.loc[3, 'height_ini'] = (2*df1.loc[3, 'count'])/200 - df1.loc[4, 'height_ini']
-    df1.loc[2, 'height_ini'] = (2*df1.loc[2, 'count'])/200 - df1.loc[3, 'height_ini']
-    df1.loc[0, 'height_ini'] = (2*df1.loc[0, 'count'])/50 - df1.loc[2, 'height_ini']
-    df1.loc[1, 'height_ini'] = (20*(df1.loc[0, 'height_ini']-df1.loc[2, 'height_ini'])/50) + df1.loc[2, 'height_ini']
-    df1.loc[1, 'count'] = 0.5*(df1.loc[1, 'height_ini']+df1.loc[2, 'height_ini'])*20
+    count   = [float(pc0_1), 0.0, float(pc0_3), float(pc0_5), float(pc1_0), float(pc2_5), float(pc5_0), float(pc10_0), 0.0]
+    D_point = [50, 80, 100, 300, 500, 1000, 2500, 5000, 10000]
+
+    height_ini = [0.0]*9
+    height_ini[7] = (2*count[7])/5000
+    height_ini[6] = (2*count[6])/2500 - height_ini[7]
+    height_ini[5] = (2*count[5])/1500 - height_ini[6]
+    height_ini[4] = (2*count[4])/500  - height_ini[5]
+    height_ini[3] = (2*count[3])/200  - height_ini[4]
+    height_ini[2] = (2*count[2])/200  - height_ini[3]
+    height_ini[0] = (2*count[0])/50   - height_ini[2]
+    height_ini[1] = (20*(height_ini[0]-height_ini[2])/50) + height_ini[2]
+    count[1]      = 0.5*(height_ini[1]+height_ini[2])*20
 
     RH = (hum) * 0.7
     RH = 98 if RH >= 99 else RH
     k = 0.62
-    df1['D_dry_point'] = df1['D_point']/((1 + k*(RH/(100-RH)))**(1/3))
-
-    df1['D_dry_range'] = df1['D_dry_point'].diff().shift(-1)
+    growth = ((1 + k*(RH/(100-RH)))**(1/3))
+    dry    = [d/growth for d in D_point]
+    dryRng = [dry[i+1]-dry[i] for i in range(8)]
 
+    fit = [0.0]*9
+    fit[7] = (2*count[7])/dryRng[7]
+    for i in range(6, 0, -1):
+        fit[i] = (2*count[i])/dryRng[i] - fit[i+1]
 
-    df1['fit_height_ini'] = 0
-    df1.loc[7, 'fit_height_ini'] = (2*df1.loc[7, 'count'])/df1.loc[7, 'D_dry_range']
-    df1.loc[6, 'fit_height_ini'] = (2*df1.loc[6, 'count'])/df1.loc[6, 'D_dry_range'] - df1.loc[7, 'fit_height_ini']
-    df1.loc[5, 'fit_height_ini'] = (2*df1.loc[5, 'count'])/df1.loc[5, 'D_dry_range'] - df1.loc[6, 'fit_height_ini']
-    df1.loc[4, 'fit_height_ini'] = (2*df1.loc[4, 'count'])/df1.loc[4, 'D_dry_range'] - df1.loc[5, 'fit_height_ini']
-    df1.loc[3, 'fit_height_ini'] = (2*df1.loc[3, 'count'])/df1.loc[3, 'D_dry_range'] - df1.loc[4, 'fit_height_ini']
-    df1.loc[2, 'fit_height_ini'] = (2*df1.loc[2, 'count'])/df1.loc[2, 'D_dry_range'] - df1.loc[3, 'fit_height_ini']
-    df1.loc[1, 'fit_height_ini'] = (2*df1.loc[1, 'count'])/df1.loc[1, 'D_dry_range'] - df1.loc[2, 'fit_height_ini']
+    slope  = [(fit[i+1]-fit[i])/dryRng[i] for i in range(8)]
+    interc = [fit[i] - slope[i]*dry[i] for i in range(8)]
 
-    df1['slope'] = (df1['fit_height_ini'].shift(-1) - df1['fit_height_ini']) / df1['D_dry_range']
-    df1['interc'] = df1['fit_height_ini'] - df1['slope'] * df1['D_dry_point']
+    cor_height = [None]*9
+    cor_count  = [0.0]*9
 
-    df1['cor_height'] = None
-    df1['cor_count'] = 0
-
-    if df1.loc[8, 'D_dry_point'] > 5000:
-        df1.loc[7, 'cor_height'] = df1.loc[7, 'slope']*5000 + df1.loc[7, 'interc']
-        df1.loc[7, 'cor_count'] = 0.5*df1.loc[7, 'cor_height']*(df1.loc[8, 'D_dry_point']-5000)
-    else:
-        df1.loc[7, 'cor_height'] = 0
-        df1.loc[7, 'cor_count'] = 0
-    
-    if (2500<df1.loc[7, 'D_dry_point']<=5000)&(df1.loc[8, 'D_dry_point']>5000):
-        df1.loc[6, 'cor_height'] = df1.loc[6, 'slope']*2500 + df1.loc[6, 'interc']
-        df1.loc[6, 'cor_count'] = (0.5*(df1.loc[7, 'cor_height']+df1.loc[7, 'fit_height_ini'])*(5000-df1.loc[7, 'D_dry_point'])) + (0.5*(df1.loc[6, 'cor_height']+df1.loc[7, 'fit_height_ini'])*(df1.loc[7, 'D_dry_point']-2500))
-    elif (2500<df1.loc[7, 'D_dry_point']<5000)&(df1.loc[8, 'D_dry_point']<5000):
-        df1.loc[6, 'cor_height'] = df1.loc[6, 'slope']*2500 + df1.loc[6, 'interc']
-        df1.loc[6, 'cor_count'] = (0.5*(df1.loc[6, 'cor_height']+df1.loc[7, 'fit_height_ini'])*(df1.loc[7, 'D_dry_point']-2500)) + (0.5*df1.loc[7, 'fit_height_ini']*(df1.loc[8, 'D_dry_point']-df1.loc[7, 'D_dry_point']))
-    elif (df1.loc[7, 'D_dry_point']<2500)&(df1.loc[8, 'D_dry_point']<5000):
-        df1.loc[6, 'cor_height'] = df1.loc[7, 'slope']*2500 + df1.loc[7, 'interc']
-        df1.loc[6, 'cor_count'] = (0.5*df1.loc[6, 'cor_height'])*(df1.loc[8, 'D_dry_point']-2500)
-    else:
-        df1.loc[6, 'cor_height'] = df1.loc[7, 'slope']*2500 + df1.loc[7, 'interc']
-        df1.loc[6, 'cor_count'] = 0.5*(df1.loc[7, 'cor_height']+df1.loc[6, 'cor_height'])*2500
-    
-    if (1000<df1.loc[6, 'D_dry_point']<=2500)&(df1.loc[7, 'D_dry_point']>2500):
-        df1.loc[5, 'cor_height'] = df1.loc[5, 'slope']*1000 + df1.loc[5, 'interc']
-        df1.loc[5, 'cor_count'] = (0.5*(df1.loc[6, 'cor_height']+df1.loc[6, 'fit_height_ini'])*(2500-df1.loc[6, 'D_dry_point'])) + (0.5*(df1.loc[5, 'cor_height']+df1.loc[6, 'fit_height_ini'])*(df1.loc[6, 'D_dry_point']-1000))
-    elif (1000<df1.loc[6, 'D_dry_point']<2500)&(df1.loc[7, 'D_dry_point']<2500):
-        df1.loc[5, 'cor_height'] = df1.loc[5, 'slope']*1000 + df1.loc[5, 'interc']
-        df1.loc[5, 'cor_count'] = (0.5*(df1.loc[5, 'cor_height']+df1.loc[6, 'fit_height_ini'])*(df1.loc[6, 'D_dry_point']-1000)) + (0.5*(df1.loc[6,'fit_height_ini']+df1.loc[7,'fit_height_ini'])*(df1.loc[7,'D_dry_point']-df1.loc[6,'D_dry_point'])) + (0.5*(df1.loc[7,'fit_height_ini']+df1.loc[6,'cor_height'])*(2500-df1.loc[7,'D_dry_point']))
-    elif (df1.loc[6,'D_dry_point']<1000)&(df1.loc[7,'D_dry_point']<2500):
-        df1.loc[5,'cor_height'] = df1.loc[6,'slope']*1000 + df1.loc[6,'interc']
-        df1.loc[5,'cor_count'] = (0.5*(df1.loc[6,'cor_height']+df1.loc[7,'fit_height_ini'])*(2500-df1.loc[7,'D_dry_point'])) + (0.5*(df1.loc[5,'cor_height']+df1.loc[7,'fit_height_ini'])*(df1.loc[7,'D_dry_point']-1000))
+    if dry[8] > 5000:
+        cor_height[7] = slope[7]*5000 + interc[7]
+        cor_count[7]  = 0.5*cor_height[7]*(dry[8]-5000)
     else:
-        df1.loc[5,'cor_height'] = df1.loc[6,'slope']*1000 + df1.loc[6,'interc']
-        df1.loc[5,'cor_count'] = 0.5*(df1.loc[6,'cor_height']+df1.loc[5,'cor_height'])*1500
-
-    if (500<df1.loc[5,'D_dry_point']<=1000)&(df1.loc[6,'D_dry_point']>1000):
-        df1.loc[4,'cor_height'] = df1.loc[4,'slope']*500 + df1.loc[4,'interc']
-        df1.loc[4,'cor_count'] = (0.5*(df1.loc[5,'cor_height']+df1.loc[5,'fit_height_ini'])*(1000-df1.loc[5,'D_dry_point'])) + (0.5*(df1.loc[4,'cor_height']+df1.loc[5,'fit_height_ini'])*(df1.loc[5,'D_dry_point']-500))
-    elif (500<df1.loc[5,'D_dry_point']<1000)&(df1.loc[6,'D_dry_point']<1000):
-        df1.loc[4,'cor_height'] = df1.loc[4,'slope']*500 + df1.loc[4,'interc']
-        df1.loc[4,'cor_count'] = (0.5*(df1.loc[4,'cor_height']+df1.loc[5,'fit_height_ini'])*(df1.loc[5,'D_dry_point']-500)) + (0.5*(df1.loc[5,'fit_height_ini']+df1.loc[6,'fit_height_ini'])*(df1.loc[6,'D_dry_point']-df1.loc[5,'D_dry_point'])) + (0.5*(df1.loc[6,'fit_height_ini']+df1.loc[5,'cor_height'])*(1000-df1.loc[6,'D_dry_point']))
-    elif (df1.loc[5,'D_dry_point']<500)&(df1.loc[6,'D_dry_point']<1000):
-        df1.loc[4,'cor_height'] = df1.loc[5,'slope']*500 + df1.loc[5,'interc']
-        df1.loc[4,'cor_count'] = (0.5*(df1.loc[5,'cor_height']+df1.loc[6,'fit_height_ini'])*(1000-df1.loc[6,'D_dry_point'])) + (0.5*(df1.loc[4,'cor_height']+df1.loc[6,'fit_height_ini'])*(df1.loc[6,'D_dry_point']-500))
+        cor_height[7] = 0
+        cor_count[7]  = 0
+
+    if (2500<dry[7]<=5000)&(dry[8]>5000):
+        cor_height[6] = slope[6]*2500 + interc[6]
+        cor_count[6]  = (0.5*(cor_height[7]+fit[7])*(5000-dry[7])) + (0.5*(cor_height[6]+fit[7])*(dry[7]-2500))
+    elif (2500<dry[7]<5000)&(dry[8]<5000):
+        cor_height[6] = slope[6]*2500 + interc[6]
+        cor_count[6]  = (0.5*(cor_height[6]+fit[7])*(dry[7]-2500)) + (0.5*fit[7]*(dry[8]-dry[7]))
+    elif (dry[7]<2500)&(dry[8]<5000):
+        cor_height[6] = slope[7]*2500 + interc[7]
+        cor_count[6]  = (0.5*cor_height[6])*(dry[8]-2500)
     else:
-        df1.loc[4,'cor_height'] = df1.loc[5,'slope']*500 + df1.loc[5,'interc']
-        df1.loc[4,'cor_count'] = 0.5*(df1.loc[5,'cor_height']+df1.loc[4,'cor_height'])*500
-
-    if (300<df1.loc[4,'D_dry_point']<=500)&(df1.loc[5,'D_dry_point']>500):
-        df1.loc[3,'cor_height'] = df1.loc[3,'slope']*300 + df1.loc[3,'interc']
-        df1.loc[3,'cor_count'] = (0.5*(df1.loc[4,'cor_height']+df1.loc[4,'fit_height_ini'])*(500-df1.loc[4,'D_dry_point'])) + (0.5*(df1.loc[3,'cor_height']+df1.loc[4,'fit_height_ini'])*(df1.loc[4,'D_dry_point']-300))
-    elif (300<df1.loc[4,'D_dry_point']<500)&(df1.loc[5,'D_dry_point']<500):
-        df1.loc[3,'cor_height'] = df1.loc[3,'slope']*300 + df1.loc[3,'interc']
-        df1.loc[3,'cor_count'] = (0.5*(df1.loc[3,'cor_height']+df1.loc[4,'fit_height_ini'])*(df1.loc[4,'D_dry_point']-300)) + (0.5*(df1.loc[4,'fit_height_ini']+df1.loc[5,'fit_height_ini'])*(df1.loc[5,'D_dry_point']-df1.loc[4,'D_dry_point'])) + (0.5*(df1.loc[5,'fit_height_ini']+df1.loc[4,'cor_height'])*(500-df1.loc[5,'D_dry_point']))
-    elif (df1.loc[4,'D_dry_point']<300)&(df1.loc[5,'D_dry_point']<500):
-        df1.loc[3,'cor_height'] = df1.loc[4,'slope']*300 + df1.loc[4,'interc']
-        df1.loc[3,'cor_count'] = (0.5*(df1.loc[4,'cor_height']+df1.loc[5,'fit_height_ini'])*(500-df1.loc[5,'D_dry_point'])) + (0.5*(df1.loc[3,'cor_height']+df1.loc[5,'fit_height_ini'])*(df1.loc[5,'D_dry_point']-300))
+        cor_height[6] = slope[7]*2500 + interc[7]
+        cor_count[6]  = 0.5*(cor_height[7]+cor_height[6])*2500
+
+    # Bins 5 to 2 share one layout: lower edge, upper edge of the bin
+    for i, lower, upper in ((5, 1000, 2500), (4, 500, 1000), (3, 300, 500), (2, 100, 300)):
+        j, m = i+1, i+2
+        if (lower<dry[j]<=upper)&(dry[m]>upper):
+            cor_height[i] = slope[i]*lower + interc[i]
+            cor_count[i]  = (0.5*(cor_height[j]+fit[j])*(upper-dry[j])) + (0.5*(cor_height[i]+fit[j])*(dry[j]-lower))
+        elif (lower<dry[j]<upper)&(dry[m]<upper):
+            cor_height[i] = slope[i]*lower + interc[i]
+            cor_count[i]  = (0.5*(cor_height[i]+fit[j])*(dry[j]-lower)) + (0.5*(fit[j]+fit[m])*(dry[m]-dry[j])) + (0.5*(fit[m]+cor_height[j])*(upper-dry[m]))
+        elif (dry[j]<lower)&(dry[m]<upper):
+            cor_height[i] = slope[j]*lower + interc[j]
+            cor_count[i]  = (0.5*(cor_height[j]+fit[m])*(upper-dry[m])) + (0.5*(cor_height[i]+fit[m])*(dry[m]-lower))
+        else:
+            cor_height[i] = slope[j]*lower + interc[j]
+            cor_count[i]  = 0.5*(cor_height[j]+cor_height[i])*(upper-lower)
+
+    if (50<dry[2]<=100)&(dry[3]>100):
+        cor_height[0] = slope[1]*50 + interc[1]
+        cor_count[0]  = (0.5*(cor_height[2]+fit[2])*(100-dry[2])) + (0.5*(cor_height[0]+fit[2])*(dry[2]-50))
+    elif (50<dry[2]<100)&(dry[3]>100):
+        cor_height[0] = slope[1]*50 + interc[1]
+        cor_count[0]  = (0.5*(cor_height[0]+fit[2])*(dry[2]-50)) + (0.5*(fit[2]+fit[3])*(dry[3]-dry[2])) + (0.5*(fit[3]+cor_height[2])*(100-dry[3]))
+    elif (dry[2]<50)&(dry[3]>100):
+        cor_height[0] = slope[2]*50 + interc[2]
+        cor_count[0]  = (0.5*(cor_height[2]+fit[3])*(100-dry[3])) + (0.5*(cor_height[0]+fit[3])*(dry[3]-50))
     else:
-        df1.loc[3,'cor_height'] = df1.loc[4,'slope']*300 + df1.loc[4,'interc']
-        df1.loc[3,'cor_count'] = 0.5*(df1.loc[4,'cor_height']+df1.loc[3,'cor_height'])*200
-
-    if (100<df1.loc[3,'D_dry_point']<=300)&(df1.loc[4,'D_dry_point']>300):
-        df1.loc[2,'cor_height'] = df1.loc[2,'slope']*100 + df1.loc[2,'interc']
-        df1.loc[2,'cor_count'] = (0.5*(df1.loc[3,'cor_height']+df1.loc[3,'fit_height_ini'])*(300-df1.loc[3,'D_dry_point'])) + (0.5*(df1.loc[2,'cor_height']+df1.loc[3,'fit_height_ini'])*(df1.loc[3,'D_dry_point']-100))
-    elif (100<df1.loc[3,'D_dry_point']<300)&(df1.loc[4,'D_dry_point']<300):
-        df1.loc[2,'cor_height'] = df1.loc[2,'slope']*100 + df1.loc[2,'interc']
-        df1.loc[2,'cor_count'] = (0.5*(df1.loc[2,'cor_height']+df1.loc[3,'fit_height_ini'])*(df1.loc[3,'D_dry_point']-100)) + (0.5*(df1.loc[3,'fit_height_ini']+df1.loc[4,'fit_height_ini'])*(df1.loc[4,'D_dry_point']-df1.loc[3,'D_dry_point'])) + (0.5*(df1.loc[4,'fit_height_ini']+df1.loc[3,'cor_height'])*(300-df1.loc[4,'D_dry_point']))
-    elif (df1.loc[3,'D_dry_point']<100)&(df1.loc[4,'D_dry_point']<300):
-        df1.loc[2,'cor_height'] = df1.loc[3,'slope']*100 + df1.loc[3,'interc']
-        df1.loc[2,'cor_count'] = (0.5*(df1.loc[3,'cor_height']+df1.loc[4,'fit_height_ini'])*(300-df1.loc[4,'D_dry_point'])) + (0.5*(df1.loc[2,'cor_height']+df1.loc[4,'fit_height_ini'])*(df1.loc[4,'D_dry_point']-100))
-    else:
-        df1.loc[2,'cor_height'] = df1.loc[3,'slope']*100 + df1.loc[3,'interc']
-        df1.loc[2,'cor_count'] = 0.5*(df1.loc[3,'cor_height']+df1.loc[2,'cor_height'])*200
-
-    if (50<df1.loc[2,'D_dry_point']<=100)&(df1.loc[3,'D_dry_point']>100):
-        df1.loc[0,'cor_height'] = df1.loc[1,'slope']*50 + df1.loc[1,'interc']
-        df1.loc[0,'cor_count'] = (0.5*(df1.loc[2,'cor_height']+df1.loc[2,'fit_height_ini'])*(100-df1.loc[2,'D_dry_point'])) + (0.5*(df1.loc[0,'cor_height']+df1.loc[2,'fit_height_ini'])*(df1.loc[2,'D_dry_point']-50))
-    elif (50<df1.loc[2,'D_dry_point']<100)&(df1.loc[3,'D_dry_point']>100):
-        df1.loc[0,'cor_height'] = df1.loc[1,'slope']*50 + df1.loc[1,'interc']
-        df1.loc[0,'cor_count'] = (0.5*(df1.loc[0,'cor_height']+df1.loc[2,'fit_height_ini'])*(df1.loc[2,'D_dry_point']-50)) + (0.5*(df1.loc[2,'fit_height_ini']+df1.loc[3,'fit_height_ini'])*(df1.loc[3,'D_dry_point']-df1.loc[2,'D_dry_point'])) + (0.5*(df1.loc[3,'fit_height_ini']+df1.loc[2,'cor_height'])*(100-df1.loc[3,'D_dry_point']))
-    elif (df1.loc[2,'D_dry_point']<50)&(df1.loc[3,'D_dry_point']>100):
-        df1.loc[0,'cor_height'] = df1.loc[2,'slope']*50 + df1.loc[2,'interc']
-        df1.loc[0,'cor_count'] = (0.5*(df1.loc[2,'cor_height']+df1.loc[3,'fit_height_ini'])*(100-df1.loc[3,'D_dry_point'])) + (0.5*(df1.loc[0,'cor_height']+df1.loc[3,'fit_height_ini'])*(df1.loc[3,'D_dry_point']-50))
-    else:
-        df1.loc[0,'cor_height'] = df1.loc[2,'slope']*50 + df1.loc[2,'interc']
-        df1.loc[0,'cor_count'] = 0.5*(df1.loc[2,'cor_height']+df1.loc[0,'cor_height'])*50
-        
-    
+        cor_height[0] = slope[2]*50 + interc[2]
+        cor_count[0]  = 0.5*(cor_height[2]+cor_height[0])*50
+
     pc0_1, pc0_3, pc0_5, pc1_0, pc2_5, pc5_0, pc10_0 = \
-        df1.loc[0,'cor_count'], df1.loc[2,'cor_count'], df1.loc[3,'cor_count'], df1.loc[4,'cor_count'], df1.loc[5,'cor_count'], df1.loc[6,'cor_count'], df1.loc[7,'cor_count']
-    
+        cor_count[0], cor_count[2], cor_count[3], cor_count[4], cor_count[5], cor_count[6], cor_count[7]
+
     return pc0_1, pc0_3, pc0_5, pc1_0, pc2_5, pc5_0, pc10_0, hum, tem, dew
+
+
+# Offline bulk correction of a full day of IPS7100 data. Climate samples are
+# matched to every PM sample with the latest reading at or before it, which
+# is what the live path sees through the latest climate store. The validity
+# checks, PM sums and the ML predict run on whole columns; only the bin
+# redistribution runs row by row on the rows which pass the checks.
+
+pcColumns = ['pc0_1', 'pc0_3', 'pc0_5', 'pc1_0', 'pc2_5', 'pc5_0', 'pc10_0']
+pmColumns = ['pm0_1', 'pm0_3', 'pm0_5', 'pm1_0', 'pm2_5', 'pm5_0', 'pm10_0']
+
+def loadClimateCSV(climateCSV,sensorName):
+    climate = pd.read_csv(climateCSV, float_precision='round_trip')
+    if sensorName == "WIMDA":
+        climate = pd.DataFrame({
+            'dateTime'    : climate['dateTime'],
+            'temperature' : climate['airTemperature'],
+            'pressure'    : 1000*pd.to_numeric(climate['barrometricPressureBars'], errors='coerce'),
+            'humidity'    : climate['relativeHumidity'],
+            'dewPoint'    : climate['dewPoint']})
+
+    climate = climate[['dateTime', 'temperature', 'pressure', 'humidity', 'dewPoint']].copy()
+    climate['dateTimeClimate'] = pd.to_datetime(climate.pop('dateTime'), format='ISO8601')
+    for column in ['temperature', 'pressure', 'humidity', 'dewPoint']:
+        climate[column] = pd.to_numeric(climate[column], errors='coerce')
+    return climate.sort_values('dateTimeClimate', kind='stable')
+
+
+def correctDailyCSV(pmCSV,climateCSV,outputCSV,climateSensorName=climateSensor):
+    pm = pd.read_csv(pmCSV, dtype={'dateTime': str}, float_precision='round_trip')
+    pm['dateTimeParsed'] = pd.to_datetime(pm['dateTime'], format='ISO8601')
+    pm = pm.sort_values('dateTimeParsed', kind='stable').reset_index(drop=True)
+
+    merged = pd.merge_asof(pm, loadClimateCSV(climateCSV,climateSensorName),\
+                            left_on='dateTimeParsed', right_on='dateTimeClimate',\
+                                direction='backward')
+
+    temperature = merged['temperature'].to_numpy(dtype=np.float64)
+    pressure    = merged['pressure'].to_numpy(dtype=np.float64)
+    humidity    = merged['humidity'].to_numpy(dtype=np.float64)
+    dewPoint    = merged['dewPoint'].to_numpy(dtype=np.float64)
+    age         = (merged['dateTimeParsed'] - merged['dateTimeClimate']).dt.total_seconds().to_numpy()
+
+    with np.errstate(invalid='ignore'):
+        climateNullValidity     = merged['dateTimeClimate'].notna().to_numpy()
+        climateValidity         = climateNullValidity & (-20 <= temperature) & (temperature <= 50) \
+                                    & (0 <= humidity) & (humidity <= 100)
+        climateDateTimeValidity = climateValidity & (age < 300)
+        humidityValidity        = climateDateTimeValidity & (humidity > 40)
+        dewPointValidity        = climateDateTimeValidity & ((temperature - dewPoint) < 2.5)
+    valid = humidityValidity & dewPointValidity
+
+    for values in (temperature, pressure, humidity, dewPoint):
+        values[~climateNullValidity] = -100
+
+    pc = merged[pcColumns].to_numpy(dtype=np.float64)
+    pm = merged[pmColumns].to_numpy(dtype=np.float64)
+    ml = pm[:, 4].copy()
+    mlValidity = np.zeros(len(merged), dtype=np.int64)
+
+    validRows = np.flatnonzero(valid)
+    print("Correcting " + str(len(validRows)) + " of " + str(len(merged)) + " samples")
+    if len(validRows) > 0:
+        for row in validRows:
+            pc[row] = humidityCorrectedPC(*pc[row], humidity[row], temperature[row], dewPoint[row])[:7]
+
+        pm[validRows] = np.column_stack(humidityCorrectedPM(*pc[validRows].T))
+        ml[validRows] = pm[validRows, 4]
+
+        features = {'cor_pm2_5'  : pm[validRows, 4],
+                    'temperature': temperature[validRows],
+                    'pressure'   : pressure[validRows],
+                    'humidity'   : humidity[validRows],
+                    'dewPoint'   : dewPoint[validRows],
+                    'temp_dew'   : temperature[validRows] - dewPoint[validRows]}
+        predicted = mlPredictBatch(np.column_stack([features[name] for name in mlFeatureNames]))
+        if predicted is not None:
+            ml[validRows] = predicted
+            mlValidity[validRows] = 1
+
+    corrected = pd.DataFrame(OrderedDict(
+        [("dateTime", merged['dateTime'])] +
+        [(column, np.round(pc[:, index]).astype(np.int64)) for index, column in enumerate(pcColumns)] +
+        [(column, pm[:, index]) for index, column in enumerate(pmColumns)] +
+        [("pm2_5ML"                 ,ml),
+         ("temperature"             ,temperature),
+         ("pressure"                ,pressure),
+         ("humidity"                ,humidity),
+         ("dewPoint"                ,dewPoint),
+         ("climateNullValidity"     ,climateNullValidity.astype(np.int64)),
+         ("climateDateTimeValidity" ,climateDateTimeValidity.astype(np.int64)),
+         ("climateValidity"         ,climateValidity.astype(np.int64)),
+         ("humidityValidity"        ,humidityValidity.astype(np.int64)),
+         ("dewPointValidity"        ,dewPointValidity.astype(np.int64)),
+         ("mlValidity"              ,mlValidity)]))
+
+    mSR.directoryCheck(outputCSV)
+    corrected.to_csv(outputCSV, index=False)
+    return corrected
@@ -0,0 +1,93 @@
+# ***************************************************************************
+#  mintsXU4 - SQLite time series store benchmark
+#   ---------------------------------
+#   Feeds a day's worth of node samples (IPS7100, BME280V2, SCD30V2,
+#   AS7265X and GPSGPGGA2, one per second each) through
+#   mintsSeriesStore into a scratch database, timing every insert call
+#   including the batch commits, then times last hour queries.
+#
+#   Run from firmware/xu4Mqtt:
+#       python3 -m mintsXU4.benchmarkSeriesStore [samples per sensor]
+#  ***************************************************************************
+
+import os
+import sys
+import time
+import random
+import datetime
+import tempfile
+import numpy as np
+from collections import OrderedDict
+
+from mintsXU4 import mintsSeriesStore as mSS
+
+ipsKeys = ['pc0_1', 'pc0_3', 'pc0_5', 'pc1_0', 'pc2_5', 'pc5_0', 'pc10_0',
+           'pm0_1', 'pm0_3', 'pm0_5', 'pm1_0', 'pm2_5', 'pm5_0', 'pm10_0']
+
+
+def nodeSamples(dateTime, rng):
+    # One sample of each sensor, as the readers pass them to sensorFinisher
+    stamp = str(dateTime)
+    yield "IPS7100", OrderedDict([("dateTime", stamp)] + \
+            [(key, str(rng.randint(0, 50000))) for key in ipsKeys[:7]] + \
+            [(key, "{0:.6f}".format(rng.uniform(0, 80))) for key in ipsKeys[7:]])
+    yield "BME280V2", OrderedDict([("dateTime", stamp), ("temperature", rng.uniform(15, 35)),
+            ("pressure", rng.uniform(990, 1020)), ("humidity", rng.uniform(20, 95)),
+            ("dewPoint", rng.uniform(0, 25))])
+    yield "SCD30V2", OrderedDict([("dateTime", stamp), ("co2", rng.uniform(400, 900)),
+            ("temperature", rng.uniform(15, 35)), ("humidity", rng.uniform(20, 95))])
+    yield "AS7265X", OrderedDict([("dateTime", stamp)] + \
+            [("channelA{0}nm".format(410 + 30*index), rng.uniform(0, 5000)) for index in range(18)])
+    yield "GPSGPGGA2", OrderedDict([("dateTime", stamp), ("timestamp", "12:00:00"),
+            ("latitude", "3259.1234"), ("latitudeDirection", "N"), ("longitude", "09645.4321"),
+            ("longitudeDirection", "W"), ("gpsQuality", "1"), ("altitude", "180.2")])
+
+
+def main(arguments):
+    seconds = int(arguments[0]) if arguments else 86400
+    rng     = random.Random(42)
+    folder  = tempfile.mkdtemp()
+    dbFile  = os.path.join(folder, "benchmark.sqlite")
+    store   = mSS.SeriesStore(dbFile)
+
+    startTime = datetime.datetime.now() - datetime.timedelta(seconds=seconds)
+    durations = []
+    wallStart = time.perf_counter()
+    for second in range(seconds):
+        for sensorName, sensorDictionary in nodeSamples(startTime + datetime.timedelta(seconds=second), rng):
+            callStart = time.perf_counter()
+            store.insert(sensorName, startTime + datetime.timedelta(seconds=second), sensorDictionary)
+            durations.append(time.perf_counter() - callStart)
+    store.flush()
+    wall = time.perf_counter() - wallStart
+
+    durations = np.array(durations)*1000
+    print("Samples        : {0} ({1} s of 5 sensors at 1 Hz)".format(len(durations), seconds))
+    print("Insert ms      : median {0:.4f}, mean {1:.4f}, p99 {2:.3f}, max {3:.2f}".format(
+            np.median(durations), durations.mean(), np.percentile(durations, 99), durations.max()))
+    print("Throughput     : {0:.0f} samples/s".format(len(durations)/wall))
+    print("Database       : {0:.1f} MB".format(os.path.getsize(dbFile)/1e6))
+
+    queryStart = time.perf_counter()
+    times, values = store.lastSeconds("IPS7100", ["pm2_5", "pc2_5"], 3600)
+    queryTime = time.perf_counter() - queryStart
+    print("Last hour query: {0} rows in {1:.2f} ms, pm2_5 mean {2:.2f}".format(
+            len(times), 1000*queryTime, np.nanmean(values[:, 0])))
+
+    queryStart = time.perf_counter()
+    age = store.age("BME280V2")
+    print("Climate age    : {0:.0f} s in {1:.3f} ms".format(age, 1000*(time.perf_counter() - queryStart)))
+
+    retentionStart = time.perf_counter()
+    store.deleteBefore(time.time() - seconds/2)
+    print("Retention      : half the rows deleted in {0:.0f} ms".format(1000*(time.perf_counter() - retentionStart)))
+
+    store.close()
+    for name in os.listdir(folder):
+        os.remove(os.path.join(folder, name))
+    os.rmdir(folder)
+    assert np.median(durations) < 1.0, "median insert above 1 ms"
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
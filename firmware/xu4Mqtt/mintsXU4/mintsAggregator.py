@@ -0,0 +1,138 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   Rolling summaries of fast sensors
+#   ---------------------------------
+#   With aggregateOn, sensorFinisher passes the samples of the sensors in
+#   aggregateSensors through here. Every window of aggregateWindows, e.g.
+#   1MIN = 60 s, keeps running statistics per numeric field (count, mean,
+#   min, max and standard deviation, Welford's update), so memory does not
+#   grow with the window length. Windows are aligned to the clock (00:00,
+#   00:01, ...). When a sample falls past the end of a window, the window
+#   is closed and handed back to sensorFinisher as a sensor of its own,
+#   e.g. IPS7100_1MIN, dated at the start of the window:
+#       dateTime, count, <field>, <field>Min, <field>Max, <field>Std, ...
+#   where <field> is the mean. Fields that are not numbers are left out.
+#   A window is only closed by a later sample, so the window open when a
+#   sensor stops or the reader restarts is not emitted.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import math
+import datetime
+import threading
+from collections import OrderedDict
+
+from mintsXU4 import mintsDefinitions as mD
+
+aggregateOn      = mD.aggregateOn
+aggregateSensors = mD.aggregateSensors
+aggregateWindows = mD.aggregateWindows
+aggregateMqttRaw = mD.aggregateMqttRaw
+
+aggregateLock    = threading.Lock()
+sensorWindows    = {}
+
+
+class RunningStats:
+    __slots__ = ('count', 'mean', 'm2', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.count   = 0
+        self.mean    = 0.0
+        self.m2      = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta       = value - self.mean
+        self.mean  += delta/self.count
+        self.m2    += delta*(value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    def std(self):
+        # Sample standard deviation, 0 for a single value
+        return math.sqrt(self.m2/(self.count - 1)) if self.count > 1 else 0.0
+
+
+def toNumber(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+class WindowAggregate:
+
+    def __init__(self, sensorName, label, seconds):
+        self.sensorName = sensorName + "_" + label
+        self.seconds    = seconds
+        self.start      = None
+        self.end        = None
+        self.samples    = 0
+        self.stats      = OrderedDict()
+
+    def windowStart(self, dateTime):
+        midnight = dateTime.replace(hour=0, minute=0, second=0, microsecond=0)
+        offset   = (dateTime - midnight).total_seconds()
+        return midnight + datetime.timedelta(seconds=offset - offset % self.seconds)
+
+    def summary(self):
+        sensorDictionary = OrderedDict([("dateTime", str(self.start)), ("count", self.samples)])
+        for name, stats in self.stats.items():
+            sensorDictionary[name]         = stats.mean
+            sensorDictionary[name + "Min"] = stats.minimum
+            sensorDictionary[name + "Max"] = stats.maximum
+            sensorDictionary[name + "Std"] = stats.std()
+        return self.start, self.sensorName, sensorDictionary
+
+    def add(self, dateTime, sensorDictionary):
+        # Returns the summary of the window this sample closed, if any
+        closed = None
+        if self.end is None or dateTime >= self.end or dateTime < self.start:
+            if self.samples:
+                closed = self.summary()
+            self.start   = self.windowStart(dateTime)
+            self.end     = self.start + datetime.timedelta(seconds=self.seconds)
+            self.samples = 0
+            self.stats   = OrderedDict()
+
+        self.samples += 1
+        for name, value in sensorDictionary.items():
+            if name == "dateTime":
+                continue
+            number = toNumber(value)
+            if number is None:
+                continue
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = RunningStats()
+            stats.add(number)
+        return closed
+
+
+def sendsRawMqtt(sensorName):
+    # Raw samples of aggregated sensors only go to MQTT with aggregateMqttRaw
+    return not aggregateOn or aggregateMqttRaw or sensorName not in aggregateSensors
+
+
+def addSample(dateTime, sensorName, sensorDictionary):
+    # Summaries of the windows closed by this sample, as sensorFinisher arguments
+    if sensorName not in aggregateSensors:
+        return []
+    with aggregateLock:
+        windows = sensorWindows.get(sensorName)
+        if windows is None:
+            windows = sensorWindows[sensorName] = [WindowAggregate(sensorName, label, seconds) \
+                                                    for label, seconds in aggregateWindows.items()]
+        closed = [window.add(dateTime, sensorDictionary) for window in windows]
+    return [summary for summary in closed if summary is not None]
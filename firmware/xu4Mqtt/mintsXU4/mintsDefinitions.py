@@ -74,6 +74,8 @@ dataFolder                = "/home/teamlary/mintsData/raw"
 dataFolderMQTT            = "/home/teamlary/mintsData/rawMQTT"
 
 dataFolderTmp             = "/home/teamlary/mintsDataTmp"
+dataFolderSpool           = "/home/teamlary/mintsDataSpool" # Not wiped at boot like dataFolderTmp
+dataFolderShared          = "/dev/shm/mints"                # Latest values shared between processes
 
 ipsPorts              = findIPSPorts()
 USBRG15Port           = findUSBRG15Port()
@@ -83,6 +85,13 @@ macAddress            = findMacAddress()
 latestDisplayOn       = False
 latestOn              = False
 airmarPort            = findAirmarPort()
+sensorRegistryFile    = 'mintsXU4/sensorRegistry.yaml' # Arduino frame layouts
+sensorHubFile         = 'mintsXU4/sensorHub.yaml' # Devices run by sensorHub.py
+hubQueueSize          = 1000 # Lines held per serial device while the output is busy
+serialReopenDelay     = 10   # Seconds before a failed serial port is opened again
+i2cReadyRetry         = 0.05 # Seconds between data ready checks of an I2C sensor
+i2cStagger            = 0.5  # Seconds between the first due times of I2C sensors
+i2cJitterReport       = 3600 # Seconds between I2C cadence reports
 # For MQTT 
 
 mqttOn                = True
@@ -90,12 +99,47 @@ mqttCredentialsFile   = 'mintsXU4/credentials.yml'
 mqttBroker            = "mqtt.circ.utdallas.edu"
 mqttPort              =  8883  # Secure port
 gpsPort               = findPort("GPS/GNSS Receiver")
+mqttQueueSize         = 1000 # Samples held while the broker is unreachable
+mqttReconnectMax      = 60   # Maximum reconnect back off in seconds
+mqttSpoolOn           = True # Keep samples on disk while the broker is unreachable
+mqttSpoolRate         = 20   # Spooled samples replayed per second after reconnecting
+mqttSpoolWindow       = 20   # Replayed samples awaiting an acknowledgment
+mqttSpoolSegmentSize  = 1048576 # Bytes per spool segment file
+mqttSpoolMaxSegments  = 200  # Oldest segment is dropped beyond this
 
 
 # For Humidity Corrections
 pmSensor      = "IPS7100"
 climateSensor = "BME280V2"
 modelFile     = 'mintsXU4/climateCorrectionModel.joblib'
+mlBatchSize   = 10   # IPS7100 samples per ML predict call, 1 disables batching
+mlBatchSeconds= 10   # Seconds the oldest IPS7100 sample waits for its batch
+
+# For the raw CSV writer pool
+csvFlushInterval  = 10     # Seconds between flushes of buffered rows
+csvFlushSize      = 60     # Rows buffered per sensor before a flush
+csvBufferSize     = 65536  # Bytes of file buffer per open daily CSV
+
+# Raw daily files as "csv" or "parquet" (needs pyarrow, see mintsParquet)
+storageBackend       = "csv"
+parquetRowGroupSize  = 600    # Rows buffered per sensor before a row group is written
+parquetFlushInterval = 300    # Seconds a buffered row is held at most
+parquetCompression   = "zstd"
+parquetCompactDays   = 7      # Days searched for parts left by a restart
+
+# For the SQLite time series store, see mintsSeriesStore
+sqliteOn            = False  # Also keep samples in SQLite for on node queries
+sqliteFile          = "/home/teamlary/mintsData/mintsSeries.sqlite"
+sqliteBatchSize     = 50     # Samples per insert transaction
+sqliteBatchSeconds  = 5      # Seconds the oldest queued sample waits for a batch
+sqliteRetentionDays = 14     # Rows older than this are deleted
+sqliteBusyTimeout   = 5      # Seconds to wait while another process writes
+
+# For the rolling summaries, see mintsAggregator
+aggregateOn       = False
+aggregateSensors  = ["IPS7100", "IPS7100MC", "BME280V2", "SCD30V2"]
+aggregateWindows  = {"1MIN": 60, "5MIN": 300, "1HOUR": 3600} # Label and seconds, emitted as <sensor>_<label>
+aggregateMqttRaw  = True   # False publishes only the summaries of aggregated sensors, raw rows stay on disk
 
 
 if __name__ == "__main__":
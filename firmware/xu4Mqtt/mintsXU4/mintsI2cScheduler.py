@@ -0,0 +1,170 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   Deadline based I2C poll scheduler
+#   ---------------------------------
+#   Every sensor gets a fixed grid of due times on the monotonic clock,
+#   interval seconds apart. A driver may provide
+#       conversionTime() seconds its measurement takes
+#       trigger()        starts a measurement
+#       ready(*args)     True once the result can be read
+#       collect(*args)   (dateTime, sensorName, sensorDictionary) or None
+#   Only collect is required. The trigger is issued conversionTime ahead
+#   of the due time so the result is read on the deadline; a sensor that
+#   is not ready yet is checked again every i2cReadyRetry seconds until
+#   half an interval has passed. Nothing sleeps inside a driver: the
+#   scheduler waits for the next event itself, or hands the wait back to
+#   the caller through runPending. How late each read started against
+#   its due time is kept per sensor in a histogram, printed every
+#   i2cJitterReport seconds.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import time
+import bisect
+
+from mintsXU4 import mintsDefinitions as mD
+from mintsXU4 import mintsSensorReader as mSR
+
+i2cReadyRetry   = mD.i2cReadyRetry
+i2cStagger      = mD.i2cStagger
+i2cJitterReport = mD.i2cJitterReport
+
+# Upper bin edges of the lateness histogram in seconds, the last bin is open
+jitterEdges     = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5)
+
+
+class I2cJob:
+
+    def __init__(self, name, driver, interval, pollArgs, firstDue):
+        self.name      = name
+        self.driver    = driver
+        self.interval  = interval
+        self.pollArgs  = tuple(pollArgs)
+        self.nextDue   = firstDue
+        self.collectAt = None
+        self.histogram = [0]*(len(jitterEdges) + 1)
+        self.samples   = 0
+        self.missed    = 0
+        self.failed    = 0
+        self.sumLate   = 0.0
+        self.maxLate   = 0.0
+
+    def conversionTime(self):
+        conversionTime = getattr(self.driver, 'conversionTime', None)
+        return conversionTime() if conversionTime is not None else 0
+
+    def nextEvent(self):
+        if self.collectAt is not None:
+            return self.collectAt
+        return self.nextDue - self.conversionTime()
+
+    def recordLate(self, late):
+        self.histogram[bisect.bisect_left(jitterEdges, late)] += 1
+        self.sumLate += late
+        self.maxLate  = max(self.maxLate, late)
+
+    def finishSlot(self, now):
+        # Move to the next due time, counting slots already gone by
+        self.collectAt = None
+        self.nextDue  += self.interval
+        while self.nextDue <= now:
+            self.nextDue += self.interval
+            self.missed  += 1
+
+
+class I2cScheduler:
+
+    def __init__(self, finisher=None):
+        self.jobs       = []
+        self.finisher   = finisher or mSR.sensorFinisher
+        self.lastReport = time.monotonic()
+
+    def add(self, name, driver, interval, pollArgs=()):
+        # Sensors start i2cStagger seconds apart so they are not all due at once
+        firstDue = time.monotonic() + interval + i2cStagger*len(self.jobs)
+        self.jobs.append(I2cJob(name, driver, interval, pollArgs, firstDue))
+
+    def step(self, job, now):
+        if job.collectAt is None:
+            if now < job.nextEvent():
+                return
+            if now > job.nextDue + job.interval/2:
+                # Too late for this slot, e.g. after another sensor hung the bus
+                job.missed += 1
+                job.finishSlot(now)
+                return
+            trigger = getattr(job.driver, 'trigger', None)
+            if trigger is not None:
+                trigger()
+            job.collectAt = max(job.nextDue, time.monotonic() + job.conversionTime())
+            return
+
+        if now < job.collectAt:
+            return
+        ready = getattr(job.driver, 'ready', None)
+        if ready is not None and not ready(*job.pollArgs):
+            if now < job.nextDue + job.interval/2:
+                job.collectAt = now + i2cReadyRetry
+                return
+            print("[ERROR] " + job.name + " not ready, slot skipped")
+            job.failed += 1
+            job.finishSlot(now)
+            return
+
+        job.recordLate(time.monotonic() - job.nextDue)
+        sample = job.driver.collect(*job.pollArgs)
+        if sample is not None:
+            self.finisher(*sample)
+            job.samples += 1
+        else:
+            job.failed += 1
+        job.finishSlot(time.monotonic())
+
+    def runPending(self):
+        # Handles every event that is due and returns the seconds until the next one
+        for job in self.jobs:
+            try:
+                self.step(job, time.monotonic())
+            except Exception as e:
+                print("[ERROR] " + job.name + ": %s - %s." % (e,type(e)))
+                job.failed += 1
+                job.finishSlot(time.monotonic())
+
+        now = time.monotonic()
+        if now - self.lastReport >= i2cJitterReport:
+            self.lastReport = now
+            print(self.report())
+        if not self.jobs:
+            return i2cJitterReport
+        return max(0, min(job.nextEvent() for job in self.jobs) - time.monotonic())
+
+    def run(self):
+        while True:
+            time.sleep(self.runPending())
+
+    def jitterStats(self):
+        return {job.name + "".join(job.pollArgs): {
+                    'interval'  : job.interval,
+                    'samples'   : job.samples,
+                    'missed'    : job.missed,
+                    'failed'    : job.failed,
+                    'meanLate'  : job.sumLate/max(1, job.samples + job.failed),
+                    'maxLate'   : job.maxLate,
+                    'histogram' : dict(zip([str(edge) for edge in jitterEdges] + ['more'], job.histogram)),
+                    } for job in self.jobs}
+
+    def report(self):
+        lines = ["I2C read lateness against the due time, counts per bin in ms"]
+        lines.append("{0:<12} {1:>8} {2:>6} {3:>6} {4:>8} {5:>8}  ".format(
+                        "Sensor", "Samples", "Missed", "Failed", "Mean ms", "Max ms") \
+                        + " ".join("{0:>6}".format("<=" + "{0:g}".format(1000*edge)) for edge in jitterEdges) + "   more")
+        for job in self.jobs:
+            lines.append("{0:<12} {1:>8} {2:>6} {3:>6} {4:>8.1f} {5:>8.1f}  ".format(
+                        job.name + "".join(job.pollArgs), job.samples, job.missed, job.failed,
+                        1000*job.sumLate/max(1, job.samples + job.failed), 1000*job.maxLate) \
+                        + " ".join("{0:>6}".format(count) for count in job.histogram[:-1]) \
+                        + " {0:>6}".format(job.histogram[-1]))
+        return "\n".join(lines)
@@ -2,12 +2,17 @@ import json
 import serial
 import datetime
 import os
+import sys
 import csv
+import atexit
 #import deepdish as dd
 import time
 import paho.mqtt.client as mqttClient
 import yaml
+import queue
+import threading
 from mintsXU4 import mintsDefinitions as mD
+from mintsXU4 import mintsSpool as mSP
 
 import ssl
 
@@ -17,6 +22,11 @@ macAddress          = mD.macAddress
 mqttPort            = mD.mqttPort
 mqttBroker          = mD.mqttBroker
 mqttCredentialsFile = mD.mqttCredentialsFile
+mqttQueueSize       = mD.mqttQueueSize
+mqttReconnectMax    = mD.mqttReconnectMax
+mqttSpoolOn         = mD.mqttSpoolOn
+mqttSpoolRate       = mD.mqttSpoolRate
+mqttSpoolWindow     = mD.mqttSpoolWindow
 
 # FOR MQTT 
 credentials = yaml.load(open(mqttCredentialsFile))
@@ -28,64 +38,196 @@ mqttPW      = credentials['mqtt']['password']
 tlsCert     = "/etc/ssl/certs/ca-certificates.crt"  # Put here the path of your TLS cert
 mqtt_client = mqttClient.Client()
 
+# Background publisher
+mqttQueue       = queue.Queue(maxsize=mqttQueueSize)
+connectedEvent  = threading.Event()
+publisherLock   = threading.Lock()
+publisherThread = None
+nextReplay      = 0
+mqttStats       = {
+    'enqueued'     : 0,
+    'published'    : 0,
+    'dropped'      : 0,
+    'failed'       : 0,
+    'latencyTotal' : 0.0,
+    'latencyMax'   : 0.0,
+    }
+
+# Store and forward spool for samples the broker never received, one per
+# reader script as every reader imports this module
+mqttSpool = None
+if mqttSpoolOn:
+    spoolName = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0] or "python"
+    try:
+        mqttSpool = mSP.MQTTSpool(mD.dataFolderSpool+"/"+macAddress+"/mqttSpool/"+spoolName,\
+                                  mD.mqttSpoolSegmentSize, mD.mqttSpoolMaxSegments)
+        # Saves the acknowledged position, so a restart does not replay it
+        atexit.register(mqttSpool.close)
+    except OSError as e:
+        print("[ERROR] MQTT spool not available: {}".format(e))
+
 def on_connect(client, userdata, flags, rc):
     global connected  # Use global variable
     if rc == 0:
 
         print("[INFO] Connected to broker")
         connected = True  # Signal connection
+        connectedEvent.set()
     else:
         print("[INFO] Error, connection failed")
 
 
+def on_disconnect(client, userdata, rc):
+    global connected
+    connected = False
+    connectedEvent.clear()
+    print("[INFO] Disconnected from broker")
+    if mqttSpool is not None:
+        # Unacknowledged replays are sent again after reconnecting
+        mqttSpool.rewind()
+
+
 def on_publish(client, userdata, result):
     print("MQTT Published!")
+    if mqttSpool is not None:
+        mqttSpool.acked(result)
 
 
-def connect(mqtt_client, mqtt_username, mqtt_password, broker_endpoint, port):
-    global connected
-    try:
-        if not mqtt_client.is_connected():
-            print("Reconnecting")
-            mqtt_client.username_pw_set(mqtt_username, password=mqtt_password)
-            mqtt_client.on_connect = on_connect
-            mqtt_client.on_publish = on_publish
-            mqtt_client.tls_set(ca_certs=tlsCert, certfile=None,
-                                keyfile=None, cert_reqs=ssl.CERT_REQUIRED,
-                                tls_version=ssl.PROTOCOL_TLSv1_2, ciphers=None)
-            mqtt_client.tls_insecure_set(False)
+def setUpClient(mqtt_client, mqtt_username, mqtt_password):
+    # TLS can only be configured once per client, so this runs a single time
+    mqtt_client.username_pw_set(mqtt_username, password=mqtt_password)
+    mqtt_client.on_connect    = on_connect
+    mqtt_client.on_disconnect = on_disconnect
+    mqtt_client.on_publish    = on_publish
+    mqtt_client.tls_set(ca_certs=tlsCert, certfile=None,
+                        keyfile=None, cert_reqs=ssl.CERT_REQUIRED,
+                        tls_version=ssl.PROTOCOL_TLSv1_2, ciphers=None)
+    mqtt_client.tls_insecure_set(False)
+    mqtt_client.reconnect_delay_set(min_delay=1, max_delay=mqttReconnectMax)
+
+
+def connect(mqtt_client, broker_endpoint, port):
+    # Only called from the publisher thread. Once the network loop is
+    # running paho takes care of reconnecting with its own backoff.
+    backOff = 1
+    while True:
+        try:
+            print("Connecting to broker")
             mqtt_client.connect(broker_endpoint, port=port)
             mqtt_client.loop_start()
+            return True
+        except Exception as e:
+            print("[ERROR] Could not connect to broker, retrying in {0} s: {1}".format(backOff, e))
+            time.sleep(backOff)
+            backOff = min(2*backOff, mqttReconnectMax)
 
-            attempts = 0
-
-            while not connected and attempts < 5:  # Wait for connection
-                print(connected)
-                print("Attempting to connect...")
-                time.sleep(1)
-                attempts += 1
 
-        if not connected:
-            print("[ERROR] Could not connect to broker")
-            return False
-    
+def spoolItem(item):
+    if mqttSpool is None:
+        mqttStats['dropped'] += 1
+        return
+    try:
+        mqttSpool.append(item[0], item[1])
     except Exception as e:
-        print(e)
-        return False
+        print("[ERROR] Could not spool data, error: {}".format(e))
+        mqttStats['dropped'] += 1
 
-    return True
+
+def replaySpool():
+    # Drains the spool with QoS 1 at mqttSpoolRate records per second,
+    # with at most mqttSpoolWindow records waiting for an acknowledgment
+    global nextReplay
+    now = time.monotonic()
+    if now < nextReplay or mqttSpool.numInFlight() >= mqttSpoolWindow:
+        return
+    record = mqttSpool.nextRecord()
+    if record is None:
+        return
+    info = mqtt_client.publish(record[0], record[1], qos=1)
+    if info.rc == mqttClient.MQTT_ERR_SUCCESS:
+        mqttSpool.sent(info.mid)
+    else:
+        mqttSpool.rewind()
+    nextReplay = now + 1.0/mqttSpoolRate
+
+
+def spoolPending():
+    return mqttSpool is not None and connectedEvent.is_set() and mqttSpool.pending()
+
+
+def publisherLoop():
+    setUpClient(mqtt_client, mqttUN, mqttPW)
+    connect(mqtt_client, broker, port)
+    while True:
+        replaying = spoolPending()
+        try:
+            item = mqttQueue.get(timeout=1.0/mqttSpoolRate if replaying else 1)
+        except queue.Empty:
+            item = None
+
+        if item is not None:
+            topic, payload, enqueueTime = item
+            if not connectedEvent.is_set():
+                spoolItem(item)
+                continue
+            try:
+                info = mqtt_client.publish(topic, payload)
+                if info.rc != mqttClient.MQTT_ERR_SUCCESS:
+                    raise RuntimeError(mqttClient.error_string(info.rc))
+                latency = time.monotonic() - enqueueTime
+                mqttStats['published']    += 1
+                mqttStats['latencyTotal'] += latency
+                mqttStats['latencyMax']    = max(mqttStats['latencyMax'], latency)
+            except Exception as e:
+                print("[ERROR] Could not publish data, error: {}".format(e))
+                mqttStats['failed'] += 1
+                spoolItem(item)
+
+        if replaying:
+            try:
+                replaySpool()
+            except Exception as e:
+                print("[ERROR] Could not replay spooled data, error: {}".format(e))
+                mqttSpool.rewind()
+
+
+def startPublisher():
+    global publisherThread
+    with publisherLock:
+        if publisherThread is None:
+            publisherThread = threading.Thread(target=publisherLoop, name="mqttPublisher", daemon=True)
+            publisherThread.start()
 
 
 def writeMQTTLatest(sensorDictionary,sensorName):
+    # Never blocks the sensor loop: the sample is queued and published
+    # by the background thread, which spools it to disk if the broker is
+    # unreachable. When the queue is full the oldest sample is dropped.
+    if publisherThread is None:
+        startPublisher()
 
-    if connect(mqtt_client, mqttUN, mqttPW, broker, port):
+    item = (macAddress+"/"+sensorName, json.dumps(sensorDictionary), time.monotonic())
+    while True:
         try:
-            mqtt_client.publish(macAddress+"/"+sensorName,json.dumps(sensorDictionary))
+            mqttQueue.put_nowait(item)
+            mqttStats['enqueued'] += 1
+            return True
+        except queue.Full:
+            try:
+                mqttQueue.get_nowait()
+                mqttStats['dropped'] += 1
+            except queue.Empty:
+                pass
 
-        except Exception as e:
-            print("[ERROR] Could not publish data, error: {}".format(e))
-    
-    return True
+
+def getMQTTStats():
+    stats = dict(mqttStats)
+    stats['queueDepth']  = mqttQueue.qsize()
+    stats['connected']   = connected
+    stats['latencyMean'] = stats['latencyTotal']/stats['published'] if stats['published'] else 0.0
+    if mqttSpool is not None:
+        stats['spool']   = dict(mqttSpool.stats)
+    return stats
     
 
 
@@ -0,0 +1,150 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   Latest value store shared within and between processes
+#   ---------------------------------
+#   The newest reading of a sensor is kept in an in-process dictionary
+#   and mirrored into a fixed layout record in a memory mapped file under
+#   dataFolderShared (tmpfs). A record is
+#       begin sequence | monotonic time | epoch time | values | end sequence
+#   The writer bumps the begin sequence to an odd number, writes the
+#   payload and the end sequence, then sets the begin sequence to the
+#   same even number. A reader takes the begin sequence, copies the
+#   record and takes the begin sequence again; the copy is only accepted
+#   when the sequence was even and unchanged throughout, and the copied
+#   end sequence matches it, so a record the writer touched during the
+#   copy is dropped. Staleness is checked against CLOCK_MONOTONIC, which is
+#   shared by all processes on the node.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import os
+import mmap
+import time
+import struct
+import datetime
+import threading
+
+from mintsXU4 import mintsDefinitions as mD
+
+dataFolderShared = mD.dataFolderShared
+macAddress       = mD.macAddress
+
+latestValues     = {}
+sharedRecords    = {}
+storeLock        = threading.Lock()
+
+
+class SharedRecord:
+
+    def __init__(self, sensorName, fields):
+        self.fields   = list(fields)
+        self.layout   = struct.Struct("<Qdd" + "d"*len(self.fields) + "Q")
+        self.endAt    = self.layout.size - 8
+        self.filePath = os.path.join(dataFolderShared, macAddress + "_" + sensorName + ".latest")
+        self.map      = None
+        self.seq      = 0
+
+    def open(self, create):
+        if self.map is not None:
+            return True
+        try:
+            if create:
+                if not os.path.exists(dataFolderShared):
+                    os.makedirs(dataFolderShared)
+                fd = os.open(self.filePath, os.O_RDWR | os.O_CREAT, 0o644)
+            else:
+                fd = os.open(self.filePath, os.O_RDONLY)
+        except OSError:
+            return False
+        try:
+            if os.fstat(fd).st_size != self.layout.size:
+                if not create:
+                    return False
+                # New file or a different field layout, start over
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, self.layout.size)
+            access   = mmap.ACCESS_WRITE if create else mmap.ACCESS_READ
+            self.map = mmap.mmap(fd, self.layout.size, access=access)
+        finally:
+            os.close(fd)
+        if create:
+            # Carry on from the sequence left by a previous writer
+            self.seq = struct.unpack_from("<Q", self.map, self.endAt)[0]
+            self.seq += self.seq % 2
+        return True
+
+    def write(self, monotonicTime, epochTime, values):
+        if not self.open(True):
+            return
+        self.seq += 2
+        struct.pack_into("<Q", self.map, 0, self.seq - 1)
+        self.layout.pack_into(self.map, 0, self.seq - 1, monotonicTime, epochTime, *values, self.seq)
+        struct.pack_into("<Q", self.map, 0, self.seq)
+
+    def read(self, retries=3):
+        if not self.open(False):
+            return None
+        for _ in range(retries):
+            seq = struct.unpack_from("<Q", self.map, 0)[0]
+            if seq % 2:
+                continue
+            record = self.layout.unpack(self.map[:self.layout.size])
+            # Begin sequence read again after the copy, the writer moves it first
+            if struct.unpack_from("<Q", self.map, 0)[0] == seq and record[0] == seq and record[-1] == seq:
+                return record if seq > 0 else None
+        return None
+
+
+def toFloat(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def update(sensorName, dateTime, sensorDictionary, fields):
+    # sensorDictionary needs every name in fields, values are stored as floats
+    values        = [toFloat(sensorDictionary[field]) for field in fields]
+    monotonicTime = time.monotonic()
+    with storeLock:
+        shared = sharedRecords.get(sensorName)
+        if shared is None or shared.fields != list(fields):
+            shared = sharedRecords[sensorName] = SharedRecord(sensorName, fields)
+        try:
+            shared.write(monotonicTime, dateTime.timestamp(), values)
+        except (OSError, ValueError) as e:
+            print("[ERROR] Latest value not shared for " + sensorName + ": " + str(e))
+        record = dict(zip(fields, values))
+        record['seq']       = shared.seq
+        record['monotonic'] = monotonicTime
+        record['dateTime']  = dateTime
+        latestValues[sensorName] = record
+
+
+def latest(sensorName, fields):
+    # Newest record written in this process, else the one shared by another
+    # process. Returns None when the sensor has not been seen yet.
+    record = latestValues.get(sensorName)
+    if record is not None:
+        return record
+
+    with storeLock:
+        shared = sharedRecords.get(sensorName)
+        if shared is None or shared.fields != list(fields):
+            shared = sharedRecords[sensorName] = SharedRecord(sensorName, fields)
+        values = shared.read()
+    if values is None:
+        return None
+
+    record = dict(zip(fields, values[3:-1]))
+    record['seq']       = values[0]
+    record['monotonic'] = values[1]
+    record['dateTime']  = datetime.datetime.fromtimestamp(values[2])
+    return record
+
+
+def age(record):
+    return time.monotonic() - record['monotonic']
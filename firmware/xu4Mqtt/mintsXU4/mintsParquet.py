@@ -0,0 +1,282 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   Parquet backend for the raw daily sensor files
+#   ---------------------------------
+#   Used by sensorFinisher in place of the CSV writer pool when
+#   storageBackend is "parquet" in mintsDefinitions (needs pyarrow).
+#   Samples are buffered per sensor and written as one typed row group
+#   every parquetRowGroupSize rows or parquetFlushInterval seconds. Each
+#   row group goes to its own part file in DD/parts/, closed straight
+#   away, so a crash only loses the buffer. When the day rolls over, and
+#   for days left over from before a restart, the parts are compacted
+#   into MINTS_<mac>_<sensor>_<YYYY_MM_DD>.parquet next to where the CSV
+#   would have been.
+#   Types: dateTime is a timestamp, fields declared float or int in
+#   sensorRegistry.yaml keep that type, other columns are float64 when
+#   every value of the batch is a number and strings otherwise. Where
+#   parts disagree on a column it is compacted as strings, so nothing is
+#   lost. readDays / readRange load date ranges day by day, reading only
+#   the requested columns.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import os
+import glob
+import time
+import atexit
+import datetime
+import threading
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from mintsXU4 import mintsDefinitions as mD
+from mintsXU4 import mintsSensorRegistry as mSRG
+
+dataFolder           = mD.dataFolder
+macAddress           = mD.macAddress
+parquetRowGroupSize  = mD.parquetRowGroupSize
+parquetFlushInterval = mD.parquetFlushInterval
+parquetCompression   = mD.parquetCompression
+parquetCompactDays   = mD.parquetCompactDays
+
+sensorBuffers = {}
+bufferLock    = threading.RLock()
+lastFlushAll  = time.monotonic()
+
+declaredTypes = {'float': pa.float64(), 'int': pa.int64()}
+
+
+def registryTypes():
+    # Column types declared in sensorRegistry.yaml, by sensor name
+    types = {}
+    for descriptor in mSRG.sensorRegistry.values():
+        types[descriptor['sensorName']] = {name: declaredTypes[fieldType] \
+                for name, fieldType in zip(descriptor['fields'], descriptor['types']) \
+                    if fieldType in declaredTypes}
+    return types
+
+sensorTypes = registryTypes()
+
+
+def dailyPath(csvPath):
+    return os.path.splitext(csvPath)[0] + ".parquet"
+
+
+def partPattern(csvPath):
+    folder, name = os.path.split(os.path.splitext(csvPath)[0])
+    return os.path.join(folder, "parts", name + "_*.parquet")
+
+
+def timeArray(values):
+    try:
+        return pa.array([None if value in (None, "") else datetime.datetime.fromisoformat(str(value)) \
+                            for value in values], pa.timestamp('us'))
+    except ValueError:
+        return None
+
+
+def numberArray(values, declared):
+    if declared is None and all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+        declared = pa.int64()
+    convert = int if declared == pa.int64() else float
+    try:
+        return pa.array([None if value in (None, "") else convert(value) for value in values], \
+                            declared or pa.float64())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def buildTable(sensorName, rows):
+    names = []
+    for row in rows:
+        for name in row:
+            if name not in names:
+                names.append(name)
+
+    declared = sensorTypes.get(sensorName, {})
+    arrays   = []
+    for name in names:
+        values = [row.get(name) for row in rows]
+        array  = timeArray(values) if name == "dateTime" else numberArray(values, declared.get(name))
+        if array is None:
+            array = pa.array([None if value is None else str(value) for value in values], pa.string())
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def unifyTables(tables):
+    # Columns keep their type where all tables agree, int and float become
+    # float, anything else becomes string. Missing columns are filled with nulls.
+    columnTypes = {}
+    for table in tables:
+        for field in table.schema:
+            columnTypes.setdefault(field.name, set()).add(field.type)
+
+    schema = []
+    for name, types in columnTypes.items():
+        types.discard(pa.null())
+        if len(types) <= 1:
+            schema.append(pa.field(name, types.pop() if types else pa.string()))
+        elif types <= {pa.int64(), pa.float64()}:
+            schema.append(pa.field(name, pa.float64()))
+        else:
+            schema.append(pa.field(name, pa.string()))
+    schema = pa.schema(schema)
+
+    unified = []
+    for table in tables:
+        arrays = []
+        for field in schema:
+            if field.name in table.column_names:
+                arrays.append(table.column(field.name).cast(field.type))
+            else:
+                arrays.append(pa.nulls(table.num_rows, field.type))
+        unified.append(pa.Table.from_arrays(arrays, schema=schema))
+    return pa.concat_tables(unified)
+
+
+def writeTable(table, path):
+    # Written next to the target and renamed, so readers never see half a file
+    directoryIn = os.path.dirname(path)
+    if not os.path.exists(directoryIn):
+        os.makedirs(directoryIn)
+    tmpPath = path + ".tmp"
+    pq.write_table(table, tmpPath, compression=parquetCompression, row_group_size=parquetRowGroupSize)
+    os.replace(tmpPath, path)
+
+
+def compact(csvPath):
+    # Merges the part files of one sensor and day into the daily file
+    parts = sorted(glob.glob(partPattern(csvPath)))
+    if not parts:
+        return
+    targetPath = dailyPath(csvPath)
+    sources    = ([targetPath] if os.path.isfile(targetPath) else []) + parts
+    writeTable(unifyTables([pq.read_table(path) for path in sources]), targetPath)
+    for path in parts:
+        os.remove(path)
+    partsFolder = os.path.dirname(parts[0])
+    if not os.listdir(partsFolder):
+        os.rmdir(partsFolder)
+    print("Compacted {0} parts into {1}".format(len(parts), targetPath))
+
+
+class SensorBuffer:
+
+    def __init__(self, sensorName, csvPath):
+        self.sensorName = sensorName
+        self.csvPath    = csvPath
+        self.rows       = []
+        self.lastFlush  = time.monotonic()
+        self.sequence   = max([int(path[-13:-8]) + 1 for path in glob.glob(partPattern(csvPath))] or [0])
+
+    def due(self, nowIn):
+        return len(self.rows) >= parquetRowGroupSize or \
+                (len(self.rows) > 0 and (nowIn - self.lastFlush) >= parquetFlushInterval)
+
+    def flush(self):
+        if self.rows:
+            partPath = partPattern(self.csvPath).replace("*", str(self.sequence).zfill(5))
+            writeTable(buildTable(self.sensorName, self.rows), partPath)
+            self.sequence += 1
+            self.rows = []
+        self.lastFlush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        compact(self.csvPath)
+
+
+def compactLeftovers(sensorName, dateTime, pathFunction):
+    # Parts of earlier days which a restart kept from being compacted
+    for days in range(1, parquetCompactDays + 1):
+        try:
+            compact(pathFunction(sensorName, dateTime - datetime.timedelta(days=days)))
+        except Exception as e:
+            print("[ERROR] Could not compact {0} of {1} days ago: {2}".format(sensorName, days, e))
+
+
+def writeRecord(sensorName, csvPath, sensorDictionary, dateTime, pathFunction):
+    global lastFlushAll
+    with bufferLock:
+        buffer = sensorBuffers.get(sensorName)
+        if buffer is not None and buffer.csvPath != csvPath:
+            # Daily rollover
+            buffer.close()
+            buffer = None
+
+        if buffer is None:
+            if sensorName not in sensorBuffers:
+                compactLeftovers(sensorName, dateTime, pathFunction)
+            buffer = SensorBuffer(sensorName, csvPath)
+            sensorBuffers[sensorName] = buffer
+
+        buffer.rows.append(dict(sensorDictionary))
+
+        now = time.monotonic()
+        if buffer.due(now):
+            buffer.flush()
+
+        # Sensors which stopped sending still get their rows on disk
+        if (now - lastFlushAll) >= parquetFlushInterval:
+            for other in sensorBuffers.values():
+                if other.due(now):
+                    other.flush()
+            lastFlushAll = now
+
+
+def flushAll():
+    with bufferLock:
+        for buffer in sensorBuffers.values():
+            try:
+                buffer.flush()
+            except Exception as e:
+                print("[ERROR] Could not flush {0}: {1}".format(buffer.sensorName, e))
+
+
+atexit.register(flushAll)
+
+
+def dayPaths(sensorName, day, folder=None, mac=None):
+    # Daily file and not yet compacted parts of one day
+    folder  = folder or dataFolder
+    mac     = mac or macAddress
+    csvPath = os.path.join(folder, mac, day.strftime("%Y"), day.strftime("%m"), day.strftime("%d"), \
+                "MINTS_" + mac + "_" + sensorName + "_" + day.strftime("%Y_%m_%d") + ".csv")
+    paths   = [dailyPath(csvPath)] if os.path.isfile(dailyPath(csvPath)) else []
+    return paths + sorted(glob.glob(partPattern(csvPath)))
+
+
+def readDays(sensorName, startDate, endDate, columns=None, folder=None, mac=None):
+    # Yields (date, DataFrame) for every day in [startDate, endDate] with data.
+    # Only the given columns are read; columns a file lacks come back empty.
+    day = startDate
+    while day <= endDate:
+        paths = dayPaths(sensorName, day, folder, mac)
+        if paths:
+            tables = []
+            for path in paths:
+                if columns is None:
+                    tables.append(pq.read_table(path))
+                else:
+                    available = set(pq.read_schema(path).names)
+                    tables.append(pq.read_table(path, columns=[name for name in columns if name in available]))
+            table = unifyTables(tables)
+            if columns is not None:
+                table = unifyTables([table, pa.table({name: pa.nulls(0) for name in columns})]) \
+                            .select(list(columns))
+            yield day, table.to_pandas()
+        day += datetime.timedelta(days=1)
+
+
+def readRange(sensorName, startDate, endDate, columns=None, folder=None, mac=None):
+    # Whole range in one DataFrame
+    import pandas as pd
+    frames = [frame for _, frame in readDays(sensorName, startDate, endDate, columns, folder, mac)]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
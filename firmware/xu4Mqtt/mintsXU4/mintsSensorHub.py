@@ -0,0 +1,287 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   Single process sensor hub
+#   ---------------------------------
+#   Runs every serial and I2C device selected in sensorHub.yaml in one
+#   asyncio loop, so pandas, the correction model, the CSV writers and
+#   the MQTT client are loaded once instead of once per reader script.
+#   Serial ports are watched with loop.add_reader and framed into lines
+#   by mintsSerialLines; each line is time stamped on arrival. Anything
+#   that blocks, i.e. the sensor reader write functions (CSV, MQTT and
+#   corrections) and the I2C reads of mintsI2cScheduler, runs on one
+#   worker thread, which keeps the output pipeline single threaded as it
+#   was in the separate scripts. A serial device whose port fails is
+#   closed and reopened after serialReopenDelay seconds.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import yaml
+import time
+import serial
+import asyncio
+import datetime
+import importlib
+import concurrent.futures
+
+from mintsXU4 import mintsDefinitions as mD
+from mintsXU4 import mintsSensorReader as mSR
+from mintsXU4 import mintsSerialLines as mSL
+from mintsXU4 import mintsI2cScheduler as mIS
+
+sensorHubFile     = mD.sensorHubFile
+hubQueueSize      = mD.hubQueueSize
+serialReopenDelay = mD.serialReopenDelay
+
+worker = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+
+def runBlocking(function, *arguments):
+    return asyncio.get_event_loop().run_in_executor(worker, function, *arguments)
+
+
+def resolvePort(portIn, index=0):
+    # A port list or string from mintsDefinitions, or a device path
+    port = getattr(mD, portIn, portIn) if isinstance(portIn, str) else portIn
+    if isinstance(port, (list, tuple)):
+        return port[index] if len(port) > index else None
+    return port
+
+
+class SerialDevice:
+
+    def __init__(self, name, port, baudRate, terminator=b'\n'):
+        self.name       = name
+        self.port       = port
+        self.baudRate   = baudRate
+        self.terminator = terminator
+        self.ser        = None
+        self.reader     = None
+        self.lines      = None
+        self.dropped    = 0
+
+    def open(self):
+        self.ser = serial.Serial(
+            port= self.port,\
+            baudrate=self.baudRate,\
+            parity  =serial.PARITY_NONE,\
+            stopbits=serial.STOPBITS_ONE,\
+            bytesize=serial.EIGHTBITS,\
+            timeout=0)
+        self.reader = mSL.SerialLineReader(self.ser, self.terminator)
+        self.lines  = asyncio.Queue(hubQueueSize)
+        asyncio.get_event_loop().add_reader(self.ser.fileno(), self.onReadable)
+        print("Connected to: " + self.ser.portstr + " (" + self.name + ")")
+
+    def close(self):
+        if self.ser is None:
+            return
+        try:
+            asyncio.get_event_loop().remove_reader(self.ser.fileno())
+        except (ValueError, OSError):
+            pass
+        try:
+            self.ser.close()
+        except Exception:
+            pass
+        self.ser = None
+
+    def onReadable(self):
+        try:
+            self.reader.fill(0)
+        except Exception as e:
+            print("[ERROR] " + self.name + " read failed: " + str(e))
+            asyncio.get_event_loop().remove_reader(self.ser.fileno())
+            # The sentinel has to get in, over the oldest line if need be
+            if self.lines.full():
+                self.lines.get_nowait()
+                self.dropped += 1
+            self.lines.put_nowait(None)
+            return
+        dateTime = datetime.datetime.now()
+        line = self.reader.takeLine()
+        while line is not None:
+            try:
+                self.lines.put_nowait((line, dateTime))
+            except asyncio.QueueFull:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 100 == 0:
+                    print("[ERROR] " + self.name + " line dropped, output is behind (" + str(self.dropped) + " dropped)")
+            line = self.reader.takeLine()
+
+    async def readLine(self, timeout=None):
+        # (line, arrival dateTime); raises when the port has failed
+        item = await asyncio.wait_for(self.lines.get(), timeout)
+        if item is None:
+            raise serial.SerialException(self.name + " port lost")
+        return item
+
+    def write(self, text):
+        self.ser.write(str.encode(text))
+
+    async def run(self, session):
+        while True:
+            try:
+                self.open()
+                await session(self)
+            except asyncio.CancelledError:
+                self.close()
+                raise
+            except Exception as e:
+                print("[ERROR] " + self.name + ": %s - %s." % (e,type(e)))
+            self.close()
+            await asyncio.sleep(serialReopenDelay)
+
+
+def streamLines(handleLine):
+    # Session for sensors which send lines on their own
+    async def session(device):
+        while True:
+            line, dateTime = await device.readLine()
+            try:
+                await runBlocking(handleLine, line, dateTime)
+            except Exception as e:
+                print("[ERROR] " + device.name + " line not handled: " + str(e))
+                print(line)
+    return session
+
+
+def rateLimited(writers, delta):
+    # Writes the first sentence of each kind every delta seconds, as the
+    # AirMar and GPS readers did. writers maps a prefix to (key, function),
+    # prefixes sharing a key share the time limit.
+    lastTimes = {key: time.time() for key, _ in writers.values()}
+    def handleLine(line, dateTime):
+        dataString = line.rstrip('\r')
+        for prefix, (key, writer) in writers.items():
+            if dataString.startswith(prefix) and mSR.getDeltaTime(lastTimes[key], delta):
+                writer(dataString, dateTime)
+                lastTimes[key] = time.time()
+    return handleLine
+
+
+def ips7100Line(line, dateTime):
+    print("================")
+    mSR.IPS7100Write(line, dateTime)
+
+
+airMarWriters = {
+    "$HCHDT" : ("HCHDT", mSR.HCHDTWriteAM),
+    "$WIMWV" : ("WIMWV", mSR.WIMWVWriteAM),
+    "$GPGGA" : ("GPGGA", mSR.GPGGAWriteAM),
+    "$GPVTG" : ("GPVTG", mSR.GPVTGWriteAM),
+    "$GPZDA" : ("GPZDA", mSR.GPZDAWriteAM),
+    "$WIMDA" : ("WIMDA", mSR.WIMDAWriteAM),
+    "$YXXDR,": ("YXXDR", mSR.YXXDRWriteAM2),
+    }
+
+gpsWriters = {
+    "$GPGGA" : ("GGA", mSR.GPSGPGGA2Write),
+    "$GPRMC" : ("RMC", mSR.GPSGPRMC2Write),
+    "$GNGGA" : ("GGA", mSR.GPSGPGGA2Write),
+    "$GNRMC" : ("RMC", mSR.GPSGPRMC2Write),
+    }
+
+
+async def rg15Session(device, loopInterval=10, timeOut=60):
+    # Same start up as rg15Reader.py: reset, force high resolution and
+    # metric units, then ask for a reading every loopInterval seconds
+    loop = asyncio.get_event_loop()
+    print("First Data Read")
+    device.write('R\r\n')
+    for command, printStr in (('O', "Reset Sensor"), ('H', "Force High Resolution"), ('M', "Force Metric System")):
+        line, _ = await device.readLine(timeOut)
+        print(line.rstrip('\r'))
+        await asyncio.sleep(5)
+        print(printStr)
+        device.write(command + '\r\n')
+        await asyncio.sleep(2)
+        if command == 'O':
+            print("Second Data Read")
+            device.write('R\r\n')
+            await asyncio.sleep(2)
+
+    startTime = loop.time()
+    while True:
+        line, dateTime = await device.readLine(timeOut)
+        dataString = line.replace("\r","")
+        print(dataString)
+        if dataString.count('Acc')==3:
+            await runBlocking(mSR.RG15Write, dataString, dateTime)
+        await asyncio.sleep(max(1, loopInterval - (loop.time() - startTime)))
+        print("Read Command Sent")
+        device.write('R\r\n')
+        startTime = loop.time()
+
+
+serialSessions = {
+    "IPS7100" : streamLines(ips7100Line),
+    "AirMar"  : streamLines(rateLimited(airMarWriters, 5)),
+    "GPS"     : streamLines(rateLimited(gpsWriters, 2)),
+    "RG15"    : rg15Session,
+    }
+
+# module, class, initiate arguments and one collect argument tuple per poll
+i2cDrivers = {
+    "BME280"  : ("mintsI2c.i2c_bme280",  "BME280",   (30,), [()]),
+    "SCD30"   : ("mintsI2c.i2c_scd30",   "SCD30",    (30,), [()]),
+    "AS7265X" : ("mintsI2c.i2c_as7265x", "AS7265X",  (),    [()]),
+    "PA101D"  : ("mintsI2c.i2c_pa101d",  "PAI101D_", (),    [("GGA",), ("RMC",)]),
+    }
+
+
+def startI2c(i2cConfig):
+    # Opens the bus, initiates the configured drivers and schedules them, blocking
+    import smbus2
+    bus       = smbus2.SMBus(i2cConfig.get('bus', 1))
+    scheduler = mIS.I2cScheduler()
+    for name, settings in (i2cConfig.get('devices') or {}).items():
+        if name not in i2cDrivers:
+            print("[ERROR] Unknown I2C device " + name)
+            continue
+        moduleName, className, initiateArgs, polls = i2cDrivers[name]
+        driver = getattr(importlib.import_module(moduleName), className)(bus, False)
+        if driver.initiate(*initiateArgs):
+            print(name + " Online")
+            for pollArgs in polls:
+                scheduler.add(name, driver, (settings or {}).get('interval', 10), pollArgs)
+        else:
+            print(name + " Not Found")
+    return scheduler
+
+
+async def runI2c(scheduler):
+    # Due checks run on the worker, the waits between them on the loop
+    while True:
+        await asyncio.sleep(await runBlocking(scheduler.runPending))
+
+
+def loadConfig(configFile=None):
+    with open(configFile or sensorHubFile, 'r') as fp:
+        return yaml.safe_load(fp) or {}
+
+
+async def runHub(config):
+    tasks = []
+    for name, settings in (config.get('serial') or {}).items():
+        port = resolvePort(settings['port'], settings.get('index', 0))
+        if not port:
+            print(name + " port not found, skipped")
+            continue
+        if settings['handler'] not in serialSessions:
+            print("[ERROR] Unknown handler " + str(settings['handler']) + " for " + name)
+            continue
+        terminator = settings.get('terminator', '\n').encode()
+        device     = SerialDevice(name, port, settings.get('baudRate', 9600), terminator)
+        tasks.append(asyncio.ensure_future(device.run(serialSessions[settings['handler']])))
+
+    if config.get('i2c'):
+        scheduler = await runBlocking(startI2c, config['i2c'])
+        tasks.append(asyncio.ensure_future(runI2c(scheduler)))
+
+    if not tasks:
+        print("No devices to run")
+        return
+    await asyncio.gather(*tasks)
@@ -20,6 +20,10 @@ import csv
 #import deepdish as dd
 from mintsXU4 import mintsLatest as mL
 from mintsXU4 import mintsDefinitions as mD
+from mintsXU4 import mintsWriter as mW
+from mintsXU4 import mintsSensorRegistry as mSRG
+from mintsXU4 import mintsSeriesStore as mSS
+from mintsXU4 import mintsAggregator as mA
 from getmac import get_mac_address
 import time
 import serial
@@ -29,7 +33,6 @@ import netifaces as ni
 import math
 import json
 import pandas as pd 
-from mintsPMCorrections import corrections as mC
 import traceback
 
 macAddress      = mD.macAddress
@@ -38,7 +41,17 @@ latestDisplayOn = mD.latestDisplayOn
 dataFolderMQTT  = mD.dataFolderMQTT
 latestOn        = mD.latestOn
 mqttOn          = mD.mqttOn
+sqliteOn        = mD.sqliteOn
+aggregateOn     = mD.aggregateOn
 dataFolderTmp   = mD.dataFolderTmp
+storageBackend  = mD.storageBackend
+
+if storageBackend == "parquet":
+    from mintsXU4 import mintsParquet as mP
+
+# Imported after the writers, so its exit time batch flush runs before their
+# exit handlers, atexit runs them in reverse
+from mintsPMCorrections import corrections as mC
 
 
 
@@ -47,20 +60,27 @@ def sensorFinisher(dateTime,sensorName,sensorDictionary):
     print("-----------------------------------")
     print("-------- Sensor Finisher ----------")
     print(sensorName)
-    writePath = getWritePath(sensorName,dateTime)
-    exists = directoryCheck(writePath)
-    writeCSV2(writePath,sensorDictionary,exists)
+    writePath = mW.getWritePathCached(sensorName,dateTime,getWritePath)
+    if storageBackend == "parquet":
+        mP.writeRecord(sensorName,writePath,sensorDictionary,dateTime,getWritePath)
+    else:
+        mW.writeRow(sensorName,writePath,sensorDictionary)
     print(writePath)
 
     if(latestOn):
        mL.writeJSONLatest(sensorDictionary,sensorName)
-    if(mqttOn):
+    if(mqttOn and mA.sendsRawMqtt(sensorName)):
        mL.writeMQTTLatest(sensorDictionary,sensorName)   
-
+    if(sqliteOn):
+       mSS.insert(sensorName,dateTime,sensorDictionary)
 
     mC.doPrediction(sensorName,sensorDictionary,dateTime)
     print()
 
+    if(aggregateOn):
+       for summary in mA.addSample(dateTime,sensorName,sensorDictionary):
+           sensorFinisher(*summary)
+
 
 
 
@@ -119,56 +139,9 @@ def sensorSplit(dataQuota,dateTime):
         sensorSend(sensorID,sensorData,dateTime)
 
 def sensorSend(sensorID,sensorData,dateTime):
-    if(sensorID=="BME680"):
-        BME680Write(sensorData,dateTime)
-    if(sensorID=="BME280"):
-        BME280Write(sensorData,dateTime)
-    if(sensorID=="MGS001"):
-        MGS001Write(sensorData,dateTime)
-    if(sensorID=="SCD30"):
-        SCD30Write(sensorData,dateTime)
-    if(sensorID=="VEML6075"):
-        VEML6075Write(sensorData,dateTime)
-    if(sensorID=="AS7262"):
-        AS7262Write(sensorData,dateTime)
-    if(sensorID=="PPD42NSDuo"):
-        PPD42NSDuoWrite(sensorData,dateTime)
-    if(sensorID=="OPCN2"):
-        OPCN2Write(sensorData,dateTime)
-    if(sensorID=="OPCN3"):
-        OPCN3Write(sensorData,dateTime)
-    if(sensorID=="VEML6070"):
-        VEML6070Write(sensorData,dateTime)
-    if(sensorID=="TSL2591"):
-        TSL2591Write(sensorData,dateTime)
-    if(sensorID=="LIBRAD"):
-        LIBRADWrite(sensorData,dateTime)
-    if(sensorID=="HTU21D"):
-        HTU21DWrite(sensorData,dateTime)
-    if(sensorID=="BMP280"):
-        BMP280Write(sensorData,dateTime)
-    if(sensorID=="INA219"):
-        INA219Write(sensorData,dateTime)
-    if(sensorID=="PPD42NS"):
-        PPD42NSWrite(sensorData,dateTime)
-    if(sensorID=="TMG3993"):
-        TMG3993Write(sensorData, dateTime)
-    if(sensorID=="GL001"):
-        GL001Write(sensorData, dateTime)
-    if(sensorID=="GUV001"):
-        GUV001Write(sensorData, dateTime)
-    if(sensorID=="APDS9002"):
-        APDS9002Write(sensorData, dateTime)
-    if(sensorID=="HM3301"):
-        HM3301Write(sensorData, dateTime)
-    if(sensorID=="SI114X"):
-        SI114XWrite(sensorData, dateTime)
-    # Added on May 21 st, 2020 
-    if(sensorID=="SEN0232"):
-        SEN0232Write(sensorData, dateTime)
-    if(sensorID=="AS3935"):
-        AS3935Write(sensorData, dateTime)
-    # End (Added on May 21 st, 2020 )
+    sensorName, sensorDictionary = mSRG.parse(sensorID,sensorData,dateTime)
+    if sensorDictionary is not None:
+        sensorFinisher(dateTime,sensorName,sensorDictionary)
 
 # Added on Feb 13, 2023
 def RG15Write(sensorData, dateTime):
@@ -366,37 +339,6 @@ def YXXDRWriteAM2(sensorData,dateTime):
 
         sensorFinisher(dateTime,sensorName,sensorDictionary)
 
-########################    
-# Added on May 21 st, 2020 
-def SEN0232Write(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "SEN0232"
-    dataLength = 3
-    if(len(dataOut) == (dataLength +1)):
-        sensorDictionary =  OrderedDict([
-                ("dateTime"   , str(dateTime)), 
-        		("rawAnalog"  ,dataOut[0]), 
-            	("rawVoltage" ,dataOut[1]),
-                ("dB"         ,dataOut[2])
-                ])
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
-def AS3935Write(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "AS3935"
-    dataLength = 3
-    if(len(dataOut) == (dataLength +1)):
-        sensorDictionary =  OrderedDict([
-                ("dateTime" , str(dateTime)), 
-        		("source"   ,dataOut[0]), 
-            	("energy"   ,dataOut[1]),
-                ("distance" ,dataOut[2])
-                ])
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-# End (Added on May 21 st, 2020)
-
-        
 def IPS7100Write(sensorData,dateTime):
     dataOut    = sensorData.split(',')
     sensorName = "IPS7100"
@@ -424,434 +366,6 @@ def IPS7100Write(sensorData,dateTime):
         print(sensorDictionary)
         sensorFinisher(dateTime,sensorName,sensorDictionary)
         
-def BME680Write(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "BME680"
-    dataLength = 4
-    if(len(dataOut) == (dataLength +1)):
-        sensorDictionary =  OrderedDict([
-                ("dateTime"     , str(dateTime)), # always the same
-        		("temperature"  ,dataOut[0]), # check with arduino code
-            	("pressure"     ,dataOut[1]),
-                ("humidity"     ,dataOut[2]),
-            	("gas"          ,dataOut[3])
-                ])
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-        
-        
-def BME280Write(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "BME280"
-    dataLength = 4
-    if(len(dataOut) == (dataLength +1)):
-        sensorDictionary =  OrderedDict([
-                ("dateTime"     , str(dateTime)), # always the same
-        		("temperature"  ,dataOut[0]), # check with arduino code
-            	("pressure"     ,dataOut[1]),
-                ("humidity"     ,dataOut[2]),
-            	("altitude"     ,dataOut[3])
-                ])
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
-def MGS001Write(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "MGS001"
-    dataLength = 8
-    if(len(dataOut) == (dataLength +1)):
-        sensorDictionary =  OrderedDict([
-                ("dateTime"   , str(dateTime)),
-        		("nh3"        ,dataOut[0]),
-            	("co"         ,dataOut[1]),
-                ("no2"        ,dataOut[2]),
-            	("c3h8"       ,dataOut[3]),
-        		("c4h10"      ,dataOut[4]),
-            	("ch4"        ,dataOut[5]),
-                ("h2"         ,dataOut[6]),
-            	("c2h5oh  "   ,dataOut[7]),
-                ])
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
-def SCD30Write(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "SCD30"
-    dataLength = 3
-    if(len(dataOut) == (dataLength +1)):
-        sensorDictionary =  OrderedDict([
-                ("dateTime"     , str(dateTime)),
-        		("c02"          ,dataOut[0]),
-            	("temperature"  ,dataOut[1]),
-                ("humidity"     ,dataOut[2]),
-
-                ])
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
-def LIBRADWrite(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "LIBRAD"
-    dataLength = 4
-    if(len(dataOut) ==(dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"           ,str(dateTime)),
-        	    ("countPerMinute"     ,dataOut[0]),
-            	("radiationValue"     ,dataOut[1]),
-                ("timeSpent"          ,dataOut[2]),
-                ("LIBRADCount"        ,dataOut[3])
-        	     ])
-
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-def SI114XWrite(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "SI114X"
-    dataLength = 6
-    if(len(dataOut) == (dataLength +1)):
-        sensorDictionary =  OrderedDict([
-                ("dateTime"     , str(dateTime)), # always the same
-                        ("visible"  ,dataOut[0]), # check with arduino code
-                ("ir"     ,dataOut[1]),
-                ("uv"     ,dataOut[2]),
-                ("proximity1"     ,dataOut[3]),
-                ("proximity2"     ,dataOut[4]),
-                ("proximity3"     ,dataOut[5])
-                ])
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
-def VEML6070Write(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "VEML6070"
-    dataLength = 1
-    if(len(dataOut) ==(dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"    , str(dateTime)),
-        	    ("UVLightLevel" ,dataOut[0]),
-        	     ])
-
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
-def TSL2591Write(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "TSL2591"
-    dataLength = 5
-    if(len(dataOut) ==(dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"   ,str(dateTime)),
-        	    ("luminosity" ,dataOut[0]),
-            	("ir"         ,dataOut[1]),
-                ("full"       ,dataOut[2]),
-                ("visible"    ,dataOut[3]),
-                ("lux"        ,dataOut[4])
-        	     ])
-
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-def VEML6075Write(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "VEML6075"
-    dataLength = 7
-    if(len(dataOut) ==(dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"    , str(dateTime)),
-        	    ("rawUVA" ,dataOut[0]),
-                ("rawUVB" ,dataOut[1]),
-        	    ("visibleCompensation" ,dataOut[2]),
-                ("irCompensation" ,dataOut[3]),
-                ("uva" ,dataOut[4]),
-                ("uvb" ,dataOut[5]),
-                ("index" ,dataOut[6]),
-        	     ])
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
-def AS7262Write(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "AS7262"
-    dataLength = 13
-    if(len(dataOut) ==(dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"          ,str(dateTime)),
-                ("temperature"        ,dataOut[0]),
-                ("violetPre"          ,dataOut[1]),
-            	("bluePre"            ,dataOut[2]),
-                ("greenPre"           ,dataOut[3]),
-                ("yellowPre"          ,dataOut[4]),
-                ("orangePre"          ,dataOut[5]),
-        	    ("redPre"             ,dataOut[6]),
-                ("violetCalibrated"   ,dataOut[7]),
-            	("blueCalibrated"     ,dataOut[8]),
-                ("greenCalibrated"    ,dataOut[9]),
-                ("yellowCalibrated"   ,dataOut[10]),
-                ("orangeCalibrated"   ,dataOut[11]),
-                ("redCalibrated"      ,dataOut[12])
-        	    ])
-
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
-
-
-
-
-
-def HTU21DWrite(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "HTU21D"
-    dataLength = 2
-    if(len(dataOut) ==(dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"    , str(dateTime)),
-        	    ("temperature" ,dataOut[0]),
-            	("humidity"    ,dataOut[1])
-        	     ])
-
-
-        #Getting Write Path
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-def BMP280Write(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "BMP280"
-    dataLength = 2
-    if(len(dataOut) == (dataLength +1)):
-        sensorDictionary =  OrderedDict([
-                ("dateTime"     , str(dateTime)),
-        		("temperature"  ,dataOut[0]),
-            	("pressure"     ,dataOut[1])
-                ])
-
-        #Getting Write Path
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-def INA219Write(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "INA219"
-    dataLength = 5
-
-    if(len(dataOut) == (dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"      ,str(dateTime)),
-        	    ("shuntVoltage"  ,dataOut[0]),
-            	("busVoltage"    ,dataOut[1]),
-                ("currentMA"     ,dataOut[2]),
-                ("powerMW"       ,dataOut[3]),
-                ("loadVoltage"   ,dataOut[4])
-        	     ])
-
-        #Getting Write Path
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-def OPCN2Write(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "OPCN2"
-    dataLength= 28
-    if(len(dataOut) == (dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"    ,str(dateTime)),
-        		("valid"       ,dataOut[0]),
-            	("binCount0"   ,dataOut[1]),
-            	("binCount1"   ,dataOut[2]),
-            	("binCount2"   ,dataOut[3]),
-            	("binCount3"   ,dataOut[4]),
-            	("binCount4"   ,dataOut[5]),
-            	("binCount5"   ,dataOut[6]),
-            	("binCount6"   ,dataOut[7]),
-            	("binCount7"   ,dataOut[8]),
-            	("binCount8"   ,dataOut[9]),
-            	("binCount9"   ,dataOut[10]),
-            	("binCount10"  ,dataOut[11]),
-            	("binCount11"  ,dataOut[12]),
-            	("binCount12"  ,dataOut[13]),
-            	("binCount13"  ,dataOut[14]),
-            	("binCount14"  ,dataOut[15]),
-                ("binCount15"  ,dataOut[16]),
-                ("bin1TimeToCross"      ,dataOut[17]),
-                ("bin3TimeToCross"      ,dataOut[18]),
-                ("bin5TimeToCross"      ,dataOut[19]),
-                ("bin7TimeToCross"      ,dataOut[20]),
-                ("sampleFlowRate"       ,dataOut[21]),
-                ("temperatureOrPressure",dataOut[22]),
-                ("samplingPeriod"       ,dataOut[23]),
-                ("checkSum"             ,dataOut[24]),
-                ("pm1"                  ,dataOut[25]),
-                ("pm2_5"                ,dataOut[26]),
-                ("pm10"                 ,dataOut[27])
-                ])
-
-        #Getting Write Path
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
-
-def OPCN3Write(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "OPCN3"
-    dataLength=43
-    if(len(dataOut) == (dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"    ,str(dateTime)),
-        		("valid"       ,dataOut[0]),
-            	("binCount0"   ,dataOut[1]),
-            	("binCount1"   ,dataOut[2]),
-            	("binCount2"   ,dataOut[3]),
-            	("binCount3"   ,dataOut[4]),
-            	("binCount4"   ,dataOut[5]),
-            	("binCount5"   ,dataOut[6]),
-            	("binCount6"   ,dataOut[7]),
-            	("binCount7"   ,dataOut[8]),
-            	("binCount8"   ,dataOut[9]),
-            	("binCount9"   ,dataOut[10]),
-            	("binCount10"  ,dataOut[11]),
-            	("binCount11"  ,dataOut[12]),
-            	("binCount12"  ,dataOut[13]),
-            	("binCount13"  ,dataOut[14]),
-            	("binCount14"  ,dataOut[15]),
-            	("binCount15"  ,dataOut[16]),
-            	("binCount16"  ,dataOut[17]),
-            	("binCount17"  ,dataOut[18]),
-            	("binCount18"  ,dataOut[19]),
-            	("binCount19"  ,dataOut[20]),
-            	("binCount20"  ,dataOut[21]),
-            	("binCount21"  ,dataOut[22]),
-            	("binCount22"  ,dataOut[23]),
-            	("binCount23"  ,dataOut[24]),
-                ("bin1TimeToCross"      ,dataOut[25]),
-                ("bin3TimeToCross"      ,dataOut[26]),
-                ("bin5TimeToCross"      ,dataOut[27]),
-                ("bin7TimeToCross"      ,dataOut[28]),
-                ("samplingPeriod"       ,dataOut[29]),
-                ("sampleFlowRate"       ,dataOut[30]),
-                ("temperature"          ,str(float(dataOut[31])/1000)),
-                ("humidity"             ,str(float(dataOut[32])/500)),
-                ("pm1"                ,dataOut[33]),
-                ("pm2_5"              ,dataOut[34]),
-                ("pm10"               ,dataOut[35]),
-                ("rejectCountGlitch"    ,dataOut[36]),
-                ("rejectCountLongTOF"   ,dataOut[37]),
-                ("rejectCountRatio"     ,dataOut[38]),
-                ("rejectCountOutOfRange",dataOut[39]),
-                ("fanRevCount"          ,dataOut[40]),
-                ("laserStatus"          ,dataOut[41]),
-                ("checkSum"             ,dataOut[42])
-                ])
-
-        #Getting Write Path
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-def PPD42NSDuoWrite(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "PPD42NSDuo"
-    dataLength = 8
-    if(len(dataOut) ==(dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"           ,str(dateTime)),
-                ("sampleTimeSeconds"  ,dataOut[0]),
-                ("LPOPmMid"           ,dataOut[1]),
-            	("LPOPm10"            ,dataOut[2]),
-                ("ratioPmMid"         ,dataOut[3]),
-                ("ratioPm10"          ,dataOut[4]),
-        	("concentrationPmMid" ,dataOut[5]),
-                ("concentrationPm2_5" ,dataOut[6]),
-                ("concentrationPm10"  ,dataOut[7])
-        	     ])
-
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
-def PPD42NSWrite(sensorData,dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "PPD42NS"
-    dataLength = 4
-    if(len(dataOut) ==(dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"           ,str(dateTime)),
-        	    ("lowPulseOccupancy"  ,dataOut[0]),
-            	("concentration"      ,dataOut[1]),
-                ("ratio"              ,dataOut[2]),
-                ("timeSpent"          ,dataOut[3])
-        	     ])
-
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
-
-
-
-def TMG3993Write(sensorData, dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "TMG3993"
-    dataLength = 5
-    if(len(dataOut) ==(dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"           ,str(dateTime)),
-                ("infraRed"           ,dataOut[0]),
-            	("red"                ,dataOut[1]),
-                ("green"              ,dataOut[2]),
-                ("blue"               ,dataOut[3]),
-                ("proximity"          ,dataOut[4])
-        	     ])
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-def GL001Write(sensorData, dateTime):
-    print("GL001Write: {0}".format(dateTime))
-    dataOut    = sensorData.split(':')
-    sensorName = "GL001"
-    dataLength = 1
-    if(len(dataOut) ==(dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"           ,str(dateTime)),
-                ("lightLevel"          ,dataOut[0])
-        	     ])
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
-
-
-def GUV001Write(sensorData, dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "GUV001"
-    dataLength = 1
-    if(len(dataOut) ==(dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"           ,str(dateTime)),
-                ("uvLevel"          ,dataOut[0])
-        	     ])
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
-
-
-def APDS9002Write(sensorData, dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "APDS9002"
-    dataLength = 3
-    if(len(dataOut) ==(dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"           ,str(dateTime)),
-                ("luminance"          ,dataOut[0]),
-                ("voltage"          ,dataOut[1]),
-                ("raw"          ,dataOut[2])
-        	     ])
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
-def HM3301Write(sensorData, dateTime):
-    dataOut    = sensorData.split(':')
-    sensorName = "HM3301"
-    dataLength = 3
-    if(len(dataOut) ==(dataLength +1)):
-        sensorDictionary = OrderedDict([
-                ("dateTime"           ,str(dateTime)),
-                ("pm1"          ,dataOut[0]),
-                ("pm2_5"          ,dataOut[1]),
-                ("pm10"          ,dataOut[2])
-        	     ])
-        sensorFinisher(dateTime,sensorName,sensorDictionary)
-
-
 def TB108LWrite(sensorData, dateTime):
     dataOut    = sensorData.split(',')
     sensorName = "TB108L"
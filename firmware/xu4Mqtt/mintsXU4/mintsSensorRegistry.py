@@ -0,0 +1,93 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   Registry of Arduino sensor frame layouts
+#   ---------------------------------
+#   Every sensor which arrives as #mintsO!<sensorID>><values> is described
+#   by an entry in sensorRegistry.yaml: its CSV name, separator, number of
+#   values and field names. sensorSend looks the sensor ID up once in
+#   sensorRegistry instead of testing every ID in turn, and new sensors
+#   only need a new YAML entry.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import yaml
+from collections import OrderedDict
+
+from mintsXU4 import mintsDefinitions as mD
+
+sensorRegistryFile = mD.sensorRegistryFile
+
+sensorRegistry     = {}
+fieldTypes         = {'str': str, 'float': float, 'int': int}
+
+
+def fieldConverter(field):
+    # None keeps the raw string, which is what the CSV files have always held
+    fieldType = fieldTypes[field.get('type', 'str')]
+    scale     = field.get('scale')
+    if scale is None:
+        return None if fieldType is str else fieldType
+    return lambda value: fieldType(float(value)/scale)
+
+
+def registerSensor(sensorID, descriptor):
+    fields = [field if isinstance(field, dict) else {'name': str(field)} \
+                for field in descriptor['fields']]
+    dataLength = descriptor.get('dataLength', len(fields))
+    if dataLength != len(fields):
+        raise ValueError("{0}: dataLength {1} does not match {2} fields"\
+                            .format(sensorID, dataLength, len(fields)))
+
+    converters = [fieldConverter(field) for field in fields]
+    sensorRegistry[sensorID] = {
+        'sensorName' : descriptor.get('sensorName', sensorID),
+        'separator'  : descriptor.get('separator', ':'),
+        'dataLength' : dataLength,
+        'fields'     : tuple(field['name'] for field in fields),
+        'types'      : tuple(field.get('type', 'str') for field in fields),
+        'converters' : converters if any(converters) else None,
+        }
+
+
+def loadRegistry(registryFile):
+    with open(registryFile, 'r') as fp:
+        sensors = yaml.safe_load(fp)['sensors']
+    for sensorID, descriptor in sensors.items():
+        registerSensor(str(sensorID), descriptor)
+
+
+def parse(sensorID, sensorData, dateTime):
+    # Returns (sensorName, sensorDictionary). The dictionary is None when
+    # the sensor is unknown or the frame has the wrong number of values.
+    descriptor = sensorRegistry.get(sensorID)
+    if descriptor is None:
+        return None, None
+
+    dataOut = sensorData.split(descriptor['separator'])
+    if len(dataOut) != descriptor['dataLength'] + 1:
+        return descriptor['sensorName'], None
+
+    converters = descriptor['converters']
+    if converters is not None:
+        dataOut = [value if convert is None else convert(value) \
+                    for convert, value in zip(converters, dataOut)]
+
+    sensorDictionary = OrderedDict([("dateTime", str(dateTime))])
+    sensorDictionary.update(zip(descriptor['fields'], dataOut))
+    return descriptor['sensorName'], sensorDictionary
+
+
+def describe():
+    return OrderedDict((sensorID, {
+                'sensorName' : descriptor['sensorName'],
+                'separator'  : descriptor['separator'],
+                'dataLength' : descriptor['dataLength'],
+                'fields'     : list(descriptor['fields']),
+                'types'      : list(descriptor['types'])}) \
+            for sensorID, descriptor in sorted(sensorRegistry.items()))
+
+
+loadRegistry(sensorRegistryFile)
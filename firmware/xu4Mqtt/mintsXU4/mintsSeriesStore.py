@@ -0,0 +1,263 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   SQLite time series store for on node queries
+#   ---------------------------------
+#   With sqliteOn, sensorFinisher also hands every sample to this store.
+#   Each sensor has its own table: t (epoch seconds, indexed) followed by
+#   the sample's keys, with columns added as new keys show up. Numeric
+#   strings are stored as numbers. Samples are queued and inserted in one
+#   transaction every sqliteBatchSize samples, or by a flusher thread
+#   once the oldest has waited sqliteBatchSeconds, in WAL mode so other
+#   processes can query while a reader script writes.
+#   Rows older than sqliteRetentionDays are deleted by time range once an
+#   hour. window / lastSeconds return numpy arrays, text values as NaN.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import os
+import time
+import atexit
+import sqlite3
+import datetime
+import threading
+import numpy as np
+
+from mintsXU4 import mintsDefinitions as mD
+
+sqliteFile          = mD.sqliteFile
+sqliteBatchSize     = mD.sqliteBatchSize
+sqliteBatchSeconds  = mD.sqliteBatchSeconds
+sqliteRetentionDays = mD.sqliteRetentionDays
+sqliteBusyTimeout   = mD.sqliteBusyTimeout
+
+retentionInterval   = 3600
+
+
+def quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def toEpoch(value):
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    return float(value)
+
+
+def toValue(value):
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+class SeriesStore:
+
+    def __init__(self, dbFile):
+        directoryIn = os.path.dirname(dbFile)
+        if directoryIn and not os.path.exists(directoryIn):
+            os.makedirs(directoryIn)
+        self.db = sqlite3.connect(dbFile, timeout=sqliteBusyTimeout,
+                                  isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.lock          = threading.RLock()
+        self.changed       = threading.Condition(self.lock)
+        self.closed        = False
+        self.columns       = {}
+        self.pending       = []
+        self.pendingSince  = None
+        self.lastRetention = 0
+        self.dropped       = 0
+        self.flusher       = threading.Thread(target=self.flushLoop, name="sqliteFlusher", daemon=True)
+        self.flusher.start()
+
+    def tableColumns(self, sensorName):
+        # Columns of a sensor's table, created on first use
+        columns = self.columns.get(sensorName)
+        if columns is None:
+            table = quote(sensorName)
+            self.db.execute("CREATE TABLE IF NOT EXISTS " + table + " (t REAL NOT NULL)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS " + quote("idx_" + sensorName) + " ON " + table + " (t)")
+            columns = [row[1] for row in self.db.execute("PRAGMA table_info(" + table + ")")]
+            self.columns[sensorName] = columns
+        return columns
+
+    def insert(self, sensorName, dateTime, sensorDictionary):
+        with self.lock:
+            if self.closed:
+                print("[ERROR] Series store closed, " + sensorName + " sample not stored")
+                return
+            self.pending.append((sensorName, toEpoch(dateTime), sensorDictionary))
+            if self.pendingSince is None:
+                self.pendingSince = time.monotonic()
+                self.changed.notify()
+            if len(self.pending) >= sqliteBatchSize or \
+                    time.monotonic() - self.pendingSince >= sqliteBatchSeconds:
+                self.flush()
+
+    def flushLoop(self):
+        # Flushes a batch no insert came to complete, e.g. of a slow sensor
+        with self.lock:
+            while not self.closed:
+                if self.pendingSince is None:
+                    self.changed.wait()
+                    continue
+                waitFor = self.pendingSince + sqliteBatchSeconds - time.monotonic()
+                if waitFor > 0:
+                    self.changed.wait(waitFor)
+                else:
+                    self.flush()
+
+    def flush(self):
+        with self.lock:
+            if not self.pending:
+                return
+            pending, self.pending, self.pendingSince = self.pending, [], None
+
+            # Rows of the same sensor and keys go in one executemany
+            groups = {}
+            for sensorName, epoch, sensorDictionary in pending:
+                keys = tuple(key for key in sensorDictionary if key != "dateTime")
+                groups.setdefault((sensorName, keys), []).append(
+                    (epoch,) + tuple(toValue(sensorDictionary[key]) for key in keys))
+
+            try:
+                self.db.execute("BEGIN IMMEDIATE")
+                for (sensorName, keys), rows in groups.items():
+                    columns = self.tableColumns(sensorName)
+                    if any(key not in columns for key in keys):
+                        # Another process may have added them already
+                        columns[:] = [row[1] for row in self.db.execute("PRAGMA table_info(" + quote(sensorName) + ")")]
+                    for key in keys:
+                        if key not in columns:
+                            self.db.execute("ALTER TABLE " + quote(sensorName) + " ADD COLUMN " + quote(key))
+                            columns.append(key)
+                    self.db.executemany("INSERT INTO " + quote(sensorName) + " (t" \
+                            + "".join(", " + quote(key) for key in keys) + ") VALUES (?" \
+                            + ", ?"*len(keys) + ")", rows)
+                self.db.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self.db.in_transaction:
+                    self.db.execute("ROLLBACK")
+                self.columns.clear()
+                self.dropped += len(pending)
+                print("[ERROR] SQLite insert failed, {0} samples dropped: {1}".format(len(pending), e))
+
+            if time.monotonic() - self.lastRetention >= retentionInterval:
+                self.lastRetention = time.monotonic()
+                self.deleteBefore(time.time() - sqliteRetentionDays*86400)
+
+    def deleteBefore(self, epoch):
+        with self.lock:
+            try:
+                for (table,) in self.db.execute(
+                        "SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+                    self.db.execute("DELETE FROM " + quote(table) + " WHERE t < ?", (epoch,))
+            except sqlite3.Error as e:
+                print("[ERROR] SQLite retention failed: " + str(e))
+
+    def sensors(self):
+        return [row[0] for row in self.db.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+
+    def window(self, sensorName, columns, start=None, end=None):
+        # (times, values) for start <= t < end: times is a float64 epoch
+        # vector, values a float64 array with one column per name given.
+        # Text values and columns the sensor does not have come back NaN.
+        with self.lock:
+            self.flush()
+            if sensorName not in self.sensors():
+                return np.empty(0), np.empty((0, len(columns)))
+            known  = [row[1] for row in self.db.execute("PRAGMA table_info(" + quote(sensorName) + ")")]
+            select = ", ".join("CASE WHEN typeof({0}) IN ('real', 'integer') THEN {0} END".format(quote(column)) \
+                                    if column in known else "NULL" for column in columns)
+            rows = self.db.execute("SELECT t" + (", " + select if columns else "") \
+                        + " FROM " + quote(sensorName) + " WHERE t >= ? AND t < ? ORDER BY t",
+                        (toEpoch(start) if start is not None else float("-inf"),
+                         toEpoch(end) if end is not None else float("inf"))).fetchall()
+        data = np.array(rows, dtype=np.float64).reshape(len(rows), 1 + len(columns))
+        return data[:, 0], data[:, 1:]
+
+    def lastSeconds(self, sensorName, columns, seconds):
+        now = time.time()
+        return self.window(sensorName, columns, now - seconds, now + 1)
+
+    def latest(self, sensorName):
+        # (epoch, {column: value}) of the newest row, or (None, None)
+        with self.lock:
+            self.flush()
+            if sensorName not in self.sensors():
+                return None, None
+            cursor = self.db.execute("SELECT * FROM " + quote(sensorName) + " ORDER BY t DESC LIMIT 1")
+            row    = cursor.fetchone()
+        if row is None:
+            return None, None
+        names = [description[0] for description in cursor.description]
+        return row[0], dict(zip(names[1:], row[1:]))
+
+    def age(self, sensorName):
+        # Seconds since the newest sample of a sensor, None without samples
+        epoch, _ = self.latest(sensorName)
+        return None if epoch is None else time.time() - epoch
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.changed.notify()
+            self.flush()
+            self.db.close()
+
+
+store     = None
+storeLock = threading.Lock()
+
+
+def getStore():
+    global store
+    with storeLock:
+        if store is None:
+            store = SeriesStore(sqliteFile)
+        return store
+
+
+def closeStore():
+    with storeLock:
+        if store is not None:
+            store.close()
+
+# Registered at import so it runs after the exit handlers of modules imported
+# later, e.g. the ML batch flush in corrections, as atexit runs them in reverse
+atexit.register(closeStore)
+
+
+def insert(sensorName, dateTime, sensorDictionary):
+    getStore().insert(sensorName, dateTime, sensorDictionary)
+
+
+def window(sensorName, columns, start=None, end=None):
+    return getStore().window(sensorName, columns, start, end)
+
+
+def lastSeconds(sensorName, columns, seconds):
+    return getStore().lastSeconds(sensorName, columns, seconds)
+
+
+def mean(sensorName, columns, seconds):
+    # NaN aware mean per column over the last seconds, e.g. a last hour average
+    _, values = lastSeconds(sensorName, columns, seconds)
+    if len(values) == 0:
+        return np.full(len(columns), np.nan)
+    return np.nanmean(values, axis=0)
+
+
+def latest(sensorName):
+    return getStore().latest(sensorName)
+
+
+def age(sensorName):
+    return getStore().age(sensorName)
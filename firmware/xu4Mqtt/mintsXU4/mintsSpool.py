@@ -0,0 +1,196 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   Disk backed store and forward spool for MQTT publishes
+#   ---------------------------------
+#   Samples which could not be handed to the broker are appended to
+#   segment files (one JSON record per line). A small index keeps the
+#   position of the first record which has not been acknowledged yet.
+#   Records are read back one line at a time so memory stays bounded
+#   regardless of how large the backlog grows. Fully acknowledged
+#   segments are deleted and the oldest segment is dropped once the
+#   spool reaches its size limit. A spool folder belongs to one process:
+#   an exclusive lock on its lock file is taken at start up, and a second
+#   process on the same folder gets an OSError.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import os
+import json
+import fcntl
+import time
+import threading
+from collections import deque
+
+
+class MQTTSpool:
+
+    def __init__(self, spoolFolder, segmentSize, maxSegments):
+        self.folder      = spoolFolder
+        self.segmentSize = segmentSize
+        self.maxSegments = maxSegments
+        self.indexFile   = os.path.join(spoolFolder, "index.json")
+        self.lock        = threading.RLock()
+        self.inFlight    = deque()   # [mid, segment, offset after record, acked]
+        self.earlyAcks   = deque(maxlen=256)
+        self.lastPersist = time.monotonic()
+        self.stats       = {'spooled': 0, 'replayed': 0, 'acked': 0, 'dropped': 0}
+
+        if not os.path.exists(spoolFolder):
+            os.makedirs(spoolFolder)
+        self.lockFile = open(os.path.join(spoolFolder, "spool.lock"), 'w')
+        try:
+            fcntl.flock(self.lockFile, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self.lockFile.close()
+            raise OSError("Spool " + spoolFolder + " is in use by another process")
+
+        segments = self.listSegments()
+        self.ackSegment, self.ackOffset = self.loadIndex(segments)
+        self.writeSegment = max(segments) if segments else self.ackSegment
+        self.writeFile    = open(self.segmentPath(self.writeSegment), 'a')
+        self.readFile     = None
+        self.rewind()
+
+    def segmentPath(self, segment):
+        return os.path.join(self.folder, "segment_{0:08d}.log".format(segment))
+
+    def listSegments(self):
+        segments = []
+        for name in os.listdir(self.folder):
+            if name.startswith("segment_") and name.endswith(".log"):
+                segments.append(int(name[8:-4]))
+        return sorted(segments)
+
+    def loadIndex(self, segments):
+        try:
+            with open(self.indexFile, 'r') as fp:
+                index = json.load(fp)
+            segment, offset = index['segment'], index['offset']
+            if segments and segment < segments[0]:
+                return segments[0], 0
+            return segment, offset
+        except (OSError, ValueError, KeyError):
+            return (segments[0] if segments else 0), 0
+
+    def persistIndex(self):
+        tmpFile = self.indexFile + ".tmp"
+        with open(tmpFile, 'w') as fp:
+            json.dump({'segment': self.ackSegment, 'offset': self.ackOffset}, fp)
+        os.replace(tmpFile, self.indexFile)
+        self.lastPersist = time.monotonic()
+
+    def append(self, topic, payload):
+        with self.lock:
+            if self.writeFile.tell() >= self.segmentSize:
+                self.writeFile.close()
+                self.writeSegment += 1
+                self.writeFile = open(self.segmentPath(self.writeSegment), 'a')
+                self.enforceLimit()
+            self.writeFile.write(json.dumps([topic, payload]) + "\n")
+            self.writeFile.flush()
+            self.stats['spooled'] += 1
+
+    def enforceLimit(self):
+        segments = self.listSegments()
+        while len(segments) > self.maxSegments:
+            oldest = segments.pop(0)
+            print("[ERROR] MQTT spool full, dropping segment {0}".format(oldest))
+            os.remove(self.segmentPath(oldest))
+            self.stats['dropped'] += 1
+            if self.ackSegment <= oldest:
+                self.ackSegment, self.ackOffset = segments[0], 0
+                self.persistIndex()
+                self.rewind()
+
+    def pending(self):
+        with self.lock:
+            if self.readSegment < self.writeSegment:
+                return True
+            return self.readOffset < self.writeFile.tell()
+
+    def numInFlight(self):
+        return len(self.inFlight)
+
+    def nextRecord(self):
+        # Returns (topic, payload) for the next record to replay, or None
+        with self.lock:
+            while True:
+                if self.readFile is None:
+                    if not os.path.exists(self.segmentPath(self.readSegment)):
+                        if self.readSegment >= self.writeSegment:
+                            return None
+                        self.readSegment, self.readOffset = self.readSegment + 1, 0
+                        continue
+                    self.readFile = open(self.segmentPath(self.readSegment), 'r')
+                    self.readFile.seek(self.readOffset)
+
+                line = self.readFile.readline()
+                if line.endswith("\n"):
+                    self.readOffset = self.readFile.tell()
+                    try:
+                        topic, payload = json.loads(line)
+                    except ValueError:
+                        continue
+                    return topic, payload
+
+                # End of segment, or a record that is still being written
+                self.readFile.seek(self.readOffset)
+                if self.readSegment >= self.writeSegment:
+                    return None
+                self.readFile.close()
+                self.readFile = None
+                self.readSegment, self.readOffset = self.readSegment + 1, 0
+
+    def sent(self, mid):
+        with self.lock:
+            entry = [mid, self.readSegment, self.readOffset, mid in self.earlyAcks]
+            self.inFlight.append(entry)
+            self.stats['replayed'] += 1
+            self.advance()
+
+    def acked(self, mid):
+        with self.lock:
+            for entry in self.inFlight:
+                if entry[0] == mid:
+                    entry[3] = True
+                    self.advance()
+                    return
+            # The broker can acknowledge before sent() registered the mid
+            self.earlyAcks.append(mid)
+
+    def advance(self):
+        moved = False
+        while self.inFlight and self.inFlight[0][3]:
+            mid, segment, offset, _ = self.inFlight.popleft()
+            if segment > self.ackSegment:
+                for old in range(self.ackSegment, segment):
+                    if os.path.exists(self.segmentPath(old)):
+                        os.remove(self.segmentPath(old))
+            self.ackSegment, self.ackOffset = segment, offset
+            self.stats['acked'] += 1
+            moved = True
+        if moved and (time.monotonic() - self.lastPersist) >= 1:
+            self.persistIndex()
+
+    def rewind(self):
+        # Resend everything after the last acknowledged record
+        with self.lock:
+            if self.readFile is not None:
+                self.readFile.close()
+            self.readFile    = None
+            self.readSegment = self.ackSegment
+            self.readOffset  = self.ackOffset
+            self.inFlight.clear()
+
+    def close(self):
+        with self.lock:
+            if self.writeFile.closed:
+                return
+            self.persistIndex()
+            self.writeFile.close()
+            if self.readFile is not None:
+                self.readFile.close()
+            self.lockFile.close()
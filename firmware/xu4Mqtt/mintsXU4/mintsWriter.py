@@ -0,0 +1,159 @@
+# ***************************************************************************
+#  mintsXU4
+#   ---------------------------------
+#   Persistent CSV writer pool for the raw daily sensor files
+#   ---------------------------------
+#   sensorFinisher used to open, write and close the daily CSV for every
+#   single sample. This module keeps one open handle per sensor for the
+#   current day, caches the csv writer and header, and flushes the
+#   buffered rows either every csvFlushSize rows or every
+#   csvFlushInterval seconds. Handles are rolled over when the date in
+#   the write path changes and flushed on exit and on SIGTERM.
+#   --------------------------------------------------------------------------
+#   https://github.com/mi3nts
+#   http://utdmints.info/
+#  ***************************************************************************
+
+import os
+import csv
+import time
+import atexit
+import signal
+import threading
+
+from mintsXU4 import mintsDefinitions as mD
+
+csvFlushInterval = mD.csvFlushInterval
+csvFlushSize     = mD.csvFlushSize
+csvBufferSize    = mD.csvBufferSize
+
+writerPool    = {}
+writePaths    = {}
+poolLock      = threading.RLock()
+lastFlushAll  = time.monotonic()
+
+
+class CSVHandle:
+
+    def __init__(self, writePath, keys):
+        directoryIn = os.path.dirname(writePath)
+        if not os.path.exists(directoryIn):
+            os.makedirs(directoryIn)
+
+        exists          = os.path.isfile(writePath) and os.path.getsize(writePath) > 0
+        self.writePath  = writePath
+        self.file       = open(writePath, 'a', newline='', buffering=csvBufferSize)
+        self.keys       = keys
+        self.writer     = csv.DictWriter(self.file, fieldnames=keys)
+        self.pending    = 0
+        self.lastFlush  = time.monotonic()
+
+        if not exists:
+            self.writer.writeheader()
+            self.pending += 1
+
+    def write(self, sensorDictionary):
+        keys = list(sensorDictionary.keys())
+        if keys != self.keys:
+            # Same behaviour as writeCSV2: a changed layout is written as is
+            self.keys   = keys
+            self.writer = csv.DictWriter(self.file, fieldnames=keys)
+        self.writer.writerow(sensorDictionary)
+        self.pending += 1
+
+    def due(self, nowIn):
+        return self.pending >= csvFlushSize or \
+                (self.pending > 0 and (nowIn - self.lastFlush) >= csvFlushInterval)
+
+    def flush(self):
+        if self.pending > 0:
+            self.file.flush()
+            self.pending = 0
+        self.lastFlush = time.monotonic()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.file.close()
+
+
+def getWritePathCached(sensorName, dateTime, pathFunction):
+    # The path only changes once a day, so only rebuild it when the date does
+    dateKey = (dateTime.year, dateTime.month, dateTime.day)
+    cached  = writePaths.get(sensorName)
+    if cached is not None and cached[0] == dateKey:
+        return cached[1]
+    writePath = pathFunction(sensorName, dateTime)
+    writePaths[sensorName] = (dateKey, writePath)
+    return writePath
+
+
+def writeRow(sensorName, writePath, sensorDictionary):
+    global lastFlushAll
+    with poolLock:
+        handle = writerPool.get(sensorName)
+        if handle is not None and handle.writePath != writePath:
+            # Daily rollover
+            handle.close()
+            handle = None
+
+        if handle is None:
+            handle = CSVHandle(writePath, list(sensorDictionary.keys()))
+            writerPool[sensorName] = handle
+
+        handle.write(sensorDictionary)
+
+        now = time.monotonic()
+        if handle.due(now):
+            handle.flush()
+
+        # Sensors which stopped writing still get their rows on disk
+        if (now - lastFlushAll) >= csvFlushInterval:
+            for other in writerPool.values():
+                if other.due(now):
+                    other.flush()
+            lastFlushAll = now
+
+
+def flushAll():
+    with poolLock:
+        for handle in writerPool.values():
+            try:
+                handle.flush()
+            except Exception as e:
+                print("[ERROR] Could not flush {0}: {1}".format(handle.writePath, e))
+
+
+def closeAll():
+    with poolLock:
+        for handle in writerPool.values():
+            try:
+                handle.close()
+            except Exception as e:
+                print("[ERROR] Could not close {0}: {1}".format(handle.writePath, e))
+        writerPool.clear()
+
+
+previousSigterm = None
+
+def onSigterm(signum, frame):
+    closeAll()
+    if callable(previousSigterm):
+        previousSigterm(signum, frame)
+    else:
+        raise SystemExit(0)
+
+
+def installHandlers():
+    global previousSigterm
+    atexit.register(closeAll)
+    try:
+        previousSigterm = signal.getsignal(signal.SIGTERM)
+        signal.signal(signal.SIGTERM, onSigterm)
+    except ValueError:
+        # Only the main thread can install signal handlers
+        pass
+
+
+installHandlers()
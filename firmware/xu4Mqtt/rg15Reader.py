@@ -5,6 +5,7 @@ import sys
 
 from mintsXU4 import mintsSensorReader as mSR
 from mintsXU4 import mintsDefinitions as mD
+from mintsXU4 import mintsSerialLines as mSL
 
 rainPort               = '/dev/ttyS1'
 firstReset             = True
@@ -21,7 +22,7 @@ def delayMints(timeSpent,loopIntervalIn):
     return time.time();
 
 def readLine(lineIn,sleepTime):
-    dataString     = (''.join(lineIn)).replace("\n","").replace("\r","")
+    dataString     = lineIn.replace("\n","").replace("\r","")
     print(dataString)
     time.sleep(sleepTime)
     return dataString;      
@@ -48,7 +49,7 @@ def main(firstReset,firstResolutionSetup,firstMetricSystemSetup,loopInterval):
     print(" ")
     print("Connected to: " + ser.portstr)
     print(" ")
-    line = []
+    reader = mSL.SerialLineReader(ser)
     
     print("First Data Read")
     ser.write(str.encode('R\r\n'))
@@ -56,44 +57,38 @@ def main(firstReset,firstResolutionSetup,firstMetricSystemSetup,loopInterval):
 
     while True:
         try:
-            for c in ser.read():
-                line.append(chr(c))
+            line = reader.readLine()
+
+            if firstReset:
+                readLine(line,5)
+                sendChars("Reset Sensor",ser,'O\r\n',2)
+                sendChars("Second Data Read",ser,'R\r\n',2)
+                firstReset = False
+                continue
+                
+            if firstResolutionSetup:
+                readLine(line,5)
+                sendChars("Force High Resolution",ser,'H\r\n',2)        
+                firstResolutionSetup = False
+                continue
+                
+            if firstMetricSystemSetup:
+                readLine(line,5)
+                sendChars("Force Metric System",ser,'M\r\n',2)                    
+                firstMetricSystemSetup= False;
+                startTime = time.time()
+                continue
+
+            dateTime = datetime.datetime.now()
+            dataString = readLine(line,1)
+            print(dateTime)
+            
+            if dataString.count('Acc')==3:
+                mSR.RG15Write(dataString, dateTime)
+                time.sleep(5)
                 
-                if chr(c) == '\n' and (firstReset):
-                    readLine(line,5)
-                    sendChars("Reset Sensor",ser,'O\r\n',2)
-                    sendChars("Second Data Read",ser,'R\r\n',2)
-                    line = []
-                    firstReset = False
-                    break;
-                    
-                if chr(c) == '\n' and (firstResolutionSetup):
-                    readLine(line,5)
-                    sendChars("Force High Resolution",ser,'H\r\n',2)        
-                    line = []
-                    firstResolutionSetup = False
-                    break;
-                    
-                if chr(c) == '\n' and (firstMetricSystemSetup):
-                    readLine(line,5)
-                    sendChars("Force Metric System",ser,'M\r\n',2)                    
-                    line = []
-                    firstMetricSystemSetup= False;
-                    startTime = time.time()
-                    break;
-
-                if chr(c) == '\n':
-                    dateTime = datetime.datetime.now()
-                    dataString = readLine(line,1)
-                    print(dateTime)
-                    
-                    if dataString.count('Acc')==3:
-                        mSR.RG15Write(dataString, dateTime)
-                        time.sleep(5)
-                        
-                    line = []
-                    sendChars("Read Command Sent",ser,'R\r\n',1)   
-                    startTime = delayMints(time.time() - startTime,loopInterval)
+            sendChars("Read Command Sent",ser,'R\r\n',1)   
+            startTime = delayMints(time.time() - startTime,loopInterval)
 
         except Exception as e:
             time.sleep(.5)
@@ -102,7 +97,7 @@ def main(firstReset,firstResolutionSetup,firstMetricSystemSetup,loopInterval):
             firstReset               = True
             firstResolutionSetup     = True
             firstMetricSystemSetup   = True
-            line = []
+            reader.clear()
             sendChars("Read Command Sent",ser,'R\r\n',1)   
             print("Rain sensor error")
             time.sleep(.5) 
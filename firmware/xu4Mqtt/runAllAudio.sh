@@ -14,6 +14,12 @@ sleep 5
 python3 audioAnalyzer.py &
 sleep 5
 
+# In memory alternative to audioRecorder.py and audioAnalyzer.py
+# kill $(pgrep -f 'python3 audioStream.py')
+# sleep 5
+# python3 audioStream.py &
+# sleep 5
+
 
 python3 ipReader.py
 sleep 5
\ No newline at end of file
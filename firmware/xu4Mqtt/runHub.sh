@@ -0,0 +1,17 @@
+#!/bin/bash
+# Starts the single process sensor hub in place of the reader scripts in runAll.sh
+
+sleep 55
+
+for reader in ips7100ReaderV1.py i2cReader.py i2cAndUsbGPSReader.py rg15Reader.py rg15USBReader.py airMarReader.py gpsUSBReader.py sensorHub.py
+do
+    kill $(pgrep -f "python3 $reader")
+    sleep 1
+done
+
+sleep 5
+python3 sensorHub.py &
+sleep 5
+
+python3 ipReader.py
+sleep 5
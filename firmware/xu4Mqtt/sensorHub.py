@@ -0,0 +1,20 @@
+#
+# Runs the serial and I2C devices selected in mintsXU4/sensorHub.yaml in
+# one process, in place of the separate reader scripts
+# Usage : python3 sensorHub.py [hubConfig.yaml]
+import sys
+import asyncio
+
+from mintsXU4 import mintsSensorHub as mSH
+
+
+if __name__ == "__main__":
+    print("=============")
+    print("    MINTS    ")
+    print("=============")
+    config = mSH.loadConfig(sys.argv[1] if len(sys.argv) > 1 else None)
+    loop   = asyncio.get_event_loop()
+    try:
+        loop.run_until_complete(mSH.runHub(config))
+    except KeyboardInterrupt:
+        print("Stopping sensor hub")